@@ -6,6 +6,7 @@ Define what configurations to simulate:
 - BESS capacity range
 - Duration classes
 - DG capacity range (if enabled)
+- Solar (PV) capacity range (optional)
 """
 
 import streamlit as st
@@ -21,11 +22,22 @@ from src.wizard_state import (
     init_wizard_state, get_wizard_state, update_wizard_state,
     update_wizard_section, set_current_step, mark_step_completed,
     validate_step_3, get_step_status, can_navigate_to_step,
-    count_configurations, estimate_simulation_time, build_simulation_params
+    count_configurations, estimate_simulation_time, estimate_sweep_cost,
+    format_duration, build_simulation_params, sweep_signature, load_composition_params
 )
 from src.template_inference import get_template_info
 from src.load_builder import build_load_profile
-from src.dispatch_engine import SimulationParams, run_simulation, calculate_metrics
+from src.dispatch_engine import SimulationParams
+from src.export import PYARROW_AVAILABLE, ResultWriter, new_study_path
+from src.study_store import base_key, get_study_store, study_key
+from src.sweep_manifest import SweepManifest, list_sweeps, run_sweep
+from src.sweep_planner import (
+    delivery_frontier, grid_values, match_prior, progressive_chunk_size, snap
+)
+from src.perf_model import RUNTIME_BUDGET_SECONDS, estimate_sweep, recommend
+
+# Configurations simulated per batched pass (one checkpoint and study row group each)
+SWEEP_CHUNK_CONFIGS = 1024
 
 
 # =============================================================================
@@ -77,8 +89,24 @@ def render_step_indicator():
                 st.markdown(f"🔒 Step {num}: {label}")
 
 
-def run_batch_simulation(progress_bar, status_text):
-    """Run batch simulation for all configurations."""
+def run_batch_simulation(progress_bar, status_text, preview=None):
+    """
+    Run batch simulation for all configurations.
+
+    A sweep identical to one in the study store (same parameters, profiles
+    and grid) is loaded from the store instead of simulated. Otherwise
+    configurations run in chunks of SWEEP_CHUNK_CONFIGS lanes; with
+    'save_study' on, each chunk is streamed to a study file as it finishes
+    and the results are added to the store.
+
+    Args:
+        progress_bar: Streamlit progress bar
+        status_text: Streamlit placeholder for status messages
+        preview: Optional placeholder for the partial frontier
+
+    Returns:
+        Tuple of (results DataFrame, study dict with 'id', 'path', 'reused')
+    """
     state = get_wizard_state()
     setup = state['setup']
     rules = state['rules']
@@ -91,6 +119,7 @@ def run_batch_simulation(progress_bar, status_text):
         'end': setup.get('load_day_end', 18),
         'windows': setup.get('load_windows', []),
         'data': setup.get('load_csv_data'),
+        **load_composition_params(setup),
     }
     load_profile = build_load_profile(setup['load_mode'], load_params)
 
@@ -129,101 +158,224 @@ def run_batch_simulation(progress_bar, status_text):
     # Get template
     template_id = rules['inferred_template']
 
+    # Solar capacities: the profile above is the output of the Step 1 PV size
+    base_solar_mw = setup['solar_capacity_mw']
+    if sizing['mode'] == 'sizing' and sizing.get('solar_sweep', False):
+        solar_values = grid_values(sizing['solar_min'], sizing['solar_max'], sizing['solar_step'])
+    else:
+        solar_values = [base_solar_mw]
+
     # Generate configurations
     if sizing['mode'] == 'fixed':
         configs = [{
             'capacity': sizing['fixed_capacity'],
             'duration': sizing['fixed_duration'],
             'dg_capacity': sizing['fixed_dg'] if setup['dg_enabled'] else 0,
+            'solar_mw': base_solar_mw,
         }]
     else:
         configs = []
-        cap_values = np.arange(
-            sizing['capacity_min'],
-            sizing['capacity_max'] + sizing['capacity_step'],
-            sizing['capacity_step']
-        )
+        cap_values = grid_values(sizing['capacity_min'], sizing['capacity_max'], sizing['capacity_step'])
         dur_values = sizing['durations']
 
         if setup['dg_enabled']:
-            dg_values = np.arange(
-                sizing['dg_min'],
-                sizing['dg_max'] + sizing['dg_step'],
-                sizing['dg_step']
-            )
+            dg_values = grid_values(sizing['dg_min'], sizing['dg_max'], sizing['dg_step'])
         else:
             dg_values = [0]
 
-        for cap in cap_values:
-            for dur in dur_values:
-                for dg in dg_values:
-                    configs.append({
-                        'capacity': cap,
-                        'duration': dur,
-                        'dg_capacity': dg,
-                    })
-
-    # Run simulations
-    results = []
-    total = len(configs)
+        for solar_mw in solar_values:
+            for cap in cap_values:
+                for dur in dur_values:
+                    for dg in dg_values:
+                        configs.append({
+                            'capacity': cap,
+                            'duration': dur,
+                            'dg_capacity': dg,
+                            'solar_mw': solar_mw,
+                        })
+
+    # Shared parameters; per-config sizes are batch lanes
+    params = SimulationParams(
+        load_profile=load_profile.tolist(),
+        solar_profile=solar_profile,
+        bess_efficiency=setup['bess_efficiency'],
+        bess_min_soc=setup['bess_min_soc'],
+        bess_max_soc=setup['bess_max_soc'],
+        bess_initial_soc=setup['bess_initial_soc'],
+        bess_daily_cycle_limit=setup['bess_daily_cycle_limit'],
+        bess_enforce_cycle_limit=setup['bess_enforce_cycle_limit'],
+        dg_enabled=setup['dg_enabled'],
+        dg_charges_bess=rules['dg_charges_bess'],
+        dg_load_priority=rules.get('dg_load_priority', 'bess_first'),
+        dg_takeover_mode=rules.get('dg_takeover_mode', False),
+        dg_operating_mode=setup.get('dg_operating_mode', 'binary'),
+        dg_min_load_pct=setup.get('dg_min_load_pct', 30.0),
+        night_start_hour=rules['night_start'],
+        night_end_hour=rules['night_end'],
+        day_start_hour=rules['day_start'],
+        day_end_hour=rules['day_end'],
+        blackout_start_hour=rules['blackout_start'],
+        blackout_end_hour=rules['blackout_end'],
+        dg_soc_on_threshold=rules['soc_on_threshold'],
+        dg_soc_off_threshold=rules['soc_off_threshold'],
+    )
 
-    for i, config in enumerate(configs):
-        # Update progress
-        progress = (i + 1) / total
-        progress_bar.progress(progress)
-        status_text.text(f"Running {i + 1} of {total}...")
-
-        # Build simulation params
-        power = config['capacity'] / config['duration']
-
-        params = SimulationParams(
-            load_profile=load_profile.tolist(),
-            solar_profile=solar_profile,
-            bess_capacity=config['capacity'],
-            bess_charge_power=power,
-            bess_discharge_power=power,
-            bess_efficiency=setup['bess_efficiency'],
-            bess_min_soc=setup['bess_min_soc'],
-            bess_max_soc=setup['bess_max_soc'],
-            bess_initial_soc=setup['bess_initial_soc'],
-            bess_daily_cycle_limit=setup['bess_daily_cycle_limit'],
-            bess_enforce_cycle_limit=setup['bess_enforce_cycle_limit'],
-            dg_enabled=setup['dg_enabled'],
-            dg_capacity=config['dg_capacity'],
-            dg_charges_bess=rules['dg_charges_bess'],
-            dg_load_priority=rules.get('dg_load_priority', 'bess_first'),
-            dg_takeover_mode=rules.get('dg_takeover_mode', False),
-            night_start_hour=rules['night_start'],
-            night_end_hour=rules['night_end'],
-            day_start_hour=rules['day_start'],
-            day_end_hour=rules['day_end'],
-            blackout_start_hour=rules['blackout_start'],
-            blackout_end_hour=rules['blackout_end'],
-            dg_soc_on_threshold=rules['soc_on_threshold'],
-            dg_soc_off_threshold=rules['soc_off_threshold'],
-        )
+    capacity = np.array([c['capacity'] for c in configs], dtype=float)
+    duration = np.array([c['duration'] for c in configs])
+    power = snap(capacity / duration.astype(float))
+    dg_mw = np.array([c['dg_capacity'] for c in configs], dtype=float)
+    solar_mw = np.array([c['solar_mw'] for c in configs], dtype=float)
+    solar_scale = solar_mw / base_solar_mw if base_solar_mw > 0 else np.ones(len(configs))
+
+    sweep_configs = {
+        'bess_mwh': capacity,
+        'duration_hrs': duration,
+        'power_mw': power,
+        'dg_mw': dg_mw,
+        'solar_mw': solar_mw,
+        'solar_scale': solar_scale,
+    }
+    total = len(configs)
 
-        # Run simulation
-        hourly_results = run_simulation(params, template_id, num_hours=8760)
-        metrics = calculate_metrics(hourly_results, params)
-
-        # Store result
-        results.append({
-            'bess_mwh': config['capacity'],
-            'duration_hrs': config['duration'],
-            'power_mw': power,
-            'dg_mw': config['dg_capacity'],
-            'delivery_pct': metrics.pct_full_delivery,
-            'wastage_pct': metrics.pct_solar_curtailed,
-            'delivery_hours': metrics.hours_full_delivery,
-            'green_hours': metrics.hours_green_delivery,
-            'dg_hours': metrics.dg_runtime_hours,
-            'dg_starts': metrics.dg_starts,
-            'bess_cycles': metrics.bess_equivalent_cycles,
-            'unserved_mwh': metrics.total_unserved,
+    # Identical sweep already stored: reuse it
+    store = get_study_store()
+    key = study_key(params, template_id, {
+        'bess_capacity': capacity, 'bess_power': power, 'dg_capacity': dg_mw, 'solar_mw': solar_mw,
+    })
+    study_id = store.find(key)
+    if study_id is not None:
+        progress_bar.progress(1.0)
+        status_text.text(f"Loaded {total} configurations from the study store")
+        stored = store.list_studies()
+        path = next((s['metadata'].get('path') for s in stored if s['study_id'] == study_id), None)
+        return store.load(study_id), {'id': study_id, 'path': path, 'reused': True, 'resumed': 0,
+                                      'reused_configs': total, 'signature': sweep_signature()}
+
+    # Configurations already simulated by earlier studies of the same inputs
+    base = base_key(params, template_id)
+    prior = match_prior(pd.DataFrame(sweep_configs), store.base_results(base))
+
+    # Progressive runs use smaller chunks so early results arrive sooner
+    schedule = sizing.get('schedule', 'grid')
+    chunk_configs = SWEEP_CHUNK_CONFIGS
+    if schedule == 'progressive':
+        chunk_configs = progressive_chunk_size(total - len(prior), SWEEP_CHUNK_CONFIGS)
+
+    # Same key as an interrupted run: its finished chunks are kept
+    manifest = SweepManifest.create(
+        key, params, template_id, sweep_configs,
+        num_hours=8760,
+        chunk_configs=chunk_configs,
+        schedule=schedule,
+        metadata={
+            'base_key': base,
+            'load_mw': setup['load_mw'],
+            'solar_capacity_mw': base_solar_mw,
+            'dg_enabled': setup['dg_enabled'],
+            'signature': sweep_signature(),
+        },
+        prior=prior if len(prior) else None,
+    )
+    return run_sweep_manifest(manifest, progress_bar, status_text, params,
+                              save_study=sizing.get('save_study', True), preview=preview)
+
+
+def run_sweep_manifest(manifest, progress_bar, status_text, params=None, save_study=True, preview=None):
+    """
+    Run or resume a sweep from its manifest, then keep its results.
+
+    Only configurations without earlier results are simulated. Every
+    finished chunk is checkpointed in the manifest, so a sweep cut off by
+    a restart or disconnect continues where it stopped. With
+    'save_study' on, each checkpointed chunk is streamed to a study file
+    as it finishes (after the configurations already known), so an
+    interrupted sweep still leaves its finished rows on disk; the results
+    are added to the store and the manifest removed once the sweep is done. With a
+    preview placeholder, the approximate delivery frontier is redrawn
+    after every chunk.
+
+    Returns:
+        Tuple of (results DataFrame, study dict with 'id', 'path', 'reused',
+        'resumed' = configurations finished before this run, 'reused_configs'
+        = configurations taken from earlier studies, 'signature' = wizard
+        sweep_signature of the sweep)
+    """
+    total = manifest.total
+    resumed = manifest.status()['completed'] - manifest.reused
+    label = f"Resuming {total} configurations ({resumed} done)" if resumed else f"Simulating {total} configurations"
+
+    def report_progress(fraction):
+        progress_bar.progress(fraction)
+        status_text.text(f"{label}... {fraction:.0%}")
+
+    # Study file written as the sweep runs: known results first, then
+    # every chunk as it is checkpointed (rows tagged with their config id)
+    writer = None
+    if save_study and PYARROW_AVAILABLE:
+        writer = ResultWriter(new_study_path('sweep'), metadata={
+            'kind': 'sweep',
+            'template_id': manifest.template_id,
+            'configurations': total,
+            'sweep_id': manifest.sweep_id,
+            **manifest.metadata,
         })
+        known = manifest.results()
+        for start in range(0, len(known), SWEEP_CHUNK_CONFIGS):
+            part = known.iloc[start:start + SWEEP_CHUNK_CONFIGS]
+            writer.write(part, config_id=part.index.to_numpy())
+
+    def on_chunk(current, index):
+        if writer is not None:
+            chunk = current.results([index], include_prior=False)
+            writer.write(chunk, config_id=chunk.index.to_numpy())
+        if preview is None or current.is_complete:
+            return
+        partial = current.results()
+        with preview.container():
+            st.caption(f"Approximate delivery frontier from {len(partial):,} of {total:,} configurations")
+            st.line_chart(delivery_frontier(partial).set_index('bess_mwh'), height=250)
 
-    return pd.DataFrame(results)
+    try:
+        results = run_sweep(manifest, progress_callback=report_progress, params=params,
+                            chunk_callback=on_chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if preview is not None:
+        preview.empty()
+    results = results.reset_index(drop=True)
+
+    path = str(writer.sink) if writer is not None and writer.rows else None
+    study_id = None
+    if save_study:
+        study_id = get_study_store().save(manifest.key, results, template_id=manifest.template_id,
+                                          metadata={'path': path, **manifest.metadata},
+                                          base=manifest.metadata.get('base_key'))
+    manifest.delete()
+    return results, {'id': study_id, 'path': path, 'reused': False, 'resumed': resumed,
+                     'reused_configs': manifest.reused, 'signature': manifest.metadata.get('signature')}
+
+
+def keep_sweep_results(results_df, study):
+    """Store sweep results in the wizard state and report how they were obtained."""
+    update_wizard_state('results', 'simulation_results', results_df)
+    update_wizard_state('results', 'study_path', study['path'])
+    update_wizard_state('results', 'study_id', study['id'])
+    update_wizard_state('results', 'partial_sweep', None)
+    update_wizard_state('results', 'sweep_signature', study.get('signature'))
+
+    if study['reused']:
+        st.success(f"Identical sweep found in the study store: loaded {len(results_df)} configurations")
+    else:
+        notes = []
+        if study['reused_configs']:
+            notes.append(f"{study['reused_configs']} reused from earlier studies")
+        if study['resumed']:
+            notes.append(f"{study['resumed']} restored from the interrupted run")
+        detail = f" ({', '.join(notes)})" if notes else ""
+        st.success(f"Completed {len(results_df)} configurations{detail}")
+
+    mark_step_completed(3)
 
 
 # =============================================================================
@@ -360,14 +512,92 @@ if mode == 'sizing':
         else:
             st.info("Generator is disabled. Only Solar + BESS configurations will be tested.")
 
+        # Solar (PV oversizing) range
+        st.markdown("### ☀️ Solar Capacity Range")
+
+        solar_sweep = st.checkbox(
+            "Vary solar capacity",
+            value=sizing.get('solar_sweep', False),
+            help=f"Scale the Step 1 profile ({setup['solar_capacity_mw']} MWp) to each solar size",
+            key='solar_sweep_check'
+        )
+        update_wizard_state('sizing', 'solar_sweep', solar_sweep)
+
+        if solar_sweep:
+            solar_min = st.number_input(
+                "Minimum (MWp)",
+                min_value=1.0,
+                max_value=1000.0,
+                value=float(sizing['solar_min']),
+                step=10.0,
+                key='solar_min_input'
+            )
+            update_wizard_state('sizing', 'solar_min', solar_min)
+
+            solar_max = st.number_input(
+                "Maximum (MWp)",
+                min_value=solar_min,
+                max_value=2000.0,
+                value=max(float(sizing['solar_max']), solar_min),
+                step=10.0,
+                key='solar_max_input'
+            )
+            update_wizard_state('sizing', 'solar_max', solar_max)
+
+            solar_step = st.selectbox(
+                "Step Size (MWp)",
+                options=[10.0, 25.0, 50.0, 100.0],
+                index=[10.0, 25.0, 50.0, 100.0].index(sizing['solar_step']) if sizing['solar_step'] in [10.0, 25.0, 50.0, 100.0] else 1,
+                key='solar_step_select'
+            )
+            update_wizard_state('sizing', 'solar_step', solar_step)
+        else:
+            st.caption(f"Using Step 1 solar capacity: {setup['solar_capacity_mw']} MWp")
+
         # Configuration summary
         st.markdown("### 📊 Simulation Summary")
 
         num_configs = count_configurations()
-        est_time = estimate_simulation_time()
+        cost = estimate_sweep_cost()
+        advice = recommend(cost, RUNTIME_BUDGET_SECONDS)
 
         st.metric("Total Configurations", f"{num_configs:,}")
-        st.metric("Estimated Time", est_time)
+        st.metric("Estimated Time", estimate_simulation_time())
+        st.caption(
+            f"Batched engine, peak memory ~{cost['batched']['memory_mb']:.0f} MB · "
+            f"serial engine would take {format_duration(cost['serial']['seconds'])} · "
+            f"measured on this machine"
+        )
+
+        schedule = st.radio(
+            "Run order",
+            options=['grid', 'progressive'],
+            format_func=lambda x: {'grid': 'Grid order', 'progressive': 'Progressive (early insight)'}[x],
+            index=['grid', 'progressive'].index(sizing.get('schedule', 'grid')),
+            horizontal=True,
+            key='schedule_radio',
+            help="Progressive runs the grid corners first, then an even spread, then the "
+                 "configurations near the delivery knee, so the trade-off is visible after "
+                 "the first chunk. Smaller chunks make it a little slower overall."
+        )
+        update_wizard_state('sizing', 'schedule', schedule)
+
+        if not advice['within_budget']:
+            # Smallest coarsening of the capacity grid that fits the budget
+            cap_count = len(grid_values(sizing['capacity_min'], sizing['capacity_max'], sizing['capacity_step']))
+            suggestion = None
+            for step in [s for s in [10.0, 25.0, 50.0, 100.0] if s > sizing['capacity_step']]:
+                coarse = num_configs // cap_count * len(grid_values(sizing['capacity_min'], sizing['capacity_max'], step))
+                coarse_cost = estimate_sweep(coarse, rules['inferred_template'], dg_enabled)
+                if recommend(coarse_cost, RUNTIME_BUDGET_SECONDS)['within_budget']:
+                    suggestion = (step, coarse, coarse_cost[advice['backend']]['seconds'])
+                    break
+            if suggestion is not None:
+                st.info(f"💡 Over the {RUNTIME_BUDGET_SECONDS} s budget. A {suggestion[0]:.0f} MWh capacity step "
+                        f"gives {suggestion[1]:,} configurations ({format_duration(suggestion[2])}).")
+            else:
+                st.info(f"💡 Over the {RUNTIME_BUDGET_SECONDS} s budget. Narrow the capacity, "
+                        f"DG or solar range to shorten the run.")
 
         if num_configs > 10000:
             st.warning("⚠️ Large number of configurations. Consider reducing range or increasing step size.")
@@ -445,6 +675,42 @@ if errors:
             st.error(error)
 
 
+# Interrupted or in-progress sweeps (this or another session)
+unfinished = list_sweeps()
+if unfinished:
+    with st.expander(f"⏯️ Unfinished Sweeps ({len(unfinished)})", expanded=True):
+        st.caption("Sweeps keep a checkpoint after every chunk of configurations. "
+                   "Resume one to finish only the remaining configurations.")
+        for sweep in unfinished:
+            info_col, resume_col, discard_col = st.columns([4, 1, 1])
+            template_name = get_template_info(sweep['template_id'])['name']
+            state_label = "running in another session" if sweep['active'] else sweep['state']
+            info_col.markdown(
+                f"`{sweep['sweep_id']}` · {sweep['created'].replace('T', ' ')} · {template_name} · "
+                f"{sweep['completed']}/{sweep['total']} configurations ({sweep['progress']:.0%}) · {state_label}"
+            )
+            if sweep['active']:
+                resume_col.button("🔄 Refresh", key=f"refresh_{sweep['sweep_id']}", width='stretch')
+                continue
+            if resume_col.button("▶️ Resume", key=f"resume_{sweep['sweep_id']}", width='stretch'):
+                progress_bar = st.progress(sweep['progress'])
+                status_text = st.empty()
+                preview = st.empty()
+                try:
+                    results_df, study = run_sweep_manifest(
+                        SweepManifest.open(sweep['sweep_id']), progress_bar, status_text,
+                        save_study=sizing.get('save_study', True), preview=preview)
+                    status_text.text("✅ Simulation complete!")
+                    keep_sweep_results(results_df, study)
+                    if st.button("View Results →", type="primary", key='resume_view_results'):
+                        st.switch_page("pages/11_📊_Step4_Results.py")
+                except Exception as e:
+                    st.error(f"Simulation error: {e}")
+            if discard_col.button("🗑️ Discard", key=f"discard_{sweep['sweep_id']}", width='stretch'):
+                SweepManifest.open(sweep['sweep_id']).delete()
+                st.rerun()
+
+
 # Navigation
 col1, col2, col3 = st.columns([1, 1, 1])
 
@@ -452,6 +718,15 @@ with col1:
     if st.button("← Back to Rules", width='stretch'):
         st.switch_page("pages/9_📋_Step2_Rules.py")
 
+with col2:
+    save_study = st.checkbox(
+        "💾 Save study",
+        value=sizing.get('save_study', True),
+        key='save_study_check',
+        help="Keep results in the study store (and a Parquet file) so Step 4 can reopen them later"
+    )
+    update_wizard_state('sizing', 'save_study', save_study)
+
 with col3:
     run_button = st.button(
         "🚀 Run Simulation",
@@ -466,18 +741,13 @@ if run_button:
 
     progress_bar = st.progress(0)
     status_text = st.empty()
+    preview = st.empty()
 
     try:
-        results_df = run_batch_simulation(progress_bar, status_text)
-
-        # Store results
-        update_wizard_state('results', 'simulation_results', results_df)
-
-        status_text.text("✅ Simulation complete!")
-        st.success(f"Completed {len(results_df)} configurations")
-
-        # Mark step complete and navigate
-        mark_step_completed(3)
+        results_df, study = run_batch_simulation(progress_bar, status_text, preview)
+        if not study['reused']:
+            status_text.text("✅ Simulation complete!")
+        keep_sweep_results(results_df, study)
 
         if st.button("View Results →", type="primary"):
             st.switch_page("pages/11_📊_Step4_Results.py")
@@ -510,6 +780,8 @@ with st.sidebar:
         st.markdown(f"- Durations: {sizing['durations']}")
         if dg_enabled:
             st.markdown(f"- DG: {sizing['dg_min']}-{sizing['dg_max']} MW")
+        if sizing.get('solar_sweep', False):
+            st.markdown(f"- Solar: {sizing['solar_min']}-{sizing['solar_max']} MWp")
     else:
         st.markdown(f"- BESS: {sizing['fixed_capacity']} MWh / {sizing['fixed_duration']}-hr")
         if dg_enabled:
@@ -7,6 +7,8 @@ Display and analyze simulation results:
 - Color-coded metrics
 - Detail view
 - Comparison view
+- Columnar export and reopening of saved studies (study store / files)
+- Delivery frontier, including partial results of unfinished sweeps
 """
 
 import streamlit as st
@@ -28,6 +30,10 @@ from src.wizard_state import (
     set_results_filter, toggle_results_filter
 )
 from src.template_inference import get_template_info
+from src.export import PYARROW_AVAILABLE, list_studies, read_results, to_bytes
+from src.study_store import get_study_store
+from src.sweep_manifest import SweepManifest, list_sweeps
+from src.sweep_planner import delivery_frontier, delivery_knee
 
 
 # =============================================================================
@@ -131,13 +137,14 @@ def filter_results(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
 
     if filters.get('hide_dominated', False):
         # Simple dominated detection: remove if worse on all metrics
-        # than another config with same or smaller BESS size
+        # than another config with same or smaller BESS and PV size
         to_keep = []
         for i, row in filtered.iterrows():
             dominated = False
             for j, other in filtered.iterrows():
                 if i != j:
                     if (other['bess_mwh'] <= row['bess_mwh'] and
+                        other['solar_mw'] <= row['solar_mw'] and
                         other['delivery_pct'] >= row['delivery_pct'] and
                         other['wastage_pct'] <= row['wastage_pct'] and
                         other['dg_hours'] <= row['dg_hours']):
@@ -145,7 +152,8 @@ def filter_results(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
                         if (other['delivery_pct'] > row['delivery_pct'] or
                             other['wastage_pct'] < row['wastage_pct'] or
                             other['dg_hours'] < row['dg_hours'] or
-                            other['bess_mwh'] < row['bess_mwh']):
+                            other['bess_mwh'] < row['bess_mwh'] or
+                            other['solar_mw'] < row['solar_mw']):
                             dominated = True
                             break
             if not dominated:
@@ -194,6 +202,48 @@ def create_comparison_chart(configs: list, results_df: pd.DataFrame) -> go.Figur
     return fig
 
 
+def create_frontier_chart(results_df: pd.DataFrame) -> go.Figure:
+    """Best delivery per BESS size over all configurations, with the knee marked."""
+    frontier = delivery_frontier(results_df)
+    knee = delivery_knee(frontier)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=results_df['bess_mwh'],
+        y=results_df['delivery_pct'],
+        mode='markers',
+        name='Configurations',
+        marker=dict(color='#bdc3c7', size=5),
+        hovertemplate='%{x:.0f} MWh: %{y:.1f}%<extra></extra>',
+    ))
+    fig.add_trace(go.Scatter(
+        x=frontier['bess_mwh'],
+        y=frontier['delivery_pct'],
+        mode='lines',
+        line_shape='hv',
+        name='Frontier',
+        line=dict(color='#3498db', width=3),
+    ))
+    if knee is not None:
+        knee_delivery = frontier.loc[frontier['bess_mwh'] == knee, 'delivery_pct'].iloc[0]
+        fig.add_trace(go.Scatter(
+            x=[knee],
+            y=[knee_delivery],
+            mode='markers',
+            name=f'Knee ({knee:.0f} MWh)',
+            marker=dict(color='#e74c3c', size=12, symbol='star'),
+        ))
+
+    fig.update_layout(
+        height=350,
+        xaxis_title="BESS Capacity (MWh)",
+        yaxis_title="Delivery (%)",
+        legend=dict(orientation='h', yanchor='bottom', y=1.02),
+        margin=dict(t=40),
+    )
+    return fig
+
+
 def create_detail_charts(row: pd.Series) -> dict:
     """Create detailed charts for a single configuration."""
     charts = {}
@@ -282,6 +332,104 @@ if results_df is None or len(results_df) == 0:
         st.switch_page("pages/10_📐_Step3_Sizing.py")
     st.stop()
 
+# Results from before the solar axis existed were all at the Step 1 PV size
+if 'solar_mw' not in results_df.columns:
+    results_df = results_df.assign(solar_mw=float(setup['solar_capacity_mw']))
+
+# Partial results of a sweep still running (or interrupted)
+partial = results_state.get('partial_sweep')
+if partial is not None:
+    partial_cols = st.columns([4, 1])
+    with partial_cols[0]:
+        st.info(f"⏳ Partial results of sweep `{partial['sweep_id']}`: {len(results_df):,} of "
+                f"{partial['total']:,} configurations. The frontier is approximate until the sweep finishes.")
+    with partial_cols[1]:
+        if st.button("🔄 Refresh", width='stretch', key='refresh_partial'):
+            finished_id = get_study_store().find(partial['key'])
+            if finished_id is not None:
+                update_wizard_state('results', 'simulation_results', get_study_store().load(finished_id))
+                update_wizard_state('results', 'study_id', finished_id)
+                update_wizard_state('results', 'partial_sweep', None)
+            else:
+                try:
+                    update_wizard_state('results', 'simulation_results',
+                                        SweepManifest.open(partial['sweep_id']).results().reset_index(drop=True))
+                except FileNotFoundError:
+                    update_wizard_state('results', 'partial_sweep', None)
+            st.rerun()
+
+
+# =============================================================================
+# SAVED STUDIES
+# =============================================================================
+
+store = get_study_store()
+study_id = results_state.get('study_id')
+
+# Stored studies first, then exported files the store does not know about
+stored_studies = store.list_studies()
+stored_paths = {study['metadata'].get('path') for study in stored_studies}
+study_options = {
+    f"db:{study['study_id']}": f"🗄️ {study['name']} — {study['configurations']} configs"
+    for study in stored_studies
+}
+study_options.update({
+    f"file:{study['path']}": f"📄 {study['name']} — {study['metadata'].get('configurations', '?')} configs"
+    for study in list_studies() if str(study['path']) not in stored_paths
+})
+study_options.update({
+    f"sweep:{sweep['sweep_id']}": f"⏳ Sweep {sweep['sweep_id']} — {sweep['completed']} of {sweep['total']} configs"
+    + (" (running)" if sweep['active'] else f" ({sweep['state']})")
+    for sweep in list_sweeps() if sweep['completed'] > 0
+})
+
+if study_options:
+    if partial is not None:
+        current_option = f"sweep:{partial['sweep_id']}"
+    elif study_id is not None:
+        current_option = f"db:{study_id}"
+    else:
+        current_option = f"file:{results_state.get('study_path')}"
+    with st.expander(f"📂 Saved Studies ({len(study_options)})"):
+        study_cols = st.columns([3, 1])
+        with study_cols[0]:
+            selected_study = st.selectbox(
+                "Study:",
+                options=list(study_options),
+                format_func=lambda key: study_options[key] + (' (current)' if key == current_option else ''),
+                key='study_select'
+            )
+        with study_cols[1]:
+            st.write("")
+            if st.button("Open Study", width='stretch', disabled=selected_study == current_option):
+                source, ref = selected_study.split(':', 1)
+                update_wizard_state('results', 'partial_sweep', None)
+                if source == 'sweep':
+                    manifest = SweepManifest.open(ref)
+                    update_wizard_state('results', 'simulation_results', manifest.results().reset_index(drop=True))
+                    update_wizard_state('results', 'study_id', None)
+                    update_wizard_state('results', 'study_path', None)
+                    update_wizard_state('results', 'partial_sweep', {
+                        'sweep_id': manifest.sweep_id, 'key': manifest.key, 'total': manifest.total,
+                    })
+                    update_wizard_state('results', 'sweep_signature', manifest.metadata.get('signature'))
+                elif source == 'db':
+                    update_wizard_state('results', 'simulation_results', store.load(int(ref)))
+                    update_wizard_state('results', 'study_id', int(ref))
+                    study_meta = next(s['metadata'] for s in stored_studies if s['study_id'] == int(ref))
+                    update_wizard_state('results', 'study_path', study_meta.get('path'))
+                    update_wizard_state('results', 'sweep_signature', study_meta.get('signature'))
+                else:
+                    study_df, study_meta = read_results(ref)
+                    # Sweep files hold chunks in run order; rows go back to config order
+                    study_df = study_df.sort_values('config_id', kind='stable').reset_index(drop=True)
+                    update_wizard_state('results', 'simulation_results', study_df.drop(columns='config_id'))
+                    update_wizard_state('results', 'study_id', None)
+                    update_wizard_state('results', 'study_path', ref)
+                    update_wizard_state('results', 'sweep_signature', study_meta.get('signature'))
+                update_wizard_state('results', 'selected_configs', [])
+                st.rerun()
+
 
 # =============================================================================
 # VIEW SELECTION
@@ -345,13 +493,20 @@ if view_mode == 'table':
         )
         set_results_filter('hide_dominated', hide_dominated)
 
-    # Apply filters
-    filtered_df = filter_results(results_df, {
+    # Apply filters (as SQL when the results are in the study store)
+    active_filters = {
         'full_delivery': full_delivery,
         'zero_dg': zero_dg,
         'low_wastage': low_wastage,
         'hide_dominated': hide_dominated,
-    })
+    }
+    if study_id is not None:
+        # SQL picks the config ids; rows come from the in-memory table so
+        # columns outside the store schema are kept (config id = row position)
+        kept_ids = store.query(study_id, active_filters).index.to_numpy()
+        filtered_df = results_df.iloc[kept_ids].set_axis(kept_ids)
+    else:
+        filtered_df = filter_results(results_df, active_filters)
 
     st.caption(f"Showing {len(filtered_df)} of {len(results_df)} configurations")
 
@@ -362,7 +517,11 @@ if view_mode == 'table':
 
     if len(filtered_df) > 0:
         # Best by delivery
-        best_row = filtered_df.loc[filtered_df['delivery_pct'].idxmax()]
+        if study_id is not None:
+            best_idx = store.best(study_id, 'delivery_pct', filters=active_filters).index[0]
+        else:
+            best_idx = filtered_df['delivery_pct'].idxmax()
+        best_row = filtered_df.loc[best_idx]
 
         metric_cols = st.columns(3)
 
@@ -413,10 +572,10 @@ if view_mode == 'table':
         config_summary = f"**Configuration:** {power_mw:.0f} MW × {best_row['duration_hrs']}-hr = {best_row['bess_mwh']:.0f} MWh"
         if best_row['dg_mw'] > 0:
             config_summary += f" | DG: {best_row['dg_mw']:.0f} MW"
+        config_summary += f" | Solar: {best_row['solar_mw']:.0f} MWp"
         st.markdown(config_summary)
 
         # Select button for this configuration
-        best_idx = filtered_df['delivery_pct'].idxmax()
         if st.button("📌 Select this configuration for comparison", key='select_top_config'):
             selected = results_state.get('selected_configs', [])
             if best_idx not in selected and len(selected) < 3:
@@ -426,25 +585,39 @@ if view_mode == 'table':
 
     st.markdown("---")
 
+    # Frontier of the filtered configurations
+    st.markdown("### 📈 Delivery Frontier")
+    if len(filtered_df) > 0:
+        st.plotly_chart(create_frontier_chart(filtered_df), width='stretch')
+        st.caption("Best delivery reachable with at most each BESS size; the knee is where extra "
+                   "capacity stops paying off.")
+
+    st.markdown("---")
+
     # Results table
     st.markdown("### All Configurations")
 
     # Format display columns
-    display_df = filtered_df[[
-        'bess_mwh', 'duration_hrs', 'power_mw', 'dg_mw',
+    table_columns = [
+        'bess_mwh', 'duration_hrs', 'power_mw', 'dg_mw', 'solar_mw',
         'delivery_pct', 'wastage_pct', 'delivery_hours',
         'dg_hours', 'bess_cycles'
-    ]].copy()
+    ]
+    table_labels = [
+        'Capacity (MWh)', 'Duration (hrs)', 'Power (MW)', 'DG (MW)', 'Solar (MWp)',
+        'Delivery %', 'Wastage %', 'Delivery Hours',
+        'DG Hours', 'BESS Cycles'
+    ]
+    if setup['dg_enabled'] and 'fuel_litres' in filtered_df.columns:
+        table_columns += ['fuel_litres', 'co2_tonnes', 'dg_low_load_hours']
+        table_labels += ['Fuel (L)', 'CO2 (t)', 'DG Low-Load Hours']
+    display_df = filtered_df[table_columns].copy()
 
     # Add combined BESS Size column (MW × hr format)
     display_df.insert(0, 'BESS Size',
         display_df.apply(lambda r: f"{r['power_mw']:.0f} MW × {r['duration_hrs']:.0f}-hr", axis=1))
 
-    display_df.columns = [
-        'BESS Size', 'Capacity (MWh)', 'Duration (hrs)', 'Power (MW)', 'DG (MW)',
-        'Delivery %', 'Wastage %', 'Delivery Hours',
-        'DG Hours', 'BESS Cycles'
-    ]
+    display_df.columns = ['BESS Size', *table_labels]
 
     # Round values
     display_df = display_df.round({
@@ -452,13 +625,15 @@ if view_mode == 'table':
         'Wastage %': 1,
         'Power (MW)': 1,
         'BESS Cycles': 0,
+        'Fuel (L)': 0,
+        'CO2 (t)': 1,
     })
 
     # Sortable dataframe
     sort_col = st.selectbox(
         "Sort by:",
         options=display_df.columns.tolist(),
-        index=4,  # Default to Delivery %
+        index=6,  # Default to Delivery %
         key='sort_column'
     )
 
@@ -521,7 +696,7 @@ if view_mode == 'table':
     st.markdown("---")
     st.markdown("### Export")
 
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
 
     with col1:
         csv_data = results_df.to_csv(index=False)
@@ -549,6 +724,19 @@ if view_mode == 'table':
             mime="text/csv"
         )
 
+    with col3:
+        if PYARROW_AVAILABLE:
+            st.download_button(
+                "📥 Download Parquet",
+                data=to_bytes(results_df, metadata={
+                    'kind': 'sweep',
+                    'template_id': rules['inferred_template'],
+                    'configurations': len(results_df),
+                }),
+                file_name="bess_sizing_results.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+
 
 # =============================================================================
 # DETAIL VIEW
@@ -560,6 +748,7 @@ elif view_mode == 'detail':
 
     # Select configuration
     config_options = [f"{i}: {row['bess_mwh']:.0f} MWh / {row['duration_hrs']}-hr / {row['dg_mw']:.0f} MW DG"
+                      f" / {row['solar_mw']:.0f} MWp PV"
                      for i, row in results_df.iterrows()]
 
     selected_config = st.selectbox(
@@ -587,6 +776,7 @@ elif view_mode == 'detail':
             st.metric("Power", f"{row['power_mw']:.1f} MW")
             if setup['dg_enabled']:
                 st.metric("DG Capacity", f"{row['dg_mw']:.0f} MW")
+            st.metric("Solar Capacity", f"{row['solar_mw']:.0f} MWp")
 
         with col2:
             st.markdown("#### Performance")
@@ -596,6 +786,11 @@ elif view_mode == 'detail':
             st.metric("BESS Cycles", f"{row['bess_cycles']:.0f}")
             if setup['dg_enabled']:
                 st.metric("DG Runtime", f"{row['dg_hours']:,} hours")
+                if pd.notna(row.get('fuel_litres')):
+                    st.metric("DG Fuel", f"{row['fuel_litres']:,.0f} L")
+                    st.metric("DG CO2", f"{row['co2_tonnes']:,.1f} t")
+                    if setup.get('dg_operating_mode') == 'variable':
+                        st.metric("DG Low-Load Hours", f"{row['dg_low_load_hours']:,.0f} hours")
 
 
 # =============================================================================
@@ -662,6 +857,8 @@ elif view_mode == 'compare':
                 st.metric("Wastage %", f"{row['wastage_pct']:.1f}%{wastage_suffix}")
                 st.metric("BESS Cycles", f"{row['bess_cycles']:.0f}")
                 st.metric("DG Hours", f"{row['dg_hours']:,}{dg_suffix}")
+                if setup['dg_enabled'] and pd.notna(row.get('fuel_litres')):
+                    st.metric("DG Fuel", f"{row['fuel_litres']:,.0f} L")
 
         st.caption("✓ = Best in category")
 
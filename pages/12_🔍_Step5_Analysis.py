@@ -5,6 +5,11 @@ Explore simulation results in detail for a selected configuration:
 - Section 1: Configuration selection (BESS size, duration, DG, dates)
 - Section 2: Dispatch visualization graph
 - Section 3: Hourly data table with color-coded states
+- Section 4: Weather-year ensemble (P50/P90) for the configuration
+- Section 5: Contingency study (DG outages, BESS derates) with LOLP/EUE
+- Section 6: DG SoC threshold optimizer (SoC-triggered templates)
+- Section 7: DG time-window optimizer (night/day/blackout templates)
+- Section 8: Side-by-side comparison of all dispatch templates
 """
 
 import streamlit as st
@@ -21,9 +26,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.wizard_state import (
     init_wizard_state, get_wizard_state, update_wizard_state,
-    set_current_step, get_step_status, can_navigate_to_step
+    set_current_step, get_step_status, can_navigate_to_step, load_composition_params
 )
 from src.template_inference import get_template_info
+from src.ensemble import bootstrap_solar_days, stack_solar_years, run_ensemble, ENSEMBLE_METRICS
+from src.contingency import run_contingency_study
+from src.threshold_optimizer import SOC_TEMPLATES, THRESHOLD_METRICS, optimize_soc_thresholds
+from src.window_optimizer import WINDOW_TEMPLATES, optimize_time_window
+from src.template_comparison import DEFAULT_TRACE_COLUMNS, compare_templates
+from src.metric_registry import METRICS
+from src.export import PYARROW_AVAILABLE, to_bytes
 
 
 # =============================================================================
@@ -196,9 +208,45 @@ def style_hourly_row(row):
     return [''] * len(row)
 
 
-def run_single_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules, solar_profile, load_profile):
-    """Run simulation for a single configuration and return hourly data."""
-    from src.dispatch_engine import SimulationParams, run_simulation
+def load_analysis_profiles(setup, solar_mw):
+    """Return (solar_profile list scaled to solar_mw, load_profile array)."""
+    solar_source = setup.get('solar_source', 'default')
+    if solar_source == 'upload' and setup.get('solar_csv_data') is not None:
+        solar_profile = setup['solar_csv_data']
+    elif 'default_solar_profile' in st.session_state:
+        solar_profile = st.session_state.default_solar_profile.tolist()
+    else:
+        try:
+            from src.data_loader import load_solar_profile
+            solar_data = load_solar_profile()
+            solar_profile = solar_data.tolist() if solar_data is not None else [0] * 8760
+        except:
+            solar_profile = [0] * 8760
+
+    # Scale the Step 1 profile to the selected PV size
+    base_solar_mw = setup['solar_capacity_mw']
+    if base_solar_mw > 0 and solar_mw != base_solar_mw:
+        solar_scale = solar_mw / base_solar_mw
+        solar_profile = [x * solar_scale for x in solar_profile]
+
+    # Build load profile
+    from src.load_builder import build_load_profile
+    load_params = {
+        'mw': setup['load_mw'],
+        'start': setup.get('load_day_start', 6),
+        'end': setup.get('load_day_end', 18),
+        'windows': setup.get('load_windows', []),
+        'data': setup.get('load_csv_data'),
+        **load_composition_params(setup),
+    }
+    load_profile = build_load_profile(setup['load_mode'], load_params)
+
+    return solar_profile, load_profile
+
+
+def build_analysis_params(bess_mwh, duration, dg_mw, setup, rules, solar_profile, load_profile):
+    """Build SimulationParams for a single configuration (same as Step 3)."""
+    from src.dispatch_engine import SimulationParams
 
     power_mw = bess_mwh / duration
 
@@ -220,6 +268,8 @@ def run_single_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules,
         dg_charges_bess=rules.get('dg_charges_bess', False),
         dg_load_priority=rules.get('dg_load_priority', 'bess_first'),
         dg_takeover_mode=rules.get('dg_takeover_mode', False),
+        dg_operating_mode=setup.get('dg_operating_mode', 'binary'),
+        dg_min_load_pct=setup.get('dg_min_load_pct', 30.0),
         night_start_hour=rules.get('night_start', 18),
         night_end_hour=rules.get('night_end', 6),
         day_start_hour=rules.get('day_start', 6),
@@ -229,6 +279,14 @@ def run_single_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules,
         dg_soc_on_threshold=rules.get('soc_on_threshold', 30),
         dg_soc_off_threshold=rules.get('soc_off_threshold', 80),
     )
+    return params
+
+
+def run_single_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules, solar_profile, load_profile):
+    """Run simulation for a single configuration and return hourly data."""
+    from src.dispatch_engine import run_simulation
+
+    params = build_analysis_params(bess_mwh, duration, dg_mw, setup, rules, solar_profile, load_profile)
 
     try:
         hourly_results = run_simulation(params, template_id, num_hours=8760)
@@ -265,6 +323,10 @@ if results_df is None or len(results_df) == 0:
         st.switch_page("pages/10_📐_Step3_Sizing.py")
     st.stop()
 
+# Results from before the solar axis existed were all at the Step 1 PV size
+if 'solar_mw' not in results_df.columns:
+    results_df = results_df.assign(solar_mw=float(setup['solar_capacity_mw']))
+
 
 # =============================================================================
 # SECTION 1: CONFIGURATION SELECTION
@@ -312,6 +374,17 @@ with col3:
         key='analysis_dg'
     )
 
+    # Solar sizes available for the selected combo (only shown when swept)
+    solar_options = sorted(filtered[filtered['dg_mw'] == selected_dg]['solar_mw'].unique())
+    if len(solar_options) > 1:
+        selected_solar = st.selectbox(
+            "Solar Capacity (MWp)",
+            options=solar_options,
+            key='analysis_solar'
+        )
+    else:
+        selected_solar = solar_options[0] if solar_options else float(setup['solar_capacity_mw'])
+
 # Date range selection
 st.markdown("**Date Range for Analysis:**")
 date_col1, date_col2, date_col3 = st.columns([1, 1, 2])
@@ -346,7 +419,7 @@ with date_col3:
 power_mw = selected_bess / selected_duration
 st.markdown(f"""
 **Selected Configuration:** `{power_mw:.0f} MW × {selected_duration}-hr = {selected_bess:.0f} MWh` |
-DG: `{selected_dg:.0f} MW`
+DG: `{selected_dg:.0f} MW` | Solar: `{selected_solar:.0f} MWp`
 """)
 
 # Template info
@@ -370,36 +443,13 @@ if run_analysis or 'analysis_hourly_data' in st.session_state:
     needs_rerun = True
     if 'analysis_hourly_data' in st.session_state:
         cached = st.session_state.get('analysis_cache_key')
-        current_key = f"{selected_bess}_{selected_duration}_{selected_dg}_{start_date}_{end_date}"
+        current_key = f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}_{start_date}_{end_date}"
         if cached == current_key:
             needs_rerun = False
 
     if needs_rerun or run_analysis:
         with st.spinner("Running simulation for selected configuration..."):
-            # Load solar profile
-            solar_source = setup.get('solar_source', 'default')
-            if solar_source == 'upload' and setup.get('solar_csv_data') is not None:
-                solar_profile = setup['solar_csv_data']
-            elif 'default_solar_profile' in st.session_state:
-                solar_profile = st.session_state.default_solar_profile.tolist()
-            else:
-                try:
-                    from src.data_loader import load_solar_profile
-                    solar_data = load_solar_profile()
-                    solar_profile = solar_data.tolist() if solar_data is not None else [0] * 8760
-                except:
-                    solar_profile = [0] * 8760
-
-            # Build load profile
-            from src.load_builder import build_load_profile
-            load_params = {
-                'mw': setup['load_mw'],
-                'start': setup.get('load_day_start', 6),
-                'end': setup.get('load_day_end', 18),
-                'windows': setup.get('load_windows', []),
-                'data': setup.get('load_csv_data'),
-            }
-            load_profile = build_load_profile(setup['load_mode'], load_params)
+            solar_profile, load_profile = load_analysis_profiles(setup, selected_solar)
 
             # Run simulation
             hourly_results = run_single_simulation(
@@ -438,7 +488,7 @@ if run_analysis or 'analysis_hourly_data' in st.session_state:
 
                 # Cache the results
                 st.session_state.analysis_hourly_data = hourly_df
-                st.session_state.analysis_cache_key = f"{selected_bess}_{selected_duration}_{selected_dg}_{start_date}_{end_date}"
+                st.session_state.analysis_cache_key = f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}_{start_date}_{end_date}"
             else:
                 st.error("Failed to get hourly data from simulation")
                 st.stop()
@@ -535,21 +585,511 @@ if run_analysis or 'analysis_hourly_data' in st.session_state:
         🔴 Pink = Unmet Load (Deficit)
         """)
 
-        # Export button
+        # Export buttons
         st.markdown("---")
-        csv_data = display_df[display_cols].to_csv(index=False)
-        st.download_button(
-            "📥 Download Hourly CSV",
-            data=csv_data,
-            file_name=f"analysis_{selected_bess}mwh_{selected_duration}hr_{selected_dg}mw_{start_date}_to_{end_date}.csv",
-            mime="text/csv",
-            width='stretch'
-        )
+        export_name = f"analysis_{selected_bess}mwh_{selected_duration}hr_{selected_dg}mw_{start_date}_to_{end_date}"
+        export_cols = st.columns(2)
+        with export_cols[0]:
+            csv_data = display_df[display_cols].to_csv(index=False)
+            st.download_button(
+                "📥 Download Hourly CSV",
+                data=csv_data,
+                file_name=f"{export_name}.csv",
+                mime="text/csv",
+                width='stretch'
+            )
+        with export_cols[1]:
+            if PYARROW_AVAILABLE:
+                st.download_button(
+                    "📥 Download Hourly Parquet",
+                    data=to_bytes(hourly_df, metadata={
+                        'kind': 'hourly',
+                        'template_id': template_id,
+                        'bess_mwh': selected_bess,
+                        'duration_hrs': selected_duration,
+                        'dg_mw': selected_dg,
+                        'solar_mw': selected_solar,
+                    }),
+                    file_name=f"{export_name}.parquet",
+                    mime="application/vnd.apache.parquet",
+                    width='stretch'
+                )
 
 else:
     st.info("👆 Select a configuration and click **Load Analysis** to view detailed dispatch data.")
 
 
+# =============================================================================
+# SECTION 4: WEATHER-YEAR ENSEMBLE
+# =============================================================================
+
+st.divider()
+st.subheader("🎲 Section 4: Weather-Year Ensemble (P50/P90)")
+st.caption(
+    "Runs the selected configuration over many solar years. P90 is the value met or "
+    "beaten in 90% of years (10th percentile of delivery, 90th of unserved energy and DG hours)."
+)
+
+ens_source = st.radio(
+    "Solar years:",
+    options=['bootstrap', 'upload'],
+    format_func=lambda x: "Resample base year (day-block bootstrap)" if x == 'bootstrap' else "Upload solar years (CSV, one column per year)",
+    horizontal=True,
+    key='ensemble_source'
+)
+
+ens_col1, ens_col2, ens_col3 = st.columns(3)
+uploaded_years = None
+
+if ens_source == 'bootstrap':
+    with ens_col1:
+        ens_members = st.number_input("Synthetic years", min_value=10, max_value=5000, value=200, step=50, key='ensemble_members')
+    with ens_col2:
+        ens_block = st.selectbox("Block length (days)", options=[1, 3, 5, 7, 10], index=2, key='ensemble_block')
+    with ens_col3:
+        ens_seed = st.number_input("Random seed", min_value=0, max_value=2**31 - 1, value=42, step=1, key='ensemble_seed')
+else:
+    ens_file = st.file_uploader(
+        "Upload Solar Years CSV",
+        type=['csv'],
+        help=f"One column of 8760 hourly values (MW) per year, for {setup['solar_capacity_mw']} MWp.",
+        key='ensemble_csv_uploader'
+    )
+    if ens_file is not None:
+        try:
+            uploaded_years = pd.read_csv(ens_file).select_dtypes(include='number')
+            st.success(f"{uploaded_years.shape[1]} solar years loaded")
+        except Exception as e:
+            st.error(f"Error reading CSV: {e}")
+
+run_ens = st.button(
+    "🎲 Run Ensemble",
+    disabled=ens_source == 'upload' and uploaded_years is None,
+    width='stretch'
+)
+
+if run_ens:
+    ens_progress = st.progress(0)
+    try:
+        solar_profile, load_profile = load_analysis_profiles(setup, selected_solar)
+        if ens_source == 'bootstrap':
+            members = bootstrap_solar_days(int(ens_members), block_days=ens_block, seed=int(ens_seed))
+            description = f"{int(ens_members)} bootstrapped years (seed {int(ens_seed)})"
+        else:
+            base_solar_mw = setup['solar_capacity_mw']
+            solar_scale = selected_solar / base_solar_mw if base_solar_mw > 0 else 1.0
+            years = [uploaded_years[c].to_numpy(dtype=float) * solar_scale for c in uploaded_years.columns]
+            solar_profile, members = stack_solar_years(years)
+            description = f"{len(years)} uploaded years"
+
+        params = build_analysis_params(
+            selected_bess, selected_duration, selected_dg, setup, rules,
+            list(solar_profile), load_profile
+        )
+        ensemble = run_ensemble(
+            params, template_id, members,
+            progress_callback=ens_progress.progress
+        )
+        st.session_state.analysis_ensemble = {
+            'key': f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}",
+            'description': description,
+            'result': ensemble,
+        }
+    except Exception as e:
+        st.error(f"Ensemble error: {e}")
+
+ensemble_state = st.session_state.get('analysis_ensemble')
+if ensemble_state and ensemble_state['key'] == f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}":
+    ens_metrics = ensemble_state['result']['metrics']
+    labels = {'delivery_pct': 'Delivery %', 'unserved_mwh': 'Unserved (MWh)', 'dg_hours': 'DG Hours'}
+
+    p_cols = st.columns(3)
+    for col, name in zip(p_cols, ENSEMBLE_METRICS):
+        col.metric(f"P90 {labels[name]}", f"{ens_metrics[name]['P90']:,.1f}",
+                   f"P50 {ens_metrics[name]['P50']:,.1f}", delta_color='off')
+
+    ens_df = pd.DataFrame([
+        {'Metric': labels[name], **{k: round(v, 2) for k, v in ens_metrics[name].items()}}
+        for name in ENSEMBLE_METRICS
+    ])
+    st.dataframe(ens_df, width='stretch', hide_index=True)
+    st.caption(f"Ensemble: {ensemble_state['description']}")
+
+
+# =============================================================================
+# SECTION 5: CONTINGENCY (DG OUTAGES / BESS DERATES)
+# =============================================================================
+
+st.divider()
+st.subheader("🛠️ Section 5: Contingency Study (LOLP / EUE)")
+st.caption("Random DG forced outages and BESS string losses, drawn from MTBF/MTTR, run through the batched engine.")
+
+cont_col1, cont_col2, cont_col3 = st.columns(3)
+
+with cont_col1:
+    st.markdown("**DG forced outages**")
+    cont_dg = st.checkbox("Model DG outages", value=setup['dg_enabled'] and selected_dg > 0,
+                          disabled=not (setup['dg_enabled'] and selected_dg > 0), key='cont_dg')
+    cont_dg_mtbf = st.number_input("DG MTBF (hours)", min_value=10.0, max_value=100000.0, value=1000.0, step=100.0, key='cont_dg_mtbf')
+    cont_dg_mttr = st.number_input("DG MTTR (hours)", min_value=1.0, max_value=5000.0, value=48.0, step=6.0, key='cont_dg_mttr')
+
+with cont_col2:
+    st.markdown("**BESS string losses**")
+    cont_bess = st.checkbox("Model BESS string outages", value=True, key='cont_bess')
+    cont_strings = st.number_input("Strings", min_value=1, max_value=100, value=10, step=1, key='cont_strings')
+    cont_str_mtbf = st.number_input("String MTBF (hours)", min_value=10.0, max_value=100000.0, value=5000.0, step=500.0, key='cont_str_mtbf')
+    cont_str_mttr = st.number_input("String MTTR (hours)", min_value=1.0, max_value=5000.0, value=72.0, step=12.0, key='cont_str_mttr')
+
+with cont_col3:
+    st.markdown("**Study**")
+    cont_draws = st.number_input("Outage draws", min_value=10, max_value=10000, value=500, step=100, key='cont_draws')
+    cont_seed = st.number_input("Random seed", min_value=0, max_value=2**31 - 1, value=7, step=1, key='cont_seed')
+
+run_cont = st.button("🛠️ Run Contingency Study", disabled=not (cont_dg or cont_bess), width='stretch')
+
+if run_cont:
+    cont_progress = st.progress(0)
+    try:
+        solar_profile, load_profile = load_analysis_profiles(setup, selected_solar)
+        params = build_analysis_params(
+            selected_bess, selected_duration, selected_dg, setup, rules, solar_profile, load_profile
+        )
+        study = run_contingency_study(
+            params, template_id,
+            num_draws=int(cont_draws),
+            dg_mtbf_hours=cont_dg_mtbf if cont_dg else None,
+            dg_mttr_hours=cont_dg_mttr if cont_dg else None,
+            bess_strings=int(cont_strings),
+            string_mtbf_hours=cont_str_mtbf if cont_bess else None,
+            string_mttr_hours=cont_str_mttr if cont_bess else None,
+            seed=int(cont_seed),
+            progress_callback=cont_progress.progress,
+        )
+        st.session_state.analysis_contingency = {
+            'key': f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}",
+            'result': study,
+        }
+    except Exception as e:
+        st.error(f"Contingency study error: {e}")
+
+contingency_state = st.session_state.get('analysis_contingency')
+if contingency_state and contingency_state['key'] == f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}":
+    study = contingency_state['result']
+    level = f"{study['confidence']:.0%} CI"
+    base = study['baseline']
+
+    c_cols = st.columns(3)
+    c_cols[0].metric("LOLP", f"{study['lolp']['mean']:.2%}",
+                     f"{study['lolp']['mean'] - base['lolp']:+.2%} vs no outages", delta_color='inverse')
+    c_cols[1].metric("EUE", f"{study['eue_mwh']['mean']:,.0f} MWh",
+                     f"{study['eue_mwh']['mean'] - base['eue_mwh']:+,.0f} MWh vs no outages", delta_color='inverse')
+    c_cols[2].metric("Delivery", f"{study['delivery_pct']['mean']:.1f}%",
+                     f"{study['delivery_pct']['mean'] - base['delivery_pct']:+.1f}% vs no outages")
+
+    cont_df = pd.DataFrame([
+        {'Metric': label, 'Mean': study[key]['mean'], 'Std': study[key]['std'],
+         f'{level} Low': study[key]['ci_low'], f'{level} High': study[key]['ci_high'],
+         'No Outages': base[key]}
+        for key, label in (('lolp', 'LOLP'), ('lole_hours', 'LOLE (hours)'),
+                           ('eue_mwh', 'EUE (MWh)'), ('delivery_pct', 'Delivery %'))
+    ])
+    st.dataframe(cont_df.round(4), width='stretch', hide_index=True)
+    st.caption(f"{study['draws']:,} outage draws")
+
+
+# =============================================================================
+# SECTION 6: DG SOC THRESHOLD OPTIMIZER
+# =============================================================================
+
+st.divider()
+st.subheader("🎚️ Section 6: DG SoC Threshold Optimizer")
+st.caption(
+    "Runs every valid DG ON/OFF SoC threshold pair (ON below OFF, both within the BESS SoC limits) "
+    "for the selected configuration in one batched pass."
+)
+
+if template_id not in SOC_TEMPLATES or not setup['dg_enabled']:
+    st.info(f"The current dispatch strategy ({template_info['name']}) does not start the DG on SoC thresholds.")
+else:
+    opt_col1, opt_col2 = st.columns(2)
+    with opt_col1:
+        opt_step = st.selectbox("Threshold step (%)", options=[5.0, 10.0], index=0, key='threshold_step')
+    with opt_col2:
+        # Step 2 keeps OFF at least 10% above ON
+        opt_deadband = st.number_input("Minimum deadband (%)", min_value=10.0, max_value=50.0, value=10.0,
+                                       step=5.0, key='threshold_deadband')
+
+    opt_key = f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}_{opt_step}_{opt_deadband}"
+    if st.button("🎚️ Optimize Thresholds", width='stretch'):
+        opt_progress = st.progress(0)
+        try:
+            solar_profile, load_profile = load_analysis_profiles(setup, selected_solar)
+            params = build_analysis_params(
+                selected_bess, selected_duration, selected_dg, setup, rules, solar_profile, load_profile
+            )
+            st.session_state.analysis_thresholds = {
+                'key': opt_key,
+                'result': optimize_soc_thresholds(params, template_id, step=opt_step, min_deadband=opt_deadband,
+                                                  progress_callback=opt_progress.progress),
+            }
+        except ValueError as e:
+            st.error(f"Threshold optimizer error: {e}")
+
+    threshold_state = st.session_state.get('analysis_thresholds')
+    if threshold_state and threshold_state['key'] == opt_key:
+        optimum = threshold_state['result']
+        labels = {'delivery_pct': 'Delivery %', 'dg_hours': 'DG Hours',
+                  'dg_starts': 'DG Starts', 'unserved_mwh': 'Unserved (MWh)'}
+
+        heat_metric = st.radio("Heatmap:", options=list(THRESHOLD_METRICS), format_func=labels.get,
+                               horizontal=True, key='threshold_heatmap_metric')
+        heatmap = optimum['heatmaps'][heat_metric]
+        fig_heat = go.Figure(go.Heatmap(
+            z=heatmap.to_numpy(), x=heatmap.columns, y=heatmap.index,
+            colorscale='RdYlGn' if heat_metric == 'delivery_pct' else 'RdYlGn_r',
+            colorbar=dict(title=labels[heat_metric]),
+            hovertemplate='ON %{y}% / OFF %{x}%<br>%{z:,.1f}<extra></extra>',
+        ))
+        fig_heat.add_trace(go.Scatter(
+            x=optimum['pareto']['soc_off'], y=optimum['pareto']['soc_on'], mode='markers',
+            marker=dict(symbol='circle-open', size=10, color='black', line=dict(width=2)),
+            name='Pareto-optimal', hoverinfo='skip',
+        ))
+        fig_heat.update_layout(
+            height=450, xaxis_title="DG OFF above SoC (%)", yaxis_title="DG ON below SoC (%)",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+            margin=dict(l=50, r=50, t=50, b=50),
+        )
+        st.plotly_chart(fig_heat, width='stretch')
+
+        st.markdown("**Pareto-optimal threshold pairs** (highest delivery, fewest DG hours and starts)")
+        pareto_df = optimum['pareto'].drop(columns='pareto').rename(columns={
+            'soc_on': 'ON below (%)', 'soc_off': 'OFF above (%)', **labels})
+        st.dataframe(pareto_df.round(2), width='stretch', hide_index=True)
+
+        current = (float(rules['soc_on_threshold']), float(rules['soc_off_threshold']))
+        st.caption(f"{len(optimum['pairs'])} pairs simulated, {optimum['skipped']} invalid pairs skipped. "
+                   f"Current rules: ON {current[0]:.0f}% / OFF {current[1]:.0f}%.")
+
+        # Pairs the Step 2 sliders can show (OFF slider needs room above ON + 10)
+        applicable = optimum['pareto'][optimum['pareto']['soc_on'] + 10 < setup['bess_max_soc']]
+        if not applicable.empty:
+            apply_cols = st.columns([3, 1])
+            with apply_cols[0]:
+                chosen = st.selectbox(
+                    "Pareto pair:", options=list(applicable.index),
+                    format_func=lambda i: (f"ON {applicable.loc[i, 'soc_on']:g}% / OFF {applicable.loc[i, 'soc_off']:g}% — "
+                                           f"{applicable.loc[i, 'delivery_pct']:.1f}% delivery, "
+                                           f"{applicable.loc[i, 'dg_hours']:,.0f} DG hrs, "
+                                           f"{applicable.loc[i, 'dg_starts']:,.0f} starts"),
+                    key='threshold_choice'
+                )
+            with apply_cols[1]:
+                st.write("")
+                if st.button("Apply to Rules", width='stretch', key='apply_thresholds'):
+                    update_wizard_state('rules', 'soc_on_threshold', float(applicable.loc[chosen, 'soc_on']))
+                    update_wizard_state('rules', 'soc_off_threshold', float(applicable.loc[chosen, 'soc_off']))
+                    st.success("Thresholds applied. Re-run the Step 3 sweep to update all configurations.")
+
+
+# =============================================================================
+# SECTION 7: DG TIME-WINDOW OPTIMIZER
+# =============================================================================
+
+st.divider()
+st.subheader("🕒 Section 7: DG Time-Window Optimizer")
+st.caption(
+    "Runs every start/end hour pair of the DG time window that meets the constraints below "
+    "for the selected configuration in one batched pass, and ranks them by DG hours at a delivery floor."
+)
+
+if template_id not in WINDOW_TEMPLATES or not setup['dg_enabled']:
+    st.info(f"The current dispatch strategy ({template_info['name']}) does not restrict the DG to a time window.")
+else:
+    window_kind = WINDOW_TEMPLATES[template_id]
+    window_labels = {'night': 'Night window (DG allowed)', 'day': 'Day window (DG allowed)',
+                     'blackout': 'Blackout window (DG not allowed)'}
+    st.markdown(f"**Optimising:** {window_labels[window_kind]}")
+
+    win_col1, win_col2, win_col3 = st.columns(3)
+    with win_col1:
+        win_floor = st.number_input("Delivery floor (%)", min_value=0.0, max_value=100.0, value=95.0,
+                                    step=1.0, key='window_floor')
+    with win_col2:
+        win_length = st.slider("Window length (hours)", 1, 23, (1, 23), key='window_length')
+    with win_col3:
+        win_include = st.multiselect("Hours the window must cover", options=list(range(24)),
+                                     format_func=lambda h: f"{h:02d}:00", key='window_include')
+
+    win_key = (f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}_{template_id}_"
+               f"{win_floor}_{win_length}_{sorted(win_include)}")
+    if st.button("🕒 Optimize Time Window", width='stretch'):
+        win_progress = st.progress(0)
+        try:
+            solar_profile, load_profile = load_analysis_profiles(setup, selected_solar)
+            params = build_analysis_params(
+                selected_bess, selected_duration, selected_dg, setup, rules, solar_profile, load_profile
+            )
+            st.session_state.analysis_windows = {
+                'key': win_key,
+                'result': optimize_time_window(params, template_id, delivery_floor=win_floor,
+                                               min_length=win_length[0], max_length=win_length[1],
+                                               must_include=win_include,
+                                               progress_callback=win_progress.progress),
+            }
+        except ValueError as e:
+            st.error(f"Window optimizer error: {e}")
+
+    window_state = st.session_state.get('analysis_windows')
+    if window_state and window_state['key'] == win_key:
+        optimum = window_state['result']
+        windows = optimum['windows']
+        labels = {'delivery_pct': 'Delivery %', 'dg_hours': 'DG Hours',
+                  'dg_starts': 'DG Starts', 'unserved_mwh': 'Unserved (MWh)'}
+
+        # DG hours of windows meeting the floor, by start (rows) and end (columns)
+        heatmap = windows[windows['meets_floor']].pivot(index='start', columns='end', values='dg_hours')
+        heatmap = heatmap.reindex(index=range(24), columns=range(24))
+        fig_win = go.Figure(go.Heatmap(
+            z=heatmap.to_numpy(), x=heatmap.columns, y=heatmap.index, colorscale='RdYlGn_r',
+            colorbar=dict(title='DG Hours'),
+            hovertemplate='Start %{y}:00 / End %{x}:00<br>DG: %{z:,.0f} hrs<extra></extra>',
+        ))
+        if optimum['best'] is not None:
+            fig_win.add_trace(go.Scatter(
+                x=[optimum['best']['end']], y=[optimum['best']['start']], mode='markers',
+                marker=dict(symbol='star', size=14, color='black'), name='Best window', hoverinfo='skip',
+            ))
+        fig_win.update_layout(
+            height=450, xaxis_title="Window end (hour)", yaxis_title="Window start (hour)",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+            margin=dict(l=50, r=50, t=50, b=50),
+        )
+        st.plotly_chart(fig_win, width='stretch')
+
+        ranked = windows[windows['meets_floor']].head(10)
+        current = optimum['current']
+        start_key, end_key = f"{window_kind}_start", f"{window_kind}_end"
+        st.caption(f"{len(windows)} windows simulated, {optimum['pruned']} start/end pairs pruned. "
+                   f"Current rules: {rules[start_key]:02d}:00-{rules[end_key]:02d}:00"
+                   + (f" ({current['delivery_pct']:.1f}% delivery, {current['dg_hours']:,.0f} DG hrs)."
+                      if current is not None else "."))
+
+        if ranked.empty:
+            best_delivery = windows['delivery_pct'].max()
+            st.warning(f"No window reaches {win_floor:.0f}% delivery (best: {best_delivery:.1f}%). "
+                       f"Lower the floor or relax the constraints.")
+        else:
+            st.markdown(f"**Top windows** (fewest DG hours with at least {win_floor:.0f}% delivery)")
+            top_df = ranked[['rank', 'start', 'end', 'length', *labels]].rename(columns={
+                'rank': 'Rank', 'start': 'Start (hr)', 'end': 'End (hr)', 'length': 'Hours', **labels})
+            st.dataframe(top_df.round(2), width='stretch', hide_index=True)
+
+            apply_cols = st.columns([3, 1])
+            with apply_cols[0]:
+                chosen = st.selectbox(
+                    "Window:", options=list(ranked.index),
+                    format_func=lambda i: (f"{ranked.loc[i, 'start']:02d}:00-{ranked.loc[i, 'end']:02d}:00 — "
+                                           f"{ranked.loc[i, 'delivery_pct']:.1f}% delivery, "
+                                           f"{ranked.loc[i, 'dg_hours']:,.0f} DG hrs"),
+                    key='window_choice'
+                )
+            with apply_cols[1]:
+                st.write("")
+                if st.button("Apply to Rules", width='stretch', key='apply_window'):
+                    update_wizard_state('rules', start_key, int(ranked.loc[chosen, 'start']))
+                    update_wizard_state('rules', end_key, int(ranked.loc[chosen, 'end']))
+                    st.success("Window applied. Re-run the Step 3 sweep to update all configurations.")
+
+
+# =============================================================================
+# SECTION 8: TEMPLATE COMPARISON
+# =============================================================================
+
+st.divider()
+st.subheader("⚖️ Section 8: Template Comparison")
+st.caption(
+    "Runs the selected configuration under every dispatch template (and the DG priority/takeover "
+    "variants each template supports) in one pass, keeping all other Step 2 rules."
+)
+
+cmp_variants = st.checkbox("Include DG priority and takeover variants", value=True, key='compare_variants')
+cmp_key = f"{selected_bess}_{selected_duration}_{selected_dg}_{selected_solar}_{cmp_variants}"
+if st.button("⚖️ Compare Templates", width='stretch'):
+    cmp_progress = st.progress(0)
+    solar_profile, load_profile = load_analysis_profiles(setup, selected_solar)
+    params = build_analysis_params(
+        selected_bess, selected_duration, selected_dg, setup, rules, solar_profile, load_profile
+    )
+    st.session_state.analysis_comparison = {
+        'key': cmp_key,
+        'result': compare_templates(params, include_variants=cmp_variants,
+                                    trace_columns=list(dict.fromkeys([*DEFAULT_TRACE_COLUMNS, *METRICS.columns()])),
+                                    progress_callback=cmp_progress.progress),
+    }
+
+comparison_state = st.session_state.get('analysis_comparison')
+if comparison_state and comparison_state['key'] == cmp_key:
+    comparison = comparison_state['result']
+    cmp_metrics = comparison['metrics']
+
+    # Variant matching the current Step 2 answers
+    current_mask = ((cmp_metrics['template_id'] == template_id)
+                    & (cmp_metrics['dg_load_priority'] == rules.get('dg_load_priority', 'bess_first'))
+                    & (cmp_metrics['dg_takeover_mode'] == rules.get('dg_takeover_mode', False)))
+    current_rows = cmp_metrics.index[current_mask]
+    current_label = cmp_metrics.loc[current_rows[0], 'label'] if len(current_rows) else None
+
+    cmp_table = cmp_metrics[['label', 'pct_full_delivery', 'pct_green_delivery', 'dg_runtime_hours',
+                             'dg_starts', 'total_unserved', 'pct_solar_curtailed', 'bess_equivalent_cycles']].rename(columns={
+        'label': 'Strategy', 'pct_full_delivery': 'Delivery %', 'pct_green_delivery': 'Green %',
+        'dg_runtime_hours': 'DG Hours', 'dg_starts': 'DG Starts', 'total_unserved': 'Unserved (MWh)',
+        'pct_solar_curtailed': 'Curtailed %', 'bess_equivalent_cycles': 'BESS Cycles',
+    })
+    # Registry KPIs evaluated over the comparison traces
+    kpis = METRICS.evaluate(comparison['traces'])
+    for name, metric in METRICS.metrics.items():
+        cmp_table[f"{metric.label} ({metric.unit})"] = kpis[name].to_numpy()
+
+    def highlight_current(row):
+        if row['Strategy'] == current_label:
+            return ['background-color: #FFF8DC'] * len(row)
+        return [''] * len(row)
+
+    st.dataframe(cmp_table.round(2).style.apply(highlight_current, axis=1), width='stretch', hide_index=True)
+    if current_label:
+        st.caption(f"Highlighted: current strategy ({current_label}).")
+
+    trace_labels = {'soc_pct': 'SoC %', 'bess_to_load': 'BESS to Load (MW)',
+                    'dg_to_load': 'DG to Load (MW)', 'unserved': 'Unserved (MW)'}
+    trace_col1, trace_col2 = st.columns([1, 2])
+    with trace_col1:
+        trace_name = st.radio("Trace:", options=list(DEFAULT_TRACE_COLUMNS), format_func=lambda c: trace_labels.get(c, c),
+                              key='compare_trace')
+    with trace_col2:
+        best_label = cmp_metrics.loc[cmp_metrics['pct_full_delivery'].idxmax(), 'label']
+        shown = st.multiselect("Strategies:", options=list(cmp_metrics['label']),
+                               default=list(dict.fromkeys([l for l in (current_label, best_label) if l])),
+                               key='compare_shown')
+
+    # Traces over the Section 1 date range
+    trace_start = date_to_hour_index(start_date)
+    trace_end = date_to_hour_index(end_date) + 24
+    fig_cmp = go.Figure()
+    for label in shown:
+        row = cmp_metrics.index[cmp_metrics['label'] == label][0]
+        fig_cmp.add_trace(go.Scatter(
+            x=comparison['t'][trace_start:trace_end], y=comparison['traces'][trace_name][row, trace_start:trace_end],
+            name=label, line=dict(shape='hv'),
+        ))
+    fig_cmp.update_layout(
+        height=400, xaxis_title="Hour of year", yaxis_title=trace_labels.get(trace_name, trace_name),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    st.plotly_chart(fig_cmp, width='stretch')
+
+
 # =============================================================================
 # NAVIGATION
 # =============================================================================
@@ -571,6 +1111,7 @@ with st.sidebar:
     st.markdown(f"- Duration: {selected_duration} hrs")
     st.markdown(f"- Power: {selected_bess/selected_duration:.0f} MW")
     st.markdown(f"- DG: {selected_dg:.0f} MW")
+    st.markdown(f"- Solar: {selected_solar:.0f} MWp")
 
     st.markdown("---")
 
@@ -22,11 +22,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.wizard_state import (
     init_wizard_state, get_wizard_state, update_wizard_state,
-    can_navigate_to_step, get_step_status
+    can_navigate_to_step, get_step_status, sweep_signature, load_composition_params
 )
 from src.template_inference import (
     infer_template, get_template_info, get_valid_triggers_for_timing
 )
+from src.surrogate import ERROR_QUANTILE, SweepSurrogate
+from src.stage_cache import StageCache, StagePipeline
+from src.degradation import DegradationTracker
 
 
 # =============================================================================
@@ -233,6 +236,8 @@ def run_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules, solar_p
         dg_charges_bess=rules.get('dg_charges_bess', False),
         dg_load_priority=rules.get('dg_load_priority', 'bess_first'),
         dg_takeover_mode=rules.get('dg_takeover_mode', False),
+        dg_operating_mode=setup.get('dg_operating_mode', 'binary'),
+        dg_min_load_pct=setup.get('dg_min_load_pct', 30.0),
         night_start_hour=rules.get('night_start', 18),
         night_end_hour=rules.get('night_end', 6),
         day_start_hour=rules.get('day_start', 6),
@@ -247,6 +252,59 @@ def run_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules, solar_p
     return hourly_results
 
 
+def get_sweep_surrogate(qa_state):
+    """
+    Surrogate of the Step 3 sweep, if it was run with the current setup and rules.
+
+    Returns:
+        Tuple of (SweepSurrogate or None, whether sweep results exist)
+    """
+    results = get_wizard_state()['results']
+    results_df = results.get('simulation_results')
+    if results_df is None or len(results_df) == 0:
+        return None, False
+    signature = results.get('sweep_signature')
+    if signature is None or signature != sweep_signature():
+        return None, True
+
+    # Rebuilt only when the sweep results change
+    key = (signature, results.get('study_id'), len(results_df))
+    cached = qa_state.get('surrogate')
+    if cached is None or cached[0] != key:
+        cached = (key, SweepSurrogate(results_df))
+        qa_state['surrogate'] = cached
+    return cached[1], True
+
+
+def render_surrogate_estimate(surrogate, bess_mwh, duration, dg_mw, solar_mw):
+    """Show instant metric estimates with cross-validation error bars."""
+    estimate = surrogate.predict(bess_mwh, duration, dg_mw, solar_mw)
+    if estimate is None:
+        st.caption("This configuration is not covered by the Step 3 sweep.")
+        return
+
+    values, errors = estimate['values'], estimate['errors']
+
+    def fmt(metric, pattern):
+        text = pattern.format(values[metric])
+        if not np.isnan(errors[metric]) and errors[metric] > 0:
+            text += " ± " + pattern.format(errors[metric])
+        return text
+
+    st.markdown("**Instant estimate** (from the Step 3 sweep)")
+    est_cols = st.columns(4)
+    est_cols[0].metric("Delivery", fmt('delivery_pct', "{:.1f}%"))
+    est_cols[1].metric("Wastage", fmt('wastage_pct', "{:.1f}%"))
+    est_cols[2].metric("DG Runtime", fmt('dg_hours', "{:,.0f} hrs"))
+    est_cols[3].metric("Unserved", fmt('unserved_mwh', "{:,.0f} MWh"))
+
+    note = (f"Interpolated from {surrogate.configurations:,} sweep configurations; "
+            f"± is the {ERROR_QUANTILE * 100:.0f}th-percentile cross-validation error. Run the full-year simulation for exact figures.")
+    if not estimate['in_range']:
+        note = "Outside the swept range: values are held at the nearest sweep edge. " + note
+    st.caption(note)
+
+
 def convert_results_to_dataframe(hourly_results):
     """Convert hourly results to DataFrame."""
     return pd.DataFrame([{
@@ -271,6 +329,254 @@ def convert_results_to_dataframe(hourly_results):
     } for h in hourly_results])
 
 
+# =============================================================================
+# COMPUTATION STAGES
+# =============================================================================
+# Each stage is memoised on its inputs (see src/stage_cache.py): a rerun for
+# a chart option or date window reuses the simulation and the 20-year
+# projection, and a new configuration recomputes only what depends on it.
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+HOURS_PER_MONTH = [744, 696, 744, 720, 744, 720, 744, 744, 720, 744, 720, 744]  # 2024 is leap year
+
+if 'qa_stage_cache' not in st.session_state:
+    st.session_state.qa_stage_cache = StageCache()
+pipeline = StagePipeline(st.session_state.qa_stage_cache)
+
+
+def month_index(hours):
+    """Month (0-11) of each hour index from January 1, 2024."""
+    dates = np.datetime64('2024-01-01T00') + np.asarray(hours, dtype='timedelta64[h]')
+    return dates.astype('datetime64[M]').astype(np.int64) % 12
+
+
+@pipeline.stage('profiles', inputs=('setup', 'default_solar'))
+def load_profiles(setup, default_solar):
+    """Solar and load profiles of the Step 1 setup, as lists."""
+    # Load solar profile
+    solar_source = setup.get('solar_source', 'default')
+    if solar_source == 'upload' and setup.get('solar_csv_data') is not None:
+        solar_profile = setup['solar_csv_data']
+    elif default_solar is not None:
+        solar_profile = default_solar.tolist()
+    else:
+        try:
+            from src.data_loader import load_solar_profile
+            solar_data = load_solar_profile()
+            solar_profile = solar_data.tolist() if solar_data is not None else [0] * 8760
+        except:
+            solar_profile = [0] * 8760
+
+    # Build load profile
+    from src.load_builder import build_load_profile
+    load_params = {
+        'mw': setup['load_mw'],
+        'start': setup.get('load_day_start', 6),
+        'end': setup.get('load_day_end', 18),
+        'windows': setup.get('load_windows', []),
+        'data': setup.get('load_csv_data'),
+        **load_composition_params(setup),
+    }
+    load_profile = build_load_profile(setup['load_mode'], load_params)
+
+    return solar_profile, load_profile.tolist()
+
+
+@pipeline.stage('simulation', inputs=('profiles', 'config', 'template_id', 'setup', 'rules'))
+def simulate_year(profiles, config, template_id, setup, rules):
+    """Full-year simulation of the selected (BESS MWh, duration, DG MW)."""
+    solar_profile, load_profile = profiles
+    bess_mwh, duration, dg_mw = config
+    return run_simulation(bess_mwh, duration, dg_mw, template_id, setup, rules, solar_profile, load_profile)
+
+
+@pipeline.stage('hourly_df', inputs=('simulation',))
+def hourly_table(simulation):
+    """Hourly results table of the full-year simulation (with month column)."""
+    full_year_df = convert_results_to_dataframe(simulation)
+    full_year_df['month'] = month_index(full_year_df['hour'])
+    return full_year_df
+
+
+@pipeline.stage('monthly', inputs=('hourly_df',))
+def monthly_summary(hourly_df):
+    """Monthly delivery chart data and monthly breakdown table."""
+    monthly_stats = hourly_df.groupby('month').agg({
+        'delivery': lambda x: (x == 'Yes').sum(),
+        'dg_state': lambda x: (x == 'ON').sum(),
+        'hour': 'count'
+    }).reset_index()
+    monthly_stats.columns = ['month', 'delivery_hours', 'dg_hours', 'total_hours']
+    monthly_stats['delivery_pct'] = (monthly_stats['delivery_hours'] / monthly_stats['total_hours'] * 100)
+    monthly_stats['dg_pct'] = (monthly_stats['dg_hours'] / monthly_stats['total_hours'] * 100)
+    monthly_stats['month_name'] = monthly_stats['month'].apply(lambda x: MONTH_NAMES[x])
+
+    # Calculate detailed monthly stats
+    monthly_detail = hourly_df.groupby('month').agg({
+        'solar_to_load': lambda x: (x > 0).sum(),  # Hours with solar contribution
+        'bess_to_load': lambda x: (x > 0).sum(),   # Hours with BESS contribution
+        'dg_to_load': lambda x: (x > 0).sum(),     # Hours with DG contribution
+        'solar_curtailed': 'sum',                   # Total solar curtailed MWh
+        'solar_mw': 'sum',                          # Total solar generated MWh
+    }).reset_index()
+    monthly_detail.columns = ['month', 'solar_hrs', 'bess_hrs', 'dg_hrs', 'curtailed_mwh', 'total_solar_mwh']
+    monthly_detail['wastage_pct'] = (monthly_detail['curtailed_mwh'] / monthly_detail['total_solar_mwh'] * 100).fillna(0)
+    monthly_detail['month_name'] = monthly_detail['month'].apply(lambda x: MONTH_NAMES[x])
+
+    # Create display DataFrame
+    monthly_table = pd.DataFrame({
+        'Month': monthly_detail['month_name'],
+        'Solar Hrs': monthly_detail['solar_hrs'].astype(int),
+        'BESS Hrs': monthly_detail['bess_hrs'].astype(int),
+        'DG Hrs': monthly_detail['dg_hrs'].astype(int),
+        'Curtailed (MWh)': monthly_detail['curtailed_mwh'].round(1),
+        'Wastage %': monthly_detail['wastage_pct'].round(1),
+    })
+
+    return monthly_stats, monthly_table
+
+
+@pipeline.stage('projection', inputs=('profiles', 'config', 'template_id', 'setup', 'rules'))
+def project_years(profiles, config, template_id, setup, rules):
+    """
+    20-year projection, one simulation per year.
+
+    Each year runs at the capacity left after the fade of the years before
+    it: rainflow cycle ageing plus SoC-dependent calendar ageing of the
+    simulated SoC traces (see src/degradation.py).
+    """
+    solar_profile, load_profile = profiles
+    bess_mwh, duration, dg_mw = config
+
+    # Build 20-year monthly projection data using ACTUAL SIMULATIONS
+    monthly_20yr_data = []
+    yearly_projection_data = []  # For 10-year annual table
+
+    # Degradation and efficiency
+    degradation = DegradationTracker()
+    capacity_factor = 1.0
+    one_way_eff = (setup['bess_efficiency'] / 100) ** 0.5
+    loss_factor = 1 - one_way_eff
+
+    # Progress bar for 20-year simulation
+    progress_bar = st.progress(0, text="Simulating Year 1...")
+
+    # Store yearly totals for summary
+    yearly_totals = []
+
+    for year in range(1, 21):
+        progress_bar.progress(year / 20, text=f"Simulating Year {year}...")
+
+        # Capacity left after the fade of the previous years
+        effective_capacity = bess_mwh * capacity_factor
+
+        # Run actual simulation for this year
+        year_results = run_simulation(
+            effective_capacity, duration, dg_mw,
+            template_id, setup, rules,
+            solar_profile, load_profile
+        )
+
+        # Convert to DataFrame for analysis
+        year_df = convert_results_to_dataframe(year_results)
+        year_df['month'] = month_index(year_df['hour'])
+
+        # Calculate year totals for summary
+        year_solar_gen = year_df['solar_mw'].sum()
+        year_dg_gen = year_df['dg_to_load'].sum()
+        year_curtailed = year_df['solar_curtailed'].sum()
+        year_load_met = (year_df['delivery'] == 'Yes').sum() * setup['load_mw']
+
+        # BESS losses
+        charging_energy = year_df[year_df['bess_mw'] < 0]['bess_mw'].abs().sum()
+        discharging_energy = year_df[year_df['bess_mw'] > 0]['bess_mw'].sum()
+        year_charging_loss = charging_energy * loss_factor
+        year_discharging_loss = discharging_energy * loss_factor
+
+        # Calculate year-level metrics
+        year_delivery_hrs = (year_df['delivery'] == 'Yes').sum()
+        year_dg_hrs = (year_df['dg_state'] == 'ON').sum()
+        year_solar_hrs = (year_df['solar_to_load'] > 0).sum()
+        year_bess_hrs = (year_df['bess_to_load'] > 0).sum()
+        year_wastage_pct = (year_curtailed / year_solar_gen * 100) if year_solar_gen > 0 else 0
+
+        yearly_totals.append({
+            'year': year,
+            'capacity': effective_capacity,
+            'solar_gen': year_solar_gen,
+            'dg_gen': year_dg_gen,
+            'curtailed': year_curtailed,
+            'load_met': year_load_met,
+            'charging_loss': year_charging_loss,
+            'discharging_loss': year_discharging_loss,
+        })
+
+        # Build 10-year/20-year annual projection table data
+        yearly_projection_data.append({
+            'Year': year,
+            'Capacity (MWh)': round(effective_capacity, 1),
+            'Capacity %': round(capacity_factor * 100, 1),
+            'Delivery Hrs': year_delivery_hrs,
+            'Delivery %': round(year_delivery_hrs / 8760 * 100, 1),
+            'DG Hrs': year_dg_hrs,
+            'Solar Hrs': year_solar_hrs,
+            'BESS Hrs': year_bess_hrs,
+            'Curtailed (MWh)': round(year_curtailed, 0),
+            'Wastage %': round(year_wastage_pct, 1),
+            'BESS Loss (MWh)': round(year_charging_loss + year_discharging_loss, 0),
+        })
+
+        # Process each month
+        for month_idx in range(12):
+            month_data = year_df[year_df['month'] == month_idx]
+            month_name = MONTH_NAMES[month_idx]
+
+            # Calculate month metrics from actual simulation
+            month_delivery_hrs = (month_data['delivery'] == 'Yes').sum()
+            month_solar_hrs = (month_data['solar_to_load'] > 0).sum()
+            month_bess_hrs = (month_data['bess_to_load'] > 0).sum()
+            month_dg_hrs = (month_data['dg_state'] == 'ON').sum()
+            month_curtailed = month_data['solar_curtailed'].sum()
+            month_solar_gen = month_data['solar_mw'].sum()
+            month_wastage_pct = (month_curtailed / month_solar_gen * 100) if month_solar_gen > 0 else 0
+
+            # BESS losses for month
+            month_charging = month_data[month_data['bess_mw'] < 0]['bess_mw'].abs().sum()
+            month_discharging = month_data[month_data['bess_mw'] > 0]['bess_mw'].sum()
+            month_charging_loss = month_charging * loss_factor
+            month_discharging_loss = month_discharging * loss_factor
+
+            monthly_20yr_data.append({
+                'Year': year,
+                'Month': month_name,
+                'Month_Num': month_idx + 1,
+                'Capacity_MWh': round(effective_capacity, 1),
+                'Capacity_%': round(capacity_factor * 100, 1),
+                'Delivery_Hrs': month_delivery_hrs,
+                'Delivery_%': round(month_delivery_hrs / HOURS_PER_MONTH[month_idx] * 100, 1),
+                'Solar_Hrs': month_solar_hrs,
+                'BESS_Hrs': month_bess_hrs,
+                'DG_Hrs': month_dg_hrs,
+                'Curtailed_MWh': round(month_curtailed, 1),
+                'Wastage_%': round(month_wastage_pct, 1),
+                'Charging_Loss_MWh': round(month_charging_loss, 2),
+                'Discharging_Loss_MWh': round(month_discharging_loss, 2),
+            })
+
+        # Fade of this year's SoC trace sizes the next year
+        degradation.consume([hour.soc_pct for hour in year_results])
+        capacity_factor = max(0.0, 1 - degradation.result()['capacity_fade_pct'] / 100)
+
+    progress_bar.empty()
+
+    return {
+        'yearly': pd.DataFrame(yearly_projection_data),
+        'monthly': pd.DataFrame(monthly_20yr_data),
+        'totals': yearly_totals,
+    }
+
+
 # =============================================================================
 # MAIN PAGE
 # =============================================================================
@@ -521,6 +827,13 @@ st.markdown(f"""
 **Selected Configuration:** `{power_mw:.0f} MW × {duration}-hr = {bess_capacity:.0f} MWh` | DG: `{dg_capacity:.0f} MW`
 """)
 
+# Instant estimate from the Step 3 sweep (no simulation)
+surrogate, has_sweep = get_sweep_surrogate(qa_state)
+if surrogate is not None:
+    render_surrogate_estimate(surrogate, bess_capacity, duration, dg_capacity, setup['solar_capacity_mw'])
+elif has_sweep:
+    st.caption("The Step 3 sweep was run with a different setup or rules, so no instant estimate is shown.")
+
 # Run simulation button
 run_btn = st.button("🚀 Run Full Year Simulation", type="primary", width='stretch')
 
@@ -535,62 +848,35 @@ st.divider()
 cache_key = f"{bess_capacity}_{duration}_{dg_capacity}_{template_id}_{dg_charges_bess}_{dg_load_priority}"
 cache_key += f"_{rules.get('soc_on_threshold', 30)}_{rules.get('soc_off_threshold', 80)}"
 
+# Inputs of the computation stages (everything the results depend on)
+qa_inputs = {
+    'setup': setup,
+    'rules': rules,
+    'template_id': template_id,
+    'config': (bess_capacity, duration, dg_capacity),
+    'default_solar': st.session_state.get('default_solar_profile'),
+}
+
 # Check if simulation needs to run
 if run_btn or (qa_state['simulation_results'] is not None and qa_state['cache_key'] == cache_key):
 
     if run_btn or qa_state['cache_key'] != cache_key:
         with st.spinner("Running 8760-hour simulation..."):
-            # Load solar profile
-            solar_source = setup.get('solar_source', 'default')
-            if solar_source == 'upload' and setup.get('solar_csv_data') is not None:
-                solar_profile = setup['solar_csv_data']
-            elif 'default_solar_profile' in st.session_state:
-                solar_profile = st.session_state.default_solar_profile.tolist()
-            else:
-                try:
-                    from src.data_loader import load_solar_profile
-                    solar_data = load_solar_profile()
-                    solar_profile = solar_data.tolist() if solar_data is not None else [0] * 8760
-                except:
-                    solar_profile = [0] * 8760
-
-            # Build load profile
-            from src.load_builder import build_load_profile
-            load_params = {
-                'mw': setup['load_mw'],
-                'start': setup.get('load_day_start', 6),
-                'end': setup.get('load_day_end', 18),
-                'windows': setup.get('load_windows', []),
-                'data': setup.get('load_csv_data'),
-            }
-            load_profile = build_load_profile(setup['load_mode'], load_params)
-
-            # Run simulation
-            hourly_results = run_simulation(
-                bess_capacity, duration, dg_capacity,
-                template_id, setup, rules,
-                solar_profile, load_profile.tolist()
-            )
+            hourly_results = pipeline.run('simulation', **qa_inputs)
 
             if hourly_results is not None and len(hourly_results) > 0:
                 qa_state['simulation_results'] = hourly_results
                 qa_state['cache_key'] = cache_key
-                # Store profiles for 20-year projection
-                qa_state['solar_profile'] = solar_profile
-                qa_state['load_profile'] = load_profile.tolist()
                 st.success("Simulation complete! Full year (8760 hours) simulated.")
             else:
                 st.error("Simulation failed.")
                 st.stop()
 
-    # Get results and profiles from state
     hourly_results = qa_state['simulation_results']
-    solar_profile = qa_state.get('solar_profile', [0] * 8760)
-    load_profile = qa_state.get('load_profile', [setup['load_mw']] * 8760)
 
     if hourly_results is not None:
-        # Convert to DataFrame
-        full_year_df = convert_results_to_dataframe(hourly_results)
+        # Full-year hourly table (cached; do not modify)
+        full_year_df = pipeline.run('hourly_df', **qa_inputs)
 
         st.header("3️⃣ Results")
 
@@ -618,25 +904,7 @@ if run_btn or (qa_state['simulation_results'] is not None and qa_state['cache_ke
         # Monthly delivery chart
         st.markdown("#### Monthly Delivery Performance")
 
-        # Calculate monthly stats
-        full_year_df['month'] = (full_year_df['hour'] // 24 // 30).clip(0, 11)  # Approximate month
-        # More accurate month calculation using day of year
-        full_year_df['month'] = full_year_df['hour'].apply(
-            lambda h: min(11, (date(2024, 1, 1) + timedelta(hours=h)).month - 1)
-        )
-
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-
-        monthly_stats = full_year_df.groupby('month').agg({
-            'delivery': lambda x: (x == 'Yes').sum(),
-            'dg_state': lambda x: (x == 'ON').sum(),
-            'hour': 'count'
-        }).reset_index()
-        monthly_stats.columns = ['month', 'delivery_hours', 'dg_hours', 'total_hours']
-        monthly_stats['delivery_pct'] = (monthly_stats['delivery_hours'] / monthly_stats['total_hours'] * 100)
-        monthly_stats['dg_pct'] = (monthly_stats['dg_hours'] / monthly_stats['total_hours'] * 100)
-        monthly_stats['month_name'] = monthly_stats['month'].apply(lambda x: month_names[x])
+        monthly_stats, monthly_table = pipeline.run('monthly', **qa_inputs)
 
         # Create bar chart
         fig_monthly = go.Figure()
@@ -663,11 +931,10 @@ if run_btn or (qa_state['simulation_results'] is not None and qa_state['cache_ke
             hovertemplate='%{x}<br>DG: %{y} hrs (%{text})<extra></extra>'
         ))
 
-        # Reference line for max possible (approximate month hours)
-        hours_per_month = [744, 696, 744, 720, 744, 720, 744, 744, 720, 744, 720, 744]  # 2024 is leap year
+        # Reference line for max possible (month hours)
         fig_monthly.add_trace(go.Scatter(
             x=monthly_stats['month_name'],
-            y=hours_per_month[:len(monthly_stats)],
+            y=HOURS_PER_MONTH[:len(monthly_stats)],
             name='Max Hours',
             mode='lines+markers',
             line=dict(color='gray', dash='dash'),
@@ -691,28 +958,6 @@ if run_btn or (qa_state['simulation_results'] is not None and qa_state['cache_ke
         # Monthly breakdown table
         st.markdown("#### Monthly Breakdown")
 
-        # Calculate detailed monthly stats
-        monthly_detail = full_year_df.groupby('month').agg({
-            'solar_to_load': lambda x: (x > 0).sum(),  # Hours with solar contribution
-            'bess_to_load': lambda x: (x > 0).sum(),   # Hours with BESS contribution
-            'dg_to_load': lambda x: (x > 0).sum(),     # Hours with DG contribution
-            'solar_curtailed': 'sum',                   # Total solar curtailed MWh
-            'solar_mw': 'sum',                          # Total solar generated MWh
-        }).reset_index()
-        monthly_detail.columns = ['month', 'solar_hrs', 'bess_hrs', 'dg_hrs', 'curtailed_mwh', 'total_solar_mwh']
-        monthly_detail['wastage_pct'] = (monthly_detail['curtailed_mwh'] / monthly_detail['total_solar_mwh'] * 100).fillna(0)
-        monthly_detail['month_name'] = monthly_detail['month'].apply(lambda x: month_names[x])
-
-        # Create display DataFrame
-        monthly_table = pd.DataFrame({
-            'Month': monthly_detail['month_name'],
-            'Solar Hrs': monthly_detail['solar_hrs'].astype(int),
-            'BESS Hrs': monthly_detail['bess_hrs'].astype(int),
-            'DG Hrs': monthly_detail['dg_hrs'].astype(int),
-            'Curtailed (MWh)': monthly_detail['curtailed_mwh'].round(1),
-            'Wastage %': monthly_detail['wastage_pct'].round(1),
-        })
-
         st.dataframe(
             monthly_table,
             width='stretch',
@@ -854,134 +1099,14 @@ if run_btn or (qa_state['simulation_results'] is not None and qa_state['cache_ke
         # ===========================================
 
         st.header("4️⃣ Multi-Year Projection")
-        st.markdown("Battery degradation impact on system performance (2% compound degradation per year).")
+        st.markdown("Battery degradation impact on system performance (rainflow cycle ageing plus SoC-dependent "
+                    "calendar ageing of each simulated year).")
         st.caption("**Note:** Running actual simulations for each year with degraded BESS capacity...")
 
-        # Build 20-year monthly projection data using ACTUAL SIMULATIONS
-        monthly_20yr_data = []
-        yearly_projection_data = []  # For 10-year annual table
-
-        # Degradation rate and efficiency
-        degradation_rate = 0.02  # 2% per year
-        one_way_eff = (setup['bess_efficiency'] / 100) ** 0.5
-        loss_factor = 1 - one_way_eff
-
-        # Progress bar for 20-year simulation
-        progress_bar = st.progress(0, text="Simulating Year 1...")
-
-        # Store yearly totals for summary
-        yearly_totals = []
-
-        for year in range(1, 21):
-            progress_bar.progress(year / 20, text=f"Simulating Year {year}...")
-
-            # Compound degradation
-            capacity_factor = (1 - degradation_rate) ** (year - 1)
-            effective_capacity = bess_capacity * capacity_factor
-            effective_power = power_mw * capacity_factor
-
-            # Run actual simulation for this year
-            year_results = run_simulation(
-                effective_capacity, duration, dg_capacity,
-                template_id, setup, rules,
-                solar_profile, load_profile
-            )
-
-            # Convert to DataFrame for analysis
-            year_df = convert_results_to_dataframe(year_results)
-
-            # Add month column
-            year_df['month'] = year_df['hour'].apply(
-                lambda h: min(11, (date(2024, 1, 1) + timedelta(hours=h)).month - 1)
-            )
-
-            # Calculate year totals for summary
-            year_solar_gen = year_df['solar_mw'].sum()
-            year_dg_gen = year_df['dg_to_load'].sum()
-            year_curtailed = year_df['solar_curtailed'].sum()
-            year_load_met = (year_df['delivery'] == 'Yes').sum() * setup['load_mw']
-
-            # BESS losses
-            charging_energy = year_df[year_df['bess_mw'] < 0]['bess_mw'].abs().sum()
-            discharging_energy = year_df[year_df['bess_mw'] > 0]['bess_mw'].sum()
-            year_charging_loss = charging_energy * loss_factor
-            year_discharging_loss = discharging_energy * loss_factor
-
-            # Calculate year-level metrics
-            year_delivery_hrs = (year_df['delivery'] == 'Yes').sum()
-            year_dg_hrs = (year_df['dg_state'] == 'ON').sum()
-            year_solar_hrs = (year_df['solar_to_load'] > 0).sum()
-            year_bess_hrs = (year_df['bess_to_load'] > 0).sum()
-            year_wastage_pct = (year_curtailed / year_solar_gen * 100) if year_solar_gen > 0 else 0
-
-            yearly_totals.append({
-                'year': year,
-                'capacity': effective_capacity,
-                'solar_gen': year_solar_gen,
-                'dg_gen': year_dg_gen,
-                'curtailed': year_curtailed,
-                'load_met': year_load_met,
-                'charging_loss': year_charging_loss,
-                'discharging_loss': year_discharging_loss,
-            })
-
-            # Build 10-year/20-year annual projection table data
-            yearly_projection_data.append({
-                'Year': year,
-                'Capacity (MWh)': round(effective_capacity, 1),
-                'Capacity %': round(capacity_factor * 100, 1),
-                'Delivery Hrs': year_delivery_hrs,
-                'Delivery %': round(year_delivery_hrs / 8760 * 100, 1),
-                'DG Hrs': year_dg_hrs,
-                'Solar Hrs': year_solar_hrs,
-                'BESS Hrs': year_bess_hrs,
-                'Curtailed (MWh)': round(year_curtailed, 0),
-                'Wastage %': round(year_wastage_pct, 1),
-                'BESS Loss (MWh)': round(year_charging_loss + year_discharging_loss, 0),
-            })
-
-            # Process each month
-            for month_idx in range(12):
-                month_data = year_df[year_df['month'] == month_idx]
-                month_name = month_names[month_idx]
-
-                # Calculate month metrics from actual simulation
-                month_delivery_hrs = (month_data['delivery'] == 'Yes').sum()
-                month_solar_hrs = (month_data['solar_to_load'] > 0).sum()
-                month_bess_hrs = (month_data['bess_to_load'] > 0).sum()
-                month_dg_hrs = (month_data['dg_state'] == 'ON').sum()
-                month_curtailed = month_data['solar_curtailed'].sum()
-                month_solar_gen = month_data['solar_mw'].sum()
-                month_wastage_pct = (month_curtailed / month_solar_gen * 100) if month_solar_gen > 0 else 0
-
-                # BESS losses for month
-                month_charging = month_data[month_data['bess_mw'] < 0]['bess_mw'].abs().sum()
-                month_discharging = month_data[month_data['bess_mw'] > 0]['bess_mw'].sum()
-                month_charging_loss = month_charging * loss_factor
-                month_discharging_loss = month_discharging * loss_factor
-
-                monthly_20yr_data.append({
-                    'Year': year,
-                    'Month': month_name,
-                    'Month_Num': month_idx + 1,
-                    'Capacity_MWh': round(effective_capacity, 1),
-                    'Capacity_%': round(capacity_factor * 100, 1),
-                    'Delivery_Hrs': month_delivery_hrs,
-                    'Delivery_%': round(month_delivery_hrs / hours_per_month[month_idx] * 100, 1),
-                    'Solar_Hrs': month_solar_hrs,
-                    'BESS_Hrs': month_bess_hrs,
-                    'DG_Hrs': month_dg_hrs,
-                    'Curtailed_MWh': round(month_curtailed, 1),
-                    'Wastage_%': round(month_wastage_pct, 1),
-                    'Charging_Loss_MWh': round(month_charging_loss, 2),
-                    'Discharging_Loss_MWh': round(month_discharging_loss, 2),
-                })
-
-        progress_bar.progress(1.0, text="Complete!")
-
-        # Create DataFrames
-        yearly_projection_df = pd.DataFrame(yearly_projection_data)
-        monthly_20yr_df = pd.DataFrame(monthly_20yr_data)
+        projection = pipeline.run('projection', **qa_inputs)
+        yearly_projection_df = projection['yearly']
+        monthly_20yr_df = projection['monthly']
+        yearly_totals = projection['totals']
 
         # ===========================================
         # 10-YEAR ANNUAL PROJECTION TABLE
@@ -1169,6 +1294,17 @@ with st.sidebar:
     if st.button("← Back to Step 1", width='stretch'):
         st.switch_page("pages/8_🚀_Step1_Setup.py")
 
+    with st.expander("⏱️ Stage Timings"):
+        timings = pipeline.cache.timing_table()
+        if timings.empty:
+            st.caption("No stages run yet.")
+        else:
+            st.dataframe(timings, hide_index=True, width='stretch', column_config={
+                'last_ms': st.column_config.NumberColumn('Last (ms)', format='%.1f'),
+                'total_ms': st.column_config.NumberColumn('Total (ms)', format='%.0f'),
+            })
+            st.caption("Last: this rerun (0 when cached). Total: compute time across reruns.")
+
     st.markdown("---")
 
     st.caption("Alternative to the 5-step wizard. Use this for quick single-configuration analysis.")
@@ -6,10 +6,10 @@ Calculates optimal DG runtime hours based on energy deficit analysis
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, date, timedelta
-from math import ceil
+from datetime import date, timedelta
 
 from src.data_loader import load_solar_profile
+from src.dg_scheduler import schedule_days, compare_with_heuristic
 from utils.config_manager import get_config
 
 
@@ -129,30 +129,40 @@ st.markdown("---")
 # Main page - Date Selection
 st.markdown("### 📅 Select Simulation Period")
 
+full_year = st.checkbox(
+    "Schedule full profile",
+    value=False,
+    help=f"Schedule all {total_days} days; the hourly table then shows one week at a time"
+)
+
 col1, col2, col3 = st.columns([1, 1, 2])
 
-with col1:
-    start_date = st.date_input(
-        "Start Date",
-        value=date(PROFILE_YEAR, 1, 2),
-        min_value=profile_start_date,
-        max_value=profile_end_date - timedelta(days=1),
-        help="First day of simulation"
-    )
+if full_year:
+    start_date = profile_start_date
+    end_date = profile_end_date
+else:
+    with col1:
+        start_date = st.date_input(
+            "Start Date",
+            value=date(PROFILE_YEAR, 1, 2),
+            min_value=profile_start_date,
+            max_value=profile_end_date - timedelta(days=1),
+            help="First day of simulation"
+        )
 
-with col2:
-    # Calculate valid end date range
-    min_end = start_date + timedelta(days=1)
-    max_end = min(start_date + timedelta(days=6), profile_end_date)
-    default_end = min(start_date + timedelta(days=2), max_end)
-
-    end_date = st.date_input(
-        "End Date",
-        value=default_end,
-        min_value=min_end,
-        max_value=max_end,
-        help="Last day of simulation (max 7 days)"
-    )
+    with col2:
+        # Calculate valid end date range
+        min_end = start_date + timedelta(days=1)
+        max_end = min(start_date + timedelta(days=6), profile_end_date)
+        default_end = min(start_date + timedelta(days=2), max_end)
+
+        end_date = st.date_input(
+            "End Date",
+            value=default_end,
+            min_value=min_end,
+            max_value=max_end,
+            help="Last day of simulation (max 7 days)"
+        )
 
 # Validate dates
 if end_date <= start_date:
@@ -166,229 +176,52 @@ start_day_idx = (start_date - profile_start_date).days
 with col3:
     st.info(f"**Selected:** {start_date.strftime('%b %d, %Y')} to {end_date.strftime('%b %d, %Y')} ({num_days} days)")
 
-st.markdown("---")
-
-
-def schedule_day(solar_24h, initial_soc, load_mw, dg_mw, bess_mwh, config, day_date):
-    """
-    Schedule one day of operation.
-
-    Args:
-        solar_24h: Array of 24 hourly solar values (MW)
-        initial_soc: Starting SOC as fraction (0-1)
-        load_mw: Load in MW
-        dg_mw: DG capacity in MW
-        bess_mwh: BESS capacity in MWh
-        config: Configuration dict with SOC limits and efficiency
-        day_date: Date object for this day
-
-    Returns:
-        hourly_data: List of hourly records
-        end_soc: Final SOC as fraction
-        dg_hours: Number of DG hours scheduled
-    """
-    min_soc = config['MIN_SOC']
-    max_soc = config['MAX_SOC']
-    one_way_eff = config['ONE_WAY_EFFICIENCY']
-
-    # Step 1: Calculate energy balance for the day
-    load_energy = load_mw * 24
-    solar_energy = sum(solar_24h)
-    bess_available = (initial_soc - min_soc) * bess_mwh
-
-    energy_deficit = load_energy - solar_energy - bess_available
-    dg_hours = max(0, ceil(energy_deficit / dg_mw)) if energy_deficit > 0 else 0
-
-    # Cap DG hours at 24
-    dg_hours = min(dg_hours, 24)
-
-    # Step 2: Simulate 24 hours
-    soc = initial_soc
-    hourly_data = []
-
-    for hour in range(24):
-        solar = solar_24h[hour]
-
-        wastage = 0  # Track wasted solar energy
-
-        if hour < dg_hours:
-            # DG period: DG delivers full load
-            dg = dg_mw
-            bess_power = 0
-            delivery = True
-            source = "DG"
-
-            # Solar goes to BESS if available and BESS has headroom
-            if solar > 0:
-                headroom = (max_soc - soc) * bess_mwh
-                charge_power = min(solar, headroom)
-                if charge_power > 0:
-                    soc += (charge_power * one_way_eff) / bess_mwh
-                    bess_power = -charge_power  # Negative = charging
-                    source = "DG+Solar→BESS"
-                # Calculate wastage (solar that couldn't be stored)
-                wastage = solar - charge_power
-        else:
-            # Solar + BESS period
-            dg = 0
-
-            if solar >= load_mw:
-                # Solar sufficient for load
-                delivery = True
-                excess = solar - load_mw
-                bess_power = 0
-                source = "Solar"
-
-                # Charge BESS with excess
-                if excess > 0:
-                    headroom = (max_soc - soc) * bess_mwh
-                    charge_power = min(excess, headroom)
-                    if charge_power > 0:
-                        soc += (charge_power * one_way_eff) / bess_mwh
-                        bess_power = -charge_power
-                        source = "Solar+BESS(chg)"
-                    # Calculate wastage (excess that couldn't be stored)
-                    wastage = excess - charge_power
-            else:
-                # Need BESS to supplement
-                deficit = load_mw - solar
-                usable_bess = (soc - min_soc) * bess_mwh
-
-                if usable_bess >= deficit:
-                    # BESS can cover deficit
-                    delivery = True
-                    bess_power = deficit
-                    # Account for efficiency when discharging
-                    energy_from_bess = deficit / one_way_eff
-                    soc -= energy_from_bess / bess_mwh
-                    source = "Solar+BESS"
-                else:
-                    # BESS cannot cover deficit - partial delivery (deficit hour)
-                    delivery = False
-                    bess_power = usable_bess
-                    soc = min_soc
-                    source = "DEFICIT"
-
-        # Clamp SOC to bounds
-        soc = max(min_soc, min(max_soc, soc))
-
-        # Create datetime for this hour
-        hour_datetime = datetime.combine(day_date, datetime.min.time()) + timedelta(hours=hour)
-
-        hourly_data.append({
-            'Date': day_date.strftime('%Y-%m-%d'),
-            'Hour': hour,
-            'Time': hour_datetime.strftime('%H:%M'),
-            'Solar_MW': round(solar, 2),
-            'DG_MW': round(dg, 2),
-            'BESS_MW': round(bess_power, 2),
-            'Load_MW': load_mw,
-            'SOC_%': round(soc * 100, 1),
-            'Wastage_MWh': round(wastage, 2),
-            'Delivery': 'Yes' if delivery else 'No',
-            'Source': source
-        })
-
-    return hourly_data, soc, dg_hours
-
-
-def simulate_days(solar_array, start_day_idx, num_days, load_mw, dg_mw, bess_mwh, initial_soc_pct, config, start_date):
-    """
-    Simulate multiple consecutive days.
-
-    Args:
-        solar_array: Full year solar profile array
-        start_day_idx: Starting day index (0-based)
-        num_days: Number of days to simulate
-        load_mw: Load in MW
-        dg_mw: DG capacity in MW
-        bess_mwh: BESS capacity in MWh
-        initial_soc_pct: Initial SOC as percentage
-        config: Configuration dict
-        start_date: Starting date object
-
-    Returns:
-        results: List of day results
-        all_hourly: Combined hourly data for all days
-    """
-    results = []
-    all_hourly = []
-    soc = initial_soc_pct / 100  # Convert to fraction
-
-    for day in range(num_days):
-        day_start = (start_day_idx + day) * 24
-        day_end = day_start + 24
-
-        # Get current day's date
-        current_date = start_date + timedelta(days=day)
-
-        # Get solar data for this day
-        if day_end <= len(solar_array):
-            solar_24h = solar_array[day_start:day_end]
-        else:
-            st.warning(f"Day {current_date.strftime('%b %d')} exceeds available solar data")
-            break
-
-        # Run scheduling
-        start_soc = soc
-        hourly_data, end_soc, dg_hours = schedule_day(
-            solar_24h, soc, load_mw, dg_mw, bess_mwh, config, current_date
-        )
-
-        # Calculate metrics
-        delivery_hours = sum(1 for h in hourly_data if h['Delivery'] == 'Yes')
-        deficit_hours = 24 - delivery_hours
-        solar_total = sum(h['Solar_MW'] for h in hourly_data)
-        dg_total = sum(h['DG_MW'] for h in hourly_data)
-
-        results.append({
-            'Date': current_date.strftime('%Y-%m-%d'),
-            'Day_Name': current_date.strftime('%a'),
-            'Solar_Energy_MWh': round(solar_total, 1),
-            'Start_SOC_%': round(start_soc * 100, 1),
-            'Load_Energy_MWh': round(load_mw * 24, 1),
-            'DG_Energy_MWh': round(dg_total, 1),
-            'DG_Hours': dg_hours,
-            'Delivery_Hours': delivery_hours,
-            'Deficit_Hours': deficit_hours,
-            'End_SOC_%': round(end_soc * 100, 1)
-        })
-
-        all_hourly.extend(hourly_data)
-
-        # Carry forward SOC
-        soc = end_soc
+schedule_mode = st.radio(
+    "Scheduling Mode",
+    options=["Heuristic (energy deficit)", "Optimal (minimum DG hours)"],
+    horizontal=True,
+    help="Heuristic runs ceil(deficit / DG MW) hours from 00:00. Optimal finds, for each day, "
+         "the fewest contiguous DG hours that deliver all 24 hours within SOC limits."
+)
 
-    return results, all_hourly
+st.markdown("---")
 
 
 # Run simulation button
 if st.button("🚀 Run Day-Ahead Scheduling", type="primary"):
     with st.spinner("Running simulation..."):
-        results, all_hourly = simulate_days(
-            solar_array,
-            start_day_idx,
-            num_days,
-            load_mw,
-            dg_mw,
-            bess_mwh,
-            initial_soc_pct,
-            config,
-            start_date
-        )
+        if schedule_mode.startswith("Optimal"):
+            comparison = compare_with_heuristic(
+                solar_array, start_day_idx, num_days, load_mw, dg_mw, bess_mwh,
+                initial_soc_pct / 100, config
+            )
+            schedule = comparison.pop('optimal')
+            comparison.pop('heuristic')
+        else:
+            comparison = None
+            schedule = schedule_days(
+                solar_array, start_day_idx, num_days, load_mw, dg_mw, bess_mwh,
+                initial_soc_pct / 100, config, mode='heuristic'
+            )
 
-        # Store in session state
-        st.session_state['dg_scheduler_results'] = results
-        st.session_state['dg_scheduler_hourly'] = all_hourly
+        # Store raw schedule; formatting happens at display time
+        st.session_state['dg_scheduler_schedule'] = schedule
+        st.session_state['dg_scheduler_start'] = start_date
+        st.session_state['dg_scheduler_comparison'] = comparison
 
 # Display results if available
-if 'dg_scheduler_results' in st.session_state:
-    results = st.session_state['dg_scheduler_results']
-    all_hourly = st.session_state['dg_scheduler_hourly']
+if 'dg_scheduler_schedule' in st.session_state:
+    schedule = st.session_state['dg_scheduler_schedule']
+    schedule_start = st.session_state['dg_scheduler_start']
+    comparison = st.session_state['dg_scheduler_comparison']
+    results = schedule.daily_rows(schedule_start)
 
     st.markdown("---")
     st.markdown("## 📊 Results")
 
+    if schedule.num_days < num_days and not full_year:
+        st.warning("Selected period exceeds available solar data; schedule truncated.")
+
     # Summary metrics
     col1, col2, col3, col4 = st.columns(4)
     total_dg_hours = sum(r['DG_Hours'] for r in results)
@@ -401,12 +234,21 @@ if 'dg_scheduler_results' in st.session_state:
     col3.metric("Deficit Hours", f"{total_deficit}")
     col4.metric("Delivery Rate", f"{total_delivery/total_hours*100:.1f}%")
 
+    if comparison is not None:
+        st.info(
+            f"**Optimal vs heuristic:** {comparison['dg_hours_saved']} DG hours saved on days the heuristic "
+            f"would deliver 24/24 ({comparison['days_improved']} days improved). "
+            f"The heuristic falls short on {comparison['heuristic_shortfall_days']} days; over the whole run the "
+            f"optimal schedule uses {-comparison['total_dg_hours_delta']:+d} DG hours and delivers "
+            f"{comparison['deficit_hours_avoided']:+d} more hours."
+        )
+
     # Daily Energy Balance table
     st.markdown("### 📅 Daily Energy Balance")
     summary_df = pd.DataFrame(results)
-    energy_cols = ['Date', 'Solar_Energy_MWh', 'Start_SOC_%', 'Load_Energy_MWh', 'DG_Energy_MWh', 'DG_Hours']
+    energy_cols = ['Date', 'Solar_Energy_MWh', 'Start_SOC_%', 'Load_Energy_MWh', 'DG_Energy_MWh', 'DG_Hours', 'DG_Start_Hour']
     energy_df = summary_df[energy_cols].copy()
-    energy_df.columns = ['Date', 'Solar Energy (MWh)', 'BESS Start SOC (%)', 'Load Energy (MWh)', 'Energy Deficit (MWh)', 'DG Hours Required']
+    energy_df.columns = ['Date', 'Solar Energy (MWh)', 'BESS Start SOC (%)', 'Load Energy (MWh)', 'Energy Deficit (MWh)', 'DG Hours Required', 'DG Start Hour']
     st.dataframe(energy_df, width='stretch', hide_index=True)
 
     # Delivery summary table
@@ -418,9 +260,21 @@ if 'dg_scheduler_results' in st.session_state:
 
     st.markdown("---")
 
-    # Hourly schedule table
-    st.markdown("### 🕐 Hourly Schedule (All Days)")
-    hourly_df = pd.DataFrame(all_hourly)
+    # Hourly schedule table (only the displayed week is formatted)
+    if schedule.num_days > 7:
+        st.markdown("### 🕐 Hourly Schedule (7-day view)")
+        view_start = st.date_input(
+            "Show week starting",
+            value=schedule_start,
+            min_value=schedule_start,
+            max_value=schedule_start + timedelta(days=schedule.num_days - 1),
+            key="dg_scheduler_view_start"
+        )
+        view_first_day = (view_start - schedule_start).days
+        hourly_df = pd.DataFrame(schedule.hourly_rows(schedule_start, view_first_day, 7))
+    else:
+        st.markdown("### 🕐 Hourly Schedule (All Days)")
+        hourly_df = pd.DataFrame(schedule.hourly_rows(schedule_start))
 
     # Reorder columns
     col_order = ['Date', 'Hour', 'Time', 'Solar_MW', 'DG_MW', 'BESS_MW', 'Load_MW', 'SOC_%', 'Wastage_MWh', 'Delivery', 'Source']
@@ -448,7 +302,10 @@ if 'dg_scheduler_results' in st.session_state:
 
     # Download button
     st.markdown("---")
-    csv = hourly_df.to_csv(index=False)
+    if schedule.num_days > 7:
+        csv = pd.DataFrame(schedule.hourly_rows(schedule_start))[col_order].to_csv(index=False)
+    else:
+        csv = hourly_df.to_csv(index=False)
     st.download_button(
         label="📥 Download Hourly Schedule (CSV)",
         data=csv,
@@ -480,6 +337,13 @@ with st.expander("ℹ️ How the Scheduler Works"):
        - Solar < Load: BESS discharges to cover deficit
        - Solar + BESS < Load: DEFICIT (delivery fails)
 
+    ### Optimal Mode
+
+    For each day, bisection on the DG hour count finds the fewest hours that
+    deliver all 24 hours. Every contiguous block position for a given count is
+    checked at once against the SOC limits; among feasible blocks, the one
+    leaving the highest end-of-day SOC is chosen.
+
     ### End-of-Day SOC
     - Final SOC carries to next day as starting SOC
     - This affects next day's energy balance calculation
@@ -21,14 +21,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.wizard_state import (
     init_wizard_state, get_wizard_state, update_wizard_state,
     update_wizard_section, set_current_step, mark_step_completed,
-    validate_step_1, get_step_status
+    validate_step_1, get_step_status, load_composition_params
 )
 from src.load_builder import (
     build_load_profile, analyze_load_profile, validate_load_csv,
     validate_solar_csv, analyze_solar_profile,
-    get_load_sparkline_data, LOAD_PRESETS
+    get_load_sparkline_data, LOAD_PRESETS, SEASON_MONTHS
 )
 from src.data_loader import load_solar_profile
+from src.profile_stats import get_profile_stats
 
 
 # =============================================================================
@@ -75,9 +76,8 @@ def render_step_indicator():
 
 def create_load_preview_chart(load: np.ndarray) -> go.Figure:
     """Create a daily load pattern preview chart."""
-    # Calculate hourly averages for typical day
-    hours = np.arange(len(load)) % 24
-    hourly_avg = [np.mean(load[hours == h]) for h in range(24)]
+    # Hourly averages for typical day (shared cached statistics)
+    hourly_avg = get_profile_stats(load)['hourly_mean'].tolist()
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -99,11 +99,68 @@ def create_load_preview_chart(load: np.ndarray) -> go.Figure:
     return fig
 
 
+def render_load_calendar_controls(setup: dict) -> None:
+    """Render the optional calendar variation of the load (any load mode)."""
+    with st.expander("📅 Calendar Variation (optional)"):
+        st.caption("Scale the load by day type, month and season, or add a load on top. "
+                   "Factors multiply; the calendar starts on 1 January.")
+
+        col1, col2 = st.columns(2)
+        weekday = col1.number_input(
+            "Weekday Factor (Mon-Fri)", min_value=0.0, max_value=5.0,
+            value=float(setup['load_weekday_multiplier']), step=0.05, key='load_weekday_mult'
+        )
+        weekend = col2.number_input(
+            "Weekend Factor (Sat-Sun)", min_value=0.0, max_value=5.0,
+            value=float(setup['load_weekend_multiplier']), step=0.05, key='load_weekend_mult'
+        )
+        update_wizard_state('setup', 'load_weekday_multiplier', weekday)
+        update_wizard_state('setup', 'load_weekend_multiplier', weekend)
+
+        st.markdown("**Seasonal Factors**")
+        seasonal = dict(setup['load_seasonal_multipliers'])
+        for col, season in zip(st.columns(len(SEASON_MONTHS)), SEASON_MONTHS):
+            seasonal[season] = col.number_input(
+                season.title(), min_value=0.0, max_value=5.0,
+                value=float(seasonal.get(season, 1.0)), step=0.05, key=f'load_season_{season}'
+            )
+        update_wizard_state('setup', 'load_seasonal_multipliers', seasonal)
+
+        st.markdown("**Monthly Factors**")
+        monthly = list(setup['load_monthly_multipliers'])
+        month_cols = st.columns(6)
+        for month in range(12):
+            monthly[month] = month_cols[month % 6].number_input(
+                pd.Timestamp(2000, month + 1, 1).strftime('%b'), min_value=0.0, max_value=5.0,
+                value=float(monthly[month]), step=0.05, key=f'load_month_{month + 1}'
+            )
+        update_wizard_state('setup', 'load_monthly_multipliers', monthly)
+
+        # Simplified: one extra load layer
+        layer = (setup['load_layers'] or [{}])[0]
+        add_layer = st.checkbox("Add a load layer", value=bool(setup['load_layers']), key='load_layer_enabled')
+        if add_layer:
+            col1, col2, col3, col4 = st.columns(4)
+            layer = {
+                'start': col1.number_input("Layer Start", 0, 23, int(layer.get('start', 18)), key='load_layer_start'),
+                'end': col2.number_input("Layer End", 0, 23, int(layer.get('end', 22)), key='load_layer_end'),
+                'mw': col3.number_input("Layer MW", 0.0, 500.0, float(layer.get('mw', 5.0)), step=1.0,
+                                        key='load_layer_mw'),
+                'days': col4.selectbox(
+                    "Layer Days", options=['all', 'weekdays', 'weekends'],
+                    index=['all', 'weekdays', 'weekends'].index(layer.get('days', 'all')),
+                    format_func=str.title, key='load_layer_days'
+                ),
+            }
+            update_wizard_state('setup', 'load_layers', [layer])
+        else:
+            update_wizard_state('setup', 'load_layers', [])
+
+
 def create_solar_preview_chart(solar: np.ndarray) -> go.Figure:
     """Create a daily solar generation pattern preview chart."""
-    # Calculate hourly averages for typical day
-    hours = np.arange(len(solar)) % 24
-    hourly_avg = [np.mean(solar[hours == h]) for h in range(24)]
+    # Hourly averages for typical day (shared cached statistics)
+    hourly_avg = get_profile_stats(solar)['hourly_mean'].tolist()
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -233,6 +290,8 @@ if load_source == 'builder':
             ]
             update_wizard_state('setup', 'load_windows', windows)
 
+    render_load_calendar_controls(setup)
+
     # Build and preview load profile
     if load_mode == 'constant':
         params = {'mw': load_mw}
@@ -245,7 +304,7 @@ if load_source == 'builder':
     else:
         params = {'mw': load_mw}
 
-    load_profile = build_load_profile(load_mode, params)
+    load_profile = build_load_profile(load_mode, {**params, **load_composition_params(setup)})
     stats = analyze_load_profile(load_profile)
 
     # Preview
@@ -268,6 +327,8 @@ else:
         key='load_csv_uploader'
     )
 
+    render_load_calendar_controls(setup)
+
     if uploaded_file is not None:
         try:
             df = pd.read_csv(uploaded_file)
@@ -277,7 +338,7 @@ else:
                 st.success(message)
                 update_wizard_state('setup', 'load_csv_data', data)
 
-                load_profile = build_load_profile('csv', {'data': data})
+                load_profile = build_load_profile('csv', {'data': data, **load_composition_params(setup)})
                 stats = analyze_load_profile(load_profile)
 
                 col1, col2, col3 = st.columns(3)
@@ -552,6 +613,8 @@ with col3:
 with st.sidebar:
     st.markdown("### 📋 Configuration Summary")
     st.markdown(f"**Load:** {setup['load_mw']} MW ({setup['load_mode']})")
+    if load_composition_params(setup):
+        st.markdown("**Load Calendar:** Varied")
     solar_src = setup.get('solar_source', 'default')
     st.markdown(f"**Solar:** {'Default' if solar_src == 'default' else 'Uploaded'} profile")
     st.markdown(f"**BESS Efficiency:** {setup['bess_efficiency']}%")
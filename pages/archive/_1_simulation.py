@@ -12,8 +12,8 @@ from pathlib import Path
 from src.data_loader import load_solar_profile, get_solar_statistics
 from src.battery_simulator import simulate_bess_year
 from utils.metrics import (
-    calculate_metrics_summary, find_optimal_battery_size,
-    create_hourly_dataframe, format_results_for_export
+    calculate_metrics_summary, calculate_sweep_metrics_summary,
+    find_optimal_battery_size, create_hourly_dataframe, format_results_for_export
 )
 from utils.config_manager import get_config
 from utils.validators import validate_battery_config
@@ -190,17 +190,12 @@ with col1:
             st.warning(f"⏱️ Running {num_simulations} simulations (estimated ~{estimated_time_seconds:.0f} seconds)")
 
         with st.spinner(f"Running {num_simulations} simulations..."):
-            all_results = []
             progress_bar = st.progress(0)
 
-            # Test all battery sizes with adjusted step
+            # Test all battery sizes with adjusted step (one batched pass)
             battery_sizes = range(min_size, max_size + step_size, step_size)
-
-            for i, size in enumerate(battery_sizes):
-                results = simulate_bess_year(size, solar_profile, config)
-                metrics = calculate_metrics_summary(size, results)
-                all_results.append(metrics)
-                progress_bar.progress((i + 1) / num_simulations)
+            all_results = calculate_sweep_metrics_summary(battery_sizes, solar_profile, config)
+            progress_bar.progress(1.0)
 
             # Find optimal size
             optimal = find_optimal_battery_size(all_results)
@@ -13,9 +13,8 @@ import os
 from pathlib import Path
 
 from src.data_loader import load_solar_profile, get_solar_statistics
-from src.battery_simulator import simulate_bess_year
 from src.config import HOURS_PER_YEAR
-from utils.metrics import calculate_metrics_summary
+from utils.metrics import calculate_sweep_metrics_summary
 from utils.config_manager import get_config
 from utils.validators import validate_battery_config
 
@@ -355,17 +354,14 @@ else:
         with st.spinner(f"Running {num_simulations} simulations..."):
             # Run simulations for all battery sizes with adjusted step
             battery_sizes = range(min_size, max_size + step_size, step_size)
-            all_results = []
 
             progress_bar = st.progress(0)
             status_text = st.empty()
 
-            for i, size in enumerate(battery_sizes):
-                status_text.text(f"Simulating {size} MWh battery...")
-                results = simulate_bess_year(size, solar_profile, config)
-                metrics = calculate_metrics_summary(size, results)
-                all_results.append(metrics)
-                progress_bar.progress((i + 1) / num_simulations)
+            # All sizes advance together in one vectorised pass
+            status_text.text(f"Simulating {num_simulations} battery sizes ({min_size}-{max_size} MWh)...")
+            all_results = calculate_sweep_metrics_summary(battery_sizes, solar_profile, config)
+            progress_bar.progress(1.0)
 
             status_text.empty()
 
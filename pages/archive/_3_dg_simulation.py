@@ -315,11 +315,20 @@ with opt_col2:
         help="Range of DG sizes to test as percentage of load"
     )
 
+    opt_search = st.radio(
+        "Search Method",
+        options=["Fixed steps", "Bisection (1 MW)"],
+        horizontal=True,
+        help="Fixed steps tests every size in the range. Bisection tests the DG at the "
+             "load first: if that reaches 100% it bisects below it to 1 MW (about 5 runs), "
+             "otherwise it still scans the fixed steps above the load (about 11 runs vs 16)"
+    )
+
     opt_step = st.selectbox(
         "Step Size (% of Load)",
         options=[5, 10, 20, 25],
         index=1,
-        help="Increment between tested DG sizes"
+        help="Increment between tested DG sizes (fixed steps only)"
     )
 
 # SOC thresholds for optimization
@@ -351,15 +360,22 @@ if st.button("Find Optimal DG Size", type="primary"):
         opt_config['DG_SOC_ON_THRESHOLD'] = opt_soc_on / 100
         opt_config['DG_SOC_OFF_THRESHOLD'] = opt_soc_off / 100
 
-        num_tests = (dg_range[1] - dg_range[0]) // opt_step + 1
-        with st.spinner(f"Testing {num_tests} DG sizes..."):
+        if opt_search == "Fixed steps":
+            search_mode = 'linear'
+            spinner_text = f"Testing {(dg_range[1] - dg_range[0]) // opt_step + 1} DG sizes..."
+        else:
+            search_mode = 'bisect'
+            spinner_text = "Searching DG sizes by bisection..."
+        with st.spinner(spinner_text):
             opt_result = find_optimal_dg_size(
                 opt_battery_size,
                 solar_profile,
                 opt_config,
                 min_dg_percent=dg_range[0],
                 max_dg_percent=dg_range[1],
-                step_percent=opt_step
+                step_percent=opt_step,
+                search=search_mode,
+                resolution_mw=1.0
             )
             st.session_state['dg_optimization'] = opt_result
             st.session_state['dg_opt_config'] = {
@@ -389,7 +405,7 @@ if 'dg_optimization' in st.session_state:
     opt_metrics[2].metric("100% Delivery", "Yes" if opt['is_100_percent'] else "No")
 
     # Results table
-    st.markdown("#### All Tested DG Sizes")
+    st.markdown("#### All Evaluated DG Sizes")
     results_df = pd.DataFrame(opt['all_results'])
 
     # Highlight the optimal row
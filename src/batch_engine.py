@@ -0,0 +1,665 @@
+"""
+Batch Dispatch Engine - BESS & DG Sizing Tool
+
+Metrics-only, vectorised counterpart of dispatch_engine.run_simulation.
+
+All configurations of a sweep ("lanes") advance through the year together:
+each hour is one set of numpy operations over the lanes, following the
+template dispatch functions (0-6) step for step. No HourlyResult objects
+are built; only the SummaryMetrics totals are accumulated (DG fuel and
+emissions step by step through dg_accounting), and they match
+run_simulation + calculate_metrics for every lane.
+
+Per-lane values (see LANE_FIELDS) override the matching SimulationParams
+fields, so lanes can differ in sizes and in the DG SoC hysteresis
+thresholds. 'solar_scale' multiplies the shared solar profile hour by hour, so a
+PV-oversizing axis never materialises scaled copies of the profile.
+Likewise 'solar_days' lets each lane read a different sequence of profile
+days (resampled weather years) without building per-lane profiles, and
+'availability' applies per-lane hourly DG/BESS derates (contingency draws)
+the same way dispatch_engine.apply_availability does for a single run, and
+'hour_masks' replaces the night/day/blackout hours of build_hour_arrays
+per lane, so candidate time windows are one more lane axis.
+
+Sub-hourly runs follow params.timestep_hours exactly as run_simulation
+does: profiles are MW per step, SoC moves by power x timestep, and the
+totals come back in MWh and hours.
+"""
+
+import math
+from dataclasses import fields
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from .dg_accounting import DGAccountant
+from .dispatch_engine import (
+    HOURS_PER_DAY, SimulationParams, SummaryMetrics, build_hour_arrays,
+    steps_per_hour, steps_to_hours,
+)
+
+
+# Per-lane inputs; anything not supplied is taken from SimulationParams
+# ('solar_scale' defaults to 1.0)
+LANE_FIELDS = (
+    'bess_capacity',
+    'bess_charge_power',
+    'bess_discharge_power',
+    'dg_capacity',
+    'dg_soc_on_threshold',
+    'dg_soc_off_threshold',
+    'solar_scale',
+)
+
+METRIC_FIELDS = tuple(f.name for f in fields(SummaryMetrics))
+
+PROGRESS_INTERVAL_HOURS = 720
+
+# Availability keys -> SimulationParams profile of the single-run engine
+AVAILABILITY_FIELDS = {
+    'dg': 'dg_availability',
+    'bess_power': 'bess_power_availability',
+    'bess_energy': 'bess_energy_availability',
+}
+
+# Hour-mask keys, in build_hour_arrays order
+HOUR_MASK_KEYS = ('night', 'day', 'blackout')
+
+
+# =============================================================================
+# LANE STATE
+# =============================================================================
+
+class _LaneState:
+    """Vector form of SimulationState plus the BESS/DG helper functions."""
+
+    def __init__(self, params: SimulationParams, lanes: Dict[str, np.ndarray]):
+        capacity = lanes['bess_capacity']
+        n = len(capacity)
+
+        self.dg_capacity = lanes['dg_capacity'] if params.dg_enabled else np.zeros(n)
+        self.has_dg = self.dg_capacity > 0
+
+        self.usable_capacity = capacity * (params.bess_max_soc - params.bess_min_soc) / 100
+        self.min_soc_mwh = capacity * params.bess_min_soc / 100
+        self.max_soc_mwh = capacity * params.bess_max_soc / 100
+        self.charge_power_limit = lanes['bess_charge_power']
+        self.discharge_power_limit = lanes['bess_discharge_power']
+        self.charge_efficiency = math.sqrt(params.bess_efficiency / 100)
+        self.discharge_efficiency = math.sqrt(params.bess_efficiency / 100)
+        self.timestep_hours = params.timestep_hours
+
+        self.dg_soc_on_mwh = capacity * lanes['dg_soc_on_threshold'] / 100
+        self.dg_soc_off_mwh = capacity * lanes['dg_soc_off_threshold'] / 100
+        self.emergency_soc_mwh = capacity * params.emergency_soc_threshold / 100
+
+        self.cycle_limit = None
+        if params.bess_enforce_cycle_limit and params.bess_daily_cycle_limit:
+            self.cycle_limit = params.bess_daily_cycle_limit
+        self.dg_charges_bess = params.dg_charges_bess
+
+        self.nominal_dg_capacity = self.dg_capacity
+        self.nominal_charge_power = self.charge_power_limit
+        self.nominal_discharge_power = self.discharge_power_limit
+        self.nominal_max_soc_mwh = self.max_soc_mwh
+
+        self.soc = capacity * params.bess_initial_soc / 100
+        self.daily_discharge = np.zeros(n)
+        self.daily_cycles = np.zeros(n)
+        self.bess_disabled_today = np.zeros(n, dtype=bool)
+        self.dg_was_running = np.zeros(n, dtype=bool)
+
+        # Shared all-zero result for calls where no lane takes part
+        self.no_flow = np.zeros(n)
+        self.no_flow.flags.writeable = False
+
+    def new_day(self):
+        self.daily_discharge[:] = 0.0
+        self.daily_cycles[:] = 0.0
+        self.bess_disabled_today[:] = False
+
+    def apply_availability(self, availability, t):
+        """Vector apply_availability: derate ratings for step t."""
+        if 'dg' in availability:
+            self.dg_capacity = self.nominal_dg_capacity * availability['dg'][t]
+            self.has_dg = self.dg_capacity > 0
+        if 'bess_power' in availability:
+            factor = availability['bess_power'][t]
+            self.charge_power_limit = self.nominal_charge_power * factor
+            self.discharge_power_limit = self.nominal_discharge_power * factor
+        if 'bess_energy' in availability:
+            self.max_soc_mwh = (self.min_soc_mwh
+                                + (self.nominal_max_soc_mwh - self.min_soc_mwh) * availability['bess_energy'][t])
+
+    def dg_hysteresis(self) -> np.ndarray:
+        """SoC deadband: on at/below the ON threshold, off at/above OFF."""
+        return (self.soc <= self.dg_soc_on_mwh) | ((self.soc < self.dg_soc_off_mwh) & self.dg_was_running)
+
+    def charge(self, active, energy, charge_power_used) -> np.ndarray:
+        """Vector charge_bess. Returns the energy charged per lane."""
+        ok = active & (energy > 0) & ~self.bess_disabled_today
+        if not ok.any():
+            return self.no_flow
+
+        charge_room = self.max_soc_mwh - self.soc
+        charge_power_available = self.charge_power_limit - charge_power_used
+        ok &= (charge_power_available > 0) & (charge_room > 0)
+        max_charge = np.minimum(np.minimum(energy, charge_power_available),
+                                charge_room / (self.charge_efficiency * self.timestep_hours))
+        ok &= max_charge > 0
+
+        charged = np.where(ok, max_charge, 0.0)
+        self.soc += charged * self.charge_efficiency * self.timestep_hours
+        return charged
+
+    def discharge(self, active, energy_needed):
+        """Vector discharge_bess. Returns (energy discharged, discharged flags)."""
+        ok = active & (energy_needed > 0) & ~self.bess_disabled_today
+        if not ok.any():
+            return self.no_flow, ok
+
+        discharge_available = self.soc - self.min_soc_mwh
+        ok &= discharge_available > 0
+        max_discharge = np.minimum(np.minimum(energy_needed, self.discharge_power_limit),
+                                   discharge_available * self.discharge_efficiency / self.timestep_hours)
+        ok &= max_discharge > 0
+
+        discharged = np.where(ok, max_discharge, 0.0)
+        self.soc -= discharged / self.discharge_efficiency * self.timestep_hours
+
+        # Cycle tracking and daily limit
+        self.daily_discharge += discharged * self.timestep_hours
+        tracked = ok & (self.usable_capacity > 0)
+        np.divide(self.daily_discharge, self.usable_capacity, out=self.daily_cycles, where=tracked)
+        if self.cycle_limit is not None:
+            self.bess_disabled_today |= ok & (self.daily_cycles >= self.cycle_limit)
+
+        return discharged, ok
+
+
+class _Hour:
+    """Per-hour flow arrays for all lanes (vector HourlyResult)."""
+
+    def __init__(self, load, solar, n):
+        self.load = load
+        self.solar = solar
+
+        self.solar_to_load = np.minimum(solar, load)
+        self.remaining = load - self.solar_to_load
+        self.excess_solar = solar - self.solar_to_load
+
+        self.solar_to_bess = np.zeros(n)
+        self.solar_curtailed = np.zeros(n)
+        self.bess_to_load = np.zeros(n)
+        self.dg_to_load = np.zeros(n)
+        self.dg_to_bess = np.zeros(n)
+        self.dg_curtailed = np.zeros(n)
+        self.dg_running = np.zeros(n, dtype=bool)
+        self.bess_discharged = np.zeros(n, dtype=bool)
+        self.charge_power_used = np.zeros(n)
+
+
+# =============================================================================
+# SHARED DISPATCH STEPS
+# =============================================================================
+
+def _charge_from_solar(state: _LaneState, hour: _Hour, active, energy):
+    """Charge BESS with solar on active lanes; the rest of it is curtailed."""
+    charged = state.charge(active, energy, hour.charge_power_used)
+    hour.charge_power_used += charged
+    hour.solar_to_bess += charged
+    hour.solar_curtailed += np.where(active, energy - charged, 0.0)
+
+
+def _discharge_to_load(state: _LaneState, hour: _Hour, active):
+    """Serve the remaining load from BESS on active lanes."""
+    discharged, ok = state.discharge(active, hour.remaining)
+    hour.remaining -= discharged
+    hour.bess_to_load += discharged
+    hour.bess_discharged |= ok
+
+
+def _run_dg(state: _LaneState, hour: _Hour, active) -> np.ndarray:
+    """Start/run DG at full output on active lanes. Returns DG excess."""
+    hour.dg_running |= active
+    dg_to_load = np.where(active, np.minimum(state.dg_capacity, hour.remaining), 0.0)
+    hour.remaining -= dg_to_load
+    hour.dg_to_load += dg_to_load
+    return np.where(active, state.dg_capacity - dg_to_load, 0.0)
+
+
+def _charge_from_dg(state: _LaneState, hour: _Hour, active, dg_excess):
+    """Charge BESS from DG excess on active lanes; the rest is curtailed."""
+    if state.dg_charges_bess:
+        can_charge = active & (dg_excess > 0)
+        charged = state.charge(can_charge, dg_excess, hour.charge_power_used)
+        hour.charge_power_used += charged
+        hour.dg_to_bess += charged
+    else:
+        charged = 0.0
+    hour.dg_curtailed += np.where(active, dg_excess - charged, 0.0)
+
+
+def _activate_dg(state: _LaneState, hour: _Hour, active):
+    """Vector activate_dg (DG excess charges BESS unless it discharged)."""
+    dg_excess = _run_dg(state, hour, active)
+    _charge_from_dg(state, hour, active & ~hour.bess_discharged, dg_excess)
+    hour.dg_curtailed += np.where(active & hour.bess_discharged, dg_excess, 0.0)
+
+
+def _dg_assist_or_recover(state: _LaneState, hour: _Hour, active):
+    """DG-on branch of templates 4-6: BESS assists DG, else both recharge it."""
+    dg_excess = _run_dg(state, hour, active)
+
+    assist = active & (hour.remaining > 0) & ~state.bess_disabled_today
+    _discharge_to_load(state, hour, assist)
+    hour.solar_curtailed += np.where(assist, hour.excess_solar, 0.0)
+    hour.dg_curtailed += np.where(assist, dg_excess, 0.0)
+
+    recover = active & ~assist
+    _charge_from_solar(state, hour, recover, hour.excess_solar)
+    _charge_from_dg(state, hour, recover, dg_excess)
+
+
+def _takeover(params: SimulationParams, state: _LaneState, hour: _Hour) -> np.ndarray:
+    """
+    Vector check_dg_takeover. Executes takeover on the lanes where solar +
+    BESS cannot meet the load and returns those lanes.
+    """
+    if not params.dg_takeover_mode:
+        return np.zeros(len(state.soc), dtype=bool)
+
+    bess_available = np.maximum(state.soc - state.min_soc_mwh, 0.0)
+    bess_can_provide = np.minimum(state.discharge_power_limit,
+                                  bess_available * state.discharge_efficiency / state.timestep_hours)
+    takeover = state.has_dg & ~(hour.solar + bess_can_provide >= hour.load - 0.001)
+
+    # DG serves the full load, all solar goes to BESS
+    total_solar = hour.solar_to_load + hour.excess_solar
+    hour.solar_to_load = np.where(takeover, 0.0, hour.solar_to_load)
+    hour.remaining = np.where(takeover, 0.0, hour.remaining)
+    hour.dg_running |= takeover
+    hour.dg_to_load += np.where(takeover, hour.load, 0.0)
+    _charge_from_solar(state, hour, takeover, total_solar)
+
+    return takeover
+
+
+# =============================================================================
+# TEMPLATE DISPATCH
+# =============================================================================
+
+def _dispatch_template_0(params, state, hour, hour_of_day, masks):
+    """Template 0: Solar -> BESS -> Unserved."""
+    active = np.ones(len(state.soc), dtype=bool)
+    _charge_from_solar(state, hour, active, hour.excess_solar)
+    _discharge_to_load(state, hour, active)
+
+
+def _dispatch_template_1(params, state, hour, hour_of_day, masks):
+    """Template 1: Green priority; DG reactive per dg_load_priority."""
+    takeover = _takeover(params, state, hour)
+    active = ~takeover
+    # Takeover lanes that stay green never start the DG
+    standard = state.has_dg if not params.dg_takeover_mode else np.zeros(len(state.soc), dtype=bool)
+    standard = standard & active
+
+    _charge_from_solar(state, hour, active, hour.excess_solar)
+
+    if params.dg_load_priority == 'dg_first':
+        _activate_dg(state, hour, standard & (hour.remaining > 0.001))
+        _discharge_to_load(state, hour, active)
+    else:
+        _discharge_to_load(state, hour, active)
+        _activate_dg(state, hour, standard & (hour.remaining > 0.001))
+
+
+def _dispatch_template_3(params, state, hour, hour_of_day, masks):
+    """Template 3: DG reactive outside the blackout window."""
+    active = ~_takeover(params, state, hour)
+
+    _charge_from_solar(state, hour, active, hour.excess_solar)
+
+    in_blackout = masks['blackout'][hour_of_day]
+    if np.all(in_blackout):
+        _discharge_to_load(state, hour, active)
+        return
+
+    dg_available = active & state.has_dg & ~in_blackout
+    if params.dg_load_priority == 'dg_first':
+        _activate_dg(state, hour, dg_available & (hour.remaining > 0.001))
+        _discharge_to_load(state, hour, active)
+    else:
+        _discharge_to_load(state, hour, active)
+        _activate_dg(state, hour, dg_available & (hour.remaining > 0.001))
+
+
+def _dispatch_template_4(params, state, hour, hour_of_day, masks):
+    """Template 4: SoC-triggered DG at any hour."""
+    active = ~_takeover(params, state, hour)
+
+    dg_on = active & state.dg_hysteresis() & (state.dg_capacity != 0)
+    green = active & ~dg_on
+
+    _charge_from_solar(state, hour, green, hour.excess_solar)
+    _discharge_to_load(state, hour, green)
+
+    _dg_assist_or_recover(state, hour, dg_on)
+
+
+def _dispatch_soc_window(params, state, hour, in_window, allow_emergency, proactive):
+    """
+    Templates 2, 5 and 6: SoC-triggered DG inside a window, optional
+    emergency DG outside it. proactive=True is template 2 (DG runs, then
+    solar tops up BESS); otherwise the DG-on branch is assist/recovery.
+    in_window is one flag for all lanes or one per lane (hour_masks).
+    """
+    active = ~_takeover(params, state, hour)
+    any_in, all_in = bool(np.any(in_window)), bool(np.all(in_window))
+
+    if allow_emergency:
+        outside = state.soc <= state.emergency_soc_mwh
+    else:
+        outside = np.zeros(len(state.soc), dtype=bool)
+    if all_in:
+        dg_should_run = state.dg_hysteresis()
+    elif any_in:
+        dg_should_run = np.where(in_window, state.dg_hysteresis(), outside)
+    else:
+        dg_should_run = outside
+
+    if any_in:
+        dg_on = active & in_window & dg_should_run & state.has_dg
+        if proactive:
+            _activate_dg(state, hour, dg_on)
+            _charge_from_solar(state, hour, dg_on, hour.excess_solar)
+        else:
+            _dg_assist_or_recover(state, hour, dg_on)
+        green = active & ~dg_on
+    else:
+        green = active
+
+    _charge_from_solar(state, hour, green, hour.excess_solar)
+    _discharge_to_load(state, hour, green)
+
+    if not all_in and allow_emergency:
+        _activate_dg(state, hour, green & ~in_window & dg_should_run & (hour.remaining > 0) & state.has_dg)
+
+
+def _dispatch_template_2(params, state, hour, hour_of_day, masks):
+    """Template 2: Night SoC-triggered DG (proactive), day emergency only."""
+    _dispatch_soc_window(params, state, hour, masks['night'][hour_of_day],
+                         params.allow_emergency_dg_day, proactive=True)
+
+
+def _dispatch_template_5(params, state, hour, hour_of_day, masks):
+    """Template 5: Day SoC-triggered DG, night emergency only."""
+    _dispatch_soc_window(params, state, hour, masks['day'][hour_of_day],
+                         params.allow_emergency_dg_night, proactive=False)
+
+
+def _dispatch_template_6(params, state, hour, hour_of_day, masks):
+    """Template 6: Night SoC-triggered DG, day emergency only."""
+    _dispatch_soc_window(params, state, hour, masks['night'][hour_of_day],
+                         params.allow_emergency_dg_day, proactive=False)
+
+
+BATCH_DISPATCH_FUNCTIONS = {
+    0: _dispatch_template_0,
+    1: _dispatch_template_1,
+    2: _dispatch_template_2,
+    3: _dispatch_template_3,
+    4: _dispatch_template_4,
+    5: _dispatch_template_5,
+    6: _dispatch_template_6,
+}
+
+
+# =============================================================================
+# MAIN BATCH LOOP
+# =============================================================================
+
+def resolve_lanes(params: SimulationParams,
+                  lanes: Dict[str, Sequence[float]],
+                  num_lanes: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Broadcast per-lane inputs to equal-length float arrays.
+
+    Args:
+        params: Shared simulation parameters (defaults for missing fields)
+        lanes: Mapping of LANE_FIELDS names to per-lane values
+        num_lanes: Lane count when it is set by another input (else the
+            longest lane array)
+
+    Returns:
+        Dictionary with one float array per LANE_FIELDS entry
+    """
+    unknown = set(lanes) - set(LANE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown lane fields: {sorted(unknown)}")
+
+    defaults = {name: getattr(params, name, 1.0) for name in LANE_FIELDS}
+    defaults['solar_scale'] = 1.0
+
+    arrays = {name: np.asarray(lanes.get(name, defaults[name]), dtype=float)
+              for name in LANE_FIELDS}
+    if num_lanes is None:
+        num_lanes = max((a.size for a in arrays.values() if a.ndim > 0), default=1)
+    n = num_lanes
+    return {name: np.broadcast_to(a, (n,)).copy() for name, a in arrays.items()}
+
+
+def _resolve_availability(params: SimulationParams, availability, n: int,
+                          num_steps: int) -> Dict[str, np.ndarray]:
+    """
+    Step-major availability tables: key -> (num_steps, n) array, or
+    (num_steps,) when shared by all lanes. Explicit arrays win over the
+    SimulationParams profiles; profiles repeat like load/solar profiles.
+    """
+    tables = {}
+    for key, field_name in AVAILABILITY_FIELDS.items():
+        values = (availability or {}).get(key)
+        if values is None:
+            values = getattr(params, field_name)
+            if not len(values):
+                continue
+        values = np.asarray(values, dtype=float)
+        hours = values.shape[-1]
+        if hours == 0:
+            continue
+        index = np.arange(num_steps) % hours
+        if values.ndim == 1:
+            tables[key] = values[index]
+        else:
+            if len(values) != n:
+                raise ValueError(f"availability['{key}'] has {len(values)} lanes, expected {n}")
+            tables[key] = np.ascontiguousarray(values[:, index].T)
+    return tables
+
+
+def _resolve_hour_masks(params: SimulationParams, hour_masks, n: int) -> Dict[str, np.ndarray]:
+    """
+    Hour-major window masks: key -> (24, n) bool array, or (24,) when
+    shared by all lanes. Keys not in hour_masks come from build_hour_arrays.
+    """
+    masks = dict(zip(HOUR_MASK_KEYS, (np.asarray(m, dtype=bool) for m in build_hour_arrays(params))))
+    for key, values in (hour_masks or {}).items():
+        if key not in HOUR_MASK_KEYS:
+            raise ValueError(f"Unknown hour mask '{key}' (expected one of {HOUR_MASK_KEYS})")
+        values = np.asarray(values, dtype=bool)
+        if values.shape[-1] != HOURS_PER_DAY or values.ndim not in (1, 2):
+            raise ValueError(f"hour_masks['{key}'] must have shape (24,) or (lanes, 24)")
+        if values.ndim == 2:
+            if len(values) != n:
+                raise ValueError(f"hour_masks['{key}'] has {len(values)} lanes, expected {n}")
+            values = np.ascontiguousarray(values.T)
+        masks[key] = values
+    return masks
+
+
+def run_batch_metrics(params: SimulationParams, template_id: int,
+                      lanes: Optional[Dict[str, Sequence[float]]] = None,
+                      num_hours: int = 8760,
+                      progress_callback: Optional[Callable[[float], None]] = None,
+                      solar_days: Optional[np.ndarray] = None,
+                      availability: Optional[Dict[str, np.ndarray]] = None,
+                      hour_masks: Optional[Dict[str, np.ndarray]] = None
+                      ) -> Dict[str, np.ndarray]:
+    """
+    Simulate many configurations at once and return their summary metrics.
+
+    Args:
+        params: Shared simulation parameters and profiles
+        template_id: Template (0-6)
+        lanes: Per-lane overrides keyed by LANE_FIELDS (scalars broadcast)
+        num_hours: Hours to simulate (default 8760); the run has
+            num_hours / params.timestep_hours steps
+        progress_callback: Optional callable receiving the completed fraction
+            (0-1) every PROGRESS_INTERVAL_HOURS and at the end
+        solar_days: Optional (lanes, days) integer array; lane i takes the
+            solar of profile day solar_days[i, d] on simulated day d, so
+            resampled weather years are read in place from one source profile
+        availability: Optional per-step availability factors (0-1) keyed by
+            AVAILABILITY_FIELDS ('dg', 'bess_power', 'bess_energy'), each of
+            shape (steps,) shared by all lanes or (lanes, steps). Replaces the
+            matching SimulationParams availability profile
+        hour_masks: Optional night/day/blackout hour flags keyed by
+            HOUR_MASK_KEYS, each of shape (24,) shared by all lanes or
+            (lanes, 24). Replaces the matching window of build_hour_arrays
+
+    Returns:
+        Dictionary of per-lane arrays keyed by SummaryMetrics field names,
+        plus the resolved lane inputs (LANE_FIELDS)
+    """
+    dt = params.timestep_hours
+    step_count = steps_per_hour(dt)
+    steps_per_day = HOURS_PER_DAY * step_count
+    num_steps = round(num_hours * step_count)
+
+    if solar_days is not None:
+        solar_days = np.asarray(solar_days, dtype=np.intp)
+        num_days = -(-num_steps // steps_per_day)
+        if solar_days.ndim != 2 or solar_days.shape[1] < num_days:
+            raise ValueError(f"solar_days must have shape (lanes, >= {num_days})")
+        if solar_days.size and (solar_days.min() < 0
+                                or solar_days.max() >= len(params.solar_profile) // steps_per_day):
+            raise ValueError("solar_days refers to days outside the solar profile")
+        lane_values = resolve_lanes(params, lanes or {}, num_lanes=len(solar_days))
+    else:
+        num_lanes = None
+        if availability:
+            shaped = [np.ndim(a) for a in availability.values()]
+            num_lanes = max((len(a) for a in availability.values() if np.ndim(a) == 2), default=None)
+            if any(d not in (1, 2) for d in shaped):
+                raise ValueError("availability arrays must have shape (steps,) or (lanes, steps)")
+        if hour_masks and num_lanes is None:
+            num_lanes = max((len(m) for m in hour_masks.values() if np.ndim(m) == 2), default=None)
+        lane_values = resolve_lanes(params, lanes or {}, num_lanes=num_lanes)
+    n = len(lane_values['bess_capacity'])
+    step_availability = _resolve_availability(params, availability, n, num_steps)
+    state = _LaneState(params, lane_values)
+    dispatch = BATCH_DISPATCH_FUNCTIONS.get(template_id, _dispatch_template_0)
+
+    masks = _resolve_hour_masks(params, hour_masks, n)
+    accountant = DGAccountant(params, state.nominal_dg_capacity)
+    account_dg = bool(state.has_dg.any())
+
+    load_profile = [float(x) for x in params.load_profile]
+    solar_profile = [float(x) for x in params.solar_profile]
+    load_len = len(load_profile)
+    solar_len = len(solar_profile)
+    solar_scale = lane_values['solar_scale']
+    if solar_days is not None:
+        solar_array = np.asarray(solar_profile)
+        day_offsets = solar_days * steps_per_day
+
+    totals = {name: np.zeros(n) for name in (
+        'total_solar_generation', 'total_solar_to_load', 'total_solar_to_bess',
+        'total_solar_curtailed', 'total_bess_to_load', 'total_dg_to_load',
+        'total_dg_to_bess', 'total_dg_curtailed', 'total_unserved')}
+    total_load = 0
+    steps_full = np.zeros(n, dtype=np.int64)
+    steps_green = np.zeros(n, dtype=np.int64)
+    steps_dg = np.zeros(n, dtype=np.int64)
+    dg_starts = np.zeros(n, dtype=np.int64)
+    progress_steps = PROGRESS_INTERVAL_HOURS * step_count
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for t in range(num_steps):
+            step_of_day = t % steps_per_day
+            hour_of_day = step_of_day // step_count
+            if step_of_day == 0 and t > 0:
+                state.new_day()
+                if progress_callback is not None and t % progress_steps == 0:
+                    progress_callback(t / num_steps)
+
+            if step_availability:
+                state.apply_availability(step_availability, t)
+
+            load = load_profile[t % load_len] if load_len > 0 else 0
+            if solar_days is not None:
+                solar = solar_array[day_offsets[:, t // steps_per_day] + step_of_day] * solar_scale
+            elif solar_len > 0:
+                solar = solar_profile[t % solar_len] * solar_scale
+            else:
+                solar = np.zeros(n)
+            hour = _Hour(load, solar, n)
+
+            dispatch(params, state, hour, hour_of_day, masks)
+
+            unserved = np.where(hour.remaining > 0.001, hour.remaining, 0.0)
+            state.soc = np.maximum(state.min_soc_mwh, np.minimum(state.soc, state.max_soc_mwh))
+
+            total_load += load
+            totals['total_solar_generation'] += hour.solar
+            totals['total_solar_to_load'] += hour.solar_to_load
+            totals['total_solar_to_bess'] += hour.solar_to_bess
+            totals['total_solar_curtailed'] += hour.solar_curtailed
+            totals['total_bess_to_load'] += hour.bess_to_load
+            totals['total_dg_to_load'] += hour.dg_to_load
+            totals['total_dg_to_bess'] += hour.dg_to_bess
+            totals['total_dg_curtailed'] += hour.dg_curtailed
+            totals['total_unserved'] += unserved
+
+            full = unserved < 0.001
+            steps_full += full
+            steps_green += full & ~hour.dg_running
+            steps_dg += hour.dg_running
+            dg_starts += hour.dg_running & ~state.dg_was_running
+            state.dg_was_running = hour.dg_running
+            if account_dg:
+                accountant.consume_step(hour.dg_to_load + hour.dg_to_bess, hour.dg_curtailed, hour.dg_running)
+
+        if progress_callback is not None:
+            progress_callback(1.0)
+
+        # Step sums of MW -> MWh, step counts -> hours
+        metrics = {name: total * dt for name, total in totals.items()}
+        total_load = total_load * dt
+        metrics['total_load'] = np.full(n, float(total_load))
+        metrics['hours_full_delivery'] = steps_to_hours(steps_full, dt)
+        metrics['hours_green_delivery'] = steps_to_hours(steps_green, dt)
+        metrics['hours_with_dg'] = steps_to_hours(steps_dg, dt)
+        metrics['dg_runtime_hours'] = metrics['hours_with_dg']
+        metrics['dg_starts'] = dg_starts
+
+        if num_steps > 0:
+            metrics['pct_full_delivery'] = steps_full / num_steps * 100
+            metrics['pct_green_delivery'] = steps_green / num_steps * 100
+        else:
+            metrics['pct_full_delivery'] = np.zeros(n)
+            metrics['pct_green_delivery'] = np.zeros(n)
+        metrics['pct_unserved'] = (metrics['total_unserved'] / total_load * 100
+                                   if total_load > 0 else np.zeros(n))
+        generation = metrics['total_solar_generation']
+        metrics['pct_solar_curtailed'] = np.where(
+            generation > 0, metrics['total_solar_curtailed'] / generation * 100, 0.0)
+
+        metrics['bess_throughput'] = metrics['total_bess_to_load']
+        usable = state.usable_capacity
+        metrics['bess_equivalent_cycles'] = np.where(
+            usable > 0, metrics['total_bess_to_load'] / usable, 0.0)
+        metrics.update(accountant.result())
+
+    metrics.update(lane_values)
+    return metrics
@@ -10,6 +10,9 @@ from .config import (
     INITIAL_SOC, TARGET_DELIVERY_MW,
     DEGRADATION_PER_CYCLE, DAYS_PER_YEAR
 )
+from .simulation_kernel import (
+    run_bess_year_kernel, run_bess_capacity_sweep_kernel, BESS_STATE_NAMES
+)
 
 
 class BatterySystem:
@@ -200,180 +203,97 @@ class BatterySystem:
         return self.total_cycles * self.degradation_per_cycle
 
 
-def simulate_bess_year(battery_capacity_mwh, solar_profile, config=None):
+def simulate_bess_year(battery_capacity_mwh, solar_profile, config=None, summary_only=False):
     """
     Simulate battery operation for a full year.
 
+    Runs on the shared low-overhead kernel in simulation_kernel; results are
+    identical to stepping a BatterySystem hour by hour.
+
     Args:
         battery_capacity_mwh: Battery capacity in MWh
         solar_profile: Array of hourly solar generation (MW)
         config: Optional configuration dictionary
+        summary_only: If True, skip building per-hour records
+            ('hourly_data' is returned as an empty list)
 
     Returns:
         dict: Simulation results with metrics
     """
-    # Initialize battery with config
+    # Initialize battery with config (resolves parameters and defaults)
     battery = BatterySystem(battery_capacity_mwh, config)
 
     # Get target delivery from config or use default
     target_delivery_mw = config.get('TARGET_DELIVERY_MW', TARGET_DELIVERY_MW) if config else TARGET_DELIVERY_MW
 
-    # Initialize results
-    results = {
-        'hours_delivered': 0,
-        'energy_delivered_mwh': 0,
-        'solar_charged_mwh': 0,
-        'solar_wasted_mwh': 0,
-        'battery_discharged_mwh': 0
-    }
-
-    # Hour-by-hour simulation
-    hourly_data = []
-
-    for hour in range(len(solar_profile)):
-        solar_mw = solar_profile[hour]
-
-        # Check if we can deliver target power
-        # Get actual power available from battery (MW), respecting C-rate
-        battery_available_mw = min(
-            battery.get_available_energy(),  # Energy limit (MWh = MW for 1 hour)
-            battery.capacity * battery.c_rate_discharge  # Power limit (MW)
-        )
+    results = run_bess_year_kernel(battery, solar_profile, target_delivery_mw, summary_only)
+    columns = results.pop('columns')
 
-        # Check basic ability to deliver
-        can_deliver_resources = (solar_mw + battery_available_mw) >= target_delivery_mw
-
-        # If we have resources but need battery, check cycle limit
-        if can_deliver_resources and solar_mw < target_delivery_mw:
-            # Would need to discharge - check if allowed
-            can_deliver = battery.can_cycle('DISCHARGING')
-        else:
-            can_deliver = can_deliver_resources
+    if columns is None:
+        results['hourly_data'] = []
+        return results
 
-        # Initialize hour data with all required fields
-        hour_data = {
+    # Build per-hour records from the kernel's output columns
+    results['hourly_data'] = [
+        {
             'hour': hour,
             'solar_mw': solar_mw,
-            'bess_mw': 0,  # Will be set: positive for discharge, negative for charge
-            'bess_charge_mwh': battery.soc * battery.capacity,  # Battery energy content at start of hour
-            'soc_percent': battery.soc * 100,  # SOC as percentage
-            'usable_energy_mwh': battery_available_mw,  # Usable energy accounting for min SOC
-            'committed_mw': target_delivery_mw,  # Always 25 MW - this is the requirement profile
-            'deficit_mw': 0,  # Will be calculated
-            'delivery': 'Yes' if can_deliver else 'No',
-            'bess_state': 'IDLE',  # Will be updated
-            'wastage_mwh': 0  # Will be calculated
+            'bess_mw': bess_mw,  # positive for discharge, negative for charge
+            'bess_charge_mwh': charge_mwh,  # Battery energy content at start of hour
+            'soc_percent': soc_pct,
+            'usable_energy_mwh': usable_mwh,  # Usable energy accounting for min SOC
+            'committed_mw': target_delivery_mw,
+            'deficit_mw': deficit_mw,
+            'delivery': 'Yes' if delivered else 'No',
+            'bess_state': BESS_STATE_NAMES[state],
+            'wastage_mwh': wastage_mwh
         }
+        for hour, (solar_mw, bess_mw, charge_mwh, soc_pct, usable_mwh,
+                   deficit_mw, delivered, state, wastage_mwh) in enumerate(zip(
+            columns['solar_mw'],
+            columns['bess_mw'],
+            columns['bess_charge_mwh'],
+            columns['soc_percent'],
+            columns['usable_energy_mwh'],
+            columns['deficit_mw'],
+            columns['delivery'],
+            columns['bess_state'],
+            columns['wastage_mwh'],
+        ))
+    ]
+
+    return results
+
+
+def simulate_bess_capacity_sweep(battery_sizes, solar_profile, config=None):
+    """
+    Simulate a full year for many battery capacities in one pass.
 
-        if can_deliver:
-            # Attempt to deliver target power
-            # Note: Will verify actual delivery success below before counting
-
-            if solar_mw >= target_delivery_mw:
-                # Solar alone can meet target - delivery successful
-                results['hours_delivered'] += 1
-                results['energy_delivered_mwh'] += target_delivery_mw
-                # Excess solar available - charge battery
-                excess_mw = solar_mw - target_delivery_mw
-                if excess_mw > 0 and battery.get_charge_headroom() > 0:
-                    # Check if we can cycle
-                    proposed_state = 'CHARGING' if excess_mw > 0 else 'IDLE'
-                    if battery.can_cycle(proposed_state):
-                        charged = battery.charge(excess_mw)
-                        results['solar_charged_mwh'] += charged
-                        hour_data['bess_mw'] = -charged  # Negative for charging
-                        new_state = proposed_state if charged > 0 else 'IDLE'
-
-                        # Waste remaining excess
-                        waste = excess_mw - charged
-                        if waste > 0:
-                            results['solar_wasted_mwh'] += waste
-                            hour_data['wastage_mwh'] = waste
-                    else:
-                        # Cannot cycle - stay idle and waste solar
-                        new_state = 'IDLE'
-                        hour_data['bess_mw'] = 0
-                        results['solar_wasted_mwh'] += excess_mw
-                        hour_data['wastage_mwh'] = excess_mw
-                else:
-                    new_state = 'IDLE'
-                    hour_data['bess_mw'] = 0
-                    if excess_mw > 0:
-                        results['solar_wasted_mwh'] += excess_mw
-                        hour_data['wastage_mwh'] = excess_mw
-
-                # No deficit when solar covers delivery
-                hour_data['deficit_mw'] = 0
-            else:
-                # Need battery support - check if we can cycle
-                if battery.can_cycle('DISCHARGING'):
-                    deficit_mw = target_delivery_mw - solar_mw
-                    discharged = battery.discharge(deficit_mw)
-                    results['battery_discharged_mwh'] += discharged
-                    hour_data['bess_mw'] = discharged  # Positive for discharge
-                    new_state = 'DISCHARGING'
-
-                    # Calculate actual deficit (if battery couldn't fully support)
-                    actual_delivered = solar_mw + discharged
-                    hour_data['deficit_mw'] = max(0, target_delivery_mw - actual_delivered)
-
-                    # Only count as delivered if we actually met the target (within small tolerance)
-                    if actual_delivered >= target_delivery_mw - 0.01:
-                        results['hours_delivered'] += 1
-                        results['energy_delivered_mwh'] += target_delivery_mw
-                    else:
-                        # Couldn't fully deliver
-                        hour_data['delivery'] = 'No'
-                else:
-                    # Cannot cycle - stay idle, cannot deliver
-                    new_state = 'IDLE'
-                    hour_data['bess_mw'] = 0
-                    hour_data['deficit_mw'] = target_delivery_mw - solar_mw
-                    hour_data['delivery'] = 'No'
-        else:
-            # Cannot deliver - charge battery with available solar
-            hour_data['deficit_mw'] = target_delivery_mw - (solar_mw + battery_available_mw)
-
-            if solar_mw > 0 and battery.get_charge_headroom() > 0:
-                # Check if we can cycle
-                if battery.can_cycle('CHARGING'):
-                    charged = battery.charge(solar_mw)
-                    results['solar_charged_mwh'] += charged
-                    hour_data['bess_mw'] = -charged  # Negative for charging
-                    new_state = 'CHARGING' if charged > 0 else 'IDLE'
-
-                    # Waste remaining solar
-                    waste = solar_mw - charged
-                    if waste > 0:
-                        results['solar_wasted_mwh'] += waste
-                        hour_data['wastage_mwh'] = waste
-                else:
-                    # Cannot cycle - stay idle and waste solar
-                    new_state = 'IDLE'
-                    hour_data['bess_mw'] = 0
-                    results['solar_wasted_mwh'] += solar_mw
-                    hour_data['wastage_mwh'] = solar_mw
-            else:
-                new_state = 'IDLE'
-                hour_data['bess_mw'] = 0
-                if solar_mw > 0:
-                    results['solar_wasted_mwh'] += solar_mw
-                    hour_data['wastage_mwh'] = solar_mw
-
-        # Update battery state and cycles
-        battery.update_state_and_cycles(new_state, hour)
-        hour_data['bess_state'] = new_state
-        hourly_data.append(hour_data)
-
-    # Add final day's cycles if not already added
-    if battery.current_day_cycles > 0:
-        battery.daily_cycles.append(battery.current_day_cycles)
-
-    # Compile final results
-    results['total_cycles'] = battery.total_cycles
-    results['avg_daily_cycles'] = battery.get_avg_daily_cycles()
-    results['max_daily_cycles'] = battery.get_max_daily_cycles()
-    results['degradation_percent'] = battery.get_degradation()
-    results['hourly_data'] = hourly_data
-
-    return results
\ No newline at end of file
+    All capacities are advanced together on run_bess_capacity_sweep_kernel,
+    including the 0.5-cycle transition counting and MAX_DAILY_CYCLES gating
+    of BatterySystem.can_cycle. Each entry equals
+    simulate_bess_year(size, solar_profile, config, summary_only=True).
+
+    Args:
+        battery_sizes: Iterable of battery capacities in MWh
+        solar_profile: Array of hourly solar generation (MW)
+        config: Optional configuration dictionary
+
+    Returns:
+        list[dict]: Simulation results per battery size, in input order
+    """
+    battery_sizes = list(battery_sizes)
+    if not battery_sizes:
+        return []
+
+    # Shared technical parameters (capacity is supplied per lane)
+    battery = BatterySystem(battery_sizes[0], config)
+    target_delivery_mw = config.get('TARGET_DELIVERY_MW', TARGET_DELIVERY_MW) if config else TARGET_DELIVERY_MW
+
+    sweep = run_bess_capacity_sweep_kernel(battery_sizes, battery, solar_profile, target_delivery_mw)
+    columns = {key: values.tolist() for key, values in sweep.items()}
+
+    return [
+        dict({key: values[i] for key, values in columns.items()}, hourly_data=[])
+        for i in range(len(battery_sizes))
+    ]
@@ -25,6 +25,13 @@ MARGINAL_INCREMENT_MWH = 10  # Increment for marginal analysis
 
 # Degradation Parameters
 DEGRADATION_PER_CYCLE = 0.0015  # Capacity degradation per cycle (0.15%)
+END_OF_LIFE_FADE_PCT = 20.0  # Capacity fade (%) at which the cycle life curve ends
+DOD_CYCLE_LIFE_CURVE = {  # Depth of discharge (%) -> cycles to end of life (LFP-like)
+    10: 100000, 20: 40000, 50: 12000, 80: 6000, 100: 4000,
+}
+CALENDAR_FADE_CURVE = {  # Mean SoC (%) -> calendar capacity fade (% per year)
+    0: 0.5, 50: 1.0, 100: 2.0,
+}
 
 # Simulation Parameters
 HOURS_PER_YEAR = 8760  # Hours in a year
@@ -39,6 +46,10 @@ FLOATING_POINT_TOLERANCE = 0.001  # Tolerance for floating point comparisons
 
 # File Paths
 SOLAR_PROFILE_PATH = "Inputs/Solar Profile.csv"
+STUDY_DIR = "studies"  # Saved sweep/hourly exports (Parquet/Feather)
+STUDY_DB_PATH = "studies/studies.sqlite3"  # Study store (SQLite)
+SWEEP_DIR = "studies/sweeps"  # Resumable sweep manifests and checkpoints
+PERF_CACHE_PATH = "studies/perf_calibration.json"  # Measured simulation throughput
 
 # Diesel Generator Parameters
 DG_CAPACITY_MW = 25.0  # DG rated capacity (MW)
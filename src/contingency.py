@@ -0,0 +1,210 @@
+"""
+Contingency Study Module - BESS & DG Sizing Tool
+
+Reliability of a configuration under DG forced outages and BESS string
+losses. Availability masks are either scheduled (fixed outage windows) or
+stochastic draws from two-state up/down Markov models with the given MTBF
+and MTTR. Draws run as lanes of the batched engine and are reduced to
+loss-of-load probability (LOLP) and expected unserved energy (EUE) with
+normal-approximation confidence intervals.
+
+A single mask can also be attached to SimulationParams
+(dg_availability, bess_power_availability, bess_energy_availability) to
+inspect one outage scenario hour by hour with run_simulation.
+"""
+
+from dataclasses import replace
+from statistics import NormalDist
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .dispatch_engine import SimulationParams, steps_per_hour
+from .batch_engine import run_batch_metrics
+
+
+DEFAULT_CHUNK_SIZE = 256
+
+
+# =============================================================================
+# AVAILABILITY MASKS
+# =============================================================================
+
+def markov_availability(num_draws: int, num_hours: int, mtbf_hours: float,
+                        mttr_hours: float, num_units: int = 1,
+                        rng: Optional[np.random.Generator] = None,
+                        timestep_hours: float = 1.0) -> np.ndarray:
+    """
+    Fraction of units available per step from a two-state Markov model.
+
+    Each unit fails with probability timestep/MTBF per step while up and is
+    repaired with probability timestep/MTTR per step while down (geometric
+    up and down times with the given means). Units start in the steady
+    state (available with probability MTBF / (MTBF + MTTR)).
+
+    Args:
+        num_draws: Number of independent draws
+        num_hours: Hours per draw
+        mtbf_hours: Mean time between failures (hours)
+        mttr_hours: Mean time to repair (hours)
+        num_units: Identical independent units (e.g. BESS strings)
+        rng: numpy Generator (a fresh unseeded one if None)
+        timestep_hours: Step length (see SimulationParams.timestep_hours)
+
+    Returns:
+        (num_draws, num_hours / timestep_hours) array of available
+        fractions (0-1)
+    """
+    if mtbf_hours <= 0 or mttr_hours <= 0:
+        raise ValueError("MTBF and MTTR must be positive")
+    if num_units < 1:
+        raise ValueError("num_units must be at least 1")
+    rng = rng if rng is not None else np.random.default_rng()
+    num_steps = round(num_hours * steps_per_hour(timestep_hours))
+
+    fail_prob = min(1.0, timestep_hours / mtbf_hours)
+    repair_prob = min(1.0, timestep_hours / mttr_hours)
+    availability = mtbf_hours / (mtbf_hours + mttr_hours)
+
+    up = rng.random((num_draws, num_units)) < availability
+    fractions = np.empty((num_steps, num_draws))
+    for t in range(num_steps):
+        fractions[t] = up.mean(axis=1)
+        u = rng.random((num_draws, num_units))
+        up = np.where(up, u >= fail_prob, u < repair_prob)
+    return np.ascontiguousarray(fractions.T)
+
+
+def scheduled_availability(num_hours: int,
+                           outages: Sequence[Tuple[int, int, float]],
+                           timestep_hours: float = 1.0) -> np.ndarray:
+    """
+    Availability profile with fixed outage windows.
+
+    Args:
+        num_hours: Profile length in hours
+        outages: (start_hour, duration_hours, available_fraction) tuples;
+            overlapping windows take the lowest fraction
+        timestep_hours: Step length (see SimulationParams.timestep_hours)
+
+    Returns:
+        (num_hours / timestep_hours,) array of available fractions (0-1)
+    """
+    step_count = steps_per_hour(timestep_hours)
+    profile = np.ones(round(num_hours * step_count))
+    for start, duration, fraction in outages:
+        window = slice(max(0, round(start * step_count)), max(0, round((start + duration) * step_count)))
+        profile[window] = np.minimum(profile[window], fraction)
+    return profile
+
+
+# =============================================================================
+# STUDY
+# =============================================================================
+
+def _mean_interval(values: np.ndarray, confidence: float) -> Dict[str, float]:
+    """Mean, standard deviation and normal-approximation CI of the mean."""
+    n = len(values)
+    mean = float(values.mean()) if n else float('nan')
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    half = NormalDist().inv_cdf(0.5 + confidence / 2) * std / n ** 0.5 if n > 1 else 0.0
+    return {'mean': mean, 'std': std, 'ci_low': mean - half, 'ci_high': mean + half}
+
+
+def run_contingency_study(params: SimulationParams, template_id: int,
+                          num_draws: int = 1000,
+                          dg_mtbf_hours: Optional[float] = None,
+                          dg_mttr_hours: Optional[float] = None,
+                          bess_strings: int = 1,
+                          string_mtbf_hours: Optional[float] = None,
+                          string_mttr_hours: Optional[float] = None,
+                          scheduled: Optional[Dict[str, np.ndarray]] = None,
+                          num_hours: int = 8760,
+                          confidence: float = 0.95,
+                          seed: Optional[int] = None,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          progress_callback: Optional[Callable[[float], None]] = None) -> Dict:
+    """
+    Loss-of-load statistics over random outage draws.
+
+    DG outages are drawn when dg_mtbf_hours and dg_mttr_hours are given;
+    BESS string losses (derating power and energy by the fraction of strings
+    down) when string_mtbf_hours and string_mttr_hours are given. Scheduled
+    availability profiles (keys 'dg', 'bess_power', 'bess_energy') multiply
+    the drawn masks.
+
+    Args:
+        params: Configuration and profiles
+        template_id: Template (0-6)
+        num_draws: Number of outage draws
+        dg_mtbf_hours, dg_mttr_hours: DG forced-outage model
+        bess_strings: Number of BESS strings
+        string_mtbf_hours, string_mttr_hours: Per-string outage model
+        scheduled: Optional scheduled availability profiles, one value per
+            step (see scheduled_availability)
+        num_hours: Hours to simulate per draw
+        confidence: Confidence level of the intervals (e.g. 0.95)
+        seed: RNG seed; the same seed gives the same draws
+        chunk_size: Draws simulated together per batched pass
+        progress_callback: Optional callable receiving the completed fraction
+
+    Returns:
+        Dictionary with:
+            - draws, confidence
+            - lolp: Loss-of-load probability (share of hours with unserved
+              load) {mean, std, ci_low, ci_high}
+            - lole_hours: Loss-of-load expectation (hours per period)
+            - eue_mwh: Expected unserved energy (MWh per period)
+            - delivery_pct: Full-delivery hours (%)
+            - baseline: Same metrics with full availability (no outages)
+    """
+    draw_dg = dg_mtbf_hours is not None and dg_mttr_hours is not None
+    draw_bess = string_mtbf_hours is not None and string_mttr_hours is not None
+    dt = params.timestep_hours
+    num_steps = round(num_hours * steps_per_hour(dt))
+    scheduled = {key: np.asarray(value, dtype=float)[:num_steps]
+                 for key, value in (scheduled or {}).items()}
+    rng = np.random.default_rng(seed)
+
+    nominal = replace(params, dg_availability=[], bess_power_availability=[], bess_energy_availability=[])
+    baseline = run_batch_metrics(nominal, template_id, num_hours=num_hours)
+
+    lole = np.empty(num_draws)
+    eue = np.empty(num_draws)
+    for start in range(0, num_draws, chunk_size):
+        draws = min(chunk_size, num_draws - start)
+        availability = {}
+
+        dg = (markov_availability(draws, num_hours, dg_mtbf_hours, dg_mttr_hours,
+                                  rng=rng, timestep_hours=dt) if draw_dg else None)
+        bess = (markov_availability(draws, num_hours, string_mtbf_hours, string_mttr_hours,
+                                    num_units=bess_strings, rng=rng, timestep_hours=dt) if draw_bess else None)
+
+        for key, drawn in (('dg', dg), ('bess_power', bess), ('bess_energy', bess)):
+            if key in scheduled:
+                drawn = scheduled[key] if drawn is None else drawn * scheduled[key]
+            if drawn is not None:
+                availability[key] = np.broadcast_to(drawn, (draws, num_steps))
+
+        metrics = run_batch_metrics(params, template_id, lanes={'solar_scale': np.ones(draws)},
+                                    num_hours=num_hours, availability=availability)
+        lole[start:start + draws] = num_hours - metrics['hours_full_delivery']
+        eue[start:start + draws] = metrics['total_unserved']
+        if progress_callback is not None:
+            progress_callback((start + draws) / num_draws)
+
+    base_lole = num_hours - baseline['hours_full_delivery'][0].item()
+    return {
+        'draws': num_draws,
+        'confidence': confidence,
+        'lolp': _mean_interval(lole / num_hours, confidence),
+        'lole_hours': _mean_interval(lole, confidence),
+        'eue_mwh': _mean_interval(eue, confidence),
+        'delivery_pct': _mean_interval((num_hours - lole) / num_hours * 100, confidence),
+        'baseline': {
+            'lolp': base_lole / num_hours,
+            'lole_hours': base_lole,
+            'eue_mwh': float(baseline['total_unserved'][0]),
+            'delivery_pct': float(baseline['pct_full_delivery'][0]),
+        },
+    }
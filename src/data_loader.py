@@ -3,9 +3,9 @@ Data loader module for reading solar profile data
 """
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
 from .config import SOLAR_PROFILE_PATH
+from .profile_stats import get_profile_stats
 from utils.logger import get_logger
 
 # Set up module logger
@@ -101,11 +101,12 @@ def get_solar_statistics(solar_profile):
     Returns:
         dict: Statistics including max, min, mean, total
     """
+    stats = get_profile_stats(solar_profile)
     return {
-        'max_mw': np.max(solar_profile),
-        'min_mw': np.min(solar_profile),
-        'mean_mw': np.mean(solar_profile),
-        'total_mwh': np.sum(solar_profile),
-        'capacity_factor': np.mean(solar_profile) / 67.0,
-        'zero_hours': np.sum(solar_profile == 0)
+        'max_mw': stats['peak_mw'],
+        'min_mw': stats['min_mw'],
+        'mean_mw': stats['mean_mw'],
+        'total_mwh': stats['total_mwh'],
+        'capacity_factor': stats['mean_mw'] / 67.0,
+        'zero_hours': stats['zero_hours']
     }
\ No newline at end of file
@@ -0,0 +1,286 @@
+"""
+Degradation Module - BESS & DG Sizing Tool
+
+Battery capacity fade from the SoC trace of a simulation.
+
+Cycle ageing: a rainflow count (ASTM E1049 three-point method) splits the
+SoC trace into full and half cycles; a cycle of depth DoD uses up
+1 / N(DoD) of the cycle life, with N read off a DoD -> cycles to end of
+life curve (interpolated in log-log space), and a used-up cycle life
+means end_of_life_fade_pct of fade (Miner's rule).
+
+Calendar ageing: every step adds fade at a rate read off a SoC -> % per
+year curve, so a battery parked full ages faster than one parked empty.
+
+The two add up. The count streams: RainflowCounter keeps only the stack
+of unclosed reversals, so a multi-year trace can be fed a year at a time
+and the fade read after each year (the Quick Analysis projection sizes
+the next simulated year from it). assess_degradation applies the same
+model to a (runs, steps) SoC matrix, e.g. the template comparison traces.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import CALENDAR_FADE_CURVE, DOD_CYCLE_LIFE_CURVE, END_OF_LIFE_FADE_PCT, HOURS_PER_YEAR
+
+
+# SoC range (percentage points) below which a cycle is ignored
+MIN_CYCLE_DEPTH = 1e-9
+
+# Keys of DegradationTracker.result / assess_degradation
+DEGRADATION_FIELDS = (
+    'cycle_fade_pct', 'calendar_fade_pct', 'capacity_fade_pct', 'equivalent_full_cycles',
+)
+
+
+@dataclass
+class DegradationParams:
+    """Cycle life and calendar ageing curves."""
+    dod_pct: List[float] = field(default_factory=lambda: list(DOD_CYCLE_LIFE_CURVE))
+    cycle_life: List[float] = field(default_factory=lambda: list(DOD_CYCLE_LIFE_CURVE.values()))
+    end_of_life_fade_pct: float = END_OF_LIFE_FADE_PCT
+    calendar_soc_pct: List[float] = field(default_factory=lambda: list(CALENDAR_FADE_CURVE))
+    calendar_fade_pct_per_year: List[float] = field(default_factory=lambda: list(CALENDAR_FADE_CURVE.values()))
+
+
+def _curve(points, values, name: str):
+    points = np.asarray(points, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(points) != len(values) or len(points) == 0:
+        raise ValueError(f"{name} curve needs matching, non-empty point and value lists")
+    order = np.argsort(points)
+    return points[order], values[order]
+
+
+def cycle_life(dod_pct, params: DegradationParams) -> np.ndarray:
+    """
+    Cycles to end of life at a depth of discharge.
+
+    Interpolates the curve in log-log space; shallower cycles than the
+    first curve point follow the slope of its first segment.
+
+    Args:
+        dod_pct: Cycle depth (SoC percentage points, array)
+        params: Supplies the DoD -> cycle life curve
+
+    Returns:
+        Cycles to end of life (array)
+    """
+    points, lives = _curve(params.dod_pct, params.cycle_life, 'Cycle life')
+    if (points <= 0).any() or (lives <= 0).any():
+        raise ValueError("Cycle life curve needs positive depths and cycle counts")
+    x, y = np.log(points), np.log(lives)
+    depth = np.log(np.maximum(np.asarray(dod_pct, dtype=float), MIN_CYCLE_DEPTH))
+    slope = (y[1] - y[0]) / (x[1] - x[0]) if len(x) > 1 else 0.0
+    return np.exp(np.where(depth < x[0], y[0] + slope * (depth - x[0]), np.interp(depth, x, y)))
+
+
+def calendar_rate(soc_pct, params: DegradationParams) -> np.ndarray:
+    """
+    Calendar fade rate at a SoC.
+
+    Args:
+        soc_pct: State of charge (%, array)
+        params: Supplies the SoC -> fade rate curve
+
+    Returns:
+        Capacity fade (% per year), clamped at the curve ends
+    """
+    return np.interp(soc_pct, *_curve(params.calendar_soc_pct, params.calendar_fade_pct_per_year, 'Calendar fade'))
+
+
+def turning_points(trace) -> np.ndarray:
+    """
+    Reversals of a trace, plus its first and last points.
+
+    Args:
+        trace: 1-D values (e.g. SoC %)
+
+    Returns:
+        1-D array of the points where the trace changes direction
+    """
+    values = np.asarray(trace, dtype=float)
+    if len(values) > 1:
+        values = values[np.r_[True, values[1:] != values[:-1]]]  # flat steps
+    if len(values) < 3:
+        return values
+    slope = np.diff(values)
+    return values[np.r_[True, slope[:-1] * slope[1:] < 0, True]]
+
+
+class RainflowCounter:
+    """
+    Streaming rainflow count (ASTM E1049 three-point method).
+
+    Chunks must follow each other in time. Only the unclosed reversals are
+    kept between chunks, so memory stays small however long the trace;
+    they count as half cycles when cycles() is read.
+    """
+
+    def __init__(self):
+        self._stack: List[float] = []
+        self._ranges: List[float] = []
+        self._means: List[float] = []
+        self._counts: List[float] = []
+
+    def consume(self, trace) -> None:
+        """
+        Add the next stretch of the trace.
+
+        Args:
+            trace: 1-D values (e.g. SoC %)
+        """
+        stack = self._stack
+        ranges, means, counts = self._ranges, self._means, self._counts
+        for point in turning_points(trace).tolist():
+            if stack and point == stack[-1]:
+                continue
+            if len(stack) >= 2 and (stack[-1] - stack[-2]) * (point - stack[-1]) > 0:
+                stack[-1] = point  # same direction: the last point was no reversal
+            else:
+                stack.append(point)
+            while len(stack) >= 3:
+                latest = abs(stack[-1] - stack[-2])
+                previous = abs(stack[-2] - stack[-3])
+                if latest < previous:
+                    break
+                ranges.append(previous)
+                if len(stack) == 3:
+                    # Range includes the starting point: half cycle
+                    means.append((stack[0] + stack[1]) / 2)
+                    counts.append(0.5)
+                    del stack[0]
+                else:
+                    means.append((stack[-2] + stack[-3]) / 2)
+                    counts.append(1.0)
+                    del stack[-3:-1]
+
+    def cycles(self) -> Dict[str, np.ndarray]:
+        """
+        Cycles counted so far, the open reversals as half cycles.
+
+        Returns:
+            Dictionary of equal-length arrays: range (depth), mean and
+            count (1 for full cycles, 0.5 for half cycles)
+        """
+        residue = np.asarray(self._stack, dtype=float)
+        open_ranges = np.abs(np.diff(residue))
+        return {
+            'range': np.r_[np.asarray(self._ranges, dtype=float), open_ranges],
+            'mean': np.r_[np.asarray(self._means, dtype=float), (residue[1:] + residue[:-1]) / 2],
+            'count': np.r_[np.asarray(self._counts, dtype=float), np.full(len(open_ranges), 0.5)],
+        }
+
+
+def rainflow(trace) -> Dict[str, np.ndarray]:
+    """
+    Rainflow cycles of a whole trace (see RainflowCounter.cycles).
+
+    Args:
+        trace: 1-D values (e.g. SoC %)
+    """
+    counter = RainflowCounter()
+    counter.consume(trace)
+    return counter.cycles()
+
+
+def cycle_damage(ranges, counts, params: DegradationParams) -> float:
+    """
+    Fraction of the cycle life used up by counted cycles (Miner's rule).
+
+    Args:
+        ranges: Cycle depths (SoC percentage points)
+        counts: Cycle counts (1 or 0.5)
+        params: Supplies the cycle life curve
+    """
+    ranges = np.asarray(ranges, dtype=float)
+    counted = ranges > MIN_CYCLE_DEPTH
+    if not counted.any():
+        return 0.0
+    return float((np.asarray(counts, dtype=float)[counted] / cycle_life(ranges[counted], params)).sum())
+
+
+class DegradationTracker:
+    """
+    Running capacity fade of one battery over SoC trace chunks.
+
+    Chunks must follow each other in time; result can be read after any
+    chunk (e.g. at the end of every simulated year).
+    """
+
+    def __init__(self, params: Optional[DegradationParams] = None, timestep_hours: float = 1.0):
+        """
+        Args:
+            params: Ageing curves (default DegradationParams())
+            timestep_hours: Step length of the SoC trace
+        """
+        self.params = params or DegradationParams()
+        self.timestep_hours = timestep_hours
+        self.counter = RainflowCounter()
+        self.calendar_rate_sum = 0.0  # % per year, summed over steps
+
+    def consume(self, soc_pct) -> None:
+        """
+        Add the next stretch of the SoC trace.
+
+        Args:
+            soc_pct: State of charge per step (% of rated capacity)
+        """
+        soc_pct = np.asarray(soc_pct, dtype=float)
+        self.counter.consume(soc_pct)
+        self.calendar_rate_sum += float(calendar_rate(soc_pct, self.params).sum())
+
+    def result(self) -> Dict[str, float]:
+        """
+        Fade of everything consumed so far.
+
+        Returns:
+            Dictionary of DEGRADATION_FIELDS: cycle, calendar and total
+            capacity fade (% of rated capacity) and equivalent full cycles
+        """
+        cycles = self.counter.cycles()
+        cycle_fade = cycle_damage(cycles['range'], cycles['count'], self.params) * self.params.end_of_life_fade_pct
+        calendar_fade = self.calendar_rate_sum * self.timestep_hours / HOURS_PER_YEAR
+        return {
+            'cycle_fade_pct': cycle_fade,
+            'calendar_fade_pct': calendar_fade,
+            'capacity_fade_pct': cycle_fade + calendar_fade,
+            'equivalent_full_cycles': float((cycles['range'] * cycles['count']).sum() / 100),
+        }
+
+
+def assess_degradation(soc_pct, params: Optional[DegradationParams] = None,
+                       timestep_hours: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Capacity fade of many runs from their SoC traces.
+
+    Args:
+        soc_pct: SoC per step (% of rated capacity), (steps,) for one run or
+            (runs, steps), e.g. template comparison traces
+        params: Ageing curves (default DegradationParams())
+        timestep_hours: Step length of the traces
+
+    Returns:
+        Dictionary of DEGRADATION_FIELDS -> per-run arrays
+    """
+    params = params or DegradationParams()
+    soc_pct = np.atleast_2d(np.asarray(soc_pct, dtype=float))
+    rates = calendar_rate(soc_pct, params).sum(axis=1)
+
+    cycle_fade = np.zeros(len(soc_pct))
+    full_cycles = np.zeros(len(soc_pct))
+    for run, trace in enumerate(soc_pct):
+        cycles = rainflow(trace)
+        cycle_fade[run] = cycle_damage(cycles['range'], cycles['count'], params) * params.end_of_life_fade_pct
+        full_cycles[run] = (cycles['range'] * cycles['count']).sum() / 100
+
+    calendar_fade = rates * timestep_hours / HOURS_PER_YEAR
+    return {
+        'cycle_fade_pct': cycle_fade,
+        'calendar_fade_pct': calendar_fade,
+        'capacity_fade_pct': cycle_fade + calendar_fade,
+        'equivalent_full_cycles': full_cycles,
+    }
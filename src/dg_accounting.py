@@ -0,0 +1,188 @@
+"""
+DG Accounting Module - BESS & DG Sizing Tool
+
+Fuel, start fuel, low-load running and CO2 of the generator, computed from
+the hourly DG flows after dispatch.
+
+Fuel burn follows a part-load curve: litres per hour per MW of rated
+capacity at a few loading points (SimulationParams.dg_fuel_curve_*),
+interpolated linearly and clamped at the curve ends. The loading of a
+running step depends on the operating mode:
+
+- binary: the DG runs at full output and dumps what load and BESS cannot
+  take, so the curtailed DG energy burns fuel too
+- variable: the DG follows dg_to_load + dg_to_bess; steps below
+  dg_min_load_pct of rated capacity count as low-load running
+
+Every start adds dg_start_fuel_l_per_mw litres per MW rated. All of it is
+array arithmetic over (runs, steps) flows, so one accountant serves a
+single run, the lanes of the batched engine step by step, or stored
+hourly traces of a whole sweep without re-running dispatch.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .simulation_params import SimulationParams, steps_to_hours
+
+
+# SummaryMetrics fields produced by DGAccountant.result
+DG_ACCOUNTING_FIELDS = (
+    'dg_fuel_litres', 'dg_start_fuel_litres', 'dg_low_load_hours',
+    'dg_mean_load_pct', 'dg_co2_tonnes',
+)
+
+OPERATING_MODES = ('binary', 'variable')
+
+
+def fuel_curve(params: SimulationParams):
+    """
+    Part-load fuel curve of the params, sorted by loading.
+
+    Args:
+        params: Supplies dg_fuel_curve_load_pct / dg_fuel_curve_lph_per_mw
+
+    Returns:
+        Tuple of (loading % array, litres per hour per MW rated array)
+    """
+    points = np.asarray(params.dg_fuel_curve_load_pct, dtype=float)
+    rates = np.asarray(params.dg_fuel_curve_lph_per_mw, dtype=float)
+    if len(points) != len(rates) or len(points) == 0:
+        raise ValueError("DG fuel curve needs matching, non-empty loading and fuel rate lists")
+    order = np.argsort(points)
+    return points[order], rates[order]
+
+
+def fuel_rate(loading_pct, params: SimulationParams) -> np.ndarray:
+    """
+    Fuel burn at a loading, from the params part-load curve.
+
+    Args:
+        loading_pct: DG output as % of rated capacity (array)
+        params: Supplies the fuel curve
+
+    Returns:
+        Litres per hour per MW rated (clamped at the curve ends)
+    """
+    return np.interp(loading_pct, *fuel_curve(params))
+
+
+class DGAccountant:
+    """
+    Running tally of DG fuel and emissions over step chunks.
+
+    Usable for one run (arrays of shape (steps,)) or many lanes (arrays of
+    shape (lanes, steps), or consume_step with one step for all lanes);
+    chunks must follow each other in time so starts across chunk
+    boundaries are counted once.
+    """
+
+    def __init__(self, params: SimulationParams, dg_capacity=None):
+        """
+        Args:
+            params: Fuel curve, operating mode, start fuel and CO2 factor
+            dg_capacity: Rated DG capacity (MW), scalar or per lane
+                (default params.dg_capacity, or 0 when the DG is disabled)
+        """
+        if params.dg_operating_mode not in OPERATING_MODES:
+            raise ValueError(f"Unknown DG operating mode '{params.dg_operating_mode}' "
+                             f"(expected one of {OPERATING_MODES})")
+        if dg_capacity is None:
+            dg_capacity = params.dg_capacity if params.dg_enabled else 0.0
+        self.params = params
+        self.capacity = np.atleast_1d(np.asarray(dg_capacity, dtype=float))
+        self.dumped_burns_fuel = params.dg_operating_mode == 'binary'
+        self.curve = fuel_curve(params)
+        # MW -> % of rated capacity (0 for lanes without a DG)
+        self._to_pct = np.divide(100.0, self.capacity, out=np.zeros_like(self.capacity),
+                                 where=self.capacity > 0)
+
+        n = len(self.capacity)
+        self.rate_sum = np.zeros(n)  # fuel rate (L/h per MW) summed over running steps
+        self.loading_sum = np.zeros(n)
+        self.running_steps = np.zeros(n, dtype=np.int64)
+        self.low_load_steps = np.zeros(n, dtype=np.int64)
+        self.starts = np.zeros(n, dtype=np.int64)
+        self._was_running = np.zeros(n, dtype=bool)
+
+    def consume(self, dg_served, dg_dumped, dg_running) -> None:
+        """
+        Add a chunk of steps.
+
+        Args:
+            dg_served: DG output used (dg_to_load + dg_to_bess, MW)
+            dg_dumped: DG output curtailed (dg_curtailed, MW)
+            dg_running: DG on flags
+        """
+        served = np.atleast_2d(np.asarray(dg_served, dtype=float))
+        running = np.atleast_2d(np.asarray(dg_running, dtype=bool))
+        if running.shape[1] == 0:
+            return
+        output = served + np.atleast_2d(np.asarray(dg_dumped, dtype=float)) if self.dumped_burns_fuel else served
+
+        loading = output * self._to_pct[:, None] * running
+        self.rate_sum += (np.interp(loading, *self.curve) * running).sum(axis=1)
+        self.loading_sum += loading.sum(axis=1)
+        self.running_steps += running.sum(axis=1)
+        if not self.dumped_burns_fuel:
+            self.low_load_steps += (running & (loading < self.params.dg_min_load_pct)).sum(axis=1)
+
+        previous = np.concatenate([self._was_running[:, None], running[:, :-1]], axis=1)
+        self.starts += (running & ~previous).sum(axis=1)
+        self._was_running = running[:, -1].copy()
+
+    def consume_step(self, dg_served: np.ndarray, dg_dumped: np.ndarray, dg_running: np.ndarray) -> None:
+        """
+        Add one step of every lane ((lanes,) arrays, as consume with one column).
+
+        Args:
+            dg_served: DG output used per lane (MW)
+            dg_dumped: DG output curtailed per lane (MW)
+            dg_running: DG on flag per lane
+        """
+        output = dg_served + dg_dumped if self.dumped_burns_fuel else dg_served
+        loading = output * self._to_pct
+        self.rate_sum += np.interp(loading, *self.curve) * dg_running
+        self.loading_sum += loading
+        self.running_steps += dg_running
+        if not self.dumped_burns_fuel:
+            self.low_load_steps += dg_running & (loading < self.params.dg_min_load_pct)
+        self.starts += dg_running & ~self._was_running
+        self._was_running = dg_running
+
+    def result(self) -> Dict[str, np.ndarray]:
+        """Per-lane DG_ACCOUNTING_FIELDS arrays for everything consumed so far."""
+        running_litres = self.rate_sum * self.capacity * self.params.timestep_hours
+        start_litres = self.starts * self.params.dg_start_fuel_l_per_mw * self.capacity
+        fuel = running_litres + start_litres
+        mean_load = np.divide(self.loading_sum, self.running_steps, out=np.zeros_like(self.loading_sum),
+                              where=self.running_steps > 0)
+        return {
+            'dg_fuel_litres': fuel,
+            'dg_start_fuel_litres': start_litres,
+            'dg_low_load_hours': steps_to_hours(self.low_load_steps, self.params.timestep_hours),
+            'dg_mean_load_pct': mean_load,
+            'dg_co2_tonnes': fuel * self.params.dg_co2_kg_per_litre / 1000,
+        }
+
+
+def account_dg(params: SimulationParams, dg_served, dg_dumped, dg_running,
+               dg_capacity: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    DG fuel and emissions of stored flows (one run or a runs x steps matrix).
+
+    Args:
+        params: Accounting settings and timestep; change them to re-cost
+            results without re-running dispatch
+        dg_served: dg_to_load + dg_to_bess per step, (steps,) or (runs, steps)
+        dg_dumped: dg_curtailed per step, same shape
+        dg_running: DG on flags, same shape
+        dg_capacity: Rated DG capacity per run (default params.dg_capacity)
+
+    Returns:
+        Dictionary of DG_ACCOUNTING_FIELDS -> per-run arrays
+    """
+    accountant = DGAccountant(params, dg_capacity)
+    accountant.consume(dg_served, dg_dumped, dg_running)
+    return accountant.result()
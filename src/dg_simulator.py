@@ -5,6 +5,7 @@ Implements merit order dispatch with SOC-triggered DG control
 
 import numpy as np
 from .battery_simulator import BatterySystem
+from .simulation_kernel import run_bess_dg_year_kernel, BESS_STATE_NAMES
 from .config import (
     DG_CAPACITY_MW, DG_SOC_ON_THRESHOLD, DG_SOC_OFF_THRESHOLD, DG_LOAD_MW
 )
@@ -115,7 +116,8 @@ class DieselGenerator:
         self.total_energy_to_bess = 0.0
 
 
-def simulate_solar_bess_dg_year(battery_capacity_mwh, dg_capacity_mw, solar_profile, config=None):
+def simulate_solar_bess_dg_year(battery_capacity_mwh, dg_capacity_mw, solar_profile, config=None,
+                                summary_only=False):
     """
     Simulate Solar + BESS + DG system for one year (8760 hours).
 
@@ -133,182 +135,113 @@ def simulate_solar_bess_dg_year(battery_capacity_mwh, dg_capacity_mw, solar_prof
         - Turn OFF when SOC >= dg_soc_off_threshold
         - Runs at full capacity when ON
 
+    Runs on the shared low-overhead kernel in simulation_kernel; results are
+    identical to stepping BatterySystem/DieselGenerator hour by hour.
+
     Args:
         battery_capacity_mwh: Battery capacity in MWh
         dg_capacity_mw: DG rated capacity in MW
         solar_profile: Array of hourly solar generation (MW)
         config: Optional configuration dictionary
+        summary_only: If True, skip building per-hour records
+            ('hourly_data' is returned as an empty list)
 
     Returns:
         dict: Simulation results with BESS and DG metrics
     """
-    # Initialize components
+    # Initialize components (resolves parameters and defaults)
     battery = BatterySystem(battery_capacity_mwh, config)
     dg = DieselGenerator(dg_capacity_mw, config)
 
     # Get load from config or use default
     load_mw = config.get('DG_LOAD_MW', DG_LOAD_MW) if config else DG_LOAD_MW
 
-    # Initialize results
-    results = {
-        # Delivery metrics
-        'hours_delivered': 0,
-        'energy_delivered_mwh': 0,
-
-        # Solar distribution
-        'solar_to_load_mwh': 0,
-        'solar_charged_mwh': 0,
-        'solar_wasted_mwh': 0,
-
-        # BESS metrics
-        'battery_discharged_mwh': 0,
-    }
-
-    # Hour-by-hour simulation
-    hourly_data = []
+    results = run_bess_dg_year_kernel(battery, dg, solar_profile, load_mw, summary_only)
+    columns = results.pop('columns')
 
-    for hour in range(len(solar_profile)):
-        solar_mw = solar_profile[hour]
+    if columns is None:
+        results['hourly_data'] = []
+        return results
 
-        # Step 1: Update DG state based on current SOC (BEFORE dispatch)
-        dg.update_state(battery.soc)
-
-        # Initialize hour tracking
-        hour_data = {
+    # Build per-hour records from the kernel's output columns
+    results['hourly_data'] = [
+        {
             'hour': hour,
             'solar_mw': solar_mw,
             'load_mw': load_mw,
-            'solar_to_load_mw': 0,
-            'bess_mw': 0,  # +ve discharge, -ve charge
-            'bess_to_load_mw': 0,
-            'soc_percent': battery.soc * 100,
-            'bess_state': 'IDLE',
-            'dg_state': dg.state,
-            'dg_output_mw': 0,
-            'dg_to_load_mw': 0,
-            'dg_to_bess_mw': 0,
-            'solar_charged_mwh': 0,
-            'solar_wasted_mwh': 0,
-            'unmet_load_mw': 0,
-            'delivery': 'No'
+            'solar_to_load_mw': solar_to_load,
+            'bess_mw': bess_mw,  # +ve discharge, -ve charge
+            'bess_to_load_mw': bess_to_load,
+            'soc_percent': soc_pct,
+            'bess_state': BESS_STATE_NAMES[state],
+            'dg_state': 'ON' if dg_on else 'OFF',
+            'dg_output_mw': dg_output,
+            'dg_to_load_mw': dg_to_load,
+            'dg_to_bess_mw': dg_to_bess,
+            'solar_charged_mwh': solar_charged,
+            'solar_wasted_mwh': solar_wasted,
+            'unmet_load_mw': unmet,
+            'delivery': 'Yes' if delivered else 'No'
         }
-
-        remaining_load = load_mw
-
-        # Step 2: Merit Order Dispatch for LOAD
-
-        # Priority 1: Solar to Load (always first, no control)
-        solar_to_load = min(solar_mw, remaining_load)
-        remaining_load -= solar_to_load
-        excess_solar = solar_mw - solar_to_load
-
-        hour_data['solar_to_load_mw'] = solar_to_load
-        results['solar_to_load_mwh'] += solar_to_load
-
-        # Priority 2: DG to Load (if DG is ON) - DG serves load before BESS
-        dg_output = 0
-        dg_to_load = 0
-        if dg.state == 'ON':
-            dg_output = dg.run()  # Full capacity
-            dg_to_load = min(dg_output, remaining_load)
-            remaining_load -= dg_to_load
-            hour_data['dg_output_mw'] = dg_output
-            hour_data['dg_to_load_mw'] = dg_to_load
-
-        excess_dg = dg_output - dg_to_load
-
-        # Priority 3: BESS discharge (only if Solar + DG can't meet load)
-        bess_to_load = 0
-        if remaining_load > 0 and battery.get_available_energy() > 0:
-            if battery.can_cycle('DISCHARGING'):
-                bess_to_load = battery.discharge(remaining_load)
-                remaining_load -= bess_to_load
-                results['battery_discharged_mwh'] += bess_to_load
-                hour_data['bess_mw'] = bess_to_load
-                hour_data['bess_to_load_mw'] = bess_to_load
-                hour_data['bess_state'] = 'DISCHARGING'
-
-        # Step 3: Charge BESS (Solar first, then DG excess)
-        solar_charged = 0
-        dg_charged = 0
-
-        # Charge from excess solar first
-        if excess_solar > 0 and battery.get_charge_headroom() > 0:
-            if battery.can_cycle('CHARGING'):
-                solar_charged = battery.charge(excess_solar)
-                results['solar_charged_mwh'] += solar_charged
-                hour_data['solar_charged_mwh'] = solar_charged
-
-                # Update BESS state if not already discharging
-                if hour_data['bess_state'] != 'DISCHARGING':
-                    hour_data['bess_state'] = 'CHARGING'
-                    hour_data['bess_mw'] = -solar_charged
-
-        # Charge from excess DG
-        if excess_dg > 0 and battery.get_charge_headroom() > 0:
-            if battery.can_cycle('CHARGING'):
-                dg_charged = battery.charge(excess_dg)
-                hour_data['dg_to_bess_mw'] = dg_charged
-
-                # Update BESS state if not already set
-                if hour_data['bess_state'] == 'IDLE':
-                    hour_data['bess_state'] = 'CHARGING'
-                    hour_data['bess_mw'] = -dg_charged
-                elif hour_data['bess_state'] == 'CHARGING':
-                    hour_data['bess_mw'] -= dg_charged
-
-        # Record DG energy distribution
-        if dg.state == 'ON':
-            dg.record_energy_distribution(dg_to_load, dg_charged)
-
-        # Step 4: Track wastage (only solar can be wasted, DG turns off when not needed)
-        solar_wasted = excess_solar - solar_charged
-        if solar_wasted > 0:
-            results['solar_wasted_mwh'] += solar_wasted
-            hour_data['solar_wasted_mwh'] = solar_wasted
-
-        # Step 5: Delivery tracking
-        hour_data['unmet_load_mw'] = remaining_load
-        if remaining_load <= 0.001:  # Small tolerance for floating point
-            results['hours_delivered'] += 1
-            results['energy_delivered_mwh'] += load_mw
-            hour_data['delivery'] = 'Yes'
-
-        # Update SOC in hour data (after all operations)
-        hour_data['soc_percent'] = battery.soc * 100
-
-        # Update battery state and cycles
-        battery.update_state_and_cycles(hour_data['bess_state'], hour)
-
-        hourly_data.append(hour_data)
-
-    # Add final day's cycles if not already added
-    if battery.current_day_cycles > 0:
-        battery.daily_cycles.append(battery.current_day_cycles)
-
-    # Compile BESS metrics
-    results['total_cycles'] = battery.total_cycles
-    results['avg_daily_cycles'] = battery.get_avg_daily_cycles()
-    results['max_daily_cycles'] = battery.get_max_daily_cycles()
-    results['degradation_percent'] = battery.get_degradation()
-
-    # Add DG metrics
-    dg_metrics = dg.get_metrics()
-    results.update(dg_metrics)
-
-    # Add hourly data
-    results['hourly_data'] = hourly_data
+        for hour, (solar_mw, solar_to_load, bess_mw, bess_to_load, soc_pct, state, dg_on,
+                   dg_output, dg_to_load, dg_to_bess, solar_charged, solar_wasted,
+                   unmet, delivered) in enumerate(zip(
+            columns['solar_mw'],
+            columns['solar_to_load_mw'],
+            columns['bess_mw'],
+            columns['bess_to_load_mw'],
+            columns['soc_percent'],
+            columns['bess_state'],
+            columns['dg_on'],
+            columns['dg_output_mw'],
+            columns['dg_to_load_mw'],
+            columns['dg_to_bess_mw'],
+            columns['solar_charged_mwh'],
+            columns['solar_wasted_mwh'],
+            columns['unmet_load_mw'],
+            columns['delivery'],
+        ))
+    ]
 
     return results
 
 
+def _dg_result_entry(dg_mw, load_mw, results):
+    """Format one DG-size simulation as an optimisation table row."""
+    return {
+        'DG (MW)': round(dg_mw, 1),
+        '% of Load': round((dg_mw / load_mw) * 100, 0),
+        'Delivery Hours': results['hours_delivered'],
+        'Delivery Rate (%)': round(results['hours_delivered'] / 87.6, 1),
+        'DG Runtime (hrs)': results['dg_runtime_hours'],
+        'DG Starts': results['dg_starts'],
+        'DG Energy (MWh)': round(results['dg_energy_generated_mwh'], 0)
+    }
+
+
 def find_optimal_dg_size(battery_capacity_mwh, solar_profile, config,
-                         min_dg_percent=50, max_dg_percent=200, step_percent=10):
+                         min_dg_percent=50, max_dg_percent=200, step_percent=10,
+                         search='linear', resolution_mw=1.0):
     """
     Find optimal DG size for 100% delivery (8760 hours).
 
-    Tests a range of DG sizes and finds the minimum capacity that achieves
-    100% delivery for the given BESS configuration.
+    Finds the minimum DG capacity that achieves 100% delivery for the given
+    BESS configuration, searching the range min_dg_percent..max_dg_percent
+    of load.
+
+    Search modes:
+        - 'linear': Simulate every size in fixed step_percent increments
+        - 'bisect': Below the load, delivery hours rise with DG size (a
+          smaller DG cannot carry a full-load hour alone), so the search
+          first simulates the DG at the load (clamped to the range). If
+          that meets 100%, it bisects between the minimum and the load
+          down to resolution_mw: about 2 + log2((load - min) / resolution_mw)
+          runs, 6 for the defaults. Otherwise no smaller size can meet
+          100% and the load is the best size below it. Above the load the
+          curve is not monotone (the SoC hysteresis can make a larger DG
+          deliver less), so the 'linear' sizes above the load are still
+          scanned. That gives the same result as 'linear' in about 11 runs
+          instead of 16 for the defaults.
 
     Args:
         battery_capacity_mwh: Fixed BESS capacity in MWh
@@ -316,47 +249,84 @@ def find_optimal_dg_size(battery_capacity_mwh, solar_profile, config,
         config: Configuration dict (must include DG_LOAD_MW)
         min_dg_percent: Min DG size as % of load (default 50%)
         max_dg_percent: Max DG size as % of load (default 200%)
-        step_percent: Step size as % of load (default 10%)
+        step_percent: Step size as % of load for 'linear' (default 10%)
+        search: 'linear' or 'bisect' (default 'linear')
+        resolution_mw: DG size resolution for 'bisect' in MW (default 1.0)
 
     Returns:
         dict: {
             'optimal_dg_mw': float - Optimal DG capacity
             'optimal_delivery_hours': int - Delivery hours at optimal size
             'is_100_percent': bool - Whether 100% delivery is achieved
-            'all_results': list[dict] - Results for all tested DG sizes
+            'all_results': list[dict] - Results for all evaluated DG sizes
+                                        (ascending DG size)
             'reasoning': str - Explanation of optimal choice
         }
     """
+    if search not in ('linear', 'bisect'):
+        raise ValueError(f"Unknown search mode: {search}. Use 'linear' or 'bisect'.")
+    if search == 'bisect' and resolution_mw <= 0:
+        raise ValueError("resolution_mw must be positive")
+
     load_mw = config.get('DG_LOAD_MW', DG_LOAD_MW) if config else DG_LOAD_MW
 
-    # Generate DG sizes to test (as % of load)
-    dg_sizes = []
-    for pct in range(min_dg_percent, max_dg_percent + step_percent, step_percent):
-        dg_sizes.append(load_mw * pct / 100)
+    # Each DG size is simulated at most once per call
+    evaluated = {}
+
+    def evaluate(dg_mw):
+        if dg_mw not in evaluated:
+            results = simulate_solar_bess_dg_year(
+                battery_capacity_mwh, dg_mw, solar_profile, config, summary_only=True
+            )
+            evaluated[dg_mw] = _dg_result_entry(dg_mw, load_mw, results)
+        return evaluated[dg_mw]
+
+    def is_full_delivery(entry):
+        return entry['Delivery Hours'] == 8760
 
-    all_results = []
     optimal_dg = None
 
-    for dg_mw in dg_sizes:
-        # Run simulation for this DG size
-        results = simulate_solar_bess_dg_year(
-            battery_capacity_mwh, dg_mw, solar_profile, config
-        )
+    # DG sizes of the linear scan (as % of load)
+    linear_sizes = [load_mw * pct / 100
+                    for pct in range(min_dg_percent, max_dg_percent + step_percent, step_percent)]
 
-        result_entry = {
-            'DG (MW)': round(dg_mw, 1),
-            '% of Load': round((dg_mw / load_mw) * 100, 0),
-            'Delivery Hours': results['hours_delivered'],
-            'Delivery Rate (%)': round(results['hours_delivered'] / 87.6, 1),
-            'DG Runtime (hrs)': results['dg_runtime_hours'],
-            'DG Starts': results['dg_starts'],
-            'DG Energy (MWh)': round(results['dg_energy_generated_mwh'], 0)
-        }
-        all_results.append(result_entry)
+    if search == 'linear':
+        for dg_mw in linear_sizes:
+            entry = evaluate(dg_mw)
+
+            # Track first DG size that achieves 100% delivery
+            if optimal_dg is None and is_full_delivery(entry):
+                optimal_dg = entry
+    else:
+        min_dg = load_mw * min_dg_percent / 100
+        max_dg = load_mw * max_dg_percent / 100
+        top = min(max(load_mw, min_dg), max_dg)  # monotone range ends at the load
+
+        if is_full_delivery(evaluate(top)):
+            # Bisect on grid indices k: size = min_dg + k * resolution (capped at top)
+            num_steps = max(0, int(np.ceil((top - min_dg) / resolution_mw - 1e-9)))
+
+            def grid_size(k):
+                return min(min_dg + k * resolution_mw, top)
+
+            lo, hi = -1, num_steps  # index lo misses (virtual below the range), hi meets 100%
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if is_full_delivery(evaluate(grid_size(mid))):
+                    hi = mid
+                else:
+                    lo = mid
+            optimal_dg = evaluated[grid_size(hi)]
+        else:
+            # Nothing up to the load meets 100%; above it the curve is not
+            # monotone, so scan the linear sizes there
+            for dg_mw in linear_sizes:
+                if dg_mw > top:
+                    entry = evaluate(dg_mw)
+                    if optimal_dg is None and is_full_delivery(entry):
+                        optimal_dg = entry
 
-        # Track first DG size that achieves 100% delivery
-        if optimal_dg is None and results['hours_delivered'] == 8760:
-            optimal_dg = result_entry
+    all_results = [evaluated[dg_mw] for dg_mw in sorted(evaluated)]
 
     # Determine reasoning
     if optimal_dg:
@@ -367,8 +337,12 @@ def find_optimal_dg_size(battery_capacity_mwh, solar_profile, config,
         )
         is_100_percent = True
     else:
-        # Find best achievable if 100% not reached
-        best = max(all_results, key=lambda x: x['Delivery Hours'])
+        # Find best achievable if 100% not reached: among the linear sizes,
+        # with the load standing in for those below it in 'bisect'
+        candidates = [dg_mw for dg_mw in linear_sizes if dg_mw in evaluated]
+        if search == 'bisect':
+            candidates = sorted(set(candidates) | {top})
+        best = max((evaluated[dg_mw] for dg_mw in candidates), key=lambda x: x['Delivery Hours'])
         optimal_dg = best
         reasoning = (
             f"100% delivery not achievable in tested range. "
@@ -10,7 +10,10 @@ Existing pages continue to use battery_simulator.py.
 
 import math
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import List, Tuple
+
+from .dg_accounting import DGAccountant
+from .simulation_params import SimulationParams, steps_per_hour, steps_to_hours
 
 
 # =============================================================================
@@ -19,60 +22,28 @@ from typing import List, Optional, Tuple
 
 DURATION_CLASSES = [1, 2, 3, 4, 6, 8, 10]  # hours
 
+HOURS_PER_DAY = 24
+
 
 # =============================================================================
 # DATA STRUCTURES
 # =============================================================================
 
-@dataclass
-class SimulationParams:
-    """Input parameters for simulation."""
-    # Profiles
-    load_profile: List[float] = field(default_factory=list)
-    solar_profile: List[float] = field(default_factory=list)
-
-    # BESS parameters
-    bess_capacity: float = 100  # MWh
-    bess_charge_power: float = 100  # MW
-    bess_discharge_power: float = 100  # MW
-    bess_efficiency: float = 85  # %
-    bess_min_soc: float = 10  # %
-    bess_max_soc: float = 90  # %
-    bess_initial_soc: float = 50  # %
-    bess_daily_cycle_limit: Optional[float] = None
-    bess_enforce_cycle_limit: bool = False
-
-    # DG parameters
-    dg_enabled: bool = False
-    dg_capacity: float = 0  # MW
-    dg_charges_bess: bool = True
-    dg_load_priority: str = 'bess_first'  # 'bess_first' or 'dg_first'
-    dg_takeover_mode: bool = False  # When True: DG serves full load, solar goes to BESS
-
-    # Template-specific: Time windows
-    night_start_hour: int = 18
-    night_end_hour: int = 6
-    day_start_hour: int = 6
-    day_end_hour: int = 18
-    blackout_start_hour: int = 22
-    blackout_end_hour: int = 6
-
-    # Template-specific: SoC thresholds
-    dg_soc_on_threshold: float = 30  # %
-    dg_soc_off_threshold: float = 80  # %
-    emergency_soc_threshold: float = 15  # %
-
-    # Template-specific: Flags
-    allow_emergency_dg_day: bool = False
-    allow_emergency_dg_night: bool = False
-
-
 @dataclass
 class SimulationState:
     """Mutable state during simulation."""
     # Configuration
     bess_capacity: float = 0
     dg_capacity: float = 0
+    timestep_hours: float = 1.0
+    steps_per_hour: int = 1
+    steps_per_day: int = 24
+
+    # Nominal (fully available) ratings for contingency derates
+    nominal_dg_capacity: float = 0
+    nominal_charge_power: float = 0
+    nominal_discharge_power: float = 0
+    nominal_max_soc_mwh: float = 0
 
     # Derived constants
     usable_capacity: float = 0
@@ -103,12 +74,17 @@ class SimulationState:
 
     # Counters
     total_dg_starts: int = 0
-    total_dg_runtime_hours: int = 0
+    total_dg_runtime_hours: float = 0
 
 
 @dataclass
 class HourlyResult:
-    """Results for a single hour."""
+    """
+    Results for a single timestep (one hour unless timestep_hours is set).
+
+    Flows are average MW over the step, so they equal MWh for hourly steps;
+    soc is MWh at the end of the step.
+    """
     t: int = 0
     day: int = 0
     hour_of_day: int = 0
@@ -172,6 +148,12 @@ class SummaryMetrics:
     bess_throughput: float = 0
     bess_equivalent_cycles: float = 0
 
+    dg_fuel_litres: float = 0  # running plus start fuel
+    dg_start_fuel_litres: float = 0
+    dg_low_load_hours: int = 0
+    dg_mean_load_pct: float = 0
+    dg_co2_tonnes: float = 0
+
 
 # =============================================================================
 # INITIALIZATION FUNCTIONS
@@ -225,6 +207,9 @@ def initialize_simulation(params: SimulationParams) -> SimulationState:
 
     state.bess_capacity = params.bess_capacity
     state.dg_capacity = params.dg_capacity if params.dg_enabled else 0
+    state.timestep_hours = params.timestep_hours
+    state.steps_per_hour = steps_per_hour(params.timestep_hours)
+    state.steps_per_day = HOURS_PER_DAY * state.steps_per_hour
 
     # BESS capacity limits (MWh)
     state.usable_capacity = params.bess_capacity * (params.bess_max_soc - params.bess_min_soc) / 100
@@ -244,6 +229,12 @@ def initialize_simulation(params: SimulationParams) -> SimulationState:
     state.dg_soc_off_mwh = params.bess_capacity * params.dg_soc_off_threshold / 100
     state.emergency_soc_mwh = params.bess_capacity * params.emergency_soc_threshold / 100
 
+    # Nominal ratings (availability factors scale these per hour)
+    state.nominal_dg_capacity = state.dg_capacity
+    state.nominal_charge_power = state.charge_power_limit
+    state.nominal_discharge_power = state.discharge_power_limit
+    state.nominal_max_soc_mwh = state.max_soc_mwh
+
     # Time windows
     state.is_night_hour, state.is_day_hour, state.is_blackout_hour = build_hour_arrays(params)
 
@@ -264,9 +255,39 @@ def initialize_simulation(params: SimulationParams) -> SimulationState:
 # HELPER FUNCTIONS
 # =============================================================================
 
+def has_contingency(params: SimulationParams) -> bool:
+    """True when any availability profile is set."""
+    return bool(len(params.dg_availability) or len(params.bess_power_availability)
+                or len(params.bess_energy_availability))
+
+
+def apply_availability(params: SimulationParams, state: SimulationState, t: int) -> None:
+    """
+    Derate DG and BESS ratings for step t from the availability profiles.
+
+    DG availability scales dg_capacity (0 = forced outage). BESS power
+    availability scales both power limits. BESS energy availability shrinks
+    the usable window from the top (max SoC moves toward min SoC); energy
+    above the derated ceiling is cut by the end-of-hour SoC clamp.
+    """
+    if len(params.dg_availability):
+        factor = params.dg_availability[t % len(params.dg_availability)]
+        state.dg_capacity = state.nominal_dg_capacity * factor
+    if len(params.bess_power_availability):
+        factor = params.bess_power_availability[t % len(params.bess_power_availability)]
+        state.charge_power_limit = state.nominal_charge_power * factor
+        state.discharge_power_limit = state.nominal_discharge_power * factor
+    if len(params.bess_energy_availability):
+        factor = params.bess_energy_availability[t % len(params.bess_energy_availability)]
+        state.max_soc_mwh = state.min_soc_mwh + (state.nominal_max_soc_mwh - state.min_soc_mwh) * factor
+
+
 def charge_bess(state: SimulationState, energy_available: float,
                 charge_power_used: float) -> Tuple[float, float]:
-    """Attempt to charge BESS. Returns (energy_charged, new_charge_power_used)."""
+    """
+    Attempt to charge BESS for one step. Flows are MW over the step.
+    Returns (power_charged, new_charge_power_used).
+    """
     if energy_available <= 0 or state.bess_disabled_today:
         return 0, charge_power_used
 
@@ -279,13 +300,13 @@ def charge_bess(state: SimulationState, energy_available: float,
     max_charge = min(
         energy_available,
         charge_power_available,
-        charge_room / state.charge_efficiency
+        charge_room / (state.charge_efficiency * state.timestep_hours)
     )
 
     if max_charge <= 0:
         return 0, charge_power_used
 
-    energy_stored = max_charge * state.charge_efficiency
+    energy_stored = max_charge * state.charge_efficiency * state.timestep_hours
     state.soc += energy_stored
 
     return max_charge, charge_power_used + max_charge
@@ -293,7 +314,10 @@ def charge_bess(state: SimulationState, energy_available: float,
 
 def discharge_bess(state: SimulationState, params: SimulationParams,
                    energy_needed: float) -> Tuple[float, bool]:
-    """Attempt to discharge BESS. Returns (energy_discharged, discharged_flag)."""
+    """
+    Attempt to discharge BESS for one step. Flows are MW over the step.
+    Returns (power_discharged, discharged_flag).
+    """
     if energy_needed <= 0 or state.bess_disabled_today:
         return 0, False
 
@@ -304,17 +328,17 @@ def discharge_bess(state: SimulationState, params: SimulationParams,
     max_discharge = min(
         energy_needed,
         state.discharge_power_limit,
-        discharge_available * state.discharge_efficiency
+        discharge_available * state.discharge_efficiency / state.timestep_hours
     )
 
     if max_discharge <= 0:
         return 0, False
 
-    energy_withdrawn = max_discharge / state.discharge_efficiency
+    energy_withdrawn = max_discharge / state.discharge_efficiency * state.timestep_hours
     state.soc -= energy_withdrawn
 
-    # Update cycle tracking
-    state.daily_discharge += max_discharge
+    # Update cycle tracking (MWh)
+    state.daily_discharge += max_discharge * state.timestep_hours
     if state.usable_capacity > 0:
         state.daily_cycles = state.daily_discharge / state.usable_capacity
 
@@ -335,7 +359,7 @@ def activate_dg(state: SimulationState, params: SimulationParams, hour: HourlyRe
 
     if not state.dg_was_running:
         state.total_dg_starts += 1
-    state.total_dg_runtime_hours += 1
+    state.total_dg_runtime_hours += state.timestep_hours
 
     dg_output = state.dg_capacity
     hour.dg_to_load = min(dg_output, remaining_load)
@@ -371,7 +395,7 @@ def check_dg_takeover(params: SimulationParams, state: SimulationState,
     bess_available = state.soc - state.min_soc_mwh
     bess_can_provide = min(
         state.discharge_power_limit,
-        max(0, bess_available) * state.discharge_efficiency
+        max(0, bess_available) * state.discharge_efficiency / state.timestep_hours
     )
     total_green_capacity = hour.solar + bess_can_provide
 
@@ -392,7 +416,7 @@ def check_dg_takeover(params: SimulationParams, state: SimulationState,
     hour.dg_mode = "TAKEOVER"
     if not state.dg_was_running:
         state.total_dg_starts += 1
-    state.total_dg_runtime_hours += 1
+    state.total_dg_runtime_hours += state.timestep_hours
 
     hour.dg_to_load = hour.load  # DG serves exactly the load
     remaining_load = 0
@@ -449,7 +473,7 @@ def dispatch_template_1(params: SimulationParams, state: SimulationState,
         if bess_available > 0:
             bess_can_provide = min(
                 state.discharge_power_limit,
-                bess_available * state.discharge_efficiency
+                bess_available * state.discharge_efficiency / state.timestep_hours
             )
         else:
             bess_can_provide = 0
@@ -485,7 +509,7 @@ def dispatch_template_1(params: SimulationParams, state: SimulationState,
             hour.dg_mode = "TAKEOVER"
             if not state.dg_was_running:
                 state.total_dg_starts += 1
-            state.total_dg_runtime_hours += 1
+            state.total_dg_runtime_hours += state.timestep_hours
 
             hour.dg_to_load = hour.load  # DG serves exactly the load
             remaining_load = 0
@@ -687,7 +711,7 @@ def dispatch_template_4(params: SimulationParams, state: SimulationState,
 
         if not state.dg_was_running:
             state.total_dg_starts += 1
-        state.total_dg_runtime_hours += 1
+        state.total_dg_runtime_hours += state.timestep_hours
 
         dg_output = state.dg_capacity
         hour.dg_to_load = min(dg_output, remaining_load)
@@ -760,7 +784,7 @@ def dispatch_template_5(params: SimulationParams, state: SimulationState,
 
         if not state.dg_was_running:
             state.total_dg_starts += 1
-        state.total_dg_runtime_hours += 1
+        state.total_dg_runtime_hours += state.timestep_hours
 
         dg_output = state.dg_capacity
         hour.dg_to_load = min(dg_output, remaining_load)
@@ -849,7 +873,7 @@ def dispatch_template_6(params: SimulationParams, state: SimulationState,
 
         if not state.dg_was_running:
             state.total_dg_starts += 1
-        state.total_dg_runtime_hours += 1
+        state.total_dg_runtime_hours += state.timestep_hours
 
         dg_output = state.dg_capacity
         hour.dg_to_load = min(dg_output, remaining_load)
@@ -912,18 +936,99 @@ DISPATCH_FUNCTIONS = {
 }
 
 
+def simulate_step(params: SimulationParams, state: SimulationState,
+                  dispatch_func, t: int, load: float, solar: float,
+                  contingency: bool = False) -> HourlyResult:
+    """
+    Simulate step t (0-based, counted from the start of the run).
+
+    State carries over between calls, so a run can be fed in pieces (see
+    streaming.stream_simulation) as long as t keeps counting.
+
+    Args:
+        params: Simulation parameters
+        state: State from initialize_simulation, updated in place
+        dispatch_func: Template dispatch function (DISPATCH_FUNCTIONS)
+        t: Step index
+        load: Load for the step (MW)
+        solar: Solar for the step (MW)
+        contingency: Apply the params availability profiles
+
+    Returns:
+        HourlyResult for the step
+    """
+    # Daily reset
+    day_of_year = (t // state.steps_per_day) + 1
+    if day_of_year > state.current_day:
+        state.current_day = day_of_year
+        state.daily_discharge = 0
+        state.daily_cycles = 0
+        state.bess_disabled_today = False
+
+    # Contingency derates for this step
+    if contingency:
+        apply_availability(params, state, t)
+
+    # Initialize hour
+    hour = HourlyResult()
+    hour.t = t + 1
+    hour.day = day_of_year
+    hour.hour_of_day = (t % state.steps_per_day) // state.steps_per_hour
+
+    hour.load = load
+    hour.solar = solar
+
+    remaining_load = hour.load
+
+    # Solar direct to load
+    hour.solar_to_load = min(hour.solar, remaining_load)
+    remaining_load -= hour.solar_to_load
+    excess_solar = hour.solar - hour.solar_to_load
+
+    # Template dispatch
+    remaining_load, bess_discharged, charge_power_used = dispatch_func(
+        params, state, hour, remaining_load, excess_solar)
+
+    # Unserved
+    hour.unserved = remaining_load if remaining_load > 0.001 else 0
+
+    # SoC clamping
+    state.soc = max(state.min_soc_mwh, min(state.soc, state.max_soc_mwh))
+
+    # Record results
+    hour.soc = state.soc
+    hour.soc_pct = (state.soc / state.bess_capacity * 100) if state.bess_capacity > 0 else 0
+    hour.daily_cycles = state.daily_cycles
+    hour.bess_disabled = state.bess_disabled_today
+
+    # BESS state for display
+    if hour.bess_to_load > 0:
+        hour.bess_state = "Discharging"
+        hour.bess_power = hour.bess_to_load
+    elif hour.solar_to_bess > 0 or hour.dg_to_bess > 0:
+        hour.bess_state = "Charging"
+        hour.bess_power = -(hour.solar_to_bess + hour.dg_to_bess)
+    else:
+        hour.bess_state = "Idle"
+        hour.bess_power = 0
+
+    state.dg_was_running = hour.dg_running
+    return hour
+
+
 def run_simulation(params: SimulationParams, template_id: int,
                    num_hours: int = 8760) -> List[HourlyResult]:
     """
-    Execute hourly simulation.
+    Execute the simulation at params.timestep_hours resolution.
 
     Args:
         params: Simulation parameters
         template_id: Template (0-6)
-        num_hours: Hours to simulate (default 8760)
+        num_hours: Hours to simulate (default 8760); the run has
+            num_hours / timestep_hours steps
 
     Returns:
-        List of HourlyResult
+        List of HourlyResult, one per step
     """
     state = initialize_simulation(params)
     dispatch_func = DISPATCH_FUNCTIONS.get(template_id, dispatch_template_0)
@@ -931,87 +1036,46 @@ def run_simulation(params: SimulationParams, template_id: int,
 
     load_len = len(params.load_profile)
     solar_len = len(params.solar_profile)
+    contingency = has_contingency(params)
 
-    for t in range(num_hours):
-        # Daily reset
-        day_of_year = (t // 24) + 1
-        if day_of_year > state.current_day:
-            state.current_day = day_of_year
-            state.daily_discharge = 0
-            state.daily_cycles = 0
-            state.bess_disabled_today = False
-
-        # Initialize hour
-        hour = HourlyResult()
-        hour.t = t + 1
-        hour.day = day_of_year
-        hour.hour_of_day = t % 24
-
-        hour.load = params.load_profile[t % load_len] if load_len > 0 else 0
-        hour.solar = params.solar_profile[t % solar_len] if solar_len > 0 else 0
-
-        remaining_load = hour.load
-
-        # Solar direct to load
-        hour.solar_to_load = min(hour.solar, remaining_load)
-        remaining_load -= hour.solar_to_load
-        excess_solar = hour.solar - hour.solar_to_load
-
-        # Template dispatch
-        remaining_load, bess_discharged, charge_power_used = dispatch_func(
-            params, state, hour, remaining_load, excess_solar)
-
-        # Unserved
-        hour.unserved = remaining_load if remaining_load > 0.001 else 0
-
-        # SoC clamping
-        state.soc = max(state.min_soc_mwh, min(state.soc, state.max_soc_mwh))
-
-        # Record results
-        hour.soc = state.soc
-        hour.soc_pct = (state.soc / state.bess_capacity * 100) if state.bess_capacity > 0 else 0
-        hour.daily_cycles = state.daily_cycles
-        hour.bess_disabled = state.bess_disabled_today
-
-        # BESS state for display
-        if hour.bess_to_load > 0:
-            hour.bess_state = "Discharging"
-            hour.bess_power = hour.bess_to_load
-        elif hour.solar_to_bess > 0 or hour.dg_to_bess > 0:
-            hour.bess_state = "Charging"
-            hour.bess_power = -(hour.solar_to_bess + hour.dg_to_bess)
-        else:
-            hour.bess_state = "Idle"
-            hour.bess_power = 0
-
-        results.append(hour)
-        state.dg_was_running = hour.dg_running
+    for t in range(round(num_hours * state.steps_per_hour)):
+        load = params.load_profile[t % load_len] if load_len > 0 else 0
+        solar = params.solar_profile[t % solar_len] if solar_len > 0 else 0
+        results.append(simulate_step(params, state, dispatch_func, t, load, solar, contingency))
 
     return results
 
 
 def calculate_metrics(results: List[HourlyResult], params: SimulationParams) -> SummaryMetrics:
-    """Calculate summary metrics from simulation results."""
-    metrics = SummaryMetrics()
+    """
+    Calculate summary metrics from simulation results.
 
-    metrics.total_load = sum(r.load for r in results)
-    metrics.total_solar_generation = sum(r.solar for r in results)
-    metrics.total_solar_to_load = sum(r.solar_to_load for r in results)
-    metrics.total_solar_to_bess = sum(r.solar_to_bess for r in results)
-    metrics.total_solar_curtailed = sum(r.solar_curtailed for r in results)
-    metrics.total_bess_to_load = sum(r.bess_to_load for r in results)
-    metrics.total_dg_to_load = sum(r.dg_to_load for r in results)
-    metrics.total_dg_to_bess = sum(r.dg_to_bess for r in results)
-    metrics.total_dg_curtailed = sum(r.dg_curtailed for r in results)
-    metrics.total_unserved = sum(r.unserved for r in results)
-
-    metrics.hours_full_delivery = sum(1 for r in results if r.unserved < 0.001)
-    metrics.hours_green_delivery = sum(1 for r in results if r.unserved < 0.001 and not r.dg_running)
-    metrics.hours_with_dg = sum(1 for r in results if r.dg_running)
-
-    num_hours = len(results)
-    metrics.pct_full_delivery = metrics.hours_full_delivery / num_hours * 100 if num_hours > 0 else 0
-    metrics.pct_green_delivery = metrics.hours_green_delivery / num_hours * 100 if num_hours > 0 else 0
+    Totals are MWh and hour counts are hours, whatever the timestep.
+    """
+    metrics = SummaryMetrics()
+    dt = params.timestep_hours
+
+    metrics.total_load = sum(r.load for r in results) * dt
+    metrics.total_solar_generation = sum(r.solar for r in results) * dt
+    metrics.total_solar_to_load = sum(r.solar_to_load for r in results) * dt
+    metrics.total_solar_to_bess = sum(r.solar_to_bess for r in results) * dt
+    metrics.total_solar_curtailed = sum(r.solar_curtailed for r in results) * dt
+    metrics.total_bess_to_load = sum(r.bess_to_load for r in results) * dt
+    metrics.total_dg_to_load = sum(r.dg_to_load for r in results) * dt
+    metrics.total_dg_to_bess = sum(r.dg_to_bess for r in results) * dt
+    metrics.total_dg_curtailed = sum(r.dg_curtailed for r in results) * dt
+    metrics.total_unserved = sum(r.unserved for r in results) * dt
+
+    steps_full = sum(1 for r in results if r.unserved < 0.001)
+    steps_green = sum(1 for r in results if r.unserved < 0.001 and not r.dg_running)
+    steps_dg = sum(1 for r in results if r.dg_running)
+    metrics.hours_full_delivery = steps_to_hours(steps_full, dt)
+    metrics.hours_green_delivery = steps_to_hours(steps_green, dt)
+    metrics.hours_with_dg = steps_to_hours(steps_dg, dt)
+
+    num_steps = len(results)
+    metrics.pct_full_delivery = steps_full / num_steps * 100 if num_steps > 0 else 0
+    metrics.pct_green_delivery = steps_green / num_steps * 100 if num_steps > 0 else 0
 
     if metrics.total_load > 0:
         metrics.pct_unserved = metrics.total_unserved / metrics.total_load * 100
@@ -1027,4 +1091,10 @@ def calculate_metrics(results: List[HourlyResult], params: SimulationParams) ->
     if usable > 0:
         metrics.bess_equivalent_cycles = metrics.bess_throughput / usable
 
+    accountant = DGAccountant(params)
+    accountant.consume([r.dg_to_load + r.dg_to_bess for r in results], [r.dg_curtailed for r in results],
+                       [r.dg_running for r in results])
+    for name, values in accountant.result().items():
+        setattr(metrics, name, values[0].item())
+
     return metrics
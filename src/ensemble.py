@@ -0,0 +1,315 @@
+"""
+Weather-Year Ensemble Module - BESS & DG Sizing Tool
+
+Runs one configuration across many solar years and reports P50/P90 values
+of delivery %, unserved energy and DG hours.
+
+Members are either real solar years (stacked into one source profile) or
+synthetic years built by seeded day-block bootstrapping of the base year.
+Either way a member is just a (days,) array of source-profile day indices;
+members run as lanes of the batched engine (batch_engine.run_batch_metrics)
+in chunks, and each chunk's metrics are folded into streaming quantile
+estimators, so neither hourly traces nor per-member profiles are kept.
+Quantiles are exact (np.quantile over the per-member values) up to
+EXACT_QUANTILE_LIMIT members and P-squared estimates beyond that.
+
+P-values follow the exceedance convention lenders use: P90 is the value
+that 90% of weather years meet or beat - the 10th percentile for delivery,
+the 90th percentile for unserved energy and DG hours.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .dispatch_engine import SimulationParams
+from .batch_engine import run_batch_metrics
+
+
+HOURS_PER_YEAR = 8760
+DAYS_PER_YEAR = 365
+
+# Reported metrics: name -> (batch metric key, higher is better)
+ENSEMBLE_METRICS = {
+    'delivery_pct': ('pct_full_delivery', True),
+    'unserved_mwh': ('total_unserved', False),
+    'dg_hours': ('dg_runtime_hours', False),
+}
+
+DEFAULT_EXCEEDANCE = (50, 90)
+DEFAULT_CHUNK_SIZE = 256
+
+# Values kept for exact quantiles before switching to the P-squared estimate
+EXACT_QUANTILE_LIMIT = 10_000
+
+
+# =============================================================================
+# MEMBER GENERATION
+# =============================================================================
+
+def stack_solar_years(profiles: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack several solar years into one source profile.
+
+    Args:
+        profiles: Hourly solar profiles, each at least 8760 values (extra
+            hours, e.g. a leap day at the end, are dropped)
+
+    Returns:
+        Tuple of (source profile, member day indices of shape (years, 365))
+    """
+    years = []
+    for i, profile in enumerate(profiles):
+        values = np.asarray(profile, dtype=float)
+        if len(values) < HOURS_PER_YEAR:
+            raise ValueError(f"Solar year {i + 1} has {len(values)} hours, need {HOURS_PER_YEAR}")
+        years.append(values[:HOURS_PER_YEAR])
+    if not years:
+        raise ValueError("At least one solar year is required")
+
+    source = np.concatenate(years)
+    days = np.arange(len(years))[:, None] * DAYS_PER_YEAR + np.arange(DAYS_PER_YEAR)
+    return source, days
+
+
+def bootstrap_solar_days(num_members: int, num_days: int = DAYS_PER_YEAR,
+                         block_days: int = 5, season_window_days: int = 15,
+                         source_years: int = 1, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Synthetic weather years by seasonal day-block bootstrapping.
+
+    Each year is built from consecutive blocks of block_days days. A block
+    for calendar day d is copied from a random start within
+    +/- season_window_days of d (wrapping around the year) in a random
+    source year, which keeps the seasonal cycle and short-term weather
+    persistence while shuffling the weather itself.
+
+    Args:
+        num_members: Number of synthetic years
+        num_days: Days per synthetic year
+        block_days: Block length in days
+        season_window_days: Maximum calendar shift of a block
+        source_years: Years in the source profile (see stack_solar_years)
+        seed: RNG seed; the same seed gives the same members
+
+    Returns:
+        (num_members, num_days) array of source-profile day indices
+    """
+    if block_days < 1:
+        raise ValueError("block_days must be at least 1")
+    if season_window_days < 0:
+        raise ValueError("season_window_days cannot be negative")
+
+    rng = np.random.default_rng(seed)
+    num_blocks = -(-num_days // block_days)
+    block_starts = np.arange(num_blocks) * block_days
+
+    shifts = rng.integers(-season_window_days, season_window_days + 1, size=(num_members, num_blocks))
+    years = rng.integers(0, source_years, size=(num_members, num_blocks))
+
+    starts = block_starts + shifts
+    days = (starts[:, :, None] + np.arange(block_days)) % DAYS_PER_YEAR
+    days = days + (years * DAYS_PER_YEAR)[:, :, None]
+    return days.reshape(num_members, -1)[:, :num_days]
+
+
+# =============================================================================
+# STREAMING QUANTILES
+# =============================================================================
+
+class StreamingQuantile:
+    """
+    Quantile of a stream of values.
+
+    Exact (np.quantile, linear interpolation) while at most exact_limit
+    values have been seen; the values are kept until then. Beyond that it
+    switches to the P-squared estimator (Jain & Chlamtac, 1985), seeded
+    with exact order statistics of the kept values: five markers in
+    constant memory, adjusted with piecewise-parabolic interpolation.
+    P-squared is an approximation whose error shrinks with the count; at
+    a few hundred values it can still be off by ~0.1 standard deviations
+    in the tails, hence the exact range.
+    """
+
+    def __init__(self, q: float, exact_limit: int = EXACT_QUANTILE_LIMIT):
+        """
+        Args:
+            q: Quantile in (0, 1)
+            exact_limit: Values kept for the exact quantile (at least 5)
+        """
+        if not 0 < q < 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        self.q = q
+        self.count = 0
+        self.exact_limit = max(int(exact_limit), 5)
+        self._values: Optional[List[float]] = []
+        self._heights: List[float] = []
+        self._fractions = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+        self._positions: List[float] = []
+        self._desired: List[float] = []
+        self._increments = list(self._fractions)
+
+    def update(self, values) -> None:
+        """Add values (scalar or array-like)."""
+        values = np.ravel(values).tolist()
+        if self._values is not None:
+            self._values.extend(values)
+            self.count += len(values)
+            if self.count > self.exact_limit:
+                self._seed()
+            return
+        for x in values:
+            self._add(x)
+
+    def _seed(self) -> None:
+        """Switch to P-squared with markers at exact order statistics of the kept values."""
+        ordered = np.sort(self._values)
+        last = len(ordered) - 1
+        positions = []
+        for i, fraction in enumerate(self._fractions):
+            position = min(max(round(last * fraction), positions[-1] + 1 if positions else 0), last - (4 - i))
+            positions.append(position)
+        self._heights = [float(ordered[p]) for p in positions]
+        self._positions = [float(p) for p in positions]
+        self._desired = [last * fraction for fraction in self._fractions]
+        self._values = None
+
+    def _add(self, x: float) -> None:
+        self.count += 1
+        h = self._heights
+
+        n = self._positions
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Adjust the three middle markers
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not h[i - 1] < height < h[i + 1]:
+                    height = h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+                h[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """Current quantile estimate (NaN before any value)."""
+        if self.count == 0:
+            return float('nan')
+        if self._values is not None:
+            return float(np.quantile(self._values, self.q))
+        return self._heights[2]
+
+
+class StreamingSummary:
+    """Count, mean, min, max and P-values of a metric (see StreamingQuantile)."""
+
+    def __init__(self, higher_is_better: bool, exceedance: Sequence[int] = DEFAULT_EXCEEDANCE):
+        """
+        Args:
+            higher_is_better: True when larger values are favourable
+            exceedance: Exceedance levels in percent (e.g. 50, 90)
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.estimators = {}
+        for level in exceedance:
+            q = (100 - level) / 100 if higher_is_better else level / 100
+            self.estimators[f'P{level}'] = StreamingQuantile(q)
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        for estimator in self.estimators.values():
+            estimator.update(values)
+
+    def result(self) -> Dict[str, float]:
+        summary = {
+            'mean': self.total / self.count if self.count else float('nan'),
+            'min': self.minimum if self.count else float('nan'),
+            'max': self.maximum if self.count else float('nan'),
+        }
+        for name, estimator in self.estimators.items():
+            summary[name] = estimator.value()
+        return summary
+
+
+# =============================================================================
+# ENSEMBLE RUNNER
+# =============================================================================
+
+def run_ensemble(params: SimulationParams, template_id: int, solar_days: np.ndarray,
+                 num_hours: int = HOURS_PER_YEAR,
+                 exceedance: Sequence[int] = DEFAULT_EXCEEDANCE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress_callback: Optional[Callable[[float], None]] = None) -> Dict:
+    """
+    Run one configuration over every ensemble member.
+
+    Args:
+        params: Configuration and profiles; params.solar_profile is the
+            source profile that solar_days indexes
+        template_id: Template (0-6)
+        solar_days: (members, days) source day indices, from
+            bootstrap_solar_days or stack_solar_years
+        num_hours: Hours to simulate per member
+        exceedance: Exceedance levels to report (percent)
+        chunk_size: Members simulated together per batched pass
+        progress_callback: Optional callable receiving the completed fraction
+
+    Returns:
+        Dictionary with:
+            - members: Number of members simulated
+            - metrics: {metric: {mean, min, max, P50, P90, ...}} for each
+              ENSEMBLE_METRICS entry
+    """
+    solar_days = np.asarray(solar_days)
+    num_members = len(solar_days)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    summaries = {
+        name: StreamingSummary(higher_is_better, exceedance)
+        for name, (_, higher_is_better) in ENSEMBLE_METRICS.items()
+    }
+
+    for start in range(0, num_members, chunk_size):
+        chunk = solar_days[start:start + chunk_size]
+        metrics = run_batch_metrics(params, template_id, num_hours=num_hours, solar_days=chunk)
+        for name, (key, _) in ENSEMBLE_METRICS.items():
+            summaries[name].update(metrics[key])
+        if progress_callback is not None:
+            progress_callback(min(start + chunk_size, num_members) / num_members)
+
+    return {
+        'members': num_members,
+        'metrics': {name: summary.result() for name, summary in summaries.items()},
+    }
@@ -0,0 +1,291 @@
+"""
+Columnar Export Module - BESS & DG Sizing Tool
+
+Writes sweep tables and hourly traces to Parquet or Arrow IPC (Feather v2)
+and reads them back.
+
+- State columns (strings such as dg_mode, bess_state, delivery) are
+  dictionary-encoded with one stable dictionary per column.
+- Flow and percentage columns are stored as float32; config keys and
+  energy totals stay float64 so reloaded studies match exactly.
+- Every write is one row group (Parquet) or record batch (IPC) tagged
+  with a config_id column, so Step 3 streams a sweep in as its chunks
+  are checkpointed (in run order) and a multi-config hourly export keeps
+  one group per config; the reader prunes groups by config_id.
+- Study metadata (JSON) lives in the schema, readable without the data.
+
+pyarrow ships with streamlit; the module still imports without it and
+raises a clear error on use.
+"""
+
+import io
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from .config import STUDY_DIR
+
+
+FORMATS = ('parquet', 'feather')
+FILE_SUFFIXES = {'parquet': '.parquet', 'feather': '.arrow'}
+
+METADATA_KEY = b'bess_sizing'
+
+# Float columns kept in float64: config keys (exact matching on reload)
+# and energy totals (MWh sums over a year lose resolution in float32)
+FLOAT64_COLUMNS = {
+    'bess_mwh', 'duration_hrs', 'power_mw', 'dg_mw', 'solar_mw',
+    'unserved_mwh', 'fuel_litres', 'co2_tonnes',
+}
+FLOAT64_PREFIXES = ('total_',)
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for Parquet/Feather export (pip install pyarrow)")
+
+
+def _keeps_float64(name: str) -> bool:
+    return name in FLOAT64_COLUMNS or name.startswith(FLOAT64_PREFIXES)
+
+
+# =============================================================================
+# WRITER
+# =============================================================================
+
+class ResultWriter:
+    """
+    Streams columnar result chunks into one Parquet or Arrow IPC file.
+
+    Usable as a context manager and as a streaming.stream_simulation sink
+    (consume = write).
+    """
+
+    def __init__(self, sink: Union[str, Path, io.IOBase], fmt: str = 'parquet',
+                 metadata: Optional[Dict] = None, float32: bool = True,
+                 compression: str = 'zstd'):
+        """
+        Args:
+            sink: File path or writable binary buffer
+            fmt: 'parquet' or 'feather' (Arrow IPC file)
+            metadata: JSON-serialisable study metadata stored in the schema
+            float32: Downcast float columns outside FLOAT64_COLUMNS
+            compression: Codec ('zstd', 'lz4', 'snappy' or None)
+        """
+        _require_pyarrow()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}' (expected one of {FORMATS})")
+        self.sink = sink
+        self.fmt = fmt
+        self.metadata = dict(metadata or {})
+        self.float32 = float32
+        self.compression = compression
+        self.rows = 0
+        self.groups = 0
+        self._writer = None
+        self._schema = None
+        self._dictionaries: Dict[str, Dict[str, int]] = {}
+
+    def _encode(self, name: str, values: np.ndarray):
+        """Column as an Arrow array with this writer's storage policy."""
+        if values.dtype == object or values.dtype.kind in 'US':
+            categories = self._dictionaries.setdefault(name, {})
+            strings = values.astype(str)
+            for value in pd.unique(strings):
+                categories.setdefault(value, len(categories))
+            indices = pd.Categorical(strings, categories=list(categories)).codes.astype(np.int32)
+            return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()),
+                                                  pa.array(list(categories), pa.string()))
+        if values.dtype.kind == 'f' and self.float32 and not _keeps_float64(name):
+            return pa.array(values.astype(np.float32))
+        if values.dtype.kind == 'i':
+            return pa.array(values.astype(np.int64))
+        return pa.array(values)
+
+    def write(self, columns: Union[pd.DataFrame, Dict[str, Iterable]],
+              config_id: Union[int, Iterable[int], None] = None) -> None:
+        """
+        Write one row group / record batch.
+
+        Args:
+            columns: DataFrame or mapping of column name -> values
+            config_id: Config id of every row (int), per-row ids, or None
+                to number rows on from the rows already written
+        """
+        if isinstance(columns, pd.DataFrame):
+            data = {name: columns[name].to_numpy() for name in columns.columns}
+        else:
+            data = {name: np.asarray(values) for name, values in columns.items()}
+        length = len(next(iter(data.values()))) if data else 0
+        if length == 0:
+            return
+
+        if config_id is None:
+            ids = np.arange(self.rows, self.rows + length)
+        else:
+            ids = np.broadcast_to(np.asarray(config_id), (length,))
+        data = {'config_id': ids.astype(np.int32), **{k: v for k, v in data.items() if k != 'config_id'}}
+
+        arrays = {name: self._encode(name, values) for name, values in data.items()}
+        if self._schema is None:
+            schema = pa.schema([(name, array.type) for name, array in arrays.items()])
+            self._schema = schema.with_metadata({METADATA_KEY: json.dumps(self.metadata, default=str)})
+            self._open()
+        batch = pa.record_batch([arrays[f.name].cast(f.type) for f in self._schema], schema=self._schema)
+
+        if self.fmt == 'parquet':
+            self._writer.write_table(pa.Table.from_batches([batch]), row_group_size=length)
+        else:
+            self._writer.write_batch(batch)
+        self.rows += length
+        self.groups += 1
+
+    consume = write
+
+    def _open(self):
+        if self.fmt == 'parquet':
+            self._writer = pq.ParquetWriter(self.sink, self._schema, compression=self.compression,
+                                            use_dictionary=True)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression, emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self.sink, self._schema, options=options)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def to_bytes(df: pd.DataFrame, fmt: str = 'parquet', metadata: Optional[Dict] = None) -> bytes:
+    """
+    Serialise a DataFrame in memory (e.g. for st.download_button).
+
+    Args:
+        df: Results table
+        fmt: 'parquet' or 'feather'
+        metadata: Optional study metadata
+
+    Returns:
+        File contents
+    """
+    buffer = io.BytesIO()
+    with ResultWriter(buffer, fmt=fmt, metadata=metadata) as writer:
+        writer.write(df)
+    return buffer.getvalue()
+
+
+# =============================================================================
+# READER
+# =============================================================================
+
+def _detect_format(source) -> str:
+    if isinstance(source, (str, Path)):
+        return 'feather' if Path(source).suffix in ('.arrow', '.feather') else 'parquet'
+    head = source.read(6)
+    source.seek(0)
+    return 'feather' if head == b'ARROW1' else 'parquet'
+
+
+def read_metadata(source: Union[str, Path, io.IOBase]) -> Dict:
+    """Study metadata of an exported file (reads the schema only)."""
+    _require_pyarrow()
+    if _detect_format(source) == 'parquet':
+        schema = pq.read_schema(source)
+    else:
+        schema = pa.ipc.open_file(source).schema
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def read_results(source: Union[str, Path, io.IOBase],
+                 columns: Optional[List[str]] = None,
+                 config_ids: Optional[Iterable[int]] = None) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Read an exported sweep or hourly trace.
+
+    Args:
+        source: File path or readable binary buffer
+        columns: Columns to load (default all)
+        config_ids: Only rows of these configs (row groups are pruned)
+
+    Returns:
+        Tuple of (DataFrame with categorical state columns, study metadata)
+    """
+    _require_pyarrow()
+    fmt = _detect_format(source)
+    wanted = None if config_ids is None else sorted(int(i) for i in config_ids)
+    read_columns = None if columns is None else list(dict.fromkeys(['config_id', *columns]))
+
+    if fmt == 'parquet':
+        filters = [('config_id', 'in', wanted)] if wanted is not None else None
+        table = pq.read_table(source, columns=read_columns, filters=filters)
+    else:
+        table = pa.ipc.open_file(source).read_all()
+        if read_columns is not None:
+            table = table.select(read_columns)
+        if wanted is not None:
+            table = table.filter(pc.is_in(table['config_id'], pa.array(wanted, pa.int32())))
+
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+    df = table.to_pandas()
+    if columns is not None and 'config_id' not in columns:
+        df = df.drop(columns='config_id')
+    return df, metadata
+
+
+# =============================================================================
+# STUDY FILES
+# =============================================================================
+
+def new_study_path(prefix: str = 'sweep', fmt: str = 'parquet',
+                   directory: Union[str, Path] = STUDY_DIR) -> Path:
+    """Timestamped file path for a new study (creates the directory)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    return directory / f"{prefix}_{stamp}{FILE_SUFFIXES[fmt]}"
+
+
+def list_studies(directory: Union[str, Path] = STUDY_DIR) -> List[Dict]:
+    """
+    Saved studies, newest first.
+
+    Args:
+        directory: Study directory
+
+    Returns:
+        List of {path, name, metadata} dictionaries (metadata from the
+        file schema; unreadable files are skipped)
+    """
+    if not PYARROW_AVAILABLE:
+        return []
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    studies = []
+    paths = [p for suffix in FILE_SUFFIXES.values() for p in directory.glob(f'*{suffix}')]
+    for path in sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            metadata = read_metadata(path)
+        except (OSError, ValueError, pa.ArrowException):
+            continue
+        studies.append({'path': path, 'name': path.stem, 'metadata': metadata})
+    return studies
@@ -3,12 +3,41 @@ Load Profile Builder Module
 
 Generates 8760-hour load profiles from user selections.
 Supports constant, day-only, night-only, custom windows, and CSV upload.
+
+Profiles are composed on a (days, 24) view: time windows become 24-hour
+masks broadcast over every day, and optional calendar multipliers
+(weekday/weekend, monthly, seasonal) and stacked window layers are applied
+per day. Built profiles are memoised by a hash of their parameters.
 """
 
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 
+from .profile_stats import day_calendar, get_profile_stats
+
+
+# Meteorological seasons (Northern Hemisphere) by month
+SEASON_MONTHS = {
+    'winter': (12, 1, 2),
+    'spring': (3, 4, 5),
+    'summer': (6, 7, 8),
+    'autumn': (9, 10, 11),
+}
+
+# Parameter keys that compose on top of the base mode
+COMPOSITION_KEYS = (
+    'weekday_multiplier', 'weekend_multiplier',
+    'monthly_multipliers', 'seasonal_multipliers', 'layers',
+)
+
+_PROFILE_CACHE_SIZE = 64
+_profile_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
 
 # =============================================================================
 # LOAD PROFILE GENERATION
@@ -33,8 +62,16 @@ def build_load_profile(
             - mw: Load value in MW (for constant/day_only/night_only)
             - start: Start hour (for day_only/night_only)
             - end: End hour (for day_only/night_only)
-            - windows: List of {start, end, mw} dicts (for custom)
+            - windows: List of {start, end, mw} dicts (for custom);
+              later windows overwrite earlier ones where they overlap
             - data: numpy array (for csv)
+            Optional composition (any mode):
+            - weekday_multiplier / weekend_multiplier: Scale Mon-Fri / Sat-Sun
+            - monthly_multipliers: 12 factors, January first
+            - seasonal_multipliers: {'winter'|'spring'|'summer'|'autumn': factor}
+            - layers: List of {start, end, mw, days, months} windows added on
+              top of the base; days is 'all' (default), 'weekdays' or
+              'weekends', months an optional list of month numbers
         num_hours: Number of hours to generate (default 8760)
 
     Returns:
@@ -47,79 +84,159 @@ def build_load_profile(
         >>> build_load_profile('day_only', {'mw': 25, 'start': 6, 'end': 18})
         array([0., 0., 0., 0., 0., 0., 25., 25., ...])
     """
-    load = np.zeros(num_hours)
+    key = (mode, _freeze(params), num_hours)
+    cached = _profile_cache.get(key)
+    if cached is None:
+        cached = _compose_load_profile(mode, params, num_hours)
+        cached.flags.writeable = False
+        _profile_cache[key] = cached
+        if len(_profile_cache) > _PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    else:
+        _profile_cache.move_to_end(key)
+
+    # Callers own the returned array
+    return cached.copy()
+
+
+def clear_load_profile_cache() -> None:
+    """Drop all memoised load profiles."""
+    _profile_cache.clear()
+
+
+def _compose_load_profile(mode: str, params: Dict[str, Any], num_hours: int) -> np.ndarray:
+    """Build a load profile on a (days, 24) view (uncached)."""
+    num_days = -(-num_hours // 24)
+
+    if mode == 'csv':
+        data = params.get('data')
+        if data is None:
+            load = np.zeros(num_hours)
+        elif len(data) >= num_hours:
+            load = np.array(data[:num_hours])
+        else:
+            # Repeat pattern to fill year
+            repeats = (num_hours // len(data)) + 1
+            load = np.tile(data, repeats)[:num_hours]
+
+        if not any(k in params for k in COMPOSITION_KEYS):
+            return load
+        days = np.zeros(num_days * 24)
+        days[:num_hours] = load
+        days = days.reshape(num_days, 24)
+    else:
+        days = np.broadcast_to(_base_day(mode, params), (num_days, 24))
+
+    day_factors = _day_multipliers(params, num_days)
+    if day_factors is not None:
+        days = days * day_factors[:, None]
+
+    layers = params.get('layers') or []
+    if layers:
+        days = np.array(days, dtype=float)
+        weekday, month = day_calendar(num_days)
+        for layer in layers:
+            applies = np.ones(num_days, dtype=bool)
+            day_filter = layer.get('days', 'all')
+            if day_filter == 'weekdays':
+                applies &= weekday < 5
+            elif day_filter == 'weekends':
+                applies &= weekday >= 5
+            if layer.get('months'):
+                applies &= np.isin(month, list(layer['months']))
+            mask = _hour_mask(layer.get('start', 0), layer.get('end', 24))
+            days += np.outer(applies, mask * float(layer.get('mw', 0)))
+
+    return np.ascontiguousarray(days, dtype=float).reshape(-1)[:num_hours]
+
+
+def _base_day(mode: str, params: Dict[str, Any]) -> np.ndarray:
+    """24-hour base pattern for the builder modes."""
+    base = np.zeros(24)
 
     if mode == 'constant':
-        mw = params.get('mw', 25.0)
-        load[:] = mw
+        base[:] = params.get('mw', 25.0)
 
     elif mode == 'day_only':
-        mw = params.get('mw', 25.0)
-        start = params.get('start', 6)
-        end = params.get('end', 18)
-
-        for hour in range(num_hours):
-            hour_of_day = hour % 24
-            if _is_in_range(hour_of_day, start, end):
-                load[hour] = mw
+        base[_hour_mask(params.get('start', 6), params.get('end', 18))] = params.get('mw', 25.0)
 
     elif mode == 'night_only':
-        mw = params.get('mw', 25.0)
-        start = params.get('start', 18)
-        end = params.get('end', 6)
-
-        for hour in range(num_hours):
-            hour_of_day = hour % 24
-            if _is_in_range(hour_of_day, start, end):
-                load[hour] = mw
+        base[_hour_mask(params.get('start', 18), params.get('end', 6))] = params.get('mw', 25.0)
 
     elif mode == 'custom':
-        windows = params.get('windows', [])
-        for window in windows:
-            start = window.get('start', 0)
-            end = window.get('end', 24)
-            mw = window.get('mw', 0)
-
-            for hour in range(num_hours):
-                hour_of_day = hour % 24
-                if _is_in_range(hour_of_day, start, end):
-                    load[hour] = mw
-
-    elif mode == 'csv':
-        data = params.get('data')
-        if data is not None:
-            # Handle different input lengths
-            if len(data) >= num_hours:
-                load = np.array(data[:num_hours])
-            else:
-                # Repeat pattern to fill year
-                repeats = (num_hours // len(data)) + 1
-                load = np.tile(data, repeats)[:num_hours]
+        for window in params.get('windows', []):
+            base[_hour_mask(window.get('start', 0), window.get('end', 24))] = window.get('mw', 0)
+
+    return base
+
+
+def _day_multipliers(params: Dict[str, Any], num_days: int) -> Optional[np.ndarray]:
+    """Per-day load factors from calendar multipliers (None if all are 1)."""
+    weekday_mult = params.get('weekday_multiplier', 1.0)
+    weekend_mult = params.get('weekend_multiplier', 1.0)
+    monthly = params.get('monthly_multipliers')
+    seasonal = params.get('seasonal_multipliers')
+
+    if weekday_mult == 1.0 and weekend_mult == 1.0 and not monthly and not seasonal:
+        return None
+
+    weekday, month = day_calendar(num_days)
+    factors = np.where(weekday < 5, float(weekday_mult), float(weekend_mult))
 
-    return load
+    if monthly:
+        if len(monthly) != 12:
+            raise ValueError(f"monthly_multipliers needs 12 values (got {len(monthly)})")
+        factors = factors * np.asarray(monthly, dtype=float)[month - 1]
 
+    if seasonal:
+        by_month = np.ones(12)
+        for season, factor in seasonal.items():
+            if season not in SEASON_MONTHS:
+                raise ValueError(f"Unknown season: {season}. Use one of {list(SEASON_MONTHS)}.")
+            by_month[[m - 1 for m in SEASON_MONTHS[season]]] = factor
+        factors = factors * by_month[month - 1]
 
-def _is_in_range(hour: int, start: int, end: int) -> bool:
+    return factors
+
+
+@lru_cache(maxsize=256)
+def _hour_mask(start: int, end: int) -> np.ndarray:
     """
-    Check if hour is within range, handling midnight wraparound.
+    24-hour boolean mask for [start, end), handling midnight wraparound.
 
     Args:
-        hour: Hour to check (0-23)
         start: Start hour
-        end: End hour
+        end: End hour (start > end crosses midnight; start == end is empty)
 
     Returns:
-        True if hour is in range
+        Read-only boolean array of length 24
     """
+    hours = np.arange(24)
     if start < end:
         # Normal range (e.g., 6-18)
-        return start <= hour < end
+        mask = (hours >= start) & (hours < end)
     elif start > end:
         # Crosses midnight (e.g., 18-6)
-        return hour >= start or hour < end
+        mask = (hours >= start) | (hours < end)
     else:
         # start == end means no hours
-        return False
+        mask = np.zeros(24, dtype=bool)
+    mask.flags.writeable = False
+    return mask
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable, order-independent cache key for profile parameters."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return ('ndarray', data.dtype.str, data.shape, hashlib.sha1(data.tobytes()).hexdigest())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
 
 
 # =============================================================================
@@ -136,49 +253,18 @@ def analyze_load_profile(load: np.ndarray) -> Dict[str, Any]:
     Returns:
         Dictionary with statistics
     """
-    # Handle empty or zero profiles
-    if len(load) == 0:
-        return {
-            'total_energy_mwh': 0,
-            'peak_mw': 0,
-            'min_mw': 0,
-            'avg_mw': 0,
-            'load_hours': 0,
-            'no_load_hours': 0,
-            'load_factor': 0,
-            'daily_pattern': np.zeros(24),
-        }
-
-    # Basic statistics
-    total_energy = np.sum(load)
-    peak = np.max(load)
-    min_load = np.min(load)
-    avg = np.mean(load)
-
-    # Count hours
-    load_hours = np.sum(load > 0)
-    no_load_hours = len(load) - load_hours
-
-    # Load factor
-    load_factor = (avg / peak * 100) if peak > 0 else 0
-
-    # Daily pattern (average by hour of day)
-    hours = np.arange(len(load)) % 24
-    daily_pattern = np.zeros(24)
-    for h in range(24):
-        mask = hours == h
-        if np.any(mask):
-            daily_pattern[h] = np.mean(load[mask])
+    stats = get_profile_stats(load)
+    peak = stats['peak_mw']
 
     return {
-        'total_energy_mwh': float(total_energy),
-        'peak_mw': float(peak),
-        'min_mw': float(min_load),
-        'avg_mw': float(avg),
-        'load_hours': int(load_hours),
-        'no_load_hours': int(no_load_hours),
-        'load_factor': float(load_factor),
-        'daily_pattern': daily_pattern,
+        'total_energy_mwh': stats['total_mwh'],
+        'peak_mw': peak,
+        'min_mw': stats['min_mw'],
+        'avg_mw': stats['mean_mw'],
+        'load_hours': stats['positive_hours'],
+        'no_load_hours': stats['num_hours'] - stats['positive_hours'],
+        'load_factor': (stats['mean_mw'] / peak * 100) if peak > 0 else 0,
+        'daily_pattern': stats['hourly_mean'].copy(),
     }
 
 
@@ -197,16 +283,7 @@ def get_load_sparkline_data(load: np.ndarray, num_points: int = 24) -> List[floa
         return [0] * num_points
 
     # Average by hour of day for a typical day pattern
-    hours = np.arange(len(load)) % 24
-    daily_avg = []
-    for h in range(24):
-        mask = hours == h
-        if np.any(mask):
-            daily_avg.append(np.mean(load[mask]))
-        else:
-            daily_avg.append(0)
-
-    return daily_avg
+    return get_profile_stats(load)['hourly_mean'].tolist()
 
 
 def validate_load_csv(df: pd.DataFrame) -> Tuple[bool, str, Optional[np.ndarray]]:
@@ -330,13 +407,14 @@ def analyze_solar_profile(solar: np.ndarray) -> Dict[str, Any]:
     Returns:
         Dictionary with statistics
     """
+    stats = get_profile_stats(solar)
     return {
-        'total_generation_mwh': float(np.sum(solar)),
-        'peak_mw': float(np.max(solar)),
-        'mean_mw': float(np.mean(solar)),
-        'generation_hours': int(np.sum(solar > 0)),
-        'zero_hours': int(np.sum(solar == 0)),
-        'capacity_factor': float(np.mean(solar) / np.max(solar)) if np.max(solar) > 0 else 0,
+        'total_generation_mwh': stats['total_mwh'],
+        'peak_mw': stats['peak_mw'],
+        'mean_mw': stats['mean_mw'],
+        'generation_hours': stats['positive_hours'],
+        'zero_hours': stats['zero_hours'],
+        'capacity_factor': stats['capacity_factor'],
     }
 
 
@@ -420,24 +498,11 @@ def create_load_preview_chart_data(load: np.ndarray) -> Dict[str, Any]:
     Returns:
         Dict with chart data
     """
-    # Get typical day pattern
-    hours = np.arange(len(load)) % 24
-
-    # Calculate hourly averages
-    hourly_avg = []
-    hourly_min = []
-    hourly_max = []
-
-    for h in range(24):
-        mask = hours == h
-        if np.any(mask):
-            hourly_avg.append(np.mean(load[mask]))
-            hourly_min.append(np.min(load[mask]))
-            hourly_max.append(np.max(load[mask]))
-        else:
-            hourly_avg.append(0)
-            hourly_min.append(0)
-            hourly_max.append(0)
+    # Typical day pattern: hourly averages and envelope
+    stats = get_profile_stats(load)
+    hourly_avg = stats['hourly_mean'].tolist()
+    hourly_min = stats['hourly_min'].tolist()
+    hourly_max = stats['hourly_max'].tolist()
 
     return {
         'hours': list(range(24)),
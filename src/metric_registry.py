@@ -0,0 +1,318 @@
+"""
+Metric Registry Module - BESS & DG Sizing Tool
+
+KPIs computed after the fact from columnar results, without re-simulating.
+
+A metric is a function declared against result columns (HourlyResult
+field names such as unserved, dg_running or hour_of_day) that maps (runs,
+steps) arrays to one value per run. The same declaration evaluates one
+run, the template comparison traces of Step 5, or an hourly file written
+with export.ResultWriter one config_id per run. No page stores per-config
+hourly traces for a sweep (sweep exports hold summary rows only), so
+evaluate_file and backfill apply to files written through the API.
+
+Evaluation is fused: every column is read and converted once per
+evaluation, derived columns (e.g. the full-delivery mask) are computed
+once for all metrics that use them, and stored files are read for the
+union of the needed columns only, a batch of configs at a time.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .degradation import assess_degradation
+from .export import read_results
+
+
+# Unserved power (MW) below which a step counts as fully delivered, as in
+# calculate_metrics
+DELIVERY_TOLERANCE = 0.001
+
+# Evening peak for the coverage KPI: hours 18:00-21:59
+EVENING_PEAK_HOURS = (18, 22)
+
+# Configs read per batch by evaluate_file
+FILE_BATCH_CONFIGS = 64
+
+
+@dataclass
+class Metric:
+    """A KPI or derived column declared against result columns."""
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...]  # result columns or names of derived columns
+    label: str = ''
+    unit: str = ''
+
+
+class MetricRegistry:
+    """Named metrics and derived columns evaluated over columnar results."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.derived: Dict[str, Metric] = {}
+
+    def metric(self, name: str, inputs: Sequence[str], label: str = '', unit: str = '') -> Callable:
+        """
+        Decorator registering a metric.
+
+        The function is called with one keyword argument per input, each a
+        (runs, steps) array, plus timestep_hours, and returns one value per run.
+
+        Args:
+            name: Result column name of the metric
+            inputs: Result columns or derived column names
+            label: Display name (defaults to name)
+            unit: Display unit
+        """
+        def register(func: Callable) -> Callable:
+            self.metrics[name] = Metric(name, func, tuple(inputs), label or name, unit)
+            return func
+        return register
+
+    def derive(self, name: str, inputs: Sequence[str]) -> Callable:
+        """
+        Decorator registering a derived column shared by several metrics.
+
+        Called like a metric, but returns a (runs, steps) array.
+
+        Args:
+            name: Column name metrics can list as an input
+            inputs: Result columns or other derived column names
+        """
+        def register(func: Callable) -> Callable:
+            self.derived[name] = Metric(name, func, tuple(inputs))
+            return func
+        return register
+
+    def columns(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Result columns the given metrics read (derived columns resolved).
+
+        Args:
+            names: Metric names (default all)
+
+        Returns:
+            Column names in first-use order
+        """
+        needed: Dict[str, None] = {}
+
+        def visit(item: str) -> None:
+            if item in self.derived:
+                for source in self.derived[item].inputs:
+                    visit(source)
+            else:
+                needed[item] = None
+
+        for name in self._names(names):
+            for item in self.metrics[name].inputs:
+                visit(item)
+        return list(needed)
+
+    def _names(self, names: Optional[Iterable[str]]) -> List[str]:
+        names = list(self.metrics) if names is None else list(names)
+        unknown = [n for n in names if n not in self.metrics]
+        if unknown:
+            raise KeyError(f"Unknown metrics: {unknown}")
+        return names
+
+    def evaluate(self, columns: Dict[str, np.ndarray], names: Optional[Iterable[str]] = None,
+                 timestep_hours: float = 1.0) -> pd.DataFrame:
+        """
+        Evaluate metrics over one run or a matrix of runs.
+
+        Args:
+            columns: Result column -> (steps,) array for one run or
+                (runs, steps) array, e.g. results_to_columns output or the
+                traces of template_comparison.compare_templates
+            names: Metric names (default all)
+            timestep_hours: Step length of the results
+
+        Returns:
+            DataFrame, one row per run, one column per metric
+        """
+        names = self._names(names)
+        values: Dict[str, np.ndarray] = {}
+
+        def resolve(item: str) -> np.ndarray:
+            if item not in values:
+                if item in self.derived:
+                    derived = self.derived[item]
+                    values[item] = derived.func(timestep_hours=timestep_hours,
+                                                **{i: resolve(i) for i in derived.inputs})
+                elif item in columns:
+                    values[item] = np.atleast_2d(np.asarray(columns[item]))
+                else:
+                    raise KeyError(f"Results have no column '{item}'")
+            return values[item]
+
+        return pd.DataFrame({
+            name: np.asarray(self.metrics[name].func(
+                timestep_hours=timestep_hours,
+                **{item: resolve(item) for item in self.metrics[name].inputs}))
+            for name in names
+        })
+
+    def evaluate_frame(self, df: pd.DataFrame, names: Optional[Iterable[str]] = None,
+                       timestep_hours: float = 1.0, run_column: str = 'config_id') -> pd.DataFrame:
+        """
+        Evaluate metrics over long-format results (one row per run step).
+
+        Args:
+            df: Results with a run_column identifying each run, steps in order
+            names: Metric names (default all)
+            timestep_hours: Step length of the results
+            run_column: Column identifying the run of each row
+
+        Returns:
+            DataFrame indexed by run_column, one column per metric
+        """
+        names = self._names(names)
+        runs = pd.unique(df[run_column])
+        sizes = df.groupby(run_column, sort=False).size().reindex(runs).to_numpy()
+        if len(runs) == 0:
+            return pd.DataFrame(columns=names, index=pd.Index([], name=run_column))
+
+        if (sizes == sizes[0]).all() and (df[run_column].to_numpy() == np.repeat(runs, sizes[0])).all():
+            # Equal-length runs stored contiguously: one (runs, steps) matrix
+            matrix = {c: df[c].to_numpy().reshape(len(runs), sizes[0]) for c in self.columns(names)}
+            result = self.evaluate(matrix, names, timestep_hours)
+        else:
+            result = pd.concat([self.evaluate({c: group[c].to_numpy() for c in self.columns(names)},
+                                              names, timestep_hours)
+                                for _, group in df.groupby(run_column, sort=False)], ignore_index=True)
+        result.index = pd.Index(runs, name=run_column)
+        return result
+
+    def evaluate_file(self, source, names: Optional[Iterable[str]] = None,
+                      timestep_hours: float = 1.0,
+                      config_ids: Optional[Iterable[int]] = None,
+                      batch_configs: int = FILE_BATCH_CONFIGS) -> pd.DataFrame:
+        """
+        Evaluate metrics over an exported hourly file (one config per row group).
+
+        Only the columns the metrics need are read, batch_configs configs at
+        a time, so memory stays bounded for large studies.
+
+        Args:
+            source: Parquet/Feather path written with ResultWriter, one
+                config_id per run
+            names: Metric names (default all)
+            timestep_hours: Step length of the stored results
+            config_ids: Configs to evaluate (default all in the file)
+            batch_configs: Configs read per batch
+
+        Returns:
+            DataFrame indexed by config_id, one column per metric
+        """
+        names = self._names(names)
+        columns = self.columns(names)
+        if config_ids is None:
+            ids, _ = read_results(source, columns=['config_id'])
+            config_ids = pd.unique(ids['config_id'])
+        config_ids = [int(i) for i in config_ids]
+
+        parts = []
+        for start in range(0, len(config_ids), batch_configs):
+            df, _ = read_results(source, columns=['config_id', *columns],
+                                 config_ids=config_ids[start:start + batch_configs])
+            parts.append(self.evaluate_frame(df, names, timestep_hours))
+        if not parts:
+            return pd.DataFrame(columns=names, index=pd.Index([], name='config_id'))
+        return pd.concat(parts)
+
+    def backfill(self, results: pd.DataFrame, source, names: Optional[Iterable[str]] = None,
+                 timestep_hours: float = 1.0) -> pd.DataFrame:
+        """
+        Add metric columns to a results table from an hourly trace file.
+
+        Args:
+            results: Results table, one row per config; joined on its
+                config_id column when present, otherwise on row position
+            source: Hourly file of the same configs, written with
+                ResultWriter.write(..., config_id=<config>) per config
+            names: Metric names (default all)
+            timestep_hours: Step length of the stored results
+
+        Returns:
+            Copy of results with one column per metric (NaN for configs
+            without stored traces)
+        """
+        kpis = self.evaluate_file(source, names, timestep_hours)
+        keys = results['config_id'] if 'config_id' in results else pd.Series(np.arange(len(results)))
+        merged = results.copy()
+        for name in kpis.columns:
+            merged[name] = kpis[name].reindex(keys.to_numpy()).to_numpy()
+        return merged
+
+
+# =============================================================================
+# BUILT-IN METRICS
+# =============================================================================
+
+def longest_run(mask: np.ndarray) -> np.ndarray:
+    """
+    Longest run of consecutive True steps in each row.
+
+    Args:
+        mask: (runs, steps) boolean array
+
+    Returns:
+        (runs,) integer array of step counts
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape[1] == 0:
+        return np.zeros(len(mask), dtype=np.int64)
+    index = np.arange(1, mask.shape[1] + 1)
+    last_break = np.maximum.accumulate(np.where(mask, 0, index), axis=1)
+    return (index - last_break).max(axis=1)
+
+
+METRICS = MetricRegistry()
+
+
+@METRICS.derive('full_delivery', inputs=('unserved',))
+def _full_delivery(unserved, timestep_hours):
+    return unserved.astype(float) < DELIVERY_TOLERANCE
+
+
+@METRICS.derive('dg_on', inputs=('dg_running',))
+def _dg_on(dg_running, timestep_hours):
+    return dg_running.astype(bool)
+
+
+@METRICS.metric('longest_green_streak_hrs', inputs=('full_delivery', 'dg_on'),
+                label='Longest Green Streak', unit='hrs')
+def _longest_green_streak(full_delivery, dg_on, timestep_hours):
+    return longest_run(full_delivery & ~dg_on) * timestep_hours
+
+
+@METRICS.metric('longest_outage_hrs', inputs=('full_delivery',),
+                label='Longest Outage', unit='hrs')
+def _longest_outage(full_delivery, timestep_hours):
+    return longest_run(~full_delivery) * timestep_hours
+
+
+@METRICS.metric('evening_peak_coverage_pct', inputs=('full_delivery', 'hour_of_day'),
+                label='Evening Peak Coverage', unit='%')
+def _evening_peak_coverage(full_delivery, hour_of_day, timestep_hours):
+    start, end = EVENING_PEAK_HOURS
+    peak = (hour_of_day >= start) & (hour_of_day < end)
+    steps = peak.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(steps > 0, (full_delivery & peak).sum(axis=1) / steps * 100, np.nan)
+
+
+@METRICS.metric('longest_dg_run_hrs', inputs=('dg_on',),
+                label='Longest DG Run', unit='hrs')
+def _longest_dg_run(dg_on, timestep_hours):
+    return longest_run(dg_on) * timestep_hours
+
+
+@METRICS.metric('capacity_fade_pct', inputs=('soc_pct',),
+                label='Capacity Fade', unit='%')
+def _capacity_fade(soc_pct, timestep_hours):
+    return assess_degradation(soc_pct, timestep_hours=timestep_hours)['capacity_fade_pct']
@@ -0,0 +1,234 @@
+"""
+Performance Model Module - BESS & DG Sizing Tool
+
+Predicts sweep wall time and peak memory from the configuration count.
+
+Throughput is measured, not assumed: the first estimate for a template
+(with or without DG) runs a short calibration of each backend on a
+synthetic four-week profile and fits
+
+- batched (batch_engine.run_batch_metrics): seconds per step =
+  step_seconds + lane_seconds * lanes, and bytes per lane
+- serial (dispatch_engine.run_simulation per configuration): seconds per
+  configuration-step, and bytes per step of the hourly trace
+
+Measurements are cached in memory and in PERF_CACHE_PATH, keyed by
+machine, so later sessions on the same host skip the calibration.
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+from .batch_engine import run_batch_metrics
+from .config import PERF_CACHE_PATH
+from .dispatch_engine import SimulationParams, run_simulation, steps_per_hour
+from .sweep_manifest import DEFAULT_CHUNK_CONFIGS
+
+
+BACKENDS = ('batched', 'serial')
+
+CALIBRATION_HOURS = 24 * 28
+CALIBRATION_LANES = (64, 1024)  # lane counts timed for the batched fit
+CALIBRATION_REPEATS = 2
+
+# Wall-time budget above which Step 3 suggests a coarser grid (seconds)
+RUNTIME_BUDGET_SECONDS = 20
+
+# Fixed memory per step (load and solar profiles as Python float lists)
+PROFILE_BYTES_PER_STEP = 2 * 32
+# Results table row (13 columns) plus pandas overhead
+RESULT_ROW_BYTES = 160
+
+
+@dataclass
+class Throughput:
+    """Measured throughput of one backend for one template."""
+    backend: str
+    step_seconds: float  # batched: per step; serial: per configuration-step
+    lane_seconds: float  # batched: per lane-step; serial: 0
+    memory_bytes: float  # batched: per lane; serial: per trace step
+    measured: str = ''
+
+
+_cache: Dict[str, Throughput] = {}
+
+
+def _machine() -> str:
+    return f"{platform.node()}|python {platform.python_version()}|numpy {np.__version__}"
+
+
+def _cache_key(backend: str, template_id: int, dg_enabled: bool) -> str:
+    return f"{backend}/{template_id}/{'dg' if dg_enabled else 'no_dg'}"
+
+
+def _read_disk_cache(path: Path) -> Dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _calibration_params(dg_enabled: bool) -> SimulationParams:
+    """Synthetic four-week case: flat 25 MW load, 60 MW peak solar."""
+    hours = np.arange(CALIBRATION_HOURS) % 24
+    solar = np.clip(60 * np.sin((hours - 6) / 12 * np.pi), 0, None)
+    return SimulationParams(
+        load_profile=[25.0] * CALIBRATION_HOURS,
+        solar_profile=solar.tolist(),
+        bess_capacity=100, bess_charge_power=50, bess_discharge_power=50,
+        dg_enabled=dg_enabled, dg_capacity=10 if dg_enabled else 0,
+    )
+
+
+def _timed(run) -> float:
+    best = float('inf')
+    for _ in range(CALIBRATION_REPEATS):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_bytes(run) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _measure(backend: str, template_id: int, dg_enabled: bool) -> Throughput:
+    params = _calibration_params(dg_enabled)
+    steps = CALIBRATION_HOURS
+
+    if backend == 'batched':
+        few, many = CALIBRATION_LANES
+        lanes = {'bess_capacity': np.linspace(20, 400, many)}
+        small = {'bess_capacity': lanes['bess_capacity'][:few]}
+        few_seconds = _timed(lambda: run_batch_metrics(params, template_id, small, num_hours=steps))
+        many_seconds = _timed(lambda: run_batch_metrics(params, template_id, lanes, num_hours=steps))
+        lane_seconds = max(many_seconds - few_seconds, 0.0) / ((many - few) * steps)
+        step_seconds = max(few_seconds / steps - few * lane_seconds, 0.0)
+        peak = _peak_bytes(lambda: run_batch_metrics(params, template_id, lanes, num_hours=48))
+        memory = peak / many
+    elif backend == 'serial':
+        step_seconds = _timed(lambda: run_simulation(params, template_id, steps)) / steps
+        lane_seconds = 0.0
+        memory = _peak_bytes(lambda: run_simulation(params, template_id, steps)) / steps
+    else:
+        raise ValueError(f"Unknown backend '{backend}' (expected one of {BACKENDS})")
+
+    return Throughput(backend, step_seconds, lane_seconds, memory,
+                      datetime.now().isoformat(timespec='seconds'))
+
+
+def calibrate(template_id: int, dg_enabled: bool, backend: str = 'batched',
+              force: bool = False,
+              cache_path: Union[str, Path, None] = PERF_CACHE_PATH) -> Throughput:
+    """
+    Measured throughput of a backend, calibrating on first use.
+
+    Args:
+        template_id: Template (0-6)
+        dg_enabled: Whether the DG is modelled
+        backend: 'batched' or 'serial'
+        force: Re-measure even if cached
+        cache_path: JSON cache file (None: memory only)
+
+    Returns:
+        Throughput
+    """
+    key = _cache_key(backend, template_id, dg_enabled)
+    if not force and key in _cache:
+        return _cache[key]
+
+    path = Path(cache_path) if cache_path is not None else None
+    disk = _read_disk_cache(path) if path is not None else {}
+    entries = disk.get(_machine(), {})
+    if not force and key in entries:
+        _cache[key] = Throughput(**entries[key])
+        return _cache[key]
+
+    throughput = _measure(backend, template_id, dg_enabled)
+    _cache[key] = throughput
+    if path is not None:
+        entries[key] = asdict(throughput)
+        disk[_machine()] = entries
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(disk, indent=1))
+        except OSError:
+            pass  # read-only deployments keep the in-memory cache
+    return throughput
+
+
+def estimate_sweep(num_configs: int, template_id: int, dg_enabled: bool,
+                   num_hours: float = 8760, timestep_hours: float = 1.0,
+                   chunk_configs: int = DEFAULT_CHUNK_CONFIGS,
+                   backends: Sequence[str] = BACKENDS,
+                   cache_path: Union[str, Path, None] = PERF_CACHE_PATH) -> Dict[str, Dict]:
+    """
+    Predict wall time and peak memory of a sweep.
+
+    Args:
+        num_configs: Configurations to simulate
+        template_id: Template (0-6)
+        dg_enabled: Whether the DG is modelled
+        num_hours: Simulated hours per configuration
+        timestep_hours: Simulation timestep (hours)
+        chunk_configs: Batched lanes per pass
+        backends: Backends to estimate
+        cache_path: Calibration cache file (see calibrate)
+
+    Returns:
+        Dictionary of backend -> {'seconds', 'memory_mb'}
+    """
+    steps = num_hours * steps_per_hour(timestep_hours)
+    base_bytes = steps * PROFILE_BYTES_PER_STEP + num_configs * RESULT_ROW_BYTES
+    estimates = {}
+
+    for backend in backends:
+        throughput = calibrate(template_id, dg_enabled, backend, cache_path=cache_path)
+        if backend == 'batched':
+            chunks = -(-num_configs // chunk_configs)
+            seconds = steps * (chunks * throughput.step_seconds + num_configs * throughput.lane_seconds)
+            peak = base_bytes + min(num_configs, chunk_configs) * throughput.memory_bytes
+        else:
+            seconds = num_configs * steps * throughput.step_seconds
+            peak = base_bytes + steps * throughput.memory_bytes
+        estimates[backend] = {'seconds': seconds, 'memory_mb': peak / 1e6}
+    return estimates
+
+
+def recommend(estimates: Dict[str, Dict],
+              budget_seconds: float = RUNTIME_BUDGET_SECONDS) -> Dict:
+    """
+    Pick a backend and say whether the sweep fits the time budget.
+
+    Args:
+        estimates: Output of estimate_sweep
+        budget_seconds: Wall-time budget
+
+    Returns:
+        Dictionary with 'backend' (fastest), 'seconds', 'memory_mb',
+        'within_budget' and 'reduction' (factor by which the configuration
+        count must shrink to fit the budget; 1.0 when it fits)
+    """
+    backend = min(estimates, key=lambda name: estimates[name]['seconds'])
+    seconds = estimates[backend]['seconds']
+    return {
+        'backend': backend,
+        'seconds': seconds,
+        'memory_mb': estimates[backend]['memory_mb'],
+        'within_budget': seconds <= budget_seconds,
+        'reduction': max(seconds / budget_seconds, 1.0) if budget_seconds > 0 else 1.0,
+    }
@@ -0,0 +1,189 @@
+"""
+Profile Statistics Module
+
+Computes a statistics bundle for an hourly profile (solar or load) in one
+pass of reshape(days, 24) reductions, cached by a digest of the profile
+values. Page previews, sparklines and summary metrics all read from the
+same bundle instead of recomputing hour-of-day averages.
+"""
+
+import hashlib
+import warnings
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from .config import SIMULATION_START_YEAR
+
+
+HOURLY_PERCENTILES = (10, 50, 90)
+
+_STATS_CACHE_SIZE = 32
+_stats_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def profile_digest(profile) -> str:
+    """
+    Content digest of an hourly profile.
+
+    Args:
+        profile: Hourly values (array-like)
+
+    Returns:
+        Hex digest of the float64 values
+    """
+    values = np.ascontiguousarray(profile, dtype=float)
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=8)
+def day_calendar(num_days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weekday (Mon=0) and month (1-12) for each day from SIMULATION_START_YEAR.
+
+    Args:
+        num_days: Number of days from January 1
+
+    Returns:
+        Tuple of read-only (weekday, month) arrays
+    """
+    dates = np.datetime64(f'{SIMULATION_START_YEAR}-01-01') + np.arange(num_days)
+    weekday = (dates.astype('int64') + 3) % 7  # 1970-01-01 was a Thursday
+    month = dates.astype('datetime64[M]').astype('int64') % 12 + 1
+    weekday.flags.writeable = False
+    month.flags.writeable = False
+    return weekday, month
+
+
+def get_profile_stats(profile) -> Dict[str, Any]:
+    """
+    Statistics bundle for an hourly profile, cached by profile digest.
+
+    Args:
+        profile: Hourly values starting at hour 0 of January 1
+
+    Returns:
+        Dictionary with (arrays are read-only and shared between callers):
+            - num_hours, total_mwh, peak_mw, min_mw, mean_mw
+            - positive_hours (> 0), zero_hours (== 0)
+            - capacity_factor: mean / peak (0 for an all-zero profile)
+            - daily_totals_mwh: Energy per day (last day may be partial)
+            - monthly_totals_mwh: Energy per calendar month (12 values)
+            - hourly_mean/min/max: Hour-of-day statistics (24 values)
+            - hourly_p10/p50/p90: Hour-of-day percentiles (24 values)
+            - max_ramp_up_mw, max_ramp_down_mw: Largest hour-to-hour rise / fall
+            - mean_abs_ramp_mw, p95_abs_ramp_mw: Hour-to-hour change statistics
+    """
+    values = np.asarray(profile, dtype=float)
+    digest = profile_digest(values)
+
+    stats = _stats_cache.get(digest)
+    if stats is None:
+        stats = _compute_profile_stats(values)
+        _stats_cache[digest] = stats
+        if len(_stats_cache) > _STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    else:
+        _stats_cache.move_to_end(digest)
+    return stats
+
+
+def clear_profile_stats_cache() -> None:
+    """Drop all cached statistics bundles."""
+    _stats_cache.clear()
+
+
+def _compute_profile_stats(values: np.ndarray) -> Dict[str, Any]:
+    """Compute the statistics bundle (uncached)."""
+    num_hours = len(values)
+
+    if num_hours == 0:
+        zeros_24 = np.zeros(24)
+        stats = {
+            'num_hours': 0, 'total_mwh': 0.0, 'peak_mw': 0.0, 'min_mw': 0.0, 'mean_mw': 0.0,
+            'positive_hours': 0, 'zero_hours': 0, 'capacity_factor': 0.0,
+            'daily_totals_mwh': np.zeros(0), 'monthly_totals_mwh': np.zeros(12),
+            'max_ramp_up_mw': 0.0, 'max_ramp_down_mw': 0.0,
+            'mean_abs_ramp_mw': 0.0, 'p95_abs_ramp_mw': 0.0,
+        }
+        for name in ('mean', 'min', 'max') + tuple(f'p{q}' for q in HOURLY_PERCENTILES):
+            stats[f'hourly_{name}'] = zeros_24
+        return _freeze_arrays(stats)
+
+    peak = float(np.max(values))
+    mean = float(np.mean(values))
+
+    # (days, 24) view; a partial trailing day is padded with NaN
+    num_days = -(-num_hours // 24)
+    if num_hours == num_days * 24:
+        days = values.reshape(num_days, 24)
+        daily_totals = days.sum(axis=1)
+        hourly = {
+            'mean': days.mean(axis=0),
+            'min': days.min(axis=0),
+            'max': days.max(axis=0),
+        }
+        percentiles = np.percentile(days, HOURLY_PERCENTILES, axis=0)
+    else:
+        padded = np.full(num_days * 24, np.nan)
+        padded[:num_hours] = values
+        days = padded.reshape(num_days, 24)
+        daily_totals = np.nansum(days, axis=1)
+        with warnings.catch_warnings():
+            # Hours of day with no data at all (profiles shorter than a day)
+            warnings.simplefilter('ignore', RuntimeWarning)
+            hourly = {
+                'mean': np.nan_to_num(np.nanmean(days, axis=0)),
+                'min': np.nan_to_num(np.nanmin(days, axis=0)),
+                'max': np.nan_to_num(np.nanmax(days, axis=0)),
+            }
+            percentiles = np.nan_to_num(np.nanpercentile(days, HOURLY_PERCENTILES, axis=0))
+
+    _, month = day_calendar(num_days)
+    monthly_totals = np.bincount(month - 1, weights=daily_totals, minlength=12)
+
+    if num_hours > 1:
+        ramps = np.diff(values)
+        abs_ramps = np.abs(ramps)
+        ramp_stats = {
+            'max_ramp_up_mw': float(max(ramps.max(), 0.0)),
+            'max_ramp_down_mw': float(max(-ramps.min(), 0.0)),
+            'mean_abs_ramp_mw': float(abs_ramps.mean()),
+            'p95_abs_ramp_mw': float(np.percentile(abs_ramps, 95)),
+        }
+    else:
+        ramp_stats = {
+            'max_ramp_up_mw': 0.0, 'max_ramp_down_mw': 0.0,
+            'mean_abs_ramp_mw': 0.0, 'p95_abs_ramp_mw': 0.0,
+        }
+
+    stats = {
+        'num_hours': num_hours,
+        'total_mwh': float(np.sum(values)),
+        'peak_mw': peak,
+        'min_mw': float(np.min(values)),
+        'mean_mw': mean,
+        'positive_hours': int(np.count_nonzero(values > 0)),
+        'zero_hours': int(np.count_nonzero(values == 0)),
+        'capacity_factor': mean / peak if peak > 0 else 0.0,
+        'daily_totals_mwh': daily_totals,
+        'monthly_totals_mwh': monthly_totals,
+        'hourly_mean': hourly['mean'],
+        'hourly_min': hourly['min'],
+        'hourly_max': hourly['max'],
+    }
+    for q, row in zip(HOURLY_PERCENTILES, percentiles):
+        stats[f'hourly_p{q}'] = row
+    stats.update(ramp_stats)
+
+    return _freeze_arrays(stats)
+
+
+def _freeze_arrays(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Make bundle arrays read-only so cached values cannot be mutated."""
+    for value in stats.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return stats
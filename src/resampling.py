@@ -0,0 +1,236 @@
+"""
+Profile Resampling Module - BESS & DG Sizing Tool
+
+Brings SCADA exports (5-minute, 15-minute, hourly, ...) onto the simulation
+timestep (SimulationParams.timestep_hours).
+
+Values are power (MW): a sample holds for its own interval, a target step
+takes the mean of the samples inside it (downsampling) and a coarse sample
+is held across the steps it covers (upsampling), so energy is preserved
+either way. CSVs are read in chunks and folded into per-step sums and
+counts, so a year of 1-minute data never has to fit in memory.
+"""
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .dispatch_engine import HOURS_PER_DAY, steps_per_hour
+
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+_NS_PER_HOUR = 3_600_000_000_000
+
+
+# =============================================================================
+# IN-MEMORY PROFILES
+# =============================================================================
+
+def resample_profile(values: Sequence[float], source_dt_hours: float,
+                     target_dt_hours: float) -> np.ndarray:
+    """
+    Resample a regular profile to another timestep.
+
+    Args:
+        values: Power values (MW), one per source step
+        source_dt_hours: Source step length (hours)
+        target_dt_hours: Target step length (hours); one of the two steps
+            must be a whole multiple of the other
+
+    Returns:
+        Resampled values (MW); a trailing partial target step is averaged
+        over the samples it has
+    """
+    values = np.asarray(values, dtype=float)
+    ratio = target_dt_hours / source_dt_hours
+
+    if ratio >= 1:
+        block = round(ratio)
+        if abs(block - ratio) > 1e-9:
+            raise ValueError(f"Cannot resample {source_dt_hours} h steps to {target_dt_hours} h")
+        if block == 1:
+            return values.copy()
+        full = len(values) // block * block
+        means = values[:full].reshape(-1, block).mean(axis=1)
+        if full < len(values):
+            means = np.append(means, values[full:].mean())
+        return means
+
+    repeat = round(1 / ratio)
+    if abs(repeat - 1 / ratio) > 1e-9:
+        raise ValueError(f"Cannot resample {source_dt_hours} h steps to {target_dt_hours} h")
+    return np.repeat(values, repeat)
+
+
+# =============================================================================
+# STREAMING RESAMPLER
+# =============================================================================
+
+class StreamingResampler:
+    """
+    Accumulates timestamped power samples into fixed-length steps.
+
+    Step 0 starts at the origin (by default midnight of the first sample's
+    day, so step-of-day lines up with the simulation's day windows).
+    Chunks may arrive in any order; samples before the origin are dropped.
+    """
+
+    def __init__(self, target_dt_hours: float = 1.0,
+                 source_dt_hours: Optional[float] = None,
+                 start=None, period_ending: bool = False):
+        """
+        Args:
+            target_dt_hours: Output step length (must divide one hour)
+            source_dt_hours: Sample interval; inferred from the first chunk
+                (median spacing) when None
+            start: Timestamp of step 0 (default: midnight of the first sample)
+            period_ending: True when timestamps mark the end of each sample
+                interval (common in SCADA exports) rather than its start
+        """
+        steps_per_hour(target_dt_hours)
+        self.target_dt_hours = target_dt_hours
+        self.source_dt_hours = source_dt_hours
+        self.period_ending = period_ending
+        self.origin = None if start is None else np.datetime64(pd.Timestamp(start), 'ns')
+        self.samples = 0
+        self.dropped = 0
+        self._sums = np.zeros(0)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._step_ns = round(target_dt_hours * _NS_PER_HOUR)
+
+    def add(self, timestamps, values) -> None:
+        """
+        Add one chunk of samples.
+
+        Args:
+            timestamps: Sample timestamps (anything pandas.to_datetime accepts)
+            values: Power values (MW); NaN samples are skipped
+        """
+        times = pd.to_datetime(pd.Series(timestamps))
+        if times.dt.tz is not None:
+            times = times.dt.tz_localize(None)
+        times = times.to_numpy(dtype='datetime64[ns]')
+        values = np.asarray(values, dtype=float)
+        if len(times) != len(values):
+            raise ValueError("timestamps and values must have the same length")
+        if len(times) == 0:
+            return
+
+        if self.source_dt_hours is None:
+            spacing = np.diff(np.sort(times)).astype('int64')
+            spacing = spacing[spacing > 0]
+            if not len(spacing):
+                raise ValueError("Cannot infer the sample interval from one timestamp; pass source_dt_hours")
+            self.source_dt_hours = float(np.median(spacing)) / _NS_PER_HOUR
+        if self.period_ending:
+            times = times - np.timedelta64(round(self.source_dt_hours * _NS_PER_HOUR), 'ns')
+        if self.origin is None:
+            self.origin = times.min().astype('datetime64[D]').astype('datetime64[ns]')
+
+        keep = ~np.isnan(values)
+        steps = (times[keep] - self.origin).astype('int64') // self._step_ns
+        values = values[keep]
+        ahead = steps >= 0
+        self.dropped += int((~ahead).sum()) + int((~keep).sum())
+        steps, values = steps[ahead], values[ahead]
+        if not len(steps):
+            return
+
+        # A coarse sample is held over every target step it covers
+        span = max(1, round(self.source_dt_hours / self.target_dt_hours))
+        if span > 1:
+            steps = (steps[:, None] + np.arange(span)).ravel()
+            values = np.repeat(values, span)
+
+        self.samples += int(ahead.sum())
+        needed = int(steps.max()) + 1
+        if needed > len(self._sums):
+            size = max(needed, 2 * len(self._sums))
+            self._sums = np.concatenate([self._sums, np.zeros(size - len(self._sums))])
+            self._counts = np.concatenate([self._counts, np.zeros(size - len(self._counts), dtype=np.int64)])
+        self._sums[:needed] += np.bincount(steps, weights=values, minlength=needed)
+        self._counts[:needed] += np.bincount(steps, minlength=needed)
+
+    def result(self, num_hours: Optional[float] = None, fill: str = 'interpolate') -> np.ndarray:
+        """
+        Mean power per step.
+
+        Args:
+            num_hours: Output length in hours (default: through the last
+                sample, rounded up to whole days)
+            fill: 'interpolate' (linear between neighbouring steps, nearest
+                value at the edges) or 'zero' for steps without samples
+
+        Returns:
+            (num_hours / target_dt_hours,) array of MW values
+        """
+        if fill not in ('interpolate', 'zero'):
+            raise ValueError("fill must be 'interpolate' or 'zero'")
+        step_count = steps_per_hour(self.target_dt_hours)
+        filled = np.flatnonzero(self._counts)
+        if num_hours is None:
+            steps_per_day = HOURS_PER_DAY * step_count
+            last = int(filled[-1]) + 1 if len(filled) else 0
+            num_steps = -(-last // steps_per_day) * steps_per_day
+        else:
+            num_steps = round(num_hours * step_count)
+
+        sums = np.zeros(num_steps)
+        counts = np.zeros(num_steps, dtype=np.int64)
+        length = min(num_steps, len(self._sums))
+        sums[:length] = self._sums[:length]
+        counts[:length] = self._counts[:length]
+
+        profile = np.zeros(num_steps)
+        has = counts > 0
+        profile[has] = sums[has] / counts[has]
+        if fill == 'interpolate' and has.any() and not has.all():
+            index = np.arange(num_steps)
+            profile[~has] = np.interp(index[~has], index[has], profile[has])
+        return profile
+
+    def gap_steps(self, num_hours: Optional[float] = None) -> int:
+        """Number of output steps without any sample."""
+        num_steps = len(self.result(num_hours, fill='zero'))
+        return num_steps - int(np.count_nonzero(self._counts[:num_steps]))
+
+
+def resample_csv(source: Union[str, object], target_dt_hours: float = 1.0,
+                 value_column: Optional[str] = None,
+                 timestamp_column: Optional[str] = None,
+                 source_dt_hours: Optional[float] = None,
+                 period_ending: bool = False,
+                 scale: float = 1.0,
+                 num_hours: Optional[float] = None,
+                 fill: str = 'interpolate',
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """
+    Read a high-resolution power CSV in chunks and resample it.
+
+    Args:
+        source: File path or file-like object (e.g. a Streamlit upload)
+        target_dt_hours: Output step length (hours)
+        value_column: Power column (default: the second column)
+        timestamp_column: Timestamp column (default: the first column)
+        source_dt_hours: Sample interval (default: inferred)
+        period_ending: Timestamps mark the end of each sample interval
+        scale: Factor applied to the values (e.g. 0.001 for kW -> MW)
+        num_hours: Output length in hours (default: whole days covered)
+        fill: Gap handling, see StreamingResampler.result
+        chunk_rows: Rows read per chunk
+
+    Returns:
+        Array of MW values, one per target step
+    """
+    resampler = StreamingResampler(target_dt_hours, source_dt_hours=source_dt_hours,
+                                   period_ending=period_ending)
+    for chunk in pd.read_csv(source, chunksize=chunk_rows):
+        if len(chunk.columns) < 2 and (value_column is None or timestamp_column is None):
+            raise ValueError("CSV needs a timestamp column and a value column")
+        time_col = timestamp_column if timestamp_column is not None else chunk.columns[0]
+        value_col = value_column if value_column is not None else chunk.columns[1]
+        values = pd.to_numeric(chunk[value_col], errors='coerce').to_numpy(dtype=float) * scale
+        resampler.add(chunk[time_col], values)
+    return resampler.result(num_hours, fill=fill)
@@ -0,0 +1,635 @@
+"""
+Low-overhead simulation kernels for the legacy year simulators
+
+Implements the hour loops behind simulate_bess_year and
+simulate_solar_bess_dg_year using plain local-variable state and
+preallocated output columns instead of per-hour method calls and dicts.
+Results are bit-for-bit identical to the BatterySystem/DieselGenerator
+object model; parameter resolution still goes through those classes.
+
+run_bess_capacity_sweep_kernel advances many battery capacities through
+the same solar year at once, one numpy vector operation per step.
+"""
+
+import numpy as np
+
+from .config import DAYS_PER_YEAR
+
+# Battery state codes (index into BESS_STATE_NAMES)
+IDLE = 0
+CHARGING = 1
+DISCHARGING = 2
+BESS_STATE_NAMES = ('IDLE', 'CHARGING', 'DISCHARGING')
+
+
+def profile_as_list(profile):
+    """Return profile values as a plain Python list (fast scalar indexing)."""
+    if hasattr(profile, 'tolist'):
+        return profile.tolist()
+    return list(profile)
+
+
+def _cycle_summary(total_cycles, daily_cycles, degradation_per_cycle):
+    """Compile cycle metrics exactly as BatterySystem reports them."""
+    return {
+        'total_cycles': total_cycles,
+        'avg_daily_cycles': sum(daily_cycles) / DAYS_PER_YEAR if daily_cycles else 0,
+        'max_daily_cycles': max(daily_cycles) if daily_cycles else 0,
+        'degradation_percent': total_cycles * degradation_per_cycle,
+    }
+
+
+def run_bess_year_kernel(battery, solar_profile, target_delivery_mw, summary_only=False):
+    """
+    Binary-delivery BESS year simulation (Solar + BESS, fixed target).
+
+    Args:
+        battery: BatterySystem supplying capacity and technical parameters
+        solar_profile: Hourly solar generation (MW)
+        target_delivery_mw: Delivery target (MW)
+        summary_only: Skip the hourly output columns when True
+
+    Returns:
+        dict: Summary results (same keys as simulate_bess_year, without
+              'hourly_data') plus 'columns' - a dict of preallocated hourly
+              lists, or None when summary_only is set
+    """
+    solar = profile_as_list(solar_profile)
+    num_hours = len(solar)
+
+    capacity = battery.capacity
+    min_soc = battery.min_soc
+    max_soc = battery.max_soc
+    eff = battery.one_way_efficiency
+    max_charge_rate = capacity * battery.c_rate_charge
+    max_discharge_rate = capacity * battery.c_rate_discharge
+    max_daily_cycles = battery.max_daily_cycles
+    target = target_delivery_mw
+
+    soc = battery.initial_soc
+    state = IDLE
+    total_cycles = 0.0
+    day_cycles = 0.0
+    daily_cycles = []
+
+    hours_delivered = 0
+    energy_delivered = 0
+    solar_charged_total = 0
+    solar_wasted_total = 0
+    discharged_total = 0
+
+    record = not summary_only
+    if record:
+        col_bess_mw = [0.0] * num_hours
+        col_charge_mwh = [0.0] * num_hours
+        col_soc_pct = [0.0] * num_hours
+        col_usable = [0.0] * num_hours
+        col_deficit = [0.0] * num_hours
+        col_delivery = [False] * num_hours
+        col_state = [IDLE] * num_hours
+        col_wastage = [0.0] * num_hours
+
+    for hour in range(num_hours):
+        solar_mw = solar[hour]
+
+        # Available discharge power (MWh = MW for 1 hour), respecting C-rate
+        available = (soc - min_soc) * capacity
+        if available < 0:
+            available = 0
+        battery_available_mw = max_discharge_rate if max_discharge_rate < available else available
+
+        # A transition counts 0.5 cycles when entering CHARGING/DISCHARGING
+        can_discharge_cycle = state == DISCHARGING or day_cycles + 0.5 <= max_daily_cycles
+        can_charge_cycle = state == CHARGING or day_cycles + 0.5 <= max_daily_cycles
+
+        can_deliver_resources = (solar_mw + battery_available_mw) >= target
+        if can_deliver_resources and solar_mw < target:
+            can_deliver = can_discharge_cycle
+        else:
+            can_deliver = can_deliver_resources
+
+        if record:
+            col_charge_mwh[hour] = soc * capacity
+            col_soc_pct[hour] = soc * 100
+            col_usable[hour] = battery_available_mw
+
+        bess_mw = 0
+        deficit = 0
+        wastage = 0
+        delivered = can_deliver
+
+        if can_deliver:
+            if solar_mw >= target:
+                hours_delivered += 1
+                energy_delivered += target
+                excess_mw = solar_mw - target
+                if excess_mw > 0 and (max_soc - soc) * capacity > 0:
+                    if can_charge_cycle:
+                        # Charge with excess solar
+                        to_battery = excess_mw * eff
+                        headroom = (max_soc - soc) * capacity
+                        max_charge = max_charge_rate if max_charge_rate < headroom else headroom
+                        actual = max_charge if max_charge < to_battery else to_battery
+                        soc += actual / capacity
+                        if soc > max_soc:
+                            soc = max_soc
+                        charged = actual / eff
+
+                        solar_charged_total += charged
+                        bess_mw = -charged
+                        new_state = CHARGING if charged > 0 else IDLE
+                        waste = excess_mw - charged
+                        if waste > 0:
+                            solar_wasted_total += waste
+                            wastage = waste
+                    else:
+                        new_state = IDLE
+                        solar_wasted_total += excess_mw
+                        wastage = excess_mw
+                else:
+                    new_state = IDLE
+                    if excess_mw > 0:
+                        solar_wasted_total += excess_mw
+                        wastage = excess_mw
+            else:
+                if can_discharge_cycle:
+                    # Discharge to cover the deficit
+                    from_battery = (target - solar_mw) / eff
+                    available = (soc - min_soc) * capacity
+                    max_discharge = max_discharge_rate if max_discharge_rate < available else available
+                    actual = max_discharge if max_discharge < from_battery else from_battery
+                    soc -= actual / capacity
+                    if soc < min_soc:
+                        soc = min_soc
+                    discharged = actual * eff
+
+                    discharged_total += discharged
+                    bess_mw = discharged
+                    new_state = DISCHARGING
+
+                    actual_delivered = solar_mw + discharged
+                    deficit = max(0, target - actual_delivered)
+                    if actual_delivered >= target - 0.01:
+                        hours_delivered += 1
+                        energy_delivered += target
+                    else:
+                        delivered = False
+                else:
+                    new_state = IDLE
+                    deficit = target - solar_mw
+                    delivered = False
+        else:
+            deficit = target - (solar_mw + battery_available_mw)
+
+            if solar_mw > 0 and (max_soc - soc) * capacity > 0:
+                if can_charge_cycle:
+                    to_battery = solar_mw * eff
+                    headroom = (max_soc - soc) * capacity
+                    max_charge = max_charge_rate if max_charge_rate < headroom else headroom
+                    actual = max_charge if max_charge < to_battery else to_battery
+                    soc += actual / capacity
+                    if soc > max_soc:
+                        soc = max_soc
+                    charged = actual / eff
+
+                    solar_charged_total += charged
+                    bess_mw = -charged
+                    new_state = CHARGING if charged > 0 else IDLE
+                    waste = solar_mw - charged
+                    if waste > 0:
+                        solar_wasted_total += waste
+                        wastage = waste
+                else:
+                    new_state = IDLE
+                    solar_wasted_total += solar_mw
+                    wastage = solar_mw
+            else:
+                new_state = IDLE
+                if solar_mw > 0:
+                    solar_wasted_total += solar_mw
+                    wastage = solar_mw
+
+        # Cycle counting and daily rollover (BatterySystem.update_state_and_cycles)
+        if new_state != state and new_state != IDLE:
+            total_cycles += 0.5
+            day_cycles += 0.5
+        if hour > 0 and hour % 24 == 0:
+            daily_cycles.append(day_cycles)
+            day_cycles = 0
+        state = new_state
+
+        if record:
+            col_bess_mw[hour] = bess_mw
+            col_deficit[hour] = deficit
+            col_delivery[hour] = delivered
+            col_state[hour] = new_state
+            col_wastage[hour] = wastage
+
+    if day_cycles > 0:
+        daily_cycles.append(day_cycles)
+
+    results = {
+        'hours_delivered': hours_delivered,
+        'energy_delivered_mwh': energy_delivered,
+        'solar_charged_mwh': solar_charged_total,
+        'solar_wasted_mwh': solar_wasted_total,
+        'battery_discharged_mwh': discharged_total,
+    }
+    results.update(_cycle_summary(total_cycles, daily_cycles, battery.degradation_per_cycle))
+
+    if record:
+        results['columns'] = {
+            'solar_mw': solar,
+            'bess_mw': col_bess_mw,
+            'bess_charge_mwh': col_charge_mwh,
+            'soc_percent': col_soc_pct,
+            'usable_energy_mwh': col_usable,
+            'deficit_mw': col_deficit,
+            'delivery': col_delivery,
+            'bess_state': col_state,
+            'wastage_mwh': col_wastage,
+        }
+    else:
+        results['columns'] = None
+
+    return results
+
+
+def run_bess_dg_year_kernel(battery, dg, solar_profile, load_mw, summary_only=False):
+    """
+    Merit-order Solar + DG + BESS year simulation with SOC-triggered DG.
+
+    Args:
+        battery: BatterySystem supplying capacity and technical parameters
+        dg: DieselGenerator supplying capacity and SOC thresholds
+        solar_profile: Hourly solar generation (MW)
+        load_mw: Constant load (MW)
+        summary_only: Skip the hourly output columns when True
+
+    Returns:
+        dict: Summary results (same keys as simulate_solar_bess_dg_year,
+              without 'hourly_data') plus 'columns' - a dict of hourly
+              numpy arrays, or None when summary_only is set
+    """
+    solar = profile_as_list(solar_profile)
+    num_hours = len(solar)
+
+    capacity = battery.capacity
+    min_soc = battery.min_soc
+    max_soc = battery.max_soc
+    eff = battery.one_way_efficiency
+    max_charge_rate = capacity * battery.c_rate_charge
+    max_discharge_rate = capacity * battery.c_rate_discharge
+    max_daily_cycles = battery.max_daily_cycles
+
+    dg_capacity = dg.capacity
+    soc_on = dg.soc_on_threshold
+    soc_off = dg.soc_off_threshold
+
+    soc = battery.initial_soc
+    state = IDLE
+    total_cycles = 0.0
+    day_cycles = 0.0
+    daily_cycles = []
+
+    dg_on = False
+    dg_runtime = 0
+    dg_starts = 0
+    dg_generated = 0.0
+    dg_to_load_total = 0.0
+    dg_to_bess_total = 0.0
+
+    hours_delivered = 0
+    energy_delivered = 0
+    solar_to_load_total = 0
+    solar_charged_total = 0
+    solar_wasted_total = 0
+    discharged_total = 0
+
+    record = not summary_only
+    if record:
+        col_solar_to_load = [0.0] * num_hours
+        col_bess_mw = [0.0] * num_hours
+        col_bess_to_load = [0.0] * num_hours
+        col_soc_pct = [0.0] * num_hours
+        col_state = [IDLE] * num_hours
+        col_dg_on = [False] * num_hours
+        col_dg_output = [0.0] * num_hours
+        col_dg_to_load = [0.0] * num_hours
+        col_dg_to_bess = [0.0] * num_hours
+        col_solar_charged = [0.0] * num_hours
+        col_solar_wasted = [0.0] * num_hours
+        col_unmet = [0.0] * num_hours
+        col_delivery = [False] * num_hours
+
+    for hour in range(num_hours):
+        solar_mw = solar[hour]
+
+        # DG hysteresis on SOC before dispatch
+        if not dg_on and soc <= soc_on:
+            dg_on = True
+            dg_starts += 1
+        elif dg_on and soc >= soc_off:
+            dg_on = False
+
+        can_discharge_cycle = state == DISCHARGING or day_cycles + 0.5 <= max_daily_cycles
+        can_charge_cycle = state == CHARGING or day_cycles + 0.5 <= max_daily_cycles
+
+        remaining_load = load_mw
+
+        # Priority 1: Solar to load
+        solar_to_load = remaining_load if remaining_load < solar_mw else solar_mw
+        remaining_load -= solar_to_load
+        excess_solar = solar_mw - solar_to_load
+        solar_to_load_total += solar_to_load
+
+        # Priority 2: DG to load
+        dg_output = 0
+        dg_to_load = 0
+        if dg_on:
+            dg_output = dg_capacity
+            dg_runtime += 1
+            dg_generated += dg_output
+            dg_to_load = remaining_load if remaining_load < dg_output else dg_output
+            remaining_load -= dg_to_load
+        excess_dg = dg_output - dg_to_load
+
+        # Priority 3: BESS discharge
+        bess_mw = 0
+        bess_to_load = 0
+        hour_state = IDLE
+        if remaining_load > 0 and (soc - min_soc) * capacity > 0:
+            if can_discharge_cycle:
+                from_battery = remaining_load / eff
+                available = (soc - min_soc) * capacity
+                max_discharge = max_discharge_rate if max_discharge_rate < available else available
+                actual = max_discharge if max_discharge < from_battery else from_battery
+                soc -= actual / capacity
+                if soc < min_soc:
+                    soc = min_soc
+                bess_to_load = actual * eff
+
+                remaining_load -= bess_to_load
+                discharged_total += bess_to_load
+                bess_mw = bess_to_load
+                hour_state = DISCHARGING
+
+        # Charge BESS: excess solar first, then excess DG
+        solar_charged = 0
+        dg_charged = 0
+        if excess_solar > 0 and (max_soc - soc) * capacity > 0:
+            if can_charge_cycle:
+                to_battery = excess_solar * eff
+                headroom = (max_soc - soc) * capacity
+                max_charge = max_charge_rate if max_charge_rate < headroom else headroom
+                actual = max_charge if max_charge < to_battery else to_battery
+                soc += actual / capacity
+                if soc > max_soc:
+                    soc = max_soc
+                solar_charged = actual / eff
+
+                solar_charged_total += solar_charged
+                if hour_state != DISCHARGING:
+                    hour_state = CHARGING
+                    bess_mw = -solar_charged
+
+        if excess_dg > 0 and (max_soc - soc) * capacity > 0:
+            if can_charge_cycle:
+                to_battery = excess_dg * eff
+                headroom = (max_soc - soc) * capacity
+                max_charge = max_charge_rate if max_charge_rate < headroom else headroom
+                actual = max_charge if max_charge < to_battery else to_battery
+                soc += actual / capacity
+                if soc > max_soc:
+                    soc = max_soc
+                dg_charged = actual / eff
+
+                if hour_state == IDLE:
+                    hour_state = CHARGING
+                    bess_mw = -dg_charged
+                elif hour_state == CHARGING:
+                    bess_mw -= dg_charged
+
+        if dg_on:
+            dg_to_load_total += dg_to_load
+            dg_to_bess_total += dg_charged
+
+        # Only solar can be wasted (DG turns off when not needed)
+        solar_wasted = excess_solar - solar_charged
+        if solar_wasted > 0:
+            solar_wasted_total += solar_wasted
+        else:
+            solar_wasted = 0
+
+        delivered = remaining_load <= 0.001
+        if delivered:
+            hours_delivered += 1
+            energy_delivered += load_mw
+
+        if hour_state != state and hour_state != IDLE:
+            total_cycles += 0.5
+            day_cycles += 0.5
+        if hour > 0 and hour % 24 == 0:
+            daily_cycles.append(day_cycles)
+            day_cycles = 0
+        state = hour_state
+
+        if record:
+            col_solar_to_load[hour] = solar_to_load
+            col_bess_mw[hour] = bess_mw
+            col_bess_to_load[hour] = bess_to_load
+            col_soc_pct[hour] = soc * 100
+            col_state[hour] = hour_state
+            col_dg_on[hour] = dg_on
+            col_dg_output[hour] = dg_output
+            col_dg_to_load[hour] = dg_to_load
+            col_dg_to_bess[hour] = dg_charged
+            col_solar_charged[hour] = solar_charged
+            col_solar_wasted[hour] = solar_wasted
+            col_unmet[hour] = remaining_load
+            col_delivery[hour] = delivered
+
+    if day_cycles > 0:
+        daily_cycles.append(day_cycles)
+
+    results = {
+        'hours_delivered': hours_delivered,
+        'energy_delivered_mwh': energy_delivered,
+        'solar_to_load_mwh': solar_to_load_total,
+        'solar_charged_mwh': solar_charged_total,
+        'solar_wasted_mwh': solar_wasted_total,
+        'battery_discharged_mwh': discharged_total,
+    }
+    results.update(_cycle_summary(total_cycles, daily_cycles, battery.degradation_per_cycle))
+    results.update({
+        'dg_runtime_hours': dg_runtime,
+        'dg_starts': dg_starts,
+        'dg_energy_generated_mwh': dg_generated,
+        'dg_to_load_mwh': dg_to_load_total,
+        'dg_to_bess_mwh': dg_to_bess_total,
+    })
+
+    if record:
+        results['columns'] = {
+            'solar_mw': solar,
+            'solar_to_load_mw': col_solar_to_load,
+            'bess_mw': col_bess_mw,
+            'bess_to_load_mw': col_bess_to_load,
+            'soc_percent': col_soc_pct,
+            'bess_state': col_state,
+            'dg_on': col_dg_on,
+            'dg_output_mw': col_dg_output,
+            'dg_to_load_mw': col_dg_to_load,
+            'dg_to_bess_mw': col_dg_to_bess,
+            'solar_charged_mwh': col_solar_charged,
+            'solar_wasted_mwh': col_solar_wasted,
+            'unmet_load_mw': col_unmet,
+            'delivery': col_delivery,
+        }
+    else:
+        results['columns'] = None
+
+    return results
+
+
+def run_bess_capacity_sweep_kernel(capacities, battery, solar_profile, target_delivery_mw):
+    """
+    Vectorised binary-delivery BESS year simulation over many capacities.
+
+    Every capacity sees the same solar profile, target and technical
+    parameters, so all of them are advanced together hour by hour. Branches
+    that depend only on the hour's solar value stay scalar; per-capacity
+    decisions (cycle-limit gating, headroom, delivery tolerance) become masks.
+    Per capacity, the results match run_bess_year_kernel exactly.
+
+    Args:
+        capacities: Sequence of battery capacities (MWh)
+        battery: BatterySystem supplying the shared technical parameters
+                 (its own capacity is ignored)
+        solar_profile: Hourly solar generation (MW)
+        target_delivery_mw: Delivery target (MW)
+
+    Returns:
+        dict: Summary metric arrays keyed like simulate_bess_year results,
+              one element per capacity
+    """
+    solar = profile_as_list(solar_profile)
+    num_hours = len(solar)
+
+    cap = np.asarray(capacities, dtype=float)
+    n = len(cap)
+
+    min_soc = battery.min_soc
+    max_soc = battery.max_soc
+    eff = battery.one_way_efficiency
+    max_charge_rate = cap * battery.c_rate_charge
+    max_discharge_rate = cap * battery.c_rate_discharge
+    max_daily_cycles = battery.max_daily_cycles
+    target = target_delivery_mw
+    delivery_tolerance = target - 0.01
+
+    soc = np.full(n, float(battery.initial_soc))
+    state = np.full(n, IDLE, dtype=np.int8)
+    new_state = np.empty(n, dtype=np.int8)
+    total_cycles = np.zeros(n)
+    day_cycles = np.zeros(n)
+    daily_sum = np.zeros(n)
+    daily_max = np.zeros(n)
+    days_recorded = 0
+
+    hours_delivered = np.zeros(n, dtype=np.int64)
+    energy_delivered = np.zeros(n)
+    solar_charged_total = np.zeros(n)
+    solar_wasted_total = np.zeros(n)
+    discharged_total = np.zeros(n)
+
+    all_lanes = np.ones(n, dtype=bool)
+
+    def charge_lanes(candidates, can_charge_cycle, energy_mw):
+        """Charge candidate lanes from energy_mw; the rest of it is wasted."""
+        headroom = (max_soc - soc) * cap
+        charging = candidates & (headroom > 0) & can_charge_cycle
+        if charging.any():
+            max_charge = np.minimum(max_charge_rate, headroom)
+            actual = np.minimum(max_charge, energy_mw * eff)
+            np.add(soc, actual / cap, out=soc, where=charging)
+            np.minimum(soc, max_soc, out=soc, where=charging)
+            charged = actual / eff
+            charged[~charging] = 0.0
+            np.add(solar_charged_total, charged, out=solar_charged_total)
+            new_state[charged > 0] = CHARGING
+            waste = energy_mw - charged
+        else:
+            waste = np.full(n, float(energy_mw))
+        np.add(solar_wasted_total, waste, out=solar_wasted_total, where=candidates & (waste > 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for hour in range(num_hours):
+            solar_mw = solar[hour]
+            new_state.fill(IDLE)
+
+            # A transition counts 0.5 cycles when entering CHARGING/DISCHARGING
+            cycle_room = day_cycles + 0.5 <= max_daily_cycles
+
+            if solar_mw >= target:
+                # Solar alone meets the target for every capacity
+                hours_delivered += 1
+                energy_delivered += target
+                excess_mw = solar_mw - target
+                if excess_mw > 0:
+                    charge_lanes(all_lanes, cycle_room | (state == CHARGING), excess_mw)
+            else:
+                available = np.maximum((soc - min_soc) * cap, 0)
+                battery_available_mw = np.minimum(max_discharge_rate, available)
+                delivering = (solar_mw + battery_available_mw >= target) & (cycle_room | (state == DISCHARGING))
+
+                if delivering.any():
+                    actual = np.minimum(battery_available_mw, (target - solar_mw) / eff)
+                    np.subtract(soc, actual / cap, out=soc, where=delivering)
+                    np.maximum(soc, min_soc, out=soc, where=delivering)
+                    discharged = actual * eff
+                    np.add(discharged_total, discharged, out=discharged_total, where=delivering)
+                    new_state[delivering] = DISCHARGING
+
+                    met = delivering & (solar_mw + discharged >= delivery_tolerance)
+                    hours_delivered += met
+                    np.add(energy_delivered, target, out=energy_delivered, where=met)
+
+                if solar_mw > 0:
+                    # Undeliverable hours bank whatever solar the battery can take
+                    charge_lanes(~delivering, cycle_room | (state == CHARGING), solar_mw)
+
+            # Cycle counting and daily rollover
+            transition = (new_state != state) & (new_state != IDLE)
+            np.add(total_cycles, 0.5, out=total_cycles, where=transition)
+            np.add(day_cycles, 0.5, out=day_cycles, where=transition)
+            if hour > 0 and hour % 24 == 0:
+                if days_recorded == 0:
+                    daily_max[:] = day_cycles
+                else:
+                    np.maximum(daily_max, day_cycles, out=daily_max)
+                daily_sum += day_cycles
+                days_recorded += 1
+                day_cycles.fill(0.0)
+            state, new_state = new_state, state
+
+    # Final partial day is only recorded when it saw cycling
+    final_day = day_cycles > 0
+    np.add(daily_sum, day_cycles, out=daily_sum, where=final_day)
+    if days_recorded == 0:
+        daily_max = np.where(final_day, day_cycles, 0.0)
+    else:
+        daily_max = np.where(final_day, np.maximum(daily_max, day_cycles), daily_max)
+    has_days = final_day | (days_recorded > 0)
+
+    return {
+        'hours_delivered': hours_delivered,
+        'energy_delivered_mwh': energy_delivered,
+        'solar_charged_mwh': solar_charged_total,
+        'solar_wasted_mwh': solar_wasted_total,
+        'battery_discharged_mwh': discharged_total,
+        'total_cycles': total_cycles,
+        'avg_daily_cycles': np.where(has_days, daily_sum / DAYS_PER_YEAR, 0.0),
+        'max_daily_cycles': np.where(has_days, daily_max, 0.0),
+        'degradation_percent': total_cycles * battery.degradation_per_cycle,
+    }
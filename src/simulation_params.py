@@ -0,0 +1,91 @@
+"""
+Simulation Parameters Module - BESS & DG Sizing Tool
+
+SimulationParams and the timestep helpers shared by the dispatch engine
+and the modules it builds on (e.g. dg_accounting), kept free of engine
+imports so those modules can be imported at the top of dispatch_engine.
+dispatch_engine re-exports all of them.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class SimulationParams:
+    """Input parameters for simulation."""
+    # Profiles (average MW over each timestep)
+    load_profile: List[float] = field(default_factory=list)
+    solar_profile: List[float] = field(default_factory=list)
+
+    # Timestep length in hours (1.0 = hourly, 0.25 = 15-minute); must divide one hour
+    timestep_hours: float = 1.0
+
+    # BESS parameters
+    bess_capacity: float = 100  # MWh
+    bess_charge_power: float = 100  # MW
+    bess_discharge_power: float = 100  # MW
+    bess_efficiency: float = 85  # %
+    bess_min_soc: float = 10  # %
+    bess_max_soc: float = 90  # %
+    bess_initial_soc: float = 50  # %
+    bess_daily_cycle_limit: Optional[float] = None
+    bess_enforce_cycle_limit: bool = False
+
+    # DG parameters
+    dg_enabled: bool = False
+    dg_capacity: float = 0  # MW
+    dg_charges_bess: bool = True
+    dg_load_priority: str = 'bess_first'  # 'bess_first' or 'dg_first'
+    dg_takeover_mode: bool = False  # When True: DG serves full load, solar goes to BESS
+
+    # DG fuel and emissions accounting (see dg_accounting)
+    dg_operating_mode: str = 'binary'  # 'binary' (full output, excess dumped) or 'variable' (follows load)
+    dg_min_load_pct: float = 30  # % of capacity; lower loading counts as low-load running
+    dg_fuel_curve_load_pct: List[float] = field(default_factory=lambda: [25.0, 50.0, 75.0, 100.0])
+    dg_fuel_curve_lph_per_mw: List[float] = field(
+        default_factory=lambda: [142.95, 204.45, 265.95, 327.45])  # L/h per MW rated at each loading
+    dg_start_fuel_l_per_mw: float = 5.0  # L per start per MW rated
+    dg_co2_kg_per_litre: float = 2.68
+
+    # Template-specific: Time windows
+    night_start_hour: int = 18
+    night_end_hour: int = 6
+    day_start_hour: int = 6
+    day_end_hour: int = 18
+    blackout_start_hour: int = 22
+    blackout_end_hour: int = 6
+
+    # Template-specific: SoC thresholds
+    dg_soc_on_threshold: float = 30  # %
+    dg_soc_off_threshold: float = 80  # %
+    emergency_soc_threshold: float = 15  # %
+
+    # Template-specific: Flags
+    allow_emergency_dg_day: bool = False
+    allow_emergency_dg_night: bool = False
+
+    # Contingency: per-timestep availability factors (0-1); empty = always available
+    dg_availability: List[float] = field(default_factory=list)
+    bess_power_availability: List[float] = field(default_factory=list)
+    bess_energy_availability: List[float] = field(default_factory=list)
+
+
+def steps_per_hour(timestep_hours: float) -> int:
+    """
+    Number of simulation steps in one hour.
+
+    Raises:
+        ValueError: If the timestep does not divide one hour evenly
+    """
+    if timestep_hours <= 0:
+        raise ValueError("timestep_hours must be positive")
+    steps = round(1 / timestep_hours)
+    if steps < 1 or abs(steps * timestep_hours - 1) > 1e-9:
+        raise ValueError(f"timestep_hours={timestep_hours} does not divide one hour")
+    return steps
+
+
+def steps_to_hours(steps, timestep_hours: float):
+    """Convert a step count to hours (kept integral for hourly steps)."""
+    return steps if timestep_hours == 1 else steps * timestep_hours
@@ -0,0 +1,200 @@
+"""
+Stage Cache Module - BESS & DG Sizing Tool
+
+Memoised pipeline of named computation stages, for pages that would
+otherwise recompute everything top to bottom on each Streamlit rerun.
+
+A stage declares the inputs it reads: external inputs supplied by the
+caller (profiles, rules, widget values) or the outputs of other stages.
+Its cache key is a digest of its name and its inputs, where a stage input
+contributes that stage's own key, so a key changes exactly when something
+upstream of it changes. Outputs are kept in an LRU StageCache; running a
+stage computes only the stages on its path whose keys are not cached.
+
+Cached outputs are shared between reruns and must not be modified by the
+caller. Each run records per-stage timings (see StageCache.timings).
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+STAGE_CACHE_SIZE = 16
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Content digest of a stage input.
+
+    Args:
+        value: None, bool, number, string, date, numpy array, DataFrame,
+            Series, or a list/tuple/dict of these
+
+    Returns:
+        Hex digest; equal contents give equal digests
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _feed(digest, value)
+    return digest.hexdigest()
+
+
+def _feed(digest, value: Any) -> None:
+    if value is None or isinstance(value, (bool, str, date, datetime)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (int, float, np.number)):
+        digest.update(f"num:{float(value)!r};".encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"array:{value.dtype}:{value.shape};".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(f"frame:{list(getattr(value, 'columns', [value.name]))};".encode())
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, (list, tuple)):
+        if value and all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in value):
+            # Numeric sequences (hourly profiles) hash as one float array
+            digest.update(f"seq:{len(value)};".encode())
+            digest.update(np.asarray(value, dtype=float).tobytes())
+        else:
+            digest.update(f"list:{len(value)};".encode())
+            for item in value:
+                _feed(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)};".encode())
+        for key in sorted(value, key=str):
+            _feed(digest, str(key))
+            _feed(digest, value[key])
+    else:
+        raise TypeError(f"Cannot fingerprint stage input of type {type(value).__name__}")
+
+
+@dataclass
+class Stage:
+    """A named computation with declared inputs."""
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...]  # external input names or names of other stages
+
+
+class StageCache:
+    """LRU store of stage outputs with per-stage timing records."""
+
+    def __init__(self, size: int = STAGE_CACHE_SIZE):
+        """
+        Args:
+            size: Maximum number of cached stage outputs
+        """
+        self.size = size
+        self._outputs: "OrderedDict[str, Any]" = OrderedDict()
+        self.timings: Dict[str, Dict] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._outputs
+
+    def get(self, key: str) -> Any:
+        self._outputs.move_to_end(key)
+        return self._outputs[key]
+
+    def put(self, key: str, value: Any) -> None:
+        self._outputs[key] = value
+        if len(self._outputs) > self.size:
+            self._outputs.popitem(last=False)
+
+    def record(self, name: str, seconds: float, cached: bool) -> None:
+        """Record one stage run (seconds: its own compute time, 0 on a cache hit)."""
+        entry = self.timings.setdefault(name, {'runs': 0, 'hits': 0, 'seconds': 0.0,
+                                               'last_seconds': 0.0, 'last_cached': False})
+        entry['runs'] += 1
+        entry['hits'] += int(cached)
+        entry['seconds'] += seconds
+        entry['last_seconds'] = seconds
+        entry['last_cached'] = cached
+
+    def timing_table(self) -> pd.DataFrame:
+        """Per-stage timings: last run (seconds, cached), runs, hits and compute time."""
+        return pd.DataFrame([
+            {'stage': name, 'last_ms': t['last_seconds'] * 1000, 'cached': t['last_cached'],
+             'runs': t['runs'], 'hits': t['hits'], 'total_ms': t['seconds'] * 1000}
+            for name, t in self.timings.items()
+        ], columns=['stage', 'last_ms', 'cached', 'runs', 'hits', 'total_ms'])
+
+    def clear(self) -> None:
+        self._outputs.clear()
+        self.timings.clear()
+
+
+class StagePipeline:
+    """DAG of stages evaluated lazily against a StageCache."""
+
+    def __init__(self, cache: StageCache):
+        """
+        Args:
+            cache: Output store; keep it across reruns (e.g. in session state)
+                while the pipeline itself can be rebuilt each rerun
+        """
+        self.cache = cache
+        self.stages: Dict[str, Stage] = {}
+
+    def stage(self, name: str, inputs: Tuple[str, ...] = ()) -> Callable:
+        """
+        Decorator registering a stage.
+
+        The function is called with one keyword argument per input.
+
+        Args:
+            name: Stage name
+            inputs: External input or stage names
+        """
+        def register(func: Callable) -> Callable:
+            self.stages[name] = Stage(name, func, tuple(inputs))
+            return func
+        return register
+
+    def key(self, name: str, inputs: Dict[str, Any], _keys: Dict[str, str] = None) -> str:
+        """Cache key of a stage for the given external inputs."""
+        keys = {} if _keys is None else _keys
+        if name not in keys:
+            digest = hashlib.blake2b(name.encode(), digest_size=16)
+            for item in self.stages[name].inputs:
+                if item in self.stages:
+                    digest.update(self.key(item, inputs, keys).encode())
+                elif item in inputs:
+                    digest.update(fingerprint(inputs[item]).encode())
+                else:
+                    raise KeyError(f"Stage '{name}' needs input '{item}'")
+            keys[name] = digest.hexdigest()
+        return keys[name]
+
+    def run(self, name: str, **inputs) -> Any:
+        """
+        Output of a stage, computing it and any uncached upstream stages.
+
+        Args:
+            name: Stage name
+            **inputs: External inputs (inputs no stage on the path reads are ignored)
+
+        Returns:
+            Stage output (shared with the cache: do not modify)
+        """
+        return self._run(name, inputs, {})
+
+    def _run(self, name: str, inputs: Dict[str, Any], keys: Dict[str, str]) -> Any:
+        key = self.key(name, inputs, keys)
+        if key in self.cache:
+            self.cache.record(name, 0.0, cached=True)
+            return self.cache.get(key)
+
+        stage = self.stages[name]
+        args = {item: self._run(item, inputs, keys) if item in self.stages else inputs[item]
+                for item in stage.inputs}
+        start = time.perf_counter()
+        value = stage.func(**args)
+        self.cache.record(name, time.perf_counter() - start, cached=False)
+        self.cache.put(key, value)
+        return value
@@ -0,0 +1,279 @@
+"""
+Streaming Simulation Module - BESS & DG Sizing Tool
+
+Runs dispatch_engine over very long horizons (multi-decade, sub-hourly)
+in bounded memory. Profiles are consumed chunk by chunk (e.g. a month or a
+year at a time), the SimulationState carries across chunk boundaries, and
+each chunk's results are handed on as columns (one numpy array per
+HourlyResult field) before the next chunk starts. Nothing outlives its
+chunk unless a sink keeps it.
+
+Sinks are plain objects with consume(columns) and an optional close():
+MetricsAggregator folds chunks into SummaryMetrics, ChartBuffer keeps a
+bounded, evenly thinned trace for plotting, and any writer (e.g. Parquet)
+can be plugged in the same way.
+"""
+
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .dg_accounting import DGAccountant
+from .dispatch_engine import (
+    DISPATCH_FUNCTIONS, HourlyResult, SimulationParams, SummaryMetrics,
+    dispatch_template_0, has_contingency, initialize_simulation,
+    simulate_step, steps_per_hour, steps_to_hours,
+)
+
+
+HOURLY_COLUMNS = tuple(f.name for f in fields(HourlyResult))
+
+DEFAULT_CHUNK_HOURS = 8760
+
+# Flow columns summed into SummaryMetrics totals (MW per step -> MWh)
+_TOTAL_COLUMNS = {
+    'total_load': 'load',
+    'total_solar_generation': 'solar',
+    'total_solar_to_load': 'solar_to_load',
+    'total_solar_to_bess': 'solar_to_bess',
+    'total_solar_curtailed': 'solar_curtailed',
+    'total_bess_to_load': 'bess_to_load',
+    'total_dg_to_load': 'dg_to_load',
+    'total_dg_to_bess': 'dg_to_bess',
+    'total_dg_curtailed': 'dg_curtailed',
+    'total_unserved': 'unserved',
+}
+
+
+# =============================================================================
+# CHUNKS
+# =============================================================================
+
+def results_to_columns(results: Sequence[HourlyResult]) -> Dict[str, np.ndarray]:
+    """
+    Convert HourlyResult objects to columns.
+
+    Args:
+        results: Step results
+
+    Returns:
+        Dictionary of HOURLY_COLUMNS name -> array (strings as object arrays)
+    """
+    columns = {}
+    for name in HOURLY_COLUMNS:
+        values = [getattr(r, name) for r in results]
+        columns[name] = np.array(values, dtype=object) if name in ('dg_mode', 'bess_state') else np.array(values)
+    return columns
+
+
+def iter_profile_chunks(params: SimulationParams, num_hours: float,
+                        chunk_hours: float = DEFAULT_CHUNK_HOURS
+                        ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Slice the params profiles into (load, solar) chunks.
+
+    Profiles repeat when the horizon is longer than they are, as in
+    run_simulation, so a one-year profile can drive a 25-year run.
+
+    Args:
+        params: Parameters holding load_profile and solar_profile
+        num_hours: Horizon in hours
+        chunk_hours: Hours per chunk
+
+    Yields:
+        (load, solar) arrays of MW per step
+    """
+    step_count = steps_per_hour(params.timestep_hours)
+    num_steps = round(num_hours * step_count)
+    chunk_steps = max(1, round(chunk_hours * step_count))
+    load = np.asarray(params.load_profile, dtype=float)
+    solar = np.asarray(params.solar_profile, dtype=float)
+
+    for start in range(0, num_steps, chunk_steps):
+        index = np.arange(start, min(start + chunk_steps, num_steps))
+        yield (load[index % len(load)] if len(load) else np.zeros(len(index)),
+               solar[index % len(solar)] if len(solar) else np.zeros(len(index)))
+
+
+def stream_simulation(params: SimulationParams, template_id: int,
+                      chunks: Iterable[Tuple[Sequence[float], Sequence[float]]],
+                      sinks: Sequence = ()) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Simulate profile chunks one after another, carrying state across them.
+
+    The concatenated output equals run_simulation on the concatenated
+    profiles. params.load_profile / solar_profile are not read; the chunks
+    supply the profile values.
+
+    Args:
+        params: Simulation parameters
+        template_id: Template (0-6)
+        chunks: Iterable of (load, solar) chunks of MW per step (any length,
+            load and solar of equal length), e.g. iter_profile_chunks
+        sinks: Objects with consume(columns) (and optionally close()), fed
+            every chunk before it is yielded; closed when the stream ends
+
+    Yields:
+        Columns of each chunk (see results_to_columns)
+    """
+    state = initialize_simulation(params)
+    dispatch_func = DISPATCH_FUNCTIONS.get(template_id, dispatch_template_0)
+    contingency = has_contingency(params)
+    t = 0
+
+    try:
+        for load_chunk, solar_chunk in chunks:
+            if len(load_chunk) != len(solar_chunk):
+                raise ValueError("Load and solar chunks must have the same length")
+            results = []
+            for load, solar in zip(np.asarray(load_chunk, dtype=float).tolist(),
+                                   np.asarray(solar_chunk, dtype=float).tolist()):
+                results.append(simulate_step(params, state, dispatch_func, t, load, solar, contingency))
+                t += 1
+
+            columns = results_to_columns(results)
+            del results
+            for sink in sinks:
+                sink.consume(columns)
+            yield columns
+    finally:
+        for sink in sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
+
+
+def run_streaming(params: SimulationParams, template_id: int, num_hours: float,
+                  sinks: Sequence, chunk_hours: float = DEFAULT_CHUNK_HOURS) -> None:
+    """
+    Run a long horizon from the params profiles into sinks.
+
+    Args:
+        params: Simulation parameters and (repeating) profiles
+        template_id: Template (0-6)
+        num_hours: Horizon in hours (e.g. 25 * 8760)
+        sinks: Sinks receiving every chunk
+        chunk_hours: Hours per chunk
+    """
+    chunks = iter_profile_chunks(params, num_hours, chunk_hours)
+    for _ in stream_simulation(params, template_id, chunks, sinks):
+        pass
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+class MetricsAggregator:
+    """Folds chunk columns into SummaryMetrics (as calculate_metrics would)."""
+
+    def __init__(self, params: SimulationParams):
+        """
+        Args:
+            params: Simulation parameters (timestep and BESS usable capacity)
+        """
+        self.params = params
+        self.steps = 0
+        self.totals = {name: 0.0 for name in _TOTAL_COLUMNS}
+        self.steps_full = 0
+        self.steps_green = 0
+        self.steps_dg = 0
+        self.dg_starts = 0
+        self._dg_was_running = False
+        self.dg_accountant = DGAccountant(params)
+
+    def consume(self, columns: Dict[str, np.ndarray]) -> None:
+        for name, column in _TOTAL_COLUMNS.items():
+            self.totals[name] += float(np.sum(columns[column]))
+
+        dg_running = columns['dg_running'].astype(bool)
+        full = columns['unserved'] < 0.001
+        self.steps += len(dg_running)
+        self.steps_full += int(full.sum())
+        self.steps_green += int((full & ~dg_running).sum())
+        self.steps_dg += int(dg_running.sum())
+        if len(dg_running):
+            previous = np.concatenate([[self._dg_was_running], dg_running[:-1]])
+            self.dg_starts += int((dg_running & ~previous).sum())
+            self._dg_was_running = bool(dg_running[-1])
+        self.dg_accountant.consume(columns['dg_to_load'] + columns['dg_to_bess'], columns['dg_curtailed'], dg_running)
+
+    def result(self) -> SummaryMetrics:
+        """SummaryMetrics over everything consumed so far."""
+        params = self.params
+        dt = params.timestep_hours
+        metrics = SummaryMetrics()
+        for name, total in self.totals.items():
+            setattr(metrics, name, total * dt)
+
+        metrics.hours_full_delivery = steps_to_hours(self.steps_full, dt)
+        metrics.hours_green_delivery = steps_to_hours(self.steps_green, dt)
+        metrics.hours_with_dg = steps_to_hours(self.steps_dg, dt)
+        if self.steps > 0:
+            metrics.pct_full_delivery = self.steps_full / self.steps * 100
+            metrics.pct_green_delivery = self.steps_green / self.steps * 100
+        if metrics.total_load > 0:
+            metrics.pct_unserved = metrics.total_unserved / metrics.total_load * 100
+        if metrics.total_solar_generation > 0:
+            metrics.pct_solar_curtailed = metrics.total_solar_curtailed / metrics.total_solar_generation * 100
+
+        metrics.dg_runtime_hours = metrics.hours_with_dg
+        metrics.dg_starts = self.dg_starts
+        metrics.bess_throughput = metrics.total_bess_to_load
+        usable = params.bess_capacity * (params.bess_max_soc - params.bess_min_soc) / 100
+        if usable > 0:
+            metrics.bess_equivalent_cycles = metrics.bess_throughput / usable
+        for name, values in self.dg_accountant.result().items():
+            setattr(metrics, name, values[0].item())
+        return metrics
+
+
+class ChartBuffer:
+    """
+    Bounded trace of selected columns for plotting.
+
+    Keeps every stride-th step; whenever the buffer would exceed max_points
+    it drops every other kept point and doubles the stride, so the trace
+    stays evenly spaced over the whole horizon in at most max_points rows.
+    """
+
+    def __init__(self, columns: Sequence[str] = ('soc_pct', 'solar', 'load', 'unserved'),
+                 max_points: int = 5000):
+        """
+        Args:
+            columns: HourlyResult columns to keep
+            max_points: Maximum points held
+        """
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+        self.columns = tuple(columns)
+        self.max_points = max_points
+        self.stride = 1
+        self._next = 0  # step index of the next point to keep
+        self._seen = 0
+        self._data: Dict[str, List[np.ndarray]] = {name: [] for name in ('t',) + self.columns}
+
+    def consume(self, columns: Dict[str, np.ndarray]) -> None:
+        length = len(columns['t'])
+        offsets = np.arange(self._next - self._seen, length, self.stride)
+        if len(offsets):
+            for name in self._data:
+                self._data[name].append(np.asarray(columns[name])[offsets])
+            self._next = self._seen + int(offsets[-1]) + self.stride
+        self._seen += length
+
+        while len(self) > self.max_points:
+            for name, parts in self._data.items():
+                self._data[name] = [np.concatenate(parts)[::2]]
+            self.stride *= 2
+            kept_t = self._data['t'][0]
+            self._next = int(kept_t[-1]) - 1 + self.stride if len(kept_t) else self._seen
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._data['t'])
+
+    def frame(self) -> Dict[str, np.ndarray]:
+        """Buffered columns ('t' plus the selected columns)."""
+        return {name: np.concatenate(parts) if parts else np.array([])
+                for name, parts in self._data.items()}
@@ -0,0 +1,314 @@
+"""
+Study Store Module - BESS & DG Sizing Tool
+
+Local SQLite database (stdlib sqlite3) of sweep results.
+
+Each study holds one row per configuration (the Step 3 results table) and
+is keyed by a digest of everything that determines its results: the
+simulation parameters, profile contents, template and configuration
+grid. Rerunning an identical sweep finds the stored study instead of
+running the engine, and any past study reloads in milliseconds. Studies
+with the same parameters and profiles also share a base key, so a widened
+or refined grid only simulates its new configurations (see sweep_planner).
+
+The Step 4 quick filters, the dominated-configuration filter and top-N
+lookups run as SQL against indexed result columns.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import STUDY_DB_PATH
+from .dispatch_engine import SimulationParams
+from .profile_stats import profile_digest
+
+
+# Result columns -> SQLite type (Step 3 results table)
+RESULT_COLUMNS = {
+    'bess_mwh': 'REAL',
+    'duration_hrs': 'INTEGER',
+    'power_mw': 'REAL',
+    'dg_mw': 'REAL',
+    'solar_mw': 'REAL',
+    'delivery_pct': 'REAL',
+    'wastage_pct': 'REAL',
+    'delivery_hours': 'INTEGER',
+    'green_hours': 'INTEGER',
+    'dg_hours': 'INTEGER',
+    'dg_starts': 'INTEGER',
+    'bess_cycles': 'REAL',
+    'unserved_mwh': 'REAL',
+    'fuel_litres': 'REAL',
+    'co2_tonnes': 'REAL',
+    'dg_low_load_hours': 'REAL',
+}
+
+# Step 4 quick filters as SQL predicates
+FILTER_CLAUSES = {
+    'full_delivery': 'delivery_pct >= 99.9',
+    'zero_dg': 'dg_hours = 0',
+    'low_wastage': 'wastage_pct <= 2',
+}
+
+_PROFILE_FIELDS = ('load_profile', 'solar_profile', 'dg_availability',
+                   'bess_power_availability', 'bess_energy_availability')
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS studies (
+    study_id INTEGER PRIMARY KEY,
+    study_key TEXT NOT NULL UNIQUE,
+    base_key TEXT,
+    name TEXT,
+    created TEXT NOT NULL,
+    template_id INTEGER,
+    configurations INTEGER NOT NULL,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    study_id INTEGER NOT NULL REFERENCES studies(study_id) ON DELETE CASCADE,
+    config_id INTEGER NOT NULL,
+    {', '.join(f'{name} {kind}' for name, kind in RESULT_COLUMNS.items())},
+    PRIMARY KEY (study_id, config_id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_delivery ON results(study_id, delivery_pct);
+CREATE INDEX IF NOT EXISTS idx_results_dg_hours ON results(study_id, dg_hours);
+CREATE INDEX IF NOT EXISTS idx_results_wastage ON results(study_id, wastage_pct);
+CREATE INDEX IF NOT EXISTS idx_results_bess ON results(study_id, bess_mwh);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_studies_base ON studies(base_key);
+"""
+
+
+def _base_payload(params: SimulationParams, template_id: int) -> bytes:
+    scalars = {name: value for name, value in asdict(params).items() if name not in _PROFILE_FIELDS}
+    profiles = {name: profile_digest(getattr(params, name)) for name in _PROFILE_FIELDS}
+    return json.dumps({'template_id': template_id, 'params': scalars, 'profiles': profiles},
+                      sort_keys=True, default=str).encode()
+
+
+def base_key(params: SimulationParams, template_id: int) -> str:
+    """
+    Content key of a sweep's shared inputs (parameters, profiles, template).
+
+    Studies with equal base keys differ only in their configuration grids,
+    so their results can be combined.
+
+    Args:
+        params: Shared simulation parameters (profiles are digested)
+        template_id: Template (0-6)
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.blake2b(_base_payload(params, template_id), digest_size=20).hexdigest()
+
+
+def study_key(params: SimulationParams, template_id: int,
+              configs: Dict[str, Sequence[float]]) -> str:
+    """
+    Content key of a sweep.
+
+    Args:
+        params: Shared simulation parameters (profiles are digested)
+        template_id: Template (0-6)
+        configs: Per-configuration arrays (e.g. the batch lanes), in order
+
+    Returns:
+        Hex digest; equal inputs give equal keys
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(_base_payload(params, template_id))
+    for name in sorted(configs):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(configs[name], dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class StudyStore:
+    """SQLite-backed store of sweep studies."""
+
+    def __init__(self, path: Union[str, Path] = STUDY_DB_PATH):
+        """
+        Args:
+            path: Database file (created on first use), or ':memory:'
+        """
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.executescript(_SCHEMA)
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(studies)')]
+        if 'base_key' not in columns:  # stores created before base keys
+            self._conn.execute('ALTER TABLE studies ADD COLUMN base_key TEXT')
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(results)')]
+        for name, kind in RESULT_COLUMNS.items():
+            if name not in columns:  # stores created before the column existed
+                self._conn.execute(f'ALTER TABLE results ADD COLUMN {name} {kind}')
+        self._conn.executescript(_INDEXES)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # -------------------------------------------------------------------------
+    # Studies
+    # -------------------------------------------------------------------------
+
+    def find(self, key: str) -> Optional[int]:
+        """Study id stored under a content key, or None."""
+        row = self._conn.execute('SELECT study_id FROM studies WHERE study_key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, key: str, results: pd.DataFrame, name: Optional[str] = None,
+             template_id: Optional[int] = None, metadata: Optional[Dict] = None,
+             base: Optional[str] = None) -> int:
+        """
+        Store a study (replacing any study with the same key).
+
+        Args:
+            key: Content key (see study_key)
+            results: Results table; rows are numbered as config ids in order
+            name: Display name (default: creation time)
+            template_id: Template of the sweep
+            metadata: JSON-serialisable extras (e.g. the Parquet file path)
+            base: Base key of the sweep (see base_key), for incremental reuse
+
+        Returns:
+            New study id
+        """
+        created = datetime.now().isoformat(timespec='seconds')
+        columns = [c for c in RESULT_COLUMNS if c in results.columns]
+        values = [results[c].to_numpy() for c in columns]
+        rows = ((i, *(v[i].item() for v in values)) for i in range(len(results)))
+
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM studies WHERE study_key = ?', (key,))
+            cursor = self._conn.execute(
+                'INSERT INTO studies (study_key, base_key, name, created, template_id, configurations, metadata) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, base, name or created.replace('T', ' '), created, template_id, len(results),
+                 json.dumps(metadata or {}, default=str)))
+            study_id = cursor.lastrowid
+            self._conn.executemany(
+                f"INSERT INTO results (study_id, config_id, {', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * (len(columns) + 2))})",
+                ((study_id, *row) for row in rows))
+        return study_id
+
+    def list_studies(self) -> List[Dict]:
+        """Stored studies, newest first (without their results)."""
+        cursor = self._conn.execute(
+            'SELECT study_id, name, created, template_id, configurations, metadata '
+            'FROM studies ORDER BY study_id DESC')
+        return [{'study_id': r[0], 'name': r[1], 'created': r[2], 'template_id': r[3],
+                 'configurations': r[4], 'metadata': json.loads(r[5] or '{}')} for r in cursor]
+
+    def delete(self, study_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM studies WHERE study_id = ?', (study_id,))
+
+    # -------------------------------------------------------------------------
+    # Results
+    # -------------------------------------------------------------------------
+
+    def load(self, study_id: int) -> pd.DataFrame:
+        """Full results table of a study, indexed by config id."""
+        return self.query(study_id)
+
+    def query(self, study_id: int, filters: Optional[Dict[str, bool]] = None,
+              order_by: Optional[str] = None, ascending: bool = False,
+              limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Filtered, ordered results of a study.
+
+        Args:
+            study_id: Study id
+            filters: Step 4 filter flags (FILTER_CLAUSES keys and
+                'hide_dominated'); dominance is judged among the rows that
+                pass the other filters, as in the Step 4 table
+            order_by: RESULT_COLUMNS name to order by (ties by config id)
+            ascending: Sort direction
+            limit: Maximum rows (top-N)
+
+        Returns:
+            DataFrame of RESULT_COLUMNS indexed by config_id
+        """
+        filters = filters or {}
+        clauses = [FILTER_CLAUSES[name] for name, on in filters.items() if on and name in FILTER_CLAUSES]
+        where = ' AND '.join(['study_id = ?'] + clauses)
+
+        sql = f"SELECT config_id, {', '.join(RESULT_COLUMNS)} FROM results r WHERE {where}"
+        args = [study_id]
+
+        if filters.get('hide_dominated'):
+            other = ' AND '.join(['o.study_id = r.study_id', 'o.config_id != r.config_id']
+                                 + [f'o.{c}' for c in clauses])
+            sql += f"""
+                AND NOT EXISTS (
+                    SELECT 1 FROM results o
+                    WHERE {other}
+                      AND o.bess_mwh <= r.bess_mwh AND o.solar_mw <= r.solar_mw
+                      AND o.delivery_pct >= r.delivery_pct AND o.wastage_pct <= r.wastage_pct
+                      AND o.dg_hours <= r.dg_hours
+                      AND (o.delivery_pct > r.delivery_pct OR o.wastage_pct < r.wastage_pct
+                           OR o.dg_hours < r.dg_hours OR o.bess_mwh < r.bess_mwh
+                           OR o.solar_mw < r.solar_mw)
+                )"""
+
+        if order_by is not None:
+            if order_by not in RESULT_COLUMNS:
+                raise ValueError(f"Cannot order by '{order_by}'")
+            sql += f" ORDER BY {order_by} {'ASC' if ascending else 'DESC'}, config_id ASC"
+        else:
+            sql += ' ORDER BY config_id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(int(limit))
+
+        df = pd.read_sql_query(sql, self._conn, params=args, index_col='config_id')
+        df.index.name = None
+        return df
+
+    def base_results(self, base: str) -> pd.DataFrame:
+        """
+        Results of every study sharing a base key, newest study first.
+
+        Args:
+            base: Base key (see base_key)
+
+        Returns:
+            DataFrame of RESULT_COLUMNS (configurations may repeat across
+            studies; the first occurrence is the newest)
+        """
+        sql = (f"SELECT {', '.join('r.' + c for c in RESULT_COLUMNS)} FROM results r "
+               "JOIN studies s ON s.study_id = r.study_id "
+               "WHERE s.base_key = ? ORDER BY r.study_id DESC, r.config_id")
+        return pd.read_sql_query(sql, self._conn, params=[base])
+
+    def best(self, study_id: int, metric: str = 'delivery_pct', n: int = 1,
+             filters: Optional[Dict[str, bool]] = None, ascending: bool = False) -> pd.DataFrame:
+        """Top-n configurations by a metric (see query)."""
+        return self.query(study_id, filters, order_by=metric, ascending=ascending, limit=n)
+
+
+_stores: Dict[str, StudyStore] = {}
+
+
+def get_study_store(path: Union[str, Path] = STUDY_DB_PATH) -> StudyStore:
+    """Shared StudyStore per database path."""
+    key = str(path)
+    if key not in _stores:
+        _stores[key] = StudyStore(path)
+    return _stores[key]
@@ -0,0 +1,287 @@
+"""
+Surrogate Module - BESS & DG Sizing Tool
+
+Instant metric estimates between the configurations of a finished sweep.
+
+A sweep grid is a set of lines along BESS capacity, one per (duration,
+DG, solar) combination. Along each line the metrics are interpolated with
+a monotone piecewise cubic (PCHIP, Fritsch-Carlson): delivery and
+wastage curves that rise or fall with capacity keep doing so between grid
+points, without the overshoot of a plain cubic spline. Across duration,
+DG and solar the surrogate blends the neighbouring lines linearly.
+
+Each estimate carries an error bar from leave-one-out cross-validation on
+the sweep itself: every interior grid point (and every interior
+duration/DG/solar level) is predicted from its neighbours with the point
+removed, and the ERROR_QUANTILE of the absolute residuals is kept per
+metric. Removing a point doubles the local spacing, so the bar is on the
+cautious side. Estimates at grid points are exact.
+"""
+
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sweep_planner import snap
+
+
+# Metrics estimated by default (Step 3 results columns)
+SURROGATE_METRICS = ('delivery_pct', 'wastage_pct', 'dg_hours', 'unserved_mwh')
+
+CAPACITY_AXIS = 'bess_mwh'
+LINEAR_AXES = ('duration_hrs', 'dg_mw', 'solar_mw')
+
+# Quantile of the absolute leave-one-out residuals reported as the error bar
+ERROR_QUANTILE = 0.9
+
+# Leave-one-out samples per error estimate (larger sweeps are subsampled)
+MAX_VALIDATION_POINTS = 2000
+
+# Query values this close to a grid value count as on the grid
+_NODE_TOLERANCE = 1e-6
+
+
+# =============================================================================
+# MONOTONE CUBIC INTERPOLATION
+# =============================================================================
+
+def _edge_slope(h0: float, h1: float, delta0: np.ndarray, delta1: np.ndarray) -> np.ndarray:
+    """Shape-preserving three-point slope at an end of the data."""
+    slope = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    slope = np.where(np.sign(slope) != np.sign(delta0), 0.0, slope)
+    overshoot = (np.sign(delta0) != np.sign(delta1)) & (np.abs(slope) > 3 * np.abs(delta0))
+    return np.where(overshoot, 3 * delta0, slope)
+
+
+def pchip_slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Fritsch-Carlson slopes of a monotone piecewise cubic.
+
+    Args:
+        x: Strictly increasing sample positions, shape (n,)
+        y: Sample values, shape (n,) or (n, metrics)
+
+    Returns:
+        Slopes with the shape of y
+    """
+    h = np.diff(x)
+    delta = np.diff(y, axis=0) / h.reshape(-1, *([1] * (y.ndim - 1)))
+    if len(x) == 2:
+        return np.repeat(delta, 2, axis=0)
+
+    slopes = np.zeros_like(y, dtype=float)
+    h_prev = h[:-1].reshape(-1, *([1] * (y.ndim - 1)))
+    h_next = h[1:].reshape(-1, *([1] * (y.ndim - 1)))
+    w1 = 2 * h_next + h_prev
+    w2 = h_next + 2 * h_prev
+    same_sign = delta[:-1] * delta[1:] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    slopes[1:-1] = np.where(same_sign, harmonic, 0.0)
+    slopes[0] = _edge_slope(h[0], h[1], delta[0], delta[1])
+    slopes[-1] = _edge_slope(h[-1], h[-2], delta[-1], delta[-2])
+    return slopes
+
+
+def pchip_interpolate(x: np.ndarray, y: np.ndarray, xq) -> np.ndarray:
+    """
+    Evaluate the monotone cubic through (x, y).
+
+    Queries outside [x[0], x[-1]] are clamped to the nearest end.
+
+    Args:
+        x: Strictly increasing sample positions, shape (n,)
+        y: Sample values, shape (n,) or (n, metrics)
+        xq: Query position(s)
+
+    Returns:
+        Values at xq: shape (queries,) + y.shape[1:]
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    xq = np.clip(np.atleast_1d(np.asarray(xq, dtype=float)), x[0], x[-1])
+    if len(x) == 1:
+        return np.repeat(y[:1], len(xq), axis=0)
+
+    slopes = pchip_slopes(x, y)
+    k = np.clip(np.searchsorted(x, xq, side='right') - 1, 0, len(x) - 2)
+    h = (x[k + 1] - x[k]).reshape(-1, *([1] * (y.ndim - 1)))
+    t = ((xq - x[k]) / (x[k + 1] - x[k])).reshape(h.shape)
+
+    # Cubic Hermite basis
+    h00 = (1 + 2 * t) * (1 - t) ** 2
+    h10 = t * (1 - t) ** 2
+    h01 = t ** 2 * (3 - 2 * t)
+    h11 = t ** 2 * (t - 1)
+    return h00 * y[k] + h10 * h * slopes[k] + h01 * y[k + 1] + h11 * h * slopes[k + 1]
+
+
+def _bracket(levels: np.ndarray, value: float) -> Tuple[List[Tuple[float, float]], bool, bool]:
+    """
+    Neighbouring levels of a value with linear weights.
+
+    Returns:
+        Tuple of ([(level, weight), ...], inside the level range,
+        on a level)
+    """
+    if value <= levels[0] + _NODE_TOLERANCE or value >= levels[-1] - _NODE_TOLERANCE:
+        nearest = levels[0] if value <= levels[0] + _NODE_TOLERANCE else levels[-1]
+        inside = abs(value - nearest) <= _NODE_TOLERANCE
+        return [(nearest, 1.0)], inside, True
+    hi = int(np.searchsorted(levels, value))
+    if abs(levels[hi] - value) <= _NODE_TOLERANCE:
+        return [(levels[hi], 1.0)], True, True
+    lo = hi - 1
+    weight = (value - levels[lo]) / (levels[hi] - levels[lo])
+    return [(levels[lo], 1.0 - weight), (levels[hi], weight)], True, False
+
+
+# =============================================================================
+# SWEEP SURROGATE
+# =============================================================================
+
+class SweepSurrogate:
+    """Interpolating model of a sweep's metrics over the sizing axes."""
+
+    def __init__(self, results: pd.DataFrame, metrics: Sequence[str] = SURROGATE_METRICS):
+        """
+        Args:
+            results: Step 3 results table (complete or partial sweep)
+            metrics: Result columns to estimate (missing columns are skipped)
+        """
+        self.metrics = [m for m in metrics if m in results.columns]
+        table = pd.DataFrame({CAPACITY_AXIS: snap(results[CAPACITY_AXIS])})
+        for axis in LINEAR_AXES:
+            table[axis] = snap(results[axis]) if axis in results else 0.0
+        for metric in self.metrics:
+            table[metric] = results[metric].to_numpy(dtype=float)
+        table = table.drop_duplicates([CAPACITY_AXIS, *LINEAR_AXES]).sort_values(CAPACITY_AXIS)
+
+        self.configurations = len(table)
+        self.levels = {axis: np.unique(table[axis].to_numpy()) for axis in LINEAR_AXES}
+        self.capacity_range = (float(table[CAPACITY_AXIS].min()), float(table[CAPACITY_AXIS].max()))
+        self._lines: Dict[Tuple[float, ...], Tuple[np.ndarray, np.ndarray]] = {
+            line: (group[CAPACITY_AXIS].to_numpy(), group[self.metrics].to_numpy())
+            for line, group in table.groupby(list(LINEAR_AXES))
+        }
+        self.errors = self._cross_validate()
+
+    # -------------------------------------------------------------------------
+    # Prediction
+    # -------------------------------------------------------------------------
+
+    def _line_value(self, line: Tuple[float, ...], bess_mwh: float) -> Optional[Tuple[np.ndarray, bool, bool]]:
+        """Metrics of one line at a capacity: (values, inside, on a grid point)."""
+        if line not in self._lines:
+            return None
+        x, y = self._lines[line]
+        on_node = bool(np.any(np.abs(x - bess_mwh) <= _NODE_TOLERANCE))
+        inside = x[0] - _NODE_TOLERANCE <= bess_mwh <= x[-1] + _NODE_TOLERANCE
+        return pchip_interpolate(x, y, bess_mwh)[0], inside, on_node
+
+    def predict(self, bess_mwh: float, duration_hrs: float, dg_mw: float = 0.0,
+                solar_mw: Optional[float] = None) -> Optional[Dict]:
+        """
+        Estimate the metrics of one configuration.
+
+        Args:
+            bess_mwh: BESS energy capacity (MWh)
+            duration_hrs: BESS duration (hours)
+            dg_mw: DG capacity (MW)
+            solar_mw: PV capacity (MWp); None uses the sweep's (smallest)
+                solar capacity
+
+        Returns:
+            Dictionary with 'values' and 'errors' (metric -> float; errors are
+            NaN where the sweep gives nothing to cross-validate against) and
+            'in_range' (False when any axis was clamped to the sweep edge),
+            or None when no sweep line surrounds the query
+        """
+        if solar_mw is None:
+            solar_mw = float(self.levels['solar_mw'][0])
+        query = {'duration_hrs': duration_hrs, 'dg_mw': dg_mw, 'solar_mw': solar_mw}
+
+        brackets = {}
+        in_range = True
+        error_sq = np.zeros(len(self.metrics))
+        for axis in LINEAR_AXES:
+            brackets[axis], inside, on_level = _bracket(self.levels[axis], float(query[axis]))
+            in_range &= inside
+            if not on_level:
+                error_sq += self.errors.get(axis, np.full(len(self.metrics), np.nan)) ** 2
+
+        total = np.zeros(len(self.metrics))
+        weight_sum = 0.0
+        capacity_on_node = True
+        for corner in product(*(brackets[axis] for axis in LINEAR_AXES)):
+            weight = float(np.prod([w for _, w in corner]))
+            if weight <= 0:
+                continue
+            value = self._line_value(tuple(level for level, _ in corner), float(bess_mwh))
+            if value is None:
+                continue
+            values, inside, on_node = value
+            total += weight * values
+            weight_sum += weight
+            in_range &= inside
+            capacity_on_node &= on_node
+        if weight_sum == 0:
+            return None
+
+        if not capacity_on_node:
+            error_sq += self.errors.get(CAPACITY_AXIS, np.full(len(self.metrics), np.nan)) ** 2
+        values = total / weight_sum
+        errors = np.sqrt(error_sq)
+        return {
+            'values': dict(zip(self.metrics, values.tolist())),
+            'errors': dict(zip(self.metrics, errors.tolist())),
+            'in_range': bool(in_range),
+        }
+
+    # -------------------------------------------------------------------------
+    # Cross-validation
+    # -------------------------------------------------------------------------
+
+    def _cross_validate(self) -> Dict[str, np.ndarray]:
+        """Leave-one-out error per axis: axis -> ERROR_QUANTILE per metric."""
+        rng = np.random.default_rng(0)
+        errors = {}
+
+        # Along capacity: drop each interior point of a line
+        samples = [(line, i) for line, (x, _) in self._lines.items() for i in range(1, len(x) - 1)]
+        if samples:
+            if len(samples) > MAX_VALIDATION_POINTS:
+                samples = [samples[i] for i in rng.choice(len(samples), MAX_VALIDATION_POINTS, replace=False)]
+            residuals = []
+            for line, i in samples:
+                x, y = self._lines[line]
+                keep = np.arange(len(x)) != i
+                residuals.append(pchip_interpolate(x[keep], y[keep], x[i])[0] - y[i])
+            errors[CAPACITY_AXIS] = np.quantile(np.abs(residuals), ERROR_QUANTILE, axis=0)
+
+        # Across duration / DG / solar: drop each interior level of a line
+        for position, axis in enumerate(LINEAR_AXES):
+            levels = self.levels[axis]
+            residuals = []
+            for line, (x, y) in self._lines.items():
+                k = int(np.searchsorted(levels, line[position]))
+                if k == 0 or k == len(levels) - 1:
+                    continue
+                lo = line[:position] + (levels[k - 1],) + line[position + 1:]
+                hi = line[:position] + (levels[k + 1],) + line[position + 1:]
+                if lo not in self._lines or hi not in self._lines:
+                    continue
+                weight = (levels[k] - levels[k - 1]) / (levels[k + 1] - levels[k - 1])
+                blend = ((1 - weight) * pchip_interpolate(*self._lines[lo], x)
+                         + weight * pchip_interpolate(*self._lines[hi], x))
+                covered = ((x >= max(self._lines[lo][0][0], self._lines[hi][0][0]))
+                           & (x <= min(self._lines[lo][0][-1], self._lines[hi][0][-1])))
+                residuals.extend(blend[covered] - y[covered])
+            if residuals:
+                if len(residuals) > MAX_VALIDATION_POINTS:
+                    residuals = [residuals[i] for i in rng.choice(len(residuals), MAX_VALIDATION_POINTS,
+                                                                  replace=False)]
+                errors[axis] = np.quantile(np.abs(residuals), ERROR_QUANTILE, axis=0)
+        return errors
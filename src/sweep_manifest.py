@@ -0,0 +1,520 @@
+"""
+Sweep Manifest Module - BESS & DG Sizing Tool
+
+Resumable sizing sweeps with on-disk checkpoints.
+
+A sweep lives in its own directory under SWEEP_DIR, named by its sweep id
+(the leading characters of the study key, so an identical sweep always
+maps to the same manifest):
+
+- manifest.json: sweep id, study key, template, chunk layout, metadata
+- params.json:   the shared SimulationParams (profiles included)
+- configs.npz:   the configuration list (one array per config column)
+- prior.npz:     results reused from earlier studies (incremental sweeps)
+- order.npz:     run order of the remaining configurations
+- status.json:   completed chunks, progress, state and a heartbeat
+- chunk_NNNNN.npz: results of each finished chunk of configurations
+
+Configurations without prior results run in chunks of chunk_configs
+batch lanes. Each finished
+chunk is flushed to disk (results first, then the status, both replaced
+atomically) before the next one starts, so an interrupted sweep loses at
+most the chunk in flight. With the 'progressive' schedule the run order
+comes from sweep_planner (corners, Halton fill, then knee refinement, which
+reorders the not-yet-run tail once enough results exist), so the results
+of any prefix already outline the delivery frontier. run_sweep skips
+finished chunks, which makes
+resuming the same call as starting; it needs nothing but the manifest, so
+a headless script and the Step 3 page can both attach to a sweep by id.
+"""
+
+import json
+import os
+import shutil
+import socket
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .batch_engine import run_batch_metrics
+from .config import SWEEP_DIR
+from .dispatch_engine import SimulationParams
+from .sweep_planner import FILL_FRACTION, knee_order, progressive_order
+
+
+DEFAULT_CHUNK_CONFIGS = 1024
+
+# A running sweep refreshes its heartbeat at least this often (seconds)
+HEARTBEAT_STALE_SECONDS = 120
+
+SWEEP_ID_LENGTH = 16
+
+# Configuration columns (results table names) and their batch lanes
+CONFIG_COLUMNS = ('bess_mwh', 'duration_hrs', 'power_mw', 'dg_mw', 'solar_mw', 'solar_scale')
+
+# Results table column -> SummaryMetrics field
+METRIC_COLUMNS = {
+    'delivery_pct': 'pct_full_delivery',
+    'wastage_pct': 'pct_solar_curtailed',
+    'delivery_hours': 'hours_full_delivery',
+    'green_hours': 'hours_green_delivery',
+    'dg_hours': 'dg_runtime_hours',
+    'dg_starts': 'dg_starts',
+    'bess_cycles': 'bess_equivalent_cycles',
+    'unserved_mwh': 'total_unserved',
+    'fuel_litres': 'dg_fuel_litres',
+    'co2_tonnes': 'dg_co2_tonnes',
+    'dg_low_load_hours': 'dg_low_load_hours',
+}
+
+SCHEDULES = ('grid', 'progressive')
+
+# States recorded in status.json
+PENDING, RUNNING, INTERRUPTED, COMPLETE = 'pending', 'running', 'interrupted', 'complete'
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    """Write through a temporary file and rename it over path."""
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(temp)
+    os.replace(temp, path)
+
+
+def _write_npz(path: Path, arrays: Dict[str, np.ndarray]) -> None:
+    def write(temp):
+        with temp.open('wb') as handle:
+            np.savez(handle, **arrays)
+    _write_atomic(path, write)
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    _write_atomic(path, lambda temp: temp.write_text(json.dumps(data, indent=1, default=float)))
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+class SweepManifest:
+    """On-disk manifest and checkpoints of one sweep."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Open an existing sweep directory (see create / open).
+
+        Args:
+            directory: Sweep directory holding manifest.json
+        """
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / 'manifest.json').read_text())
+        self.sweep_id = manifest['sweep_id']
+        self.key = manifest['key']
+        self.template_id = manifest['template_id']
+        self.total = manifest['total']
+        self.chunk_configs = manifest['chunk_configs']
+        self.num_hours = manifest['num_hours']
+        self.created = manifest['created']
+        self.metadata = manifest.get('metadata', {})
+        self.reused = manifest.get('reused', 0)
+        self.schedule = manifest.get('schedule', 'grid')
+        self._configs = None
+        self._prior_rows = None
+        self._run_rows = None
+
+    @classmethod
+    def create(cls, key: str, params: SimulationParams, template_id: int,
+               configs: Dict[str, np.ndarray], num_hours: float = 8760,
+               chunk_configs: int = DEFAULT_CHUNK_CONFIGS,
+               metadata: Optional[Dict] = None,
+               prior: Optional[pd.DataFrame] = None,
+               schedule: str = 'grid',
+               directory: Union[str, Path] = SWEEP_DIR) -> 'SweepManifest':
+        """
+        Create the manifest of a sweep, or open it if it already exists.
+
+        Args:
+            key: Study key of the sweep (see study_store.study_key)
+            params: Shared simulation parameters
+            template_id: Template (0-6)
+            configs: CONFIG_COLUMNS name -> per-config array, in sweep order
+            num_hours: Simulated hours per configuration
+            chunk_configs: Configurations per batched pass (and checkpoint)
+            metadata: JSON-serialisable extras (e.g. Step 1 inputs)
+            prior: Known results (METRIC_COLUMNS) indexed by config position,
+                e.g. sweep_planner.match_prior; these configs are not rerun
+            schedule: 'grid' (sweep order) or 'progressive' (early insight)
+            directory: Parent directory of sweep directories
+
+        Returns:
+            SweepManifest; an existing sweep with the same key keeps its
+            checkpoints
+        """
+        missing = set(CONFIG_COLUMNS) - set(configs)
+        if missing:
+            raise ValueError(f"Missing config columns: {sorted(missing)}")
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unknown schedule '{schedule}' (expected one of {SCHEDULES})")
+
+        sweep_id = key[:SWEEP_ID_LENGTH]
+        path = Path(directory) / sweep_id
+        if (path / 'manifest.json').exists():
+            manifest = cls(path)
+            if manifest.key == key:
+                return manifest
+            shutil.rmtree(path)  # id collision with a different sweep
+        path.mkdir(parents=True, exist_ok=True)
+
+        arrays = {name: np.asarray(configs[name], dtype=float) for name in CONFIG_COLUMNS}
+        total = len(arrays['bess_mwh'])
+        reused = 0 if prior is None else len(prior)
+        run_rows = np.arange(total)
+        _write_npz(path / 'configs.npz', arrays)
+        if reused:
+            _write_npz(path / 'prior.npz', {
+                'rows': prior.index.to_numpy(dtype=np.int64),
+                **{name: prior[name].to_numpy() for name in METRIC_COLUMNS},
+            })
+            run_rows = np.setdiff1d(run_rows, prior.index.to_numpy(dtype=np.int64))
+        if schedule == 'progressive':
+            run_rows = run_rows[progressive_order(pd.DataFrame(arrays).iloc[run_rows])]
+        _write_npz(path / 'order.npz', {'rows': run_rows})
+        _write_json(path / 'params.json', asdict(params))
+        _write_json(path / 'status.json', {
+            'state': PENDING, 'completed_chunks': [], 'completed': reused,
+            'progress': reused / total if total else 0.0,
+            'updated': time.time(), 'owner': None,
+        })
+        _write_json(path / 'manifest.json', {
+            'sweep_id': sweep_id,
+            'key': key,
+            'template_id': template_id,
+            'total': total,
+            'chunk_configs': int(chunk_configs),
+            'num_hours': num_hours,
+            'reused': reused,
+            'schedule': schedule,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'metadata': metadata or {},
+        })
+        return cls(path)
+
+    @classmethod
+    def open(cls, sweep_id: str, directory: Union[str, Path] = SWEEP_DIR) -> 'SweepManifest':
+        """
+        Attach to a sweep by id.
+
+        Args:
+            sweep_id: Sweep id (or the full study key)
+            directory: Parent directory of sweep directories
+
+        Returns:
+            SweepManifest
+        """
+        path = Path(directory) / sweep_id[:SWEEP_ID_LENGTH]
+        if not (path / 'manifest.json').exists():
+            raise FileNotFoundError(f"No sweep '{sweep_id}' in {directory}")
+        return cls(path)
+
+    # -------------------------------------------------------------------------
+    # Contents
+    # -------------------------------------------------------------------------
+
+    @property
+    def prior_rows(self) -> np.ndarray:
+        """Config positions whose results were reused."""
+        if self._prior_rows is None:
+            if self.reused:
+                with np.load(self.directory / 'prior.npz') as data:
+                    self._prior_rows = data['rows']
+            else:
+                self._prior_rows = np.zeros(0, dtype=np.int64)
+        return self._prior_rows
+
+    @property
+    def run_rows(self) -> np.ndarray:
+        """Config positions to simulate, in run order."""
+        if self._run_rows is None:
+            with np.load(self.directory / 'order.npz') as data:
+                self._run_rows = data['rows']
+        return self._run_rows
+
+    @property
+    def num_chunks(self) -> int:
+        return -(-(self.total - self.reused) // self.chunk_configs)
+
+    def chunk_rows(self, index: int) -> np.ndarray:
+        """Config positions simulated in a chunk."""
+        return self.run_rows[index * self.chunk_configs:(index + 1) * self.chunk_configs]
+
+    @property
+    def configs(self) -> Dict[str, np.ndarray]:
+        """Configuration arrays (CONFIG_COLUMNS)."""
+        if self._configs is None:
+            with np.load(self.directory / 'configs.npz') as data:
+                self._configs = {name: data[name] for name in CONFIG_COLUMNS}
+        return self._configs
+
+    def params(self) -> SimulationParams:
+        """Shared simulation parameters of the sweep."""
+        return SimulationParams(**json.loads((self.directory / 'params.json').read_text()))
+
+    # -------------------------------------------------------------------------
+    # Status
+    # -------------------------------------------------------------------------
+
+    def status(self) -> Dict:
+        """Current status.json (re-read on every call)."""
+        return json.loads((self.directory / 'status.json').read_text())
+
+    def _update_status(self, **changes) -> Dict:
+        status = {**self.status(), **changes, 'updated': time.time()}
+        _write_json(self.directory / 'status.json', status)
+        return status
+
+    def completed_mask(self) -> np.ndarray:
+        """Per-configuration completion flags."""
+        mask = np.zeros(self.total, dtype=bool)
+        mask[self.prior_rows] = True
+        for index in self.status()['completed_chunks']:
+            with np.load(self.directory / f'chunk_{index:05d}.npz') as data:
+                mask[data['rows']] = True
+        return mask
+
+    def pending_chunks(self) -> List[int]:
+        """Chunks still to run, in order."""
+        done = set(self.status()['completed_chunks'])
+        return [index for index in range(self.num_chunks) if index not in done]
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.pending_chunks()
+
+    def is_active(self, stale_seconds: float = HEARTBEAT_STALE_SECONDS) -> bool:
+        """True while some process is running the sweep (recent heartbeat)."""
+        status = self.status()
+        return status['state'] == RUNNING and time.time() - status['updated'] < stale_seconds
+
+    # -------------------------------------------------------------------------
+    # Checkpoints
+    # -------------------------------------------------------------------------
+
+    def record_chunk(self, index: int, metrics: Dict[str, np.ndarray]) -> None:
+        """
+        Flush the results of one finished chunk.
+
+        Args:
+            index: Chunk index
+            metrics: METRIC_COLUMNS name -> per-config array of the chunk
+        """
+        arrays = {'rows': self.chunk_rows(index), **{name: np.asarray(metrics[name]) for name in METRIC_COLUMNS}}
+        _write_npz(self.directory / f'chunk_{index:05d}.npz', arrays)
+        completed = sorted(set(self.status()['completed_chunks']) | {index})
+        done = self.reused + sum(len(self.chunk_rows(i)) for i in completed)
+        self._update_status(completed_chunks=completed, completed=done, progress=done / self.total)
+
+    def results(self, chunks: Optional[Iterable[int]] = None, include_prior: bool = True) -> pd.DataFrame:
+        """
+        Results table (the Step 3 columns) of the finished configurations, indexed by config id.
+
+        Args:
+            chunks: Only these finished chunks (default all finished chunks)
+            include_prior: Include the configurations reused from earlier studies
+        """
+        configs = self.configs
+        frame = pd.DataFrame({name: configs[name] for name in CONFIG_COLUMNS if name != 'solar_scale'})
+        frame['duration_hrs'] = frame['duration_hrs'].astype(np.int64)
+
+        parts = {name: [] for name in METRIC_COLUMNS}
+        rows = []
+        if self.reused and include_prior:
+            with np.load(self.directory / 'prior.npz') as data:
+                rows.append(data['rows'])
+                for name in METRIC_COLUMNS:
+                    parts[name].append(data[name])
+        completed = self.status()['completed_chunks']
+        for index in sorted(completed if chunks is None else set(chunks) & set(completed)):
+            with np.load(self.directory / f'chunk_{index:05d}.npz') as data:
+                rows.append(data['rows'])
+                for name in METRIC_COLUMNS:
+                    parts[name].append(data[name])
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        order = np.argsort(rows, kind='stable')
+        frame = frame.iloc[rows[order]]
+        for name, values in parts.items():
+            frame[name] = np.concatenate(values)[order] if values else np.array([])
+        return frame
+
+    def reorder_pending(self, permutation: np.ndarray) -> None:
+        """
+        Reorder the configurations not yet run.
+
+        Args:
+            permutation: Permutation of the pending tail of run_rows (see
+                pending_rows)
+        """
+        start = self._pending_start()
+        rows = self.run_rows.copy()
+        rows[start:] = rows[start:][np.asarray(permutation)]
+        _write_npz(self.directory / 'order.npz', {'rows': rows})
+        self._run_rows = rows
+
+    def _pending_start(self) -> int:
+        completed = self.status()['completed_chunks']
+        return (max(completed) + 1) * self.chunk_configs if completed else 0
+
+    def pending_rows(self) -> np.ndarray:
+        """Config positions not yet run, in run order."""
+        return self.run_rows[self._pending_start():]
+
+    def delete(self) -> None:
+        """Remove the sweep directory."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def summary(self) -> Dict:
+        """Manifest and status fields for listings."""
+        status = self.status()
+        return {
+            'sweep_id': self.sweep_id,
+            'created': self.created,
+            'template_id': self.template_id,
+            'total': self.total,
+            'completed': status['completed'],
+            'progress': status['progress'],
+            'state': status['state'],
+            'active': self.is_active(),
+            'metadata': self.metadata,
+        }
+
+
+def list_sweeps(directory: Union[str, Path] = SWEEP_DIR,
+                include_complete: bool = False) -> List[Dict]:
+    """
+    Sweeps on disk, newest first.
+
+    Args:
+        directory: Parent directory of sweep directories
+        include_complete: Also list finished sweeps
+
+    Returns:
+        List of SweepManifest.summary() dictionaries (unreadable
+        directories are skipped)
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    sweeps = []
+    for path in directory.iterdir():
+        try:
+            manifest = SweepManifest(path)
+            summary = manifest.summary()
+        except (OSError, ValueError, KeyError):
+            continue
+        if include_complete or summary['state'] != COMPLETE:
+            sweeps.append(summary)
+    return sorted(sweeps, key=lambda s: s['created'], reverse=True)
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def run_sweep(manifest: SweepManifest,
+              progress_callback: Optional[Callable[[float], None]] = None,
+              params: Optional[SimulationParams] = None,
+              force: bool = False,
+              chunk_callback: Optional[Callable[['SweepManifest', int], None]] = None) -> pd.DataFrame:
+    """
+    Run (or resume) a sweep, checkpointing every chunk.
+
+    Args:
+        manifest: Sweep to run
+        progress_callback: Optional callable receiving the overall completed
+            fraction (0-1), counting reused configs and chunks finished earlier
+        params: Shared parameters (default: read from the manifest)
+        force: Run even if another process holds a live heartbeat
+        chunk_callback: Optional callable receiving the manifest and the
+            chunk index after each checkpoint (e.g. to redraw partial results
+            or stream the chunk's rows, manifest.results([index], False), to a
+            study file)
+
+    Returns:
+        Full results table (see SweepManifest.results)
+    """
+    if not force and manifest.is_active() and manifest.status().get('owner') != _owner():
+        raise RuntimeError(f"Sweep {manifest.sweep_id} is being run by {manifest.status()['owner']}")
+    if params is None:
+        params = manifest.params()
+
+    configs = manifest.configs
+    manifest._update_status(state=RUNNING, owner=_owner())
+
+    try:
+        for index in manifest.pending_chunks():
+            status = manifest.status()
+            done = status['completed']
+
+            # Progressive sweeps refine around the knee once the fill has run
+            if (manifest.schedule == 'progressive' and not status.get('refined')
+                    and done >= FILL_FRACTION * manifest.total):
+                pending = manifest.pending_rows()
+                grid = pd.DataFrame({name: configs[name][pending] for name in CONFIG_COLUMNS})
+                manifest.reorder_pending(knee_order(grid, manifest.results()))
+                manifest._update_status(refined=True)
+
+            rows = manifest.chunk_rows(index)
+
+            def report_progress(fraction):
+                overall = (done + fraction * len(rows)) / manifest.total
+                manifest._update_status(progress=overall)  # heartbeat
+                if progress_callback is not None:
+                    progress_callback(overall)
+
+            metrics = run_batch_metrics(
+                params, manifest.template_id,
+                lanes={
+                    'bess_capacity': configs['bess_mwh'][rows],
+                    'bess_charge_power': configs['power_mw'][rows],
+                    'bess_discharge_power': configs['power_mw'][rows],
+                    'dg_capacity': configs['dg_mw'][rows],
+                    'solar_scale': configs['solar_scale'][rows],
+                },
+                num_hours=manifest.num_hours,
+                progress_callback=report_progress,
+            )
+            manifest.record_chunk(index, {name: metrics[field] for name, field in METRIC_COLUMNS.items()})
+            if chunk_callback is not None:
+                chunk_callback(manifest, index)
+    except BaseException:
+        manifest._update_status(state=INTERRUPTED, owner=None)
+        raise
+
+    manifest._update_status(state=COMPLETE, owner=None, progress=1.0)
+    if progress_callback is not None:
+        progress_callback(1.0)
+    return manifest.results()
+
+
+def resume_sweep(sweep_id: str, directory: Union[str, Path] = SWEEP_DIR,
+                 progress_callback: Optional[Callable[[float], None]] = None) -> pd.DataFrame:
+    """
+    Resume a sweep by id from its manifest alone (e.g. from a script).
+
+    Args:
+        sweep_id: Sweep id
+        directory: Parent directory of sweep directories
+        progress_callback: Optional progress callable (see run_sweep)
+
+    Returns:
+        Full results table
+    """
+    return run_sweep(SweepManifest.open(sweep_id, directory), progress_callback)
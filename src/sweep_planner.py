@@ -0,0 +1,244 @@
+"""
+Sweep Planner Module - BESS & DG Sizing Tool
+
+Builds sizing grids on canonical values and matches them against earlier
+results, so widening or refining a range (e.g. capacity 50-300 step 25,
+then 50-400 step 10) only simulates the configurations not seen before.
+
+Grid values are snapped to GRID_DECIMALS decimal places. Without this,
+np.arange float drift (0.1 + 0.2 != 0.3) would stop a refined grid from
+matching configurations that a coarser grid already ran.
+
+Progressive scheduling orders a sweep for early insight instead of the
+nested capacity -> duration -> DG loops: the corners of the grid first,
+then a Halton low-discrepancy fill, and once FILL_FRACTION of the grid has
+run, the rest sorted by distance to the delivery knee. The delivery
+frontier of any prefix of that order is already a fair picture of the
+final one.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+GRID_DECIMALS = 6
+
+# Columns that identify a configuration in the results table
+CONFIG_KEY_COLUMNS = ('bess_mwh', 'duration_hrs', 'power_mw', 'dg_mw', 'solar_mw')
+
+# Grid axes of a sweep (power follows from capacity and duration)
+SWEEP_AXES = ('bess_mwh', 'duration_hrs', 'dg_mw', 'solar_mw')
+
+# Share of the grid run in space-filling order before knee refinement
+FILL_FRACTION = 0.25
+
+# Progressive sweeps run in about PROGRESSIVE_STAGES chunks, each at least
+# PROGRESSIVE_MIN_CHUNK lanes (smaller batches waste the per-step overhead)
+PROGRESSIVE_STAGES = 10
+PROGRESSIVE_MIN_CHUNK = 256
+
+_HALTON_BASES = (2, 3, 5, 7, 11, 13)
+
+
+def snap(values, decimals: int = GRID_DECIMALS) -> np.ndarray:
+    """
+    Round values to their canonical decimal form.
+
+    Args:
+        values: Scalar or array of floats
+        decimals: Decimal places kept
+
+    Returns:
+        Float array (negative zero normalised to zero)
+    """
+    return np.round(np.asarray(values, dtype=float), decimals) + 0.0
+
+
+def grid_values(start: float, stop: float, step: float,
+                decimals: int = GRID_DECIMALS) -> np.ndarray:
+    """
+    Inclusive range from start to stop on canonical values.
+
+    Unlike np.arange(start, stop + step, step), never overshoots stop and
+    gives the same count as the Step 3 configuration estimate.
+
+    Args:
+        start: First value
+        stop: Last value (included when on the grid)
+        step: Spacing; a non-positive step gives [start]
+        decimals: Decimal places kept
+
+    Returns:
+        Array of snapped values
+    """
+    if step <= 0:
+        return snap([start], decimals)
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return snap(start + step * np.arange(max(count, 0)), decimals)
+
+
+def match_prior(grid: pd.DataFrame, prior: Optional[pd.DataFrame],
+                columns: Sequence[str] = CONFIG_KEY_COLUMNS,
+                decimals: int = GRID_DECIMALS) -> pd.DataFrame:
+    """
+    Earlier results of the grid configurations that have already run.
+
+    Args:
+        grid: Configurations to simulate (columns include the key columns)
+        prior: Earlier results table(s) for the same base parameters and
+            profiles; on duplicate configurations the first row wins
+        columns: Key columns identifying a configuration
+        decimals: Decimal places compared
+
+    Returns:
+        Prior result columns (without the key columns) indexed by the grid
+        row position of each matched configuration, in grid order
+    """
+    keys = list(columns)
+    if prior is None or prior.empty or grid.empty:
+        extra = [] if prior is None else [c for c in prior.columns if c not in keys]
+        return pd.DataFrame(columns=extra, index=pd.Index([], dtype=np.int64))
+
+    left = pd.DataFrame({name: snap(grid[name], decimals) for name in keys})
+    left['_row'] = np.arange(len(grid))
+    right = prior.copy()
+    for name in keys:
+        right[name] = snap(right[name], decimals)
+    right = right.drop_duplicates(keys, keep='first')
+
+    matched = left.merge(right, on=keys, how='inner').set_index('_row').sort_index()
+    matched.index.name = None
+    return matched.drop(columns=keys)
+
+
+# =============================================================================
+# PROGRESSIVE ORDER
+# =============================================================================
+
+def _halton(count: int, base: int) -> np.ndarray:
+    """First count points (from index 1) of the radical inverse in a base."""
+    index = np.arange(1, count + 1)
+    result = np.zeros(count)
+    fraction = 1.0 / base
+    while index.any():
+        index, digit = np.divmod(index, base)
+        result += digit * fraction
+        fraction /= base
+    return result
+
+
+def _level_indices(grid: pd.DataFrame, axes: Sequence[str]) -> np.ndarray:
+    """(configs, axes) array of each configuration's level index per axis."""
+    return np.column_stack([np.unique(snap(grid[axis]), return_inverse=True)[1] for axis in axes])
+
+
+def progressive_order(grid: pd.DataFrame, axes: Sequence[str] = SWEEP_AXES) -> np.ndarray:
+    """
+    Space-filling run order: grid corners first, then a Halton fill.
+
+    Args:
+        grid: Configurations (any subset of a grid works)
+        axes: Grid axes; axes with a single value are ignored
+
+    Returns:
+        Permutation of the row positions
+    """
+    total = len(grid)
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    axes = [axis for axis in axes if axis in grid and grid[axis].nunique() > 1]
+    if not axes:
+        return np.arange(total)
+
+    levels = _level_indices(grid, axes)
+    counts = levels.max(axis=0) + 1
+    cell = np.ravel_multi_index(levels.T, counts)
+    first_row = pd.Series(np.arange(total)).groupby(cell).first()
+
+    # Corners: every axis at its lowest or highest level
+    corner = ((levels == 0) | (levels == counts - 1)).all(axis=1)
+    order = list(np.flatnonzero(corner))
+
+    # Halton points snapped to the nearest grid cell, in order of first hit
+    points = 8 * total
+    halton = np.column_stack([_halton(points, _HALTON_BASES[i % len(_HALTON_BASES)])
+                              for i in range(len(axes))])
+    snapped = np.minimum(np.floor(halton * counts), counts - 1).astype(np.int64)
+    hit_cells = pd.unique(np.ravel_multi_index(snapped.T, counts))
+    hits = first_row.reindex(hit_cells).dropna().astype(np.int64).to_numpy()
+
+    # Configurations sharing a cell (or never hit) follow in grid order
+    seen = np.zeros(total, dtype=bool)
+    seen[order] = True
+    for row in hits:
+        if not seen[row]:
+            seen[row] = True
+            order.append(row)
+    order.extend(np.flatnonzero(~seen))
+    return np.asarray(order, dtype=np.int64)
+
+
+def progressive_chunk_size(total: int, maximum: int) -> int:
+    """Lanes per chunk of a progressive sweep of total configurations."""
+    return int(min(maximum, max(PROGRESSIVE_MIN_CHUNK, -(-total // PROGRESSIVE_STAGES))))
+
+
+def delivery_frontier(results: pd.DataFrame, x: str = 'bess_mwh',
+                      y: str = 'delivery_pct') -> pd.DataFrame:
+    """
+    Best delivery achievable with at most each BESS size.
+
+    Args:
+        results: Results table (complete or partial)
+        x: Size column
+        y: Metric column (higher is better)
+
+    Returns:
+        DataFrame of x and y, one row per simulated x value, y non-decreasing
+    """
+    best = results.groupby(x)[y].max().sort_index()
+    return pd.DataFrame({x: best.index.to_numpy(), y: np.maximum.accumulate(best.to_numpy())})
+
+
+def delivery_knee(frontier: pd.DataFrame, x: str = 'bess_mwh',
+                  y: str = 'delivery_pct') -> Optional[float]:
+    """
+    Knee of a frontier: the point furthest above the chord between its ends.
+
+    Args:
+        frontier: Output of delivery_frontier
+        x: Size column
+        y: Metric column
+
+    Returns:
+        x value of the knee, or None for fewer than three points or a flat frontier
+    """
+    if len(frontier) < 3:
+        return None
+    xs = frontier[x].to_numpy(dtype=float)
+    ys = frontier[y].to_numpy(dtype=float)
+    if np.ptp(xs) == 0 or np.ptp(ys) == 0:
+        return None
+    gain = (ys - ys[0]) / np.ptp(ys) - (xs - xs[0]) / np.ptp(xs)
+    return float(xs[int(np.argmax(gain))])
+
+
+def knee_order(pending: pd.DataFrame, results: pd.DataFrame) -> np.ndarray:
+    """
+    Refinement order: pending configurations closest to the knee first.
+
+    Args:
+        pending: Configurations still to run, in their current order
+        results: Results so far
+
+    Returns:
+        Permutation of the pending row positions (current order kept when
+        no knee can be found, and among equal distances)
+    """
+    knee = delivery_knee(delivery_frontier(results)) if len(results) else None
+    if knee is None:
+        return np.arange(len(pending))
+    distance = np.abs(pending['bess_mwh'].to_numpy(dtype=float) - knee)
+    return np.argsort(distance, kind='stable')
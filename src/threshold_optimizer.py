@@ -0,0 +1,147 @@
+"""
+Threshold Optimizer Module - BESS & DG Sizing Tool
+
+Grid search over the DG SoC hysteresis thresholds of one configuration.
+
+In the SoC-triggered templates (2, 4, 5, 6) the DG starts when the battery
+falls to dg_soc_on_threshold and stops once it recovers to
+dg_soc_off_threshold. The pair trades delivery against DG runtime and
+starts. Every valid pair of a threshold grid (on < off, both within the
+BESS min/max SoC) runs as one lane of a single batched engine pass;
+invalid pairs are never simulated. The result holds a heatmap per metric
+and the Pareto-optimal pairs (highest delivery, fewest DG hours and
+starts).
+"""
+
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .batch_engine import run_batch_metrics
+from .dispatch_engine import SimulationParams
+from .sweep_planner import grid_values
+
+
+# Templates whose DG follows the SoC hysteresis
+SOC_TEMPLATES = (2, 4, 5, 6)
+
+DEFAULT_THRESHOLD_STEP = 5.0
+
+# Result column -> SummaryMetrics field
+THRESHOLD_METRICS = {
+    'delivery_pct': 'pct_full_delivery',
+    'dg_hours': 'dg_runtime_hours',
+    'dg_starts': 'dg_starts',
+    'unserved_mwh': 'total_unserved',
+}
+
+# Pareto objectives: (column, True to maximise)
+PARETO_OBJECTIVES = (('delivery_pct', True), ('dg_hours', False), ('dg_starts', False))
+
+_PARETO_BLOCK = 512
+
+
+def threshold_pairs(min_soc: float, max_soc: float,
+                    step: float = DEFAULT_THRESHOLD_STEP,
+                    min_deadband: float = 0.0) -> pd.DataFrame:
+    """
+    Valid (on, off) threshold pairs of a grid.
+
+    Args:
+        min_soc: BESS minimum SoC (%); lowest threshold on the grid
+        max_soc: BESS maximum SoC (%); highest threshold on the grid
+        step: Grid spacing (percentage points)
+        min_deadband: Smallest off - on gap kept (pairs always have on < off)
+
+    Returns:
+        DataFrame with columns soc_on and soc_off, ordered by on then off
+    """
+    levels = grid_values(min_soc, max_soc, step)
+    on, off = np.meshgrid(levels, levels, indexing='ij')
+    valid = (off > on) & (off - on >= min_deadband)
+    return pd.DataFrame({'soc_on': on[valid], 'soc_off': off[valid]})
+
+
+def pareto_mask(table: pd.DataFrame,
+                objectives: Sequence[Tuple[str, bool]] = PARETO_OBJECTIVES) -> np.ndarray:
+    """
+    Rows no other row dominates.
+
+    A row is dominated when another is at least as good on every objective
+    and strictly better on one; rows with identical objectives are all kept.
+
+    Args:
+        table: Rows to compare
+        objectives: (column, maximise) pairs
+
+    Returns:
+        Boolean array, True for Pareto-optimal rows
+    """
+    costs = np.column_stack([-table[c].to_numpy(dtype=float) if maximise else table[c].to_numpy(dtype=float)
+                             for c, maximise in objectives])
+    optimal = np.ones(len(costs), dtype=bool)
+    for start in range(0, len(costs), _PARETO_BLOCK):
+        block = costs[start:start + _PARETO_BLOCK, None, :]
+        no_worse = (costs[None, :, :] <= block).all(axis=2)
+        better = (costs[None, :, :] < block).any(axis=2)
+        optimal[start:start + _PARETO_BLOCK] = ~(no_worse & better).any(axis=1)
+    return optimal
+
+
+def optimize_soc_thresholds(params: SimulationParams, template_id: int,
+                            step: float = DEFAULT_THRESHOLD_STEP,
+                            min_deadband: float = 0.0,
+                            num_hours: int = 8760,
+                            progress_callback: Optional[Callable[[float], None]] = None) -> Dict:
+    """
+    Evaluate every valid SoC threshold pair of one configuration.
+
+    Args:
+        params: Configuration (sizes, rules, profiles); its own thresholds
+            are ignored
+        template_id: SoC-triggered template (see SOC_TEMPLATES)
+        step: Threshold grid spacing (percentage points)
+        min_deadband: Smallest off - on gap evaluated
+        num_hours: Hours to simulate
+        progress_callback: Optional callable receiving the completed fraction
+
+    Returns:
+        Dictionary with:
+            - pairs: DataFrame of soc_on, soc_off, THRESHOLD_METRICS columns
+              and 'pareto' (bool), one row per valid pair
+            - pareto: Pareto-optimal rows, highest delivery first
+            - heatmaps: metric -> DataFrame (index soc_on, columns soc_off;
+              NaN for invalid pairs)
+            - skipped: Invalid grid pairs not simulated
+    """
+    if template_id not in SOC_TEMPLATES:
+        raise ValueError(f"Template {template_id} has no SoC-triggered DG (expected one of {SOC_TEMPLATES})")
+    if not params.dg_enabled:
+        raise ValueError("Threshold optimisation needs the DG enabled")
+
+    pairs = threshold_pairs(params.bess_min_soc, params.bess_max_soc, step, min_deadband)
+    if pairs.empty:
+        raise ValueError("No valid threshold pairs: widen the SoC range or reduce the step/deadband")
+    levels = len(grid_values(params.bess_min_soc, params.bess_max_soc, step))
+
+    metrics = run_batch_metrics(
+        params, template_id,
+        lanes={'dg_soc_on_threshold': pairs['soc_on'].to_numpy(),
+               'dg_soc_off_threshold': pairs['soc_off'].to_numpy()},
+        num_hours=num_hours, progress_callback=progress_callback,
+    )
+    for column, field_name in THRESHOLD_METRICS.items():
+        pairs[column] = metrics[field_name]
+    pairs['pareto'] = pareto_mask(pairs)
+
+    pareto = pairs[pairs['pareto']].sort_values(
+        ['delivery_pct', 'dg_hours', 'dg_starts'], ascending=[False, True, True]).reset_index(drop=True)
+    heatmaps = {column: pairs.pivot(index='soc_on', columns='soc_off', values=column)
+                for column in THRESHOLD_METRICS}
+    return {
+        'pairs': pairs,
+        'pareto': pareto,
+        'heatmaps': heatmaps,
+        'skipped': levels * levels - len(pairs),
+    }
@@ -0,0 +1,161 @@
+"""
+Window Optimizer Module - BESS & DG Sizing Tool
+
+Search over the start/end hours of the DG time window of one configuration.
+
+Templates 2 and 6 run the DG in the night window, template 5 in the day
+window and template 3 everywhere except the blackout window. Every
+start/end pair of that window (24 x 24, less the empty start == end
+windows and any pair outside the length and hour constraints) becomes one
+lane of a single batched engine pass, with the window's hour flags fed in
+as per-lane hour masks instead of being rebuilt run by run. Windows are
+ranked by DG runtime among those meeting a delivery floor.
+"""
+
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .batch_engine import run_batch_metrics
+from .dispatch_engine import HOURS_PER_DAY, SimulationParams
+
+
+# Template -> window its DG timing depends on
+WINDOW_TEMPLATES = {2: 'night', 3: 'blackout', 5: 'day', 6: 'night'}
+
+# Window -> (SimulationParams start field, end field)
+WINDOW_FIELDS = {
+    'night': ('night_start_hour', 'night_end_hour'),
+    'day': ('day_start_hour', 'day_end_hour'),
+    'blackout': ('blackout_start_hour', 'blackout_end_hour'),
+}
+
+# Result column -> SummaryMetrics field
+WINDOW_METRICS = {
+    'delivery_pct': 'pct_full_delivery',
+    'dg_hours': 'dg_runtime_hours',
+    'dg_starts': 'dg_starts',
+    'unserved_mwh': 'total_unserved',
+}
+
+DEFAULT_DELIVERY_FLOOR = 95.0
+
+
+def window_masks(starts, ends) -> np.ndarray:
+    """
+    Hour flags of windows, as build_hour_arrays sets them.
+
+    A window covers start..end-1, wrapping past midnight when start > end;
+    start == end is empty.
+
+    Args:
+        starts: Start hours (0-23)
+        ends: End hours (0-23)
+
+    Returns:
+        (windows, 24) boolean array
+    """
+    starts = np.asarray(starts, dtype=np.int64)[:, None]
+    ends = np.asarray(ends, dtype=np.int64)[:, None]
+    hours = np.arange(HOURS_PER_DAY)[None, :]
+    return (hours - starts) % HOURS_PER_DAY < (ends - starts) % HOURS_PER_DAY
+
+
+def candidate_windows(min_length: int = 1, max_length: int = HOURS_PER_DAY - 1,
+                      must_include: Iterable[int] = (),
+                      must_exclude: Iterable[int] = ()) -> pd.DataFrame:
+    """
+    Start/end pairs meeting the window constraints.
+
+    Args:
+        min_length: Fewest hours in the window (at least 1)
+        max_length: Most hours in the window (at most 23)
+        must_include: Hours the window has to cover
+        must_exclude: Hours the window must leave out
+
+    Returns:
+        DataFrame with columns start, end and length, ordered by start then end
+    """
+    start, end = np.meshgrid(np.arange(HOURS_PER_DAY), np.arange(HOURS_PER_DAY), indexing='ij')
+    start, end = start.ravel(), end.ravel()
+    length = (end - start) % HOURS_PER_DAY
+    keep = (length >= max(min_length, 1)) & (length <= max_length)
+
+    masks = window_masks(start, end)
+    include, exclude = list(must_include), list(must_exclude)
+    if include:
+        keep &= masks[:, include].all(axis=1)
+    if exclude:
+        keep &= ~masks[:, exclude].any(axis=1)
+    return pd.DataFrame({'start': start[keep], 'end': end[keep], 'length': length[keep]})
+
+
+def optimize_time_window(params: SimulationParams, template_id: int,
+                         delivery_floor: float = DEFAULT_DELIVERY_FLOOR,
+                         min_length: int = 1, max_length: int = HOURS_PER_DAY - 1,
+                         must_include: Iterable[int] = (),
+                         must_exclude: Iterable[int] = (),
+                         num_hours: int = 8760,
+                         progress_callback: Optional[Callable[[float], None]] = None) -> Dict:
+    """
+    Evaluate every feasible DG window of one configuration.
+
+    Args:
+        params: Configuration (sizes, rules, profiles); its own window hours
+            are ignored for the optimised window
+        template_id: Windowed template (see WINDOW_TEMPLATES)
+        delivery_floor: Minimum delivery (%) a window must reach to be ranked
+        min_length: Fewest hours in the window
+        max_length: Most hours in the window
+        must_include: Hours the window has to cover
+        must_exclude: Hours the window must leave out
+        num_hours: Hours to simulate
+        progress_callback: Optional callable receiving the completed fraction
+
+    Returns:
+        Dictionary with:
+            - window: 'night', 'day' or 'blackout'
+            - windows: DataFrame of start, end, length, WINDOW_METRICS columns,
+              'meets_floor' (bool) and 'rank' (1 = fewest DG hours among
+              windows meeting the floor, <NA> otherwise), ranked rows first
+            - best: Row of the top-ranked window as a dict, or None when no
+              window meets the floor
+            - current: Metrics row of the params' own window as a dict, or
+              None when it is not among the candidates
+            - pruned: Start/end pairs not simulated
+    """
+    if template_id not in WINDOW_TEMPLATES:
+        raise ValueError(f"Template {template_id} has no DG time window (expected one of {tuple(WINDOW_TEMPLATES)})")
+    if not params.dg_enabled:
+        raise ValueError("Window optimisation needs the DG enabled")
+
+    window = WINDOW_TEMPLATES[template_id]
+    windows = candidate_windows(min_length, max_length, must_include, must_exclude)
+    if windows.empty:
+        raise ValueError("No window meets the constraints: relax the length limits or the required hours")
+
+    metrics = run_batch_metrics(
+        params, template_id,
+        lanes={'bess_capacity': np.full(len(windows), float(params.bess_capacity))},
+        num_hours=num_hours, progress_callback=progress_callback,
+        hour_masks={window: window_masks(windows['start'], windows['end'])},
+    )
+    for column, field_name in WINDOW_METRICS.items():
+        windows[column] = metrics[field_name]
+
+    windows['meets_floor'] = windows['delivery_pct'] >= delivery_floor
+    windows = windows.sort_values(['meets_floor', 'dg_hours', 'delivery_pct', 'dg_starts'],
+                                  ascending=[False, True, False, True]).reset_index(drop=True)
+    windows['rank'] = pd.Series(np.arange(1, len(windows) + 1)).where(windows['meets_floor']).astype('Int64')
+
+    start_field, end_field = WINDOW_FIELDS[window]
+    current = windows[(windows['start'] == getattr(params, start_field))
+                      & (windows['end'] == getattr(params, end_field))]
+    return {
+        'window': window,
+        'windows': windows,
+        'best': windows.iloc[0].to_dict() if windows['meets_floor'].iloc[0] else None,
+        'current': current.iloc[0].to_dict() if not current.empty else None,
+        'pruned': HOURS_PER_DAY * HOURS_PER_DAY - len(windows),
+    }
@@ -5,10 +5,18 @@ Centralizes all state management for the new wizard UI.
 Provides initialization, validation, and persistence for wizard steps.
 """
 
+import hashlib
+import json
+import numbers
+
 import streamlit as st
 from typing import Dict, Any, Optional, List
 from copy import deepcopy
 
+from .perf_model import estimate_sweep
+from .profile_stats import profile_digest
+from .sweep_planner import grid_values
+
 
 # =============================================================================
 # DEFAULT STATE DEFINITIONS
@@ -30,6 +38,11 @@ DEFAULT_WIZARD_STATE = {
         'load_night_end': 6,
         'load_windows': [],  # List of {'start': int, 'end': int, 'mw': float}
         'load_csv_data': None,  # numpy array if CSV uploaded
+        'load_weekday_multiplier': 1.0,  # Scales Mon-Fri (any load mode)
+        'load_weekend_multiplier': 1.0,  # Scales Sat-Sun
+        'load_monthly_multipliers': [1.0] * 12,  # January first
+        'load_seasonal_multipliers': {'winter': 1.0, 'spring': 1.0, 'summer': 1.0, 'autumn': 1.0},
+        'load_layers': [],  # List of {'start', 'end', 'mw', 'days', 'months'} added on top
 
         # Solar profile
         'solar_capacity_mw': 100.0,
@@ -94,15 +107,30 @@ DEFAULT_WIZARD_STATE = {
         'dg_max': 20.0,  # MW
         'dg_step': 5.0,  # MW
 
+        # Solar (PV oversizing) range - off: use Step 1 solar capacity
+        'solar_sweep': False,
+        'solar_min': 100.0,  # MWp
+        'solar_max': 200.0,  # MWp
+        'solar_step': 25.0,  # MWp
+
         # Fixed mode values
         'fixed_capacity': 100.0,  # MWh
         'fixed_duration': 2,  # hours
         'fixed_dg': 10.0,  # MW
+
+        # Save each sweep to disk as a columnar study file
+        'save_study': True,
+        # Run order: 'grid' (nested loops) or 'progressive' (early insight)
+        'schedule': 'grid',
     },
 
     # Step 4: Results
     'results': {
         'simulation_results': None,  # DataFrame with all configs
+        'study_path': None,  # Saved study file of these results (if any)
+        'study_id': None,  # Study store id of these results (if any)
+        'partial_sweep': None,  # {'sweep_id', 'key', 'total'} while results are a partial sweep
+        'sweep_signature': None,  # sweep_signature() of the setup and rules behind these results
         'selected_configs': [],  # List of config indices for comparison (max 3)
         'sort_column': 'delivery_pct',
         'sort_ascending': False,
@@ -284,6 +312,15 @@ def validate_step_3() -> tuple[bool, List[str]]:
             if sizing['dg_step'] <= 0:
                 errors.append("DG step must be positive")
 
+        # Solar range (if swept)
+        if sizing.get('solar_sweep', False):
+            if sizing['solar_min'] <= 0:
+                errors.append("Minimum solar capacity must be positive")
+            if sizing['solar_max'] < sizing['solar_min']:
+                errors.append("Maximum solar capacity must be >= minimum")
+            if sizing['solar_step'] <= 0:
+                errors.append("Solar step must be positive")
+
         # Check total configurations
         num_configs = count_configurations()
         if num_configs > 50000:
@@ -314,37 +351,56 @@ def count_configurations() -> int:
         return 1
 
     # Count capacity values
-    cap_range = sizing['capacity_max'] - sizing['capacity_min']
-    cap_count = int(cap_range / sizing['capacity_step']) + 1 if sizing['capacity_step'] > 0 else 1
+    cap_count = len(grid_values(sizing['capacity_min'], sizing['capacity_max'], sizing['capacity_step']))
 
     # Count duration values
     dur_count = len(sizing['durations'])
 
     # Count DG values
     if setup['dg_enabled'] and sizing['dg_step'] > 0:
-        dg_range = sizing['dg_max'] - sizing['dg_min']
-        dg_count = int(dg_range / sizing['dg_step']) + 1
+        dg_count = len(grid_values(sizing['dg_min'], sizing['dg_max'], sizing['dg_step']))
     else:
         dg_count = 1
 
-    return cap_count * dur_count * dg_count
+    # Count solar values
+    if sizing.get('solar_sweep', False) and sizing['solar_step'] > 0:
+        solar_count = len(grid_values(sizing['solar_min'], sizing['solar_max'], sizing['solar_step']))
+    else:
+        solar_count = 1
+
+    return cap_count * dur_count * dg_count * solar_count
 
 
-def estimate_simulation_time() -> str:
-    """Estimate simulation time based on configuration count."""
-    num_configs = count_configurations()
+def estimate_sweep_cost() -> Dict[str, Dict]:
+    """
+    Predicted wall time and memory of the Step 3 sweep per backend.
+
+    Uses throughput measured on this machine for the current template
+    (see perf_model; the first call per template calibrates).
+    """
+    init_wizard_state()
+    setup = st.session_state.wizard['setup']
+    rules = st.session_state.wizard['rules']
+    return estimate_sweep(count_configurations(), rules['inferred_template'], setup['dg_enabled'])
 
-    # Rough estimate: ~30ms per configuration
-    seconds = num_configs * 0.03
 
+def format_duration(seconds: float) -> str:
+    """Human-readable run time estimate."""
     if seconds < 1:
         return "< 1 second"
     elif seconds < 60:
         return f"~{int(seconds)} seconds"
-    elif seconds < 300:
-        return f"~{int(seconds / 60)} minutes"
     else:
-        return f"~{int(seconds / 60)} minutes (consider reducing range)"
+        return f"~{int(seconds / 60)} minutes"
+
+
+def estimate_simulation_time() -> str:
+    """Estimate simulation time of the Step 3 sweep (batched engine)."""
+    seconds = estimate_sweep_cost()['batched']['seconds']
+    text = format_duration(seconds)
+    if seconds >= 300:
+        text += " (consider reducing range)"
+    return text
 
 
 def get_step_status(step: int) -> str:
@@ -393,6 +449,8 @@ def build_simulation_params() -> Dict[str, Any]:
         'dg_charges_bess': rules['dg_charges_bess'],
         'dg_load_priority': rules['dg_load_priority'],
         'dg_takeover_mode': rules['dg_takeover_mode'],
+        'dg_operating_mode': setup['dg_operating_mode'],
+        'dg_min_load_pct': setup['dg_min_load_pct'],
 
         # Time windows
         'night_start_hour': rules['night_start'],
@@ -408,6 +466,68 @@ def build_simulation_params() -> Dict[str, Any]:
     }
 
 
+def load_composition_params(setup: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calendar keys of build_load_profile for the Step 1 load variation.
+
+    Only the settings that change the profile are returned, so a setup
+    without calendar variation builds (and signs) the same as before.
+
+    Args:
+        setup: Wizard setup section
+
+    Returns:
+        Dict to merge into the build_load_profile params
+    """
+    params = {}
+    weekday = setup.get('load_weekday_multiplier', 1.0)
+    weekend = setup.get('load_weekend_multiplier', 1.0)
+    if weekday != 1.0 or weekend != 1.0:
+        params['weekday_multiplier'] = weekday
+        params['weekend_multiplier'] = weekend
+
+    monthly = setup.get('load_monthly_multipliers') or []
+    if any(factor != 1.0 for factor in monthly):
+        params['monthly_multipliers'] = list(monthly)
+
+    seasonal = {season: factor for season, factor in (setup.get('load_seasonal_multipliers') or {}).items()
+                if factor != 1.0}
+    if seasonal:
+        params['seasonal_multipliers'] = seasonal
+
+    layers = [layer for layer in setup.get('load_layers') or [] if layer.get('mw')]
+    if layers:
+        params['layers'] = layers
+    return params
+
+
+def sweep_signature() -> str:
+    """
+    Digest of the setup and rules that determine sweep results.
+
+    Results stored with the signature of the current wizard state can
+    stand in for simulations of it (e.g. the Quick Analysis estimates).
+    Numbers are compared as floats, so 30 and 30.0 match.
+    """
+    init_wizard_state()
+    setup = st.session_state.wizard['setup']
+    rules = st.session_state.wizard['rules']
+
+    payload = build_simulation_params()
+    payload['load_csv_data'] = None if setup['load_csv_data'] is None else profile_digest(setup['load_csv_data'])
+    payload['solar_csv_data'] = None if setup['solar_csv_data'] is None else profile_digest(setup['solar_csv_data'])
+    payload['solar_source'] = setup['solar_source']
+    payload['solar_capacity_mw'] = setup['solar_capacity_mw']
+    payload['template_id'] = rules['inferred_template']
+    composition = load_composition_params(setup)
+    if composition:
+        payload['load_composition'] = composition
+    payload = {name: float(value) if isinstance(value, numbers.Real) and not isinstance(value, bool) else value
+               for name, value in payload.items()}
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True, default=str).encode(),
+                           digest_size=16).hexdigest()
+
+
 def add_comparison_config(config_index: int) -> bool:
     """Add a config to comparison selection. Returns True if added."""
     init_wizard_state()
@@ -7,6 +7,7 @@ configuration management, and input validation.
 
 from .metrics import (
     calculate_metrics_summary,
+    calculate_sweep_metrics_summary,
     find_optimal_battery_size,
     create_hourly_dataframe,
     format_results_for_export
@@ -16,6 +17,7 @@ from .validators import validate_battery_config
 
 __all__ = [
     'calculate_metrics_summary',
+    'calculate_sweep_metrics_summary',
     'find_optimal_battery_size',
     'create_hourly_dataframe',
     'format_results_for_export',
@@ -15,6 +15,7 @@ from src.config import (
     MAX_SIMULATIONS,
     SIMULATION_START_YEAR
 )
+from src.battery_simulator import simulate_bess_capacity_sweep
 
 
 def calculate_metrics_summary(battery_capacity_mwh, simulation_results):
@@ -53,6 +54,27 @@ def calculate_metrics_summary(battery_capacity_mwh, simulation_results):
     return metrics
 
 
+def calculate_sweep_metrics_summary(battery_sizes, solar_profile, config=None):
+    """
+    Simulate and summarise a whole battery size curve in one pass.
+
+    Args:
+        battery_sizes: Iterable of battery capacities in MWh
+        solar_profile: Array of hourly solar generation (MW)
+        config: Optional configuration dictionary
+
+    Returns:
+        list: Metrics rows (calculate_metrics_summary format) per battery
+              size, ready for find_optimal_battery_size
+    """
+    battery_sizes = list(battery_sizes)
+    sweep_results = simulate_bess_capacity_sweep(battery_sizes, solar_profile, config)
+    return [
+        calculate_metrics_summary(size, results)
+        for size, results in zip(battery_sizes, sweep_results)
+    ]
+
+
 def find_optimal_battery_size(all_results):
     """
     Find optimal battery size based on diminishing returns.